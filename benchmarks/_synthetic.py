@@ -0,0 +1,57 @@
+"""Synthetic registries for the benchmarks: N real clones of local bare remotes, no network.
+
+Real repos rather than mocks because every benchmark here measures process spawns and git's own
+work, which a stub would replace with whatever number it was told to return.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+from pathlib import Path
+
+# A fixed identity, so the clones commit on a machine with no git config at all.
+_IDENTITY = {
+    'GIT_AUTHOR_NAME': 'bench',
+    'GIT_AUTHOR_EMAIL': 'bench@example.com',
+    'GIT_COMMITTER_NAME': 'bench',
+    'GIT_COMMITTER_EMAIL': 'bench@example.com',
+}
+
+
+def git(path: Path, *args: str) -> str:
+    result = subprocess.run(['git', *args], cwd=path, capture_output=True, text=True, check=True, env={**os.environ, **_IDENTITY})
+    return result.stdout
+
+
+def build_repos(root: Path, count: int, *, branches: int = 3) -> list[Path]:
+    """`count` clones of one seeded bare remote each, with a mix of the states syncer reports.
+
+    Every third repo has an uncommitted change and every fifth a stash, so the readers under test
+    take both of their paths rather than only the clean one.
+    """
+    seed = root / 'seed'
+    seed.mkdir(parents=True)
+    git(seed, 'init', '-q', '-b', 'main')
+    for index in range(5):
+        (seed / f'file{index}.txt').write_text(f'{index}\n')
+        git(seed, 'add', '.')
+        git(seed, 'commit', '-q', '-m', f'commit {index}')
+    for index in range(branches):
+        git(seed, 'branch', f'feature/{index}')
+
+    repos = []
+    for index in range(count):
+        bare = root / 'remotes' / f'repo{index}.git'
+        git(root, 'clone', '-q', '--bare', str(seed), str(bare))
+        clone = root / 'clones' / f'repo{index}'
+        git(root, 'clone', '-q', str(bare), str(clone))
+        for branch in range(branches):
+            git(clone, 'branch', '-q', '--track', f'feature/{branch}', f'origin/feature/{branch}')
+        if index % 5 == 0:
+            (clone / 'file0.txt').write_text('stashed\n')
+            git(clone, 'stash', '-q')
+        if index % 3 == 0:
+            (clone / 'file1.txt').write_text('dirty\n')
+        repos.append(clone)
+    return repos
@@ -0,0 +1,90 @@
+"""Ahead/behind from the commit-graph against `git rev-list --left-right --count`, by distance.
+
+    python benchmarks/commitgraph.py [--history 30000] [--rounds 50]
+
+One repo with a long first-parent history, a merge every tenth commit, and a commit-graph written
+over all of it. Each row compares a branch `distance` commits ahead of main with main, the way a
+guard compares a branch with its upstream: once by walking the graph in process and once by
+spawning git. The walk grows with the distance and the spawn barely does, which is where
+commitgraph.WALK_LIMIT comes from.
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from _synthetic import git  # noqa: E402
+
+from syncer.commitgraph import WALK_LIMIT  # noqa: E402
+from syncer.commitgraph import CommitGraph  # noqa: E402
+from syncer.commitgraph import GraphMiss  # noqa: E402
+from syncer.repos import run_command  # noqa: E402
+
+_DISTANCES = (1, 10, 100, 1_000, 10_000)
+
+
+def _commit(branch: str, mark: int, when: int, message: str, *parents: int) -> str:
+    """One fast-import commit; mark 0 as a parent is no parent."""
+    lines = [f'commit refs/heads/{branch}', f'mark :{mark}', f'committer b <b@example.com> {when} +0000', f'data {len(message)}', message]
+    lines += [f'{"from" if index == 0 else "merge"} :{parent}' for index, parent in enumerate(parents) if parent]
+    return '\n'.join(lines) + '\n'
+
+
+def build_history(path: Path, length: int) -> list[str]:
+    """`length` commits on main through fast-import, with a side commit merged in every tenth;
+    returns main's first-parent oids, newest first."""
+    path.mkdir()
+    git(path, 'init', '-q', '-b', 'main')
+    stream = []
+    mark = 0
+    for index in range(1, length + 1):
+        stream.append(_commit('main', mark + 1, index, '', mark))
+        mark += 1
+        if index % 10 == 0:
+            # A message of its own, or it would be the same object as the main commit beside it.
+            stream.append(_commit('side', mark + 1, index, 'side', mark - 1))
+            stream.append(_commit('main', mark + 2, index, '', mark, mark + 1))
+            mark += 2
+    subprocess.run(['git', 'fast-import', '--quiet'], cwd=path, input=''.join(stream), text=True, check=True)  # nosec B603 B607
+    git(path, 'commit-graph', 'write', '--reachable')
+    return git(path, 'rev-list', '--first-parent', 'main').split()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--history', type=int, default=30_000)
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'history'
+        first_parents = build_history(path, args.history)
+        graph = CommitGraph.open(path / '.git')
+        assert graph is not None
+        print(f'walk limit {WALK_LIMIT} commits')
+        for distance in _DISTANCES:
+            if distance >= len(first_parents):
+                break
+            head, base = first_parents[0], first_parents[distance]
+            started = time.perf_counter()
+            for _ in range(args.rounds):
+                try:
+                    counts = graph.ahead_behind(head, base)
+                except GraphMiss as exc:
+                    counts = str(exc)
+            walked = (time.perf_counter() - started) / args.rounds
+            started = time.perf_counter()
+            for _ in range(args.rounds):
+                run_command(['git', 'rev-list', '--left-right', '--count', f'{head}...{base}'], cwd=path, timeout=60)
+            spawned = (time.perf_counter() - started) / args.rounds
+            print(f'{distance:>6} first parents: graph {walked * 1e3:7.3f} ms  git {spawned * 1e3:6.3f} ms  {counts}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""The thread-pool engine against the asyncio one: wall time and peak RSS at several -j widths.
+
+    python benchmarks/engines.py [--repos 256] [--latency 0.5] [--jobs 16 64 256]
+
+Each (engine, jobs) pair runs in a fresh interpreter, so the peak RSS it reports is that run's
+and not the high-water mark of every run before it. `--latency` stretches each fetch by having
+origin's upload-pack sleep first, since a local remote answers in milliseconds and the engines
+differ in what a repo costs while it *waits*.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from _synthetic import build_repos  # noqa: E402
+from _synthetic import git  # noqa: E402
+
+from syncer.config import RepoConfig  # noqa: E402
+from syncer.config import SyncerConfig  # noqa: E402
+from syncer.config import ToolConfig  # noqa: E402
+from syncer.report import Engine  # noqa: E402
+from syncer.report import gather_reports  # noqa: E402
+
+
+def child(root: Path, engine: str, jobs: int) -> None:
+    """One run in this process, printed as JSON for the parent to collect."""
+    clones = sorted((root / 'clones').iterdir())
+    config = SyncerConfig(owner='bench', host='https://example.com', repos=[RepoConfig(name=p.name, path=str(p)) for p in clones])
+    started = time.perf_counter()
+    reports = gather_reports(config, ToolConfig(default_policy='observe'), jobs=jobs, jitter=0.0, engine=Engine(engine))
+    elapsed = time.perf_counter() - started
+    assert len(reports) == len(clones)
+    # ru_maxrss is kilobytes on Linux, and only this process: the git children are the same
+    # processes under either engine, and what differs is what syncer holds while they run.
+    print(json.dumps({'seconds': elapsed, 'rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repos', type=int, default=256)
+    parser.add_argument('--latency', type=float, default=0.5)
+    parser.add_argument('--jobs', type=int, nargs='+', default=[16, 64, 256])
+    parser.add_argument('--child', nargs=3, metavar=('ROOT', 'ENGINE', 'JOBS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(Path(args.child[0]), args.child[1], int(args.child[2]))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        repos = build_repos(root, args.repos, branches=1)
+        if args.latency > 0:
+            for repo in repos:
+                git(repo, 'config', 'remote.origin.uploadpack', f'sleep {args.latency}; git-upload-pack')
+        print(f'{args.repos} repos, {args.latency}s added to every fetch')
+        for jobs in args.jobs:
+            for engine in Engine:
+                out = subprocess.run(
+                    [sys.executable, __file__, '--child', str(root), engine.value, str(jobs)], capture_output=True, text=True, check=True
+                )
+                result = json.loads(out.stdout)
+                print(f'  -j {jobs:<4} {engine.value:>8}: {result["seconds"]:6.2f}s  peak RSS {result["rss_kb"] / 1024:6.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""Probe-then-fetch against fetch-every-time: bytes on the wire and wall time, over git://.
+
+    python benchmarks/probe.py [--repos 100] [--moved 0.1] [--jobs 16]
+
+The remotes are served by a local `git daemon`, behind a proxy that counts every byte in either
+direction, so the figures are what a real network would carry rather than what a file:// remote
+(which git short-cuts) costs. Before each pass `--moved` of the remotes gain a commit, the day's
+usual share of repos with something new, so both passes have the same work to find.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from _synthetic import _IDENTITY  # noqa: E402
+from _synthetic import build_repos  # noqa: E402
+from _synthetic import git  # noqa: E402
+
+from syncer.classify import refresh_remote  # noqa: E402
+from syncer.policy import BUILTIN_POLICIES  # noqa: E402
+from syncer.repos import Repo  # noqa: E402
+
+
+class CountingProxy:
+    """A TCP forwarder that tallies the bytes it carries, both ways, for as long as it runs."""
+
+    def __init__(self, upstream_port: int) -> None:
+        self.upstream_port = upstream_port
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._server = socket.create_server(('127.0.0.1', 0))
+        self.port = self._server.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self) -> None:
+        while True:
+            client, _ = self._server.accept()
+            upstream = socket.create_connection(('127.0.0.1', self.upstream_port))
+            for source, sink in ((client, upstream), (upstream, client)):
+                threading.Thread(target=self._pump, args=(source, sink), daemon=True).start()
+
+    def _pump(self, source: socket.socket, sink: socket.socket) -> None:
+        with contextlib.suppress(OSError):
+            while chunk := source.recv(65536):
+                sink.sendall(chunk)
+                with self._lock:
+                    self.bytes += len(chunk)
+        # Half-close, so the other direction can still finish what it was sending.
+        for sock, how in ((sink, socket.SHUT_WR), (source, socket.SHUT_RD)):
+            with contextlib.suppress(OSError):
+                sock.shutdown(how)
+
+    def take(self) -> int:
+        with self._lock:
+            count, self.bytes = self.bytes, 0
+        return count
+
+
+def free_port() -> int:
+    with socket.create_server(('127.0.0.1', 0)) as probe:
+        return probe.getsockname()[1]
+
+
+def wait_for(port: int) -> None:
+    for _ in range(100):
+        try:
+            socket.create_connection(('127.0.0.1', port)).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f'git daemon never listened on {port}')
+
+
+def advance(remotes: list[Path]) -> None:
+    """One new commit on main in each of these bare remotes."""
+    env = {**os.environ, **_IDENTITY}
+    for bare in remotes:
+        tip = git(bare, 'rev-parse', 'main').strip()
+        argv = ['git', 'commit-tree', f'{tip}^{{tree}}', '-p', tip, '-m', 'moved']
+        commit = subprocess.run(argv, cwd=bare, capture_output=True, text=True, env=env, check=True).stdout.strip()
+        git(bare, 'update-ref', 'refs/heads/main', commit)
+
+
+def fetch_always(repo: Repo) -> None:
+    """What refresh_remote did before it asked first."""
+    repo.fetch_prune()
+    repo.set_head_auto()
+
+
+def probe_first(repo: Repo) -> None:
+    refresh_remote(repo, BUILTIN_POLICIES['standard'])
+
+
+def run_pass(clones: list[Path], refresh: Callable[[Repo], None], jobs: int) -> float:
+    repos = [Repo(name=clone.name, path=clone, owner='bench', host='git://127.0.0.1') for clone in clones]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        list(pool.map(refresh, repos))
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repos', type=int, default=100)
+    parser.add_argument('--moved', type=float, default=0.1)
+    parser.add_argument('--jobs', type=int, default=16)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        clones = build_repos(root, args.repos, branches=3)
+        remotes = sorted((root / 'remotes').iterdir())
+        daemon_port = free_port()
+        serve = ['git', 'daemon', '--export-all', '--reuseaddr', '--listen=127.0.0.1', f'--port={daemon_port}']
+        daemon = subprocess.Popen([*serve, f'--base-path={root / "remotes"}'], stderr=subprocess.DEVNULL)
+        try:
+            wait_for(daemon_port)
+            proxy = CountingProxy(daemon_port)
+            for clone in clones:
+                git(clone, 'remote', 'set-url', 'origin', f'git://127.0.0.1:{proxy.port}/{clone.name}.git')
+                git(clone, 'fetch', '-q')
+                git(clone, 'remote', 'set-head', 'origin', '--auto')
+            proxy.take()
+
+            moved = remotes[: int(len(remotes) * args.moved)]
+            print(f'{args.repos} repos over git://, {len(moved)} with a new commit before each pass, -j {args.jobs}')
+            for name, refresh in (('fetch every time', fetch_always), ('ls-remote first', probe_first)):
+                advance(moved)
+                seconds = run_pass(clones, refresh, args.jobs)
+                print(f'  {name:>16}: {seconds:6.2f}s  {proxy.take() / 1024:8.1f} KiB on the wire')
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+
+if __name__ == '__main__':
+    main()
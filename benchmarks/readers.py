@@ -0,0 +1,59 @@
+"""classify_repo through the git CLI and through libgit2, over a synthetic registry.
+
+    python benchmarks/readers.py [--repos 200] [--branches 10]
+
+The same clones are classified twice with the fetch already done, as `check` classifies a repo
+once its fetch has landed: once with every read a git call, once with pygit2 answering the ones
+libgit2 can. The worktree list, the default branch and anything libgit2 defers still go to git in
+both, so the difference is the reads the backend took over. Needs pygit2; without it there is only
+the first row to print.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from _synthetic import build_repos  # noqa: E402
+
+import syncer.repos  # noqa: E402
+from syncer.classify import classify_repo  # noqa: E402
+from syncer.policy import BUILTIN_POLICIES  # noqa: E402
+from syncer.repos import Repo  # noqa: E402
+from syncer.repos import _pygit2_usable  # noqa: E402
+from syncer.repos import take_spawn_stats  # noqa: E402
+
+
+def classify_all(repos: list[Path]) -> int:
+    states = 0
+    for path in repos:
+        repo = Repo(name=path.name, path=path, owner='bench', host='https://example.com')
+        states += len(classify_repo(repo, BUILTIN_POLICIES['observe'], fetched=True))
+    return states
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repos', type=int, default=200)
+    parser.add_argument('--branches', type=int, default=10)
+    args = parser.parse_args()
+    backends = ('cli', 'libgit2') if _pygit2_usable() else ('cli',)
+    with tempfile.TemporaryDirectory() as tmp:
+        repos = build_repos(Path(tmp), args.repos, branches=args.branches)
+        for backend in backends:
+            syncer.repos.READ_BACKEND = backend
+            take_spawn_stats()
+            started = time.perf_counter()
+            states = classify_all(repos)
+            elapsed = time.perf_counter() - started
+            spawns = take_spawn_stats().spawns
+            print(f'{backend:>8}: {elapsed:6.2f}s  {states:5d} branches  {spawns:5d} spawns  {elapsed / len(repos) * 1000:6.1f} ms/repo')
+
+
+if __name__ == '__main__':
+    main()
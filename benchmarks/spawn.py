@@ -0,0 +1,79 @@
+"""What one git call costs syncer to start and wait on: `git rev-parse HEAD`, over and over.
+
+    python benchmarks/spawn.py [--calls 10000]
+
+Three ways of running the same call, one after another against one synthetic repo:
+
+- `subprocess.run` is the shape run_command had before the spawn backend: an environment built for
+  the call, `git` found on PATH by the child, and a wait with a timeout, which polls.
+- `run_command` is today's, outside a run: the environment is still built per call, but the
+  timeout is kept by the watchdog and the wait blocks.
+- `frozen` is run_command inside frozen_execution, as every call in a sync is: one environment
+  and one resolved git for all of them.
+
+git's own work is the same in each, so the differences are what syncer adds around it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from _synthetic import build_repos  # noqa: E402
+
+from syncer.repos import _noninteractive_env  # noqa: E402
+from syncer.repos import frozen_execution  # noqa: E402
+from syncer.repos import run_command  # noqa: E402
+from syncer.repos import take_spawn_stats  # noqa: E402
+
+_ARGV = ['git', 'rev-parse', 'HEAD']
+
+
+def before(repo: Path, calls: int) -> None:
+    for _ in range(calls):
+        subprocess.run(_ARGV, cwd=repo, capture_output=True, text=True, env=_noninteractive_env(), timeout=60)  # nosec B603 B607
+
+
+def per_call(repo: Path, calls: int) -> None:
+    for _ in range(calls):
+        run_command(_ARGV, cwd=repo, timeout=60)
+
+
+def frozen(repo: Path, calls: int) -> None:
+    with frozen_execution():
+        per_call(repo, calls)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=10_000)
+    args = parser.parse_args()
+    runners: tuple[tuple[str, Callable[[Path, int], None]], ...] = (
+        ('subprocess.run', before),
+        ('run_command', per_call),
+        ('frozen', frozen),
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = build_repos(Path(tmp), 1)[0]
+        for label, runner in runners:
+            take_spawn_stats()
+            started = time.perf_counter()
+            runner(repo, args.calls)
+            elapsed = time.perf_counter() - started
+            stats = take_spawn_stats()
+            line = f'{label:>14}: {elapsed:6.2f}s  {args.calls / elapsed:6.0f} calls/s  {elapsed / args.calls * 1e6:6.0f} us/call'
+            if stats.spawns:
+                spawn_us, wait_us = (seconds / stats.spawns * 1e6 for seconds in (stats.spawn_seconds, stats.wait_seconds))
+                line += f'  spawn {spawn_us:4.0f} us  wait {wait_us:5.0f} us'
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
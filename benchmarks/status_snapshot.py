@@ -0,0 +1,67 @@
+"""Repo.status_snapshot() against the reads it replaced, over a synthetic registry.
+
+    python benchmarks/status_snapshot.py [--repos 200]
+
+The "separate" path is the one syncer took before the snapshot existed: rev-parse for the branch,
+`status --porcelain` once per reader (three in a report), `stash list`, and for-each-ref plus
+rev-list for the upstream and its counts. Both paths go through run_command, so the difference is
+the spawns and git's own work, not two ways of starting a process.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from _synthetic import build_repos  # noqa: E402
+
+from syncer.repos import Repo  # noqa: E402
+from syncer.repos import run_command  # noqa: E402
+
+_SEPARATE_READS = (
+    ('rev-parse', '--abbrev-ref', 'HEAD'),
+    ('status', '--porcelain'),
+    ('status', '--porcelain'),
+    ('status', '--porcelain'),
+    ('stash', 'list'),
+    ('for-each-ref', '--format=%(upstream:short)%09%(upstream:track)', 'refs/heads/main'),
+    ('rev-list', '--left-right', '--count', 'main...origin/main'),
+)
+
+
+def separate(repos: list[Path]) -> int:
+    for path in repos:
+        for args in _SEPARATE_READS:
+            run_command(['git', *args], cwd=path, timeout=60)
+    return len(repos) * len(_SEPARATE_READS)
+
+
+def snapshot(repos: list[Path]) -> int:
+    for path in repos:
+        repo = Repo(name=path.name, path=path, owner='bench', host='https://example.com')
+        status = repo.status_snapshot()
+        assert status is not None
+        _ = (status.current, repo.is_dirty, repo.uncommitted_changes, repo.stash_count, status.ahead, status.behind)
+    return len(repos)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repos', type=int, default=200)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        repos = build_repos(Path(tmp), args.repos)
+        for label, reader in (('separate reads', separate), ('status_snapshot', snapshot)):
+            started = time.perf_counter()
+            spawns = reader(repos)
+            elapsed = time.perf_counter() - started
+            print(f'{label:>16}: {elapsed:6.2f}s  {spawns:5d} spawns  {elapsed / len(repos) * 1000:6.1f} ms/repo')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""AncestryMemo's answers on disk, so each run starts from what the last one measured.
+
+Most branches on a machine are exactly where they were at the last run — the same commit, against
+the same upstream commit — and a gone branch waits, run after run, for someone to delete it. Each
+run still asked git again: a `rev-list` for counts for-each-ref could not print, and a merge-base
+and a `git cherry` for every gone branch. The answers are facts about two commits, so they are
+written down by oid and read back at the start of the next run, least recently used first, and
+the memo's size bound does the forgetting.
+
+Nothing read from here reaches execute(): its guards run inside live(), where Repo never asks the
+memo. A lost or unreadable file is a run that asks git everything, as every run did before.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from pydantic import TypeAdapter
+from pydantic import ValidationError
+
+from syncer.config import STATE_DIR
+from syncer.repos import AncestryMemo
+from syncer.repos import Answer
+from syncer.repos import MemoKey
+
+_ENTRIES = TypeAdapter(list[tuple[MemoKey, Answer]])
+
+
+def ancestry_file() -> Path:
+    """Where the answers live. One file for every registry, for the reason trips_file gives."""
+    return STATE_DIR / 'ancestry.json'
+
+
+def load_memo(path: Path) -> AncestryMemo:
+    """The memo the last run left, or an empty one when there is none or it cannot be read."""
+    try:
+        entries = _ENTRIES.validate_json(path.read_bytes())
+    except (OSError, ValidationError):
+        entries = []
+    return AncestryMemo(entries)
+
+
+def save_memo(path: Path, memo: AncestryMemo) -> None:
+    """Write the memo back when the run added or evicted an answer. Written whole and renamed into place, so a run
+    reading it mid-write finds the old file or the new one and never half of either."""
+    if not memo.changed:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f'.{path.name}.{os.getpid()}')
+    partial.write_bytes(_ENTRIES.dump_json(memo.entries()))
+    partial.replace(path)
@@ -59,8 +59,12 @@ class Trip:
         return f'{self.host} ({self.cause.value.replace("_", " ")})'
 
 
-def _key(url: str) -> tuple[str, str] | None:
-    """(host, transport) for a URL, or None when there is no host to draw a conclusion about."""
+def host_key(url: str) -> tuple[str, str] | None:
+    """(host, transport) for a URL, or None when there is no host to draw a conclusion about.
+
+    Public because the scheduler keys on it too: the lanes a host's concurrency is capped in are
+    the same ones its failures are counted in.
+    """
     host = remote_host(url)
     if not host:
         return None
@@ -73,18 +77,31 @@ class HostBreaker:
     Shared across worker threads, so every read and write takes the lock. The window it cannot
     close is the one already in flight: with `jobs` fetches running when the first failure lands,
     that many were always going to be attempted. Bounding the damage at `jobs` instead of at the
-    size of the registry is the whole win.
+    size of the registry is the whole win. With `preflight` set, preflight.py narrows the window
+    to one repo per host.
     """
 
     def __init__(self, *, flaky_threshold: int = FLAKY_THRESHOLD) -> None:
         self._lock = threading.Lock()
         self._failures: dict[tuple[str, str], Counter[Cause]] = {}
         self._reached: set[tuple[str, str]] = set()
+        self._half_open: set[tuple[str, str]] = set()
         self._flaky_threshold = flaky_threshold
 
+    def half_open(self, key: tuple[str, str]) -> None:
+        """Put a host on probation, for one an earlier run closed: its first recognised failure
+        trips it, at either tier, and its first success clears it like any other.
+
+        Every failure counts because the earlier run already supplied the repetition the flaky
+        tier waits for. Holding out for three fresh timeouts would spend three git_timeouts
+        re-proving what the last run established.
+        """
+        with self._lock:
+            self._half_open.add(key)
+
     def record_success(self, url: str) -> None:
         """Note that this host answered. Immunises it for the rest of the run."""
-        key = _key(url)
+        key = host_key(url)
         if key is None:
             return
         with self._lock:
@@ -97,7 +114,7 @@ class HostBreaker:
         and a breaker that trips on 'something went wrong' would skip repos over a message no one
         has read.
         """
-        key = _key(url)
+        key = host_key(url)
         cause = classify_failure(failure)
         if key is None or cause is None:
             return
@@ -106,18 +123,33 @@ class HostBreaker:
 
     def trip_for(self, url: str) -> Trip | None:
         """The reason this host is closed, or None if it is still worth asking."""
-        key = _key(url)
+        key = host_key(url)
         if key is None:
             return None
         with self._lock:
-            if key in self._reached:
-                return None
-            counts = Counter(self._failures.get(key, ()))
+            return self._trip(key)
+
+    def tripped(self) -> dict[tuple[str, str], Trip]:
+        """Every host closed so far this run, for trips.py to carry into the next one."""
+        with self._lock:
+            trips = {key: self._trip(key) for key in self._failures}
+        return {key: trip for key, trip in trips.items() if trip is not None}
+
+    def reached(self) -> set[tuple[str, str]]:
+        """Every host that has answered this run."""
+        with self._lock:
+            return set(self._reached)
+
+    def _trip(self, key: tuple[str, str]) -> Trip | None:
+        """trip_for's verdict, with the lock already held."""
+        if key in self._reached:
+            return None
+        counts = self._failures.get(key, Counter())
         host = key[0]
         for cause in counts:
             if cause in HOST_WIDE_CAUSES:
                 return Trip(host=host, cause=cause)
         for cause, count in counts.items():
-            if cause in FLAKY_CAUSES and count >= self._flaky_threshold:
+            if cause in FLAKY_CAUSES and (count >= self._flaky_threshold or key in self._half_open):
                 return Trip(host=host, cause=cause)
         return None
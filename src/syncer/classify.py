@@ -1,20 +1,31 @@
 """Impure half of the pipeline: turn real git state into BranchState objects.
 
 classify_repo() runs the read-side remediation the design calls for — fetch --prune
-plus `git remote set-head origin --auto` — so a renamed default resolves correctly and
-stale remote-tracking refs are gone before anything is classified. It performs no
-mutation of local branches; that is execute()'s job (a later slice).
+plus pointing origin/HEAD at the remote's default — so a renamed default resolves correctly
+and stale remote-tracking refs are gone before anything is classified. The fetch itself is
+skipped when an ls-remote shows it would bring nothing. It performs no mutation of local
+branches; that is execute()'s job (a later slice).
 """
 
 from __future__ import annotations
 
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
+
 from syncer.policy import BranchState
 from syncer.policy import Policy
 from syncer.policy import PrimaryState
 from syncer.policy import Scope
+from syncer.repos import CLONE_REFSPECS
+from syncer.repos import BranchRef
 from syncer.repos import GitFailure
+from syncer.repos import RemoteRefs
 from syncer.repos import Repo
 
+# How long origin/HEAD may go unchecked on a remote whose ls-remote never names its default.
+HEAD_RECHECK_DAYS = 7
+
 
 class ClassifyError(Exception):
     """A branch's state could not be measured even though the fetch succeeded.
@@ -49,7 +60,19 @@ def classify_branch(
     dirty_current: bool,
     stashed: bool,
     merge_target: str | None = None,
+    refs: dict[str, BranchRef] | None = None,
 ) -> BranchState:
+    """Measure one branch. `refs` is classify_repo's snapshot; without one, this reads its own.
+
+    A branch missing from the snapshot has no ref to track anything — a default named by
+    origin/HEAD that was never checked out locally — and classifies as NO_UPSTREAM, as it did
+    when each branch was asked about separately.
+    """
+    if refs is None:
+        refs = repo.branch_refs(branch)
+        if refs is None:
+            raise ClassifyError(branch, repo.failures[-1])
+    ref = refs.get(branch)
     is_current = branch == current
     is_default = branch == default
     # dirty only gates the *current* branch — a non-current branch's tree isn't checked out here.
@@ -58,7 +81,8 @@ def classify_branch(
     dirty = dirty_current and is_current
     worktree = None if is_current else repo.worktree_for(branch)
     worktree_dirty = worktree is not None and repo.worktree_is_dirty(worktree)
-    upstream_short, gone = repo.branch_upstream(branch)
+    upstream_short = ref.upstream if ref else ''
+    gone = ref is not None and ref.gone
     target = merge_target or default
 
     ahead = 0
@@ -71,7 +95,11 @@ def classify_branch(
         if target:
             merged_into_target = repo.contains_branch(branch, target)
     else:
-        counts = repo.ahead_behind(branch, upstream_short)
+        # The snapshot's counts when git printed them legibly; a branch it could not read is
+        # measured on its own, and only a failure *there* is a branch that cannot be classified.
+        counts = ref.counts if ref else None
+        if counts is None:
+            counts = repo.ahead_behind(branch, upstream_short)
         if counts is None:
             raise ClassifyError(branch, repo.failures[-1])
         ahead, behind = counts
@@ -93,14 +121,14 @@ def classify_branch(
     )
 
 
-def _branches_in_scope(repo: Repo, scope: Scope, default: str | None, current: str, detached: bool) -> list[str]:
+def _branches_in_scope(refs: dict[str, BranchRef], scope: Scope, default: str | None, current: str, detached: bool) -> list[str]:
     if scope == Scope.DEFAULT:
         return [default] if default else []
     if scope == Scope.CURRENT:
         return [] if detached else [current]
     if scope == Scope.TRACKED:
-        return [branch for branch in repo.local_branches() if repo.branch_upstream(branch)[0]]
-    return repo.local_branches()
+        return [name for name, ref in refs.items() if ref.upstream]
+    return list(refs)
 
 
 def refresh_remote(repo: Repo, policy: Policy) -> GitFailure | None:
@@ -108,16 +136,108 @@ def refresh_remote(repo: Repo, policy: Policy) -> GitFailure | None:
 
     Split out of classify_repo so the caller can stop before classifying: every state below is
     measured against remote-tracking refs, so a dead fetch does not degrade the report, it
-    invalidates it. set_head_auto's own failure is deliberately not escalated — it is
-    remediation for a renamed default, not the measurement.
+    invalidates it. set_head's own failure is deliberately not escalated — it is remediation for a
+    renamed default, not the measurement.
+
+    Origin is asked what it has before anything is fetched. On most runs nothing has moved, and a
+    fetch that finds as much still pays for a full negotiation; `ls-remote` is one round trip that
+    says so. The fetch runs only when a branch the fetch refspecs take is new or has moved, a
+    deletion is pruned locally from the same listing, and origin/HEAD is pointed at the default the
+    listing names — where `set-head --auto` was a second connection to learn the same thing.
+    """
+    advertised = repo.ls_remote()
+    if isinstance(advertised, GitFailure):
+        return advertised
+    recorded = repo.tracking_refs()
+    refspecs = CLONE_REFSPECS
+    if _differs(advertised, recorded):
+        refspecs = repo.fetch_refspecs()
+    fetched = False
+    if recorded is None or advertised.moved_since(recorded, refspecs):
+        failure = repo.fetch_prune() if policy.prune else repo.fetch()
+        if failure is not None:
+            return failure
+        fetched = True
+    elif policy.prune:
+        repo.prune_tracking(advertised.deleted_since(recorded, refspecs))
+    _point_origin_head(repo, advertised, recorded, fetched)
+    return None
+
+
+def _differs(advertised: RemoteRefs, recorded: RemoteRefs | None) -> bool:
+    """Whether the two listings differ as a plain clone would fetch, which is when the repo's own
+    refspecs are worth a read. Most runs they agree, and a narrower refspec only ever takes a
+    difference away: the branches a `--single-branch` clone leaves out are always missing here."""
+    return recorded is not None and (advertised.moved_since(recorded) or bool(advertised.deleted_since(recorded)))
+
+
+def _guess_is_due(repo: Repo, advertised: RemoteRefs, recorded: RemoteRefs | None) -> bool:
+    """Whether a remote whose listing names no default should have `set-head --auto` guess again.
+
+    That guess is a second connection, so it is not made every run: only when origin/HEAD is
+    missing, when it names a branch origin no longer has — the renamed default default_branch
+    depends on catching — or when it was last checked HEAD_RECHECK_DAYS ago, for a rename that
+    left the old branch in place.
     """
-    failure = repo.fetch_prune() if policy.prune else repo.fetch()
-    if failure is not None:
-        return failure
-    repo.set_head_auto()
+    if not advertised.heads:
+        return False
+    if recorded is None or recorded.default not in advertised.heads:
+        return True
+    written = repo.origin_head_written
+    return written is None or datetime.now(UTC) - written > timedelta(days=HEAD_RECHECK_DAYS)
+
+
+def _point_origin_head(repo: Repo, advertised: RemoteRefs, recorded: RemoteRefs | None, fetched: bool) -> None:
+    """Point origin/HEAD at the default the listing names, when there is a tracking ref to point it
+    at. A clone whose refspecs leave the default out has none — `--single-branch` of another
+    branch — and set-head would fail there on every run; origin/HEAD is left as it is instead.
+    A fetch this run may have just written the ref, so after one the refs are read again."""
+    if advertised.default is None:
+        if _guess_is_due(repo, advertised, recorded):
+            repo.set_head_auto()
+    elif recorded is None or recorded.default != advertised.default:
+        if fetched and not _tracks(recorded, advertised.default):
+            recorded = repo.tracking_refs()
+        if _tracks(recorded, advertised.default):
+            repo.set_head(advertised.default)
+
+
+def _tracks(recorded: RemoteRefs | None, branch: str) -> bool:
+    return recorded is not None and branch in recorded.heads
+
+
+async def refresh_remote_async(repo: Repo, policy: Policy) -> GitFailure | None:
+    """refresh_remote for the asyncio engine, with the same result and the same escalation."""
+    advertised = await repo.ls_remote_async()
+    if isinstance(advertised, GitFailure):
+        return advertised
+    recorded = await repo.tracking_refs_async()
+    refspecs = CLONE_REFSPECS
+    if _differs(advertised, recorded):
+        refspecs = await repo.fetch_refspecs_async()
+    fetched = False
+    if recorded is None or advertised.moved_since(recorded, refspecs):
+        failure = await (repo.fetch_prune_async() if policy.prune else repo.fetch_async())
+        if failure is not None:
+            return failure
+        fetched = True
+    elif policy.prune:
+        await repo.prune_tracking_async(advertised.deleted_since(recorded, refspecs))
+    await _point_origin_head_async(repo, advertised, recorded, fetched)
     return None
 
 
+async def _point_origin_head_async(repo: Repo, advertised: RemoteRefs, recorded: RemoteRefs | None, fetched: bool) -> None:
+    if advertised.default is None:
+        if _guess_is_due(repo, advertised, recorded):
+            await repo.set_head_auto_async()
+    elif recorded is None or recorded.default != advertised.default:
+        if fetched and not _tracks(recorded, advertised.default):
+            recorded = await repo.tracking_refs_async()
+        if _tracks(recorded, advertised.default):
+            await repo.set_head_async(advertised.default)
+
+
 def classify_repo(repo: Repo, policy: Policy, *, fetched: bool = False) -> list[BranchState]:
     """Classify every branch the policy's scope selects, after prune + set-head.
 
@@ -126,11 +246,19 @@ def classify_repo(repo: Repo, policy: Policy, *, fetched: bool = False) -> list[
     if not fetched:
         refresh_remote(repo, policy)
 
+    # The branch, the tree and the stash from one `git status`, so all three describe the same
+    # instant. A failed status falls back to the separate reads, and reads as dirty.
+    status = repo.status_snapshot()
     default = repo.default_branch
-    current = repo.current_branch
+    current = status.current if status is not None else repo.current_branch
     detached = current == 'HEAD'
-    dirty_current = repo.is_dirty
+    dirty_current = status is None or status.dirty
     stashed = repo.stash_count > 0
+    # One for-each-ref for every branch in the repo, whatever the scope: the scope itself is
+    # decided from it, and each branch is then classified from the same lines.
+    refs = repo.branch_refs()
+    if refs is None:
+        raise ClassifyError('branches', repo.failures[-1])
 
     states = [
         classify_branch(
@@ -141,8 +269,9 @@ def classify_repo(repo: Repo, policy: Policy, *, fetched: bool = False) -> list[
             dirty_current=dirty_current,
             stashed=stashed,
             merge_target=policy.merge_target,
+            refs=refs,
         )
-        for branch in _branches_in_scope(repo, policy.scope, default, current, detached)
+        for branch in _branches_in_scope(refs, policy.scope, default, current, detached)
     ]
 
     if detached and policy.scope in (Scope.CURRENT, Scope.ALL):
@@ -0,0 +1,263 @@
+"""Ancestry and ahead/behind counts read from git's commit-graph files, without running git.
+
+`Repo.ahead_behind` and `Repo.is_merged_into` were a `rev-list` or a `merge-base` spawn each, and
+execute()'s guards ask them again, inside live(), for every branch they are about to move or
+delete. Most repos already carry the answer on disk: git writes `objects/info/commit-graph` on gc,
+and on every fetch with `fetch.writeCommitGraph`, holding each commit's parents and its
+generation number in fixed-width records meant to be read without parsing a single object.
+
+So this maps the file — or the chain of files a `--split` write leaves under
+`objects/info/commit-graphs/` — and walks it the way git's own paint-down does, newest generation
+first, stopping as soon as everything left to walk is reachable from both sides. A generation
+number is a lower bound on how far a commit is from its roots, so a walk looking for an ancestor
+never goes below that ancestor's generation.
+
+It answers only for commits the graph holds, and only where the graph is what git would read:
+
+- a commit written since the graph was, which is every commit made since the last gc or fetch,
+  raises GraphMiss, and the caller asks git — which is the common case for a branch with new
+  local work, and the reason this falls back rather than parsing objects itself;
+- a shallow clone, a grafts file or any replace ref changes what git considers a commit's
+  parents, and git ignores the graph for all three, so open() returns None for them;
+- a graph written without generation numbers, or with levels past the 30 bits v1 has for them,
+  cannot prune a walk correctly, and raises GraphMiss too.
+
+What the graph says about a commit is true of that commit forever — its parents are part of its
+identity — so, unlike everything else a Repo reads, the answer needs no re-reading inside live().
+Only which commit a branch names does, and that comes from the ref files afresh each time.
+"""
+
+from __future__ import annotations
+
+import heapq
+import mmap
+import struct
+from pathlib import Path
+
+_SIGNATURE = b'CGPH'
+# The hash each graph version is keyed on: 1 is SHA-1, 2 is SHA-256.
+_HASH_LENGTHS = {1: 20, 2: 32}
+_NO_PARENT = 0x70000000
+# Set on the second-parent field of a merge with more than two parents, whose remaining parents
+# are listed in the EDGE chunk from the index in the low bits; set again on the last of them.
+_EXTRA_EDGES = 0x80000000
+# Generation numbers in CDAT are 30 bits. Zero is what a graph written before they existed holds,
+# and the maximum is where git stops counting; neither orders a walk.
+_GENERATION_MAX = 0x3FFFFFFF
+# Past this many commits a walk is handed back to git. The walk costs about 2.3us a commit here and
+# a `rev-list` about 1.5ms whatever it counts, up to a few thousand (benchmarks/commitgraph.py), so
+# they cross near a thousand: below it the graph wins, above it a spawn does.
+WALK_LIMIT = 1_000
+
+_LEFT = 1
+_RIGHT = 2
+_BOTH = _LEFT | _RIGHT
+
+
+class GraphMiss(Exception):
+    """The graph cannot answer this one as git would. The caller asks git."""
+
+
+class _Layer:
+    """One commit-graph file, mapped. Its commits sit at positions [base, base + count) of the
+    chain it belongs to, and its parent fields are positions in that whole chain."""
+
+    def __init__(self, path: Path, base: int) -> None:
+        with path.open('rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ, trackfd=False)
+        data = self._map
+        signature, version, hash_version, chunk_count, self.base_layers = struct.unpack_from('>4sBBBB', data, 0)
+        if signature != _SIGNATURE or version != 1 or hash_version not in _HASH_LENGTHS:
+            raise GraphMiss(f'{path.name}: not a commit-graph this can read')
+        self.hash_length = _HASH_LENGTHS[hash_version]
+        chunks: dict[bytes, int] = {}
+        for index in range(chunk_count):
+            chunk_id, offset = struct.unpack_from('>4sQ', data, 8 + 12 * index)
+            chunks[chunk_id] = offset
+        if not {b'OIDF', b'OIDL', b'CDAT'} <= set(chunks):
+            raise GraphMiss(f'{path.name}: missing a required chunk')
+        self._fanout = chunks[b'OIDF']
+        self._lookup = chunks[b'OIDL']
+        self._commits = chunks[b'CDAT']
+        self._edges = chunks.get(b'EDGE')
+        self._bases = chunks.get(b'BASE')
+        self.count = struct.unpack_from('>I', data, self._fanout + 4 * 255)[0]
+        self.base = base
+
+    def base_hashes(self) -> list[bytes]:
+        if self._bases is None:
+            return []
+        width = self.hash_length
+        return [self._map[start : start + width] for start in range(self._bases, self._bases + self.base_layers * width, width)]
+
+    def find(self, oid: bytes) -> int | None:
+        """The chain position of `oid`, when this layer holds it."""
+        first = oid[0]
+        low = struct.unpack_from('>I', self._map, self._fanout + 4 * (first - 1))[0] if first else 0
+        high = struct.unpack_from('>I', self._map, self._fanout + 4 * first)[0]
+        width = self.hash_length
+        while low < high:
+            middle = (low + high) // 2
+            start = self._lookup + middle * width
+            found = self._map[start : start + width]
+            if found == oid:
+                return self.base + middle
+            if found < oid:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def commit(self, position: int) -> tuple[int, list[int]]:
+        """The generation number and parent positions of the commit at chain position `position`."""
+        record = self._commits + (position - self.base) * (self.hash_length + 16)
+        first, second, generation, _ = struct.unpack_from('>IIII', self._map, record + self.hash_length)
+        parents = [] if first == _NO_PARENT else [first]
+        if second & _EXTRA_EDGES:
+            if self._edges is None:
+                raise GraphMiss('an octopus merge without an EDGE chunk')
+            index = second & ~_EXTRA_EDGES
+            while True:
+                edge = struct.unpack_from('>I', self._map, self._edges + 4 * index)[0]
+                parents.append(edge & ~_EXTRA_EDGES)
+                if edge & _EXTRA_EDGES:
+                    break
+                index += 1
+        elif second != _NO_PARENT:
+            parents.append(second)
+        return generation >> 2, parents
+
+
+def rewrites_parents(common_dir: Path) -> bool:
+    """Whether git would read some commit's parents from somewhere other than the commit itself,
+    in which case it sets the graph aside, and so must this."""
+    if (common_dir / 'shallow').exists() or (common_dir / 'info' / 'grafts').exists():
+        return True
+    replace = common_dir / 'refs' / 'replace'
+    if replace.is_dir() and any(path.is_file() for path in replace.rglob('*')):
+        return True
+    try:
+        return b' refs/replace/' in (common_dir / 'packed-refs').read_bytes()
+    except FileNotFoundError:
+        return False
+
+
+class CommitGraph:
+    """The commit-graph of one repository: a single file, or a chain of them oldest first."""
+
+    def __init__(self, layers: list[_Layer]) -> None:
+        self._layers = layers
+
+    @classmethod
+    def open(cls, common_dir: Path) -> CommitGraph | None:
+        """The graph git would read for the repo whose common dir this is, or None when there is
+        none, or none git would trust. The single file wins over a chain, as it does for git."""
+        info = common_dir / 'objects' / 'info'
+        try:
+            if rewrites_parents(common_dir):
+                return None
+            if (info / 'commit-graph').is_file():
+                return cls([_Layer(info / 'commit-graph', 0)])
+            chain = info / 'commit-graphs' / 'commit-graph-chain'
+            if not chain.is_file():
+                return None
+            layers: list[_Layer] = []
+            hashes: list[bytes] = []
+            for line in chain.read_text(encoding='ascii').split():
+                layer = _Layer(chain.parent / f'graph-{line}.graph', sum(each.count for each in layers))
+                # Each layer names the layers below it; a chain rewritten under a reader no longer
+                # agrees with itself, and git drops the layers from there up.
+                if layer.base_layers != len(layers) or layer.base_hashes() != hashes:
+                    break
+                layers.append(layer)
+                hashes.append(bytes.fromhex(line))
+        except (OSError, ValueError, struct.error, GraphMiss):
+            return None
+        return cls(layers) if layers else None
+
+    def _position(self, oid: str) -> int:
+        try:
+            raw = bytes.fromhex(oid)
+        except ValueError as exc:
+            raise GraphMiss(f'{oid!r} is not an object id') from exc
+        for layer in reversed(self._layers):
+            if len(raw) != layer.hash_length:
+                raise GraphMiss(f'{oid} is not a {layer.hash_length}-byte id')
+            position = layer.find(raw)
+            if position is not None:
+                return position
+        raise GraphMiss(f'{oid} is not in the commit-graph')
+
+    def _commit(self, position: int) -> tuple[int, list[int]]:
+        for layer in self._layers:
+            if position < layer.base + layer.count:
+                generation, parents = layer.commit(position)
+                if not 0 < generation < _GENERATION_MAX:
+                    raise GraphMiss('the commit-graph has no usable generation numbers')
+                return generation, parents
+        raise GraphMiss(f'position {position} is past the end of the commit-graph')
+
+    def is_ancestor(self, ancestor: str, descendant: str) -> bool:
+        """`git merge-base --is-ancestor ancestor descendant`: True when they are the same commit too."""
+        target, start = self._position(ancestor), self._position(descendant)
+        if target == start:
+            return True
+        floor = self._commit(target)[0]
+        seen = {start}
+        stack = [start]
+        while stack:
+            generation, parents = self._commit(stack.pop())
+            # Every parent is a generation below its child, so nothing under the ancestor's
+            # generation can lead back up to it.
+            if generation <= floor:
+                continue
+            for parent in parents:
+                if parent == target:
+                    return True
+                if parent not in seen:
+                    seen.add(parent)
+                    stack.append(parent)
+            if len(seen) > WALK_LIMIT:
+                raise GraphMiss(f'more than {WALK_LIMIT} commits to walk')
+        return False
+
+    def ahead_behind(self, left: str, right: str) -> tuple[int, int]:
+        """`git rev-list --left-right --count left...right`: commits only `left` reaches, and only `right`.
+
+        Painted down from both tips in generation order. A commit is popped only once every commit
+        above it has been, and all of its children are above it, so its colours are final when it
+        is counted. The walk ends when nothing left in the queue is reachable from one side only.
+        """
+        heads = self._position(left), self._position(right)
+        if heads[0] == heads[1]:
+            return 0, 0
+        colours = {heads[0]: _LEFT, heads[1]: _RIGHT}
+        queue = [(-self._commit(head)[0], head) for head in heads]
+        heapq.heapify(queue)
+        queued = set(heads)
+        one_sided = 2
+        counts = {_LEFT: 0, _RIGHT: 0}
+        while one_sided:
+            _, position = heapq.heappop(queue)
+            queued.discard(position)
+            colour = colours[position]
+            if colour != _BOTH:
+                one_sided -= 1
+                counts[colour] += 1
+            for parent in self._commit(position)[1]:
+                before = colours.get(parent, 0)
+                after = before | colour
+                if after == before:
+                    continue
+                colours[parent] = after
+                if parent in queued:
+                    if after == _BOTH:
+                        one_sided -= 1
+                    continue
+                queued.add(parent)
+                heapq.heappush(queue, (-self._commit(parent)[0], parent))
+                if after != _BOTH:
+                    one_sided += 1
+            if len(colours) > WALK_LIMIT:
+                raise GraphMiss(f'more than {WALK_LIMIT} commits to walk')
+        return counts[_LEFT], counts[_RIGHT]
@@ -0,0 +1,118 @@
+"""`--jobs auto`: pick the run's width from how the network is answering, instead of a constant.
+
+Sixteen is a guess that is wrong in both directions. Over a VPN, sixteen parallel SSH handshakes
+queue behind one another and every fetch gets slower than it would have alone; on a fast LAN the
+same sixteen leave most of the link idle. The right number is a property of the path to the
+hosts, which is only measurable by running.
+
+So the width is steered the way TCP steers a window — additive increase, multiplicative
+decrease. It starts low and grows by one slot per round of fetches while their latency holds
+near the best seen so far, and halves when latency inflates past `INFLATION` times that best or
+a fetch fails for a reason that names congestion (NETWORK, TIMEOUT). A failure that says nothing
+about load — a rejected key, a missing repo — is not a signal either way.
+
+Latency is smoothed rather than read per fetch, because repos differ in size and one large
+repo's fetch is not the network slowing down. After a cut the controller waits out a round
+before it will cut again: the fetches already in flight were started under the old width and
+report the same congestion, and reacting to each of them would collapse the width to one.
+
+The ceiling is the smaller of `AUTO_MAX_JOBS` and what RLIMIT_NOFILE can hold. Each git child
+costs the parent three pipe ends for as long as it runs, and a width the descriptor limit
+cannot back ends in `Too many open files` from a spawn that has nothing to do with any repo.
+"""
+
+from __future__ import annotations
+
+import resource
+import threading
+
+from syncer.diagnose import Cause
+
+# Where an adaptive run starts, and how wide it may grow.
+AUTO_START_JOBS = 4
+AUTO_MAX_JOBS = 64
+# Smoothed latency this many times the best smoothed latency seen counts as queueing.
+INFLATION = 2.0
+# Weight of each new fetch in the smoothed latency.
+SMOOTHING = 0.3
+# Failures that say the path is overloaded, as opposed to wrong.
+CONGESTION_CAUSES = frozenset({Cause.NETWORK, Cause.TIMEOUT})
+# Pipe ends per git child (stdin, stdout, stderr), and descriptors left for everything else.
+FDS_PER_CHILD = 3
+RESERVED_FDS = 64
+
+
+def fd_ceiling() -> int:
+    """How many git children the open-file limit leaves room for. At least one, always."""
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        return AUTO_MAX_JOBS
+    return max(1, (soft - RESERVED_FDS) // FDS_PER_CHILD)
+
+
+class AimdController:
+    """The adaptive width. Fed one observation per finished fetch; read through `limit`.
+
+    Locked because the thread engine's dispatcher is not the only reader — the progress display
+    reads `limit` from its own refresh thread.
+    """
+
+    def __init__(self, *, start: int = AUTO_START_JOBS, ceiling: int = AUTO_MAX_JOBS) -> None:
+        self._lock = threading.Lock()
+        self._ceiling = max(1, ceiling)
+        self._limit = min(max(1, start), self._ceiling)
+        self._smoothed: float | None = None
+        self._best: float | None = None
+        # Fetches to observe at this width before it grows, and before another cut may land.
+        self._until_increase = self._limit
+        self._cooldown = 0
+
+    @property
+    def limit(self) -> int:
+        with self._lock:
+            return self._limit
+
+    @property
+    def ceiling(self) -> int:
+        return self._ceiling
+
+    def observe(self, latency_ms: int | None, cause: Cause | None = None, *, fetched: bool = True) -> int:
+        """Record one finished fetch and return the width to run at now.
+
+        `latency_ms` is None for a repo that never fetched — a lifecycle report, a skipped host —
+        which still completes a slot but says nothing about the path. `fetched` is False for one
+        whose refresh ended at the ls-remote, origin having nothing new: an answer, so the width
+        may grow on it, but a round trip far shorter than any fetch. Taken as a latency it would
+        set the baseline, and every real fetch after it would read as inflation.
+        """
+        with self._lock:
+            if self._cooldown:
+                self._cooldown -= 1
+            if cause in CONGESTION_CAUSES:
+                self._decrease()
+            elif latency_ms is not None and not fetched:
+                self._grow()
+            elif latency_ms is not None:
+                self._smoothed = latency_ms if self._smoothed is None else (1 - SMOOTHING) * self._smoothed + SMOOTHING * latency_ms
+                self._best = self._smoothed if self._best is None else min(self._best, self._smoothed)
+                if self._smoothed > self._best * INFLATION:
+                    self._decrease()
+                else:
+                    self._grow()
+            return self._limit
+
+    def _grow(self) -> None:
+        self._until_increase -= 1
+        if self._until_increase <= 0:
+            self._limit = min(self._limit + 1, self._ceiling)
+            self._until_increase = self._limit
+
+    def _decrease(self) -> None:
+        if self._cooldown:
+            return
+        self._limit = max(1, self._limit // 2)
+        self._until_increase = self._limit
+        # Every fetch in flight was started at the old width; let them land before judging again.
+        self._cooldown = self._limit * 2
+        # Queueing delay inflated the average; start the new width from its own measurements.
+        self._smoothed = None
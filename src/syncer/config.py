@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import json
 import os
+import re
 import sys
 import tomllib
+from datetime import timedelta
 from pathlib import Path
 from typing import Any
 from typing import Literal
@@ -97,9 +99,40 @@ TEMPLATE_TOOL_CONFIG = """\
 default_policy = "standard"
 
 # Ceiling on a single git call, in seconds; clones get five times this. Machine-local because it
-# is a property of this box's network — a VPN fetching a large monorepo needs more headroom.
+# is a property of this box's network — a VPN fetching a large monorepo needs more headroom. A
+# repo with a few recorded fetches gets a tighter fetch ceiling of its own, under this one.
 git_timeout = 120
 
+# Skip the fetch for a repo syncer fetched less than this long ago, and classify it against the refs
+# that fetch left; the report says how old they are. Saves fetching everything twice when `apply`
+# follows a `check`. A number and a unit: 90s, 10m, 2h. Unset, every run fetches every repo, and
+# --max-fetch-age overrides it for one run (0 to fetch regardless).
+# max_fetch_age = "10m"
+
+# Carry every fetch to one SSH host over a single connection, opened once at the start of the run
+# and closed at its end, instead of a key exchange and an authentication per repo. Worth it for a
+# server whose handshake is slow — behind a VPN, say. A host whose connection will not open is
+# fetched the ordinary way.
+# ssh_multiplex = true
+
+# Ask the credential helper for each HTTPS host once per run, and serve every fetch to that host
+# from memory, instead of waking the helper — and the keyring behind it — for every repo. The
+# credential is held by a `git credential-cache` daemon that exits when the run does. A host the
+# helper has nothing for is fetched the ordinary way.
+# credential_cache = true
+
+# Probe each host with one quick `git ls-remote` at the start of the run, and start only one of its
+# repos until the answer is in. A host that has stopped accepting your credential, or whose name
+# no longer resolves, then costs one probe and one fetch rather than a whole --jobs of fetches.
+# preflight = true
+
+# Per-host limits, keyed by the bare host name. max_concurrent caps how many repos syncer fetches
+# from that host at once, on top of --jobs; the host's ssh and https routes are each capped
+# separately, since they are separate sessions to whatever is doing the throttling. Set it for a
+# server that refuses connections past a per-user limit, which otherwise reads as a flaky network.
+[hosts."bitbucket.example.com"]
+max_concurrent = 4
+
 # Per-repo policy, keyed by the name in the registry. Beats the registry's sync_policy hint,
 # loses to --policy.
 [repo_overrides]
@@ -295,6 +328,34 @@ class SyncerConfig(BaseModel):
         return self
 
 
+_AGE = re.compile(r'^(\d+)\s*([smhd]?)$')
+_AGE_UNITS = {'s': 'seconds', 'm': 'minutes', 'h': 'hours', 'd': 'days'}
+
+
+def parse_age(value: str | int) -> timedelta:
+    """'10m' as a timedelta. Units s, m, h and d; a bare number is seconds, like git_timeout."""
+    match = _AGE.match(str(value).strip())
+    if match is None:
+        raise ValueError(f'expected a number and a unit (90s, 10m, 2h, 1d), got {value!r}')
+    count, unit = match.groups()
+    return timedelta(**{_AGE_UNITS[unit or 's']: int(count)})
+
+
+class HostConfig(BaseModel):
+    """Per-host settings from a `[hosts."<host>"]` table, keyed by the bare host name."""
+
+    # Repos fetched from this host at once, on each of its transports; the global --jobs still
+    # applies on top. None leaves the host limited by --jobs alone.
+    max_concurrent: int | None = None
+
+    @field_validator('max_concurrent')
+    @classmethod
+    def validate_max_concurrent(cls, value: int | None) -> int | None:
+        if value is not None and value < 1:
+            raise ValueError(f'max_concurrent must be at least 1, got {value} — a host nobody may contact is one to retire')
+        return value
+
+
 class ToolConfig(BaseModel):
     """Machine-local tool config from ~/.config/syncer/config.toml.
 
@@ -312,6 +373,30 @@ class ToolConfig(BaseModel):
     # Ceiling on a single git call. Machine-local because it is a property of this box's network
     # — a corporate VPN fetching a large monorepo needs more headroom than a home connection.
     git_timeout: int = GIT_TIMEOUT_SECONDS
+    # Host name -> its settings. Machine-local for the same reason as git_timeout: a throttle is
+    # a fact about the account this box uses, and a work laptop and a home desktop have different ones.
+    hosts: dict[str, HostConfig] = {}
+    # How recent a fetch has to be for the next run to reuse it instead of fetching again. None
+    # fetches every time, which is what a machine that never set it has always done.
+    max_fetch_age: timedelta | None = None
+    # One SSH connection per host for the whole run rather than one per fetch; see multiplex.py.
+    # Off unless asked for: it starts ssh masters, which a locked-down ssh_config may forbid.
+    ssh_multiplex: bool = False
+    # One credential-helper lookup per HTTPS host for the whole run; see credentials.py. Off unless
+    # asked for: it copies a secret out of the keyring into a daemon for as long as the run lasts.
+    credential_cache: bool = False
+    # Probe each host before its repos fan out; see preflight.py. Off unless asked for: it is one
+    # more connection per host, and a healthy host's second repo waits on the answer.
+    preflight: bool = False
+
+    @field_validator('max_fetch_age', mode='before')
+    @classmethod
+    def validate_max_fetch_age(cls, value: object) -> object:
+        return parse_age(value) if isinstance(value, str | int) else value
+
+    def host_caps(self) -> dict[str, int]:
+        """Host -> max_concurrent, for the hosts that set one."""
+        return {host: settings.max_concurrent for host, settings in self.hosts.items() if settings.max_concurrent is not None}
 
 
 class ConfigError(Exception):
@@ -465,7 +550,24 @@ def _build_policies(raw_policies: dict[str, Any], bases: dict[str, str] | None =
 # Every key this file may carry. Declared rather than inferred from the model, because the
 # construction below reads each one by name and pydantic ignores what it is not handed —
 # so a key dropped from that call would silently become "unknown" rather than unread.
-_TOOL_CONFIG_KEYS = frozenset({'repos_registry', 'default_policy', 'policies', 'repo_overrides', 'git_timeout'})
+_TOOL_CONFIG_KEYS = frozenset(
+    {
+        'repos_registry',
+        'default_policy',
+        'policies',
+        'repo_overrides',
+        'git_timeout',
+        'hosts',
+        'max_fetch_age',
+        'ssh_multiplex',
+        'credential_cache',
+        'preflight',
+    }
+)
+
+# Keys a [hosts.*] table may hold. Checked for the same reason as _POLICY_BODY_KEYS: pydantic would
+# drop a misspelt `max_concurent` in silence, and a throttle nobody applied reads as one that works.
+_HOST_BODY_KEYS = frozenset(HostConfig.model_fields)
 
 
 def parse_tool_config(raw: dict[str, Any]) -> ToolConfig:
@@ -489,6 +591,10 @@ def parse_tool_config(raw: dict[str, Any]) -> ToolConfig:
 
     bases: dict[str, str] = {}
     policies = _build_policies(raw.get('policies', {}), bases)
+    hosts = raw.get('hosts', {})
+    host_problems = [f'hosts.{host}: unknown key {key!r}' for host, body in hosts.items() for key in sorted(set(body) - _HOST_BODY_KEYS)]
+    if host_problems:
+        raise ConfigError(host_problems)
 
     try:
         return ToolConfig(
@@ -498,6 +604,11 @@ def parse_tool_config(raw: dict[str, Any]) -> ToolConfig:
             policy_bases=bases,
             repo_overrides=raw.get('repo_overrides', {}),
             git_timeout=raw.get('git_timeout', GIT_TIMEOUT_SECONDS),
+            hosts=hosts,
+            max_fetch_age=raw.get('max_fetch_age'),
+            ssh_multiplex=raw.get('ssh_multiplex', False),
+            credential_cache=raw.get('credential_cache', False),
+            preflight=raw.get('preflight', False),
         )
     except ValidationError as exc:
         raise ConfigError(_validation_problems(exc)) from exc
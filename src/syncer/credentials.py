@@ -0,0 +1,144 @@
+"""One credential lookup per HTTPS host for a whole run, instead of one per fetch.
+
+noninteractive_env leaves the user's credential helper configured on purpose, and so every HTTPS
+fetch runs it: libsecret or Git Credential Manager, 100-300ms a call, and the keyring behind them
+answers one caller at a time — so under `--jobs 16` the fetches to one host queue on the keyring
+before any of them reaches the network. Then git runs the helper again on success, to store what
+it was just handed.
+
+So with `credential_cache = true` in config.toml, a run asks the user's helpers once per HTTPS
+host before the first fetch, hands each answer to a `git credential-cache` daemon listening on a
+socket in a private directory, and points that host's credential chain at the daemon alone. A
+fetch then gets its credential from memory. The daemon is told to exit and the directory removed
+when the run ends; the cache's own timeout is only the backstop for a run killed before it can.
+
+Git's own cache rather than a server in this process, because git already ships the client half,
+in C: a helper that syncer served itself would need a process of its own for git to spawn per
+fetch, which is the cost this exists to remove.
+
+It fails closed. A host whose lookup finds nothing — no stored credential, an expired token the
+helper refuses to hand out, a platform without credential-cache — keeps its chain exactly as it
+was, so its fetches fail or succeed as they always did. A rejected credential still fails the
+fetch with git's own words, which is what HostBreaker trips on: the cache changes where a
+credential comes from, never what a refusal looks like. A host with `credential.useHttpPath` set
+is left alone too, since its credentials differ per repo and one lookup cannot answer for all.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import shlex
+import shutil
+import subprocess
+import tempfile
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+from syncer.repos import noninteractive_env
+from syncer.repos import set_run_config
+
+# How long the daemon keeps a credential after it was last stored, for a run that ends without
+# stopping it. Each fetch that succeeds stores it again, so a long run never outlives it.
+CACHE_SECONDS = 3600
+# Ceiling on one lookup or one hand-over, which is one helper call.
+CREDENTIAL_TIMEOUT_SECONDS = 15
+
+
+class Context(NamedTuple):
+    """What git tells a credential helper about a URL: its scheme, `host[:port]`, and the user
+    the URL names, when it names one."""
+
+    protocol: str
+    host: str
+    username: str | None
+
+    @property
+    def scope(self) -> str:
+        """The URL a `credential.<url>.*` key has to name to apply to this context."""
+        return f'{self.protocol}://{self.host}'
+
+    def describe(self) -> str:
+        """The context in git's credential protocol, blank-line terminated."""
+        lines = [f'protocol={self.protocol}', f'host={self.host}']
+        if self.username:
+            lines.append(f'username={self.username}')
+        return '\n'.join(lines) + '\n\n'
+
+
+def credential_context(url: str) -> Context | None:
+    """The credential context a clone URL asks for, or None for anything that is not HTTP(S)."""
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        return None
+    host = parts.netloc.rpartition('@')[2]
+    return Context(parts.scheme, host, parts.username or None)
+
+
+def _git(*args: str, stdin: str = '') -> subprocess.CompletedProcess[str]:
+    """One helper-facing git call. Not run_command: these need stdin, and they run before the first
+    fetch, where there is nothing yet for a Ctrl-C to abort."""
+    try:
+        return subprocess.run(  # nosec B603 B607
+            ['git', *args], input=stdin, capture_output=True, text=True, env=noninteractive_env(), timeout=CREDENTIAL_TIMEOUT_SECONDS
+        )
+    except subprocess.TimeoutExpired:
+        return subprocess.CompletedProcess(args, returncode=1, stdout='', stderr='')
+
+
+def _uses_http_path(context: Context) -> bool:
+    result = _git('config', '--type=bool', '--get-urlmatch', 'credential.useHttpPath', context.scope)
+    return result.stdout.strip() == 'true'
+
+
+def _cache(context: Context, socket: str) -> bool:
+    """Look the context up through the user's own helpers and hand the answer to the daemon.
+    False when there was nothing to hand over, or nowhere to hand it."""
+    if _uses_http_path(context):
+        return False
+    filled = _git('credential', 'fill', stdin=context.describe())
+    if filled.returncode != 0 or '\npassword=' not in f'\n{filled.stdout}':
+        return False
+    # The first store starts the daemon, which detaches once it is listening.
+    stored = _git('credential-cache', f'--socket={socket}', f'--timeout={CACHE_SECONDS}', 'store', stdin=filled.stdout + '\n')
+    return stored.returncode == 0
+
+
+@contextlib.contextmanager
+def credential_cache(urls: Iterable[str], *, enabled: bool) -> Iterator[list[str]]:
+    """Run the block with each HTTPS host in `urls` served from a run-scoped cache; yields the
+    `protocol://host` of each one that is.
+
+    A no-op when not enabled or when no URL is HTTP(S).
+    """
+    found = {context for url in urls if (context := credential_context(url)) is not None}
+    contexts = sorted(found, key=lambda context: (context.scope, context.username or ''))
+    if not enabled or not contexts:
+        yield []
+        return
+
+    # Private, so no other user can ask the daemon for what it holds; credential-cache refuses a
+    # socket in a directory anyone else can read anyway.
+    socket_dir = Path(tempfile.mkdtemp(prefix='syncer-cred-'))
+    socket = str(socket_dir / 'socket')
+    try:
+        with ThreadPoolExecutor(max_workers=min(8, len(contexts))) as pool:
+            results = list(pool.map(lambda context: _cache(context, socket), contexts))
+        # A host is served from the cache only when every user it is reached as was found: the
+        # daemon answers all of them once the chain points at it, and the one it has nothing for
+        # would fail where the user's own helper might have answered.
+        scopes = {context.scope for context in contexts}
+        missed = {context.scope for context, ok in zip(contexts, results, strict=True) if not ok}
+        served = sorted(scopes - missed)
+        helper = f'cache --socket={shlex.quote(socket)} --timeout={CACHE_SECONDS}'
+        # The empty value clears every helper configured for that URL up to this point, and the
+        # environment's settings are read after every file's, so the daemon is the whole chain.
+        set_run_config([pair for scope in served for pair in ((f'credential.{scope}.helper', ''), (f'credential.{scope}.helper', helper))])
+        yield served
+    finally:
+        set_run_config([])
+        _git('credential-cache', f'--socket={socket}', 'exit')
+        shutil.rmtree(socket_dir, ignore_errors=True)
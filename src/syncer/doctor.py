@@ -23,6 +23,8 @@ import json
 import shutil
 from dataclasses import dataclass
 from dataclasses import field
+from datetime import UTC
+from datetime import datetime
 from enum import StrEnum
 from pathlib import Path
 
@@ -53,7 +55,10 @@ from syncer.output import error
 from syncer.output import hint
 from syncer.output import success
 from syncer.repos import GitFailure
+from syncer.repos import read_backend_description
 from syncer.repos import run_command
+from syncer.trips import load_trips
+from syncer.trips import trips_file
 
 # Deliberately not git_timeout. That is sized for fetching a large monorepo over a VPN (120s by
 # default); a diagnostic that hangs for two minutes per host is one nobody waits for.
@@ -97,7 +102,7 @@ def _git_present() -> Check:
             hints=['install git — every other check below depends on it'],
         )
     version = run_command(['git', '--version'], timeout=PROBE_TIMEOUT_SECONDS)
-    return Check('git', Status.OK, version.stdout.strip() or 'git found', detail=[binary])
+    return Check('git', Status.OK, version.stdout.strip() or 'git found', detail=[binary, read_backend_description()])
 
 
 def _paths(tool_config: ToolConfig, override: Path | None) -> Check:
@@ -252,6 +257,31 @@ def _reachable(config: SyncerConfig) -> list[Check]:
     return checks
 
 
+def _closed_hosts() -> list[Check]:
+    """Hosts an earlier run closed, while that verdict still holds; nothing when there are none.
+
+    A WARN, never a FAIL: the next run still tries each of these, one repo at a time, and the
+    reach check below is the one that says whether it will get through.
+    """
+    trips = load_trips(trips_file())
+    if not trips:
+        return []
+    now = datetime.now(UTC)
+    return [
+        Check(
+            'trips',
+            Status.WARN,
+            f'{len(trips)} host{"" if len(trips) == 1 else "s"} closed by an earlier run',
+            detail=[
+                f'{trip.host} ({trip.transport}): {trip.cause.value.replace("_", " ")}, '
+                f'suspect for another {max(1, int((trip.until - now).total_seconds() // 60))}m'
+                for trip in trips
+            ],
+            hints=['syncer doctor --clear-trips — once whatever closed them is fixed'],
+        )
+    ]
+
+
 def _repos_on_disk(config: SyncerConfig, reachable: bool) -> Check:
     """Pure stat, no git. Reports the fresh-machine case as one fact rather than N warnings."""
     active = [repo for repo in config.repos if repo.status != 'retired']
@@ -331,6 +361,7 @@ def run_doctor(override: Path | None = None) -> list[Check]:
         checks.append(_policies_resolve(config, tool_config))
         return checks
 
+    checks.extend(_closed_hosts())
     reach_checks = _reachable(config)
     checks.extend(reach_checks)
     reachable = all(check.status is Status.OK for check in reach_checks)
@@ -602,4 +602,7 @@ def execute(action: Action, state: BranchState, repo: Repo, policy: Policy) -> O
     if action == Action.PROMPT:
         # Interactive traverse is deferred to a later slice; degrade to a report.
         return Outcome(branch=state.branch, action=action, status='reported', message='interactive prompt not implemented (v1)')
-    return _MUTATORS[action](state, repo, policy)
+    # live(): the guards below re-measure the tree and refs at the moment of the write, bypassing
+    # the Repo's read memo — it knows about syncer's own writes, not an editor's (invariant 6).
+    with repo.live():
+        return _MUTATORS[action](state, repo, policy)
@@ -4,6 +4,7 @@ import importlib.metadata
 import shutil
 import subprocess
 import tempfile
+from datetime import timedelta
 from pathlib import Path
 from typing import Annotated
 
@@ -12,11 +13,13 @@ from pyselfupdate import Config
 from pyselfupdate import notify
 from pyselfupdate.typercmd import run_update
 
+from syncer.ancestry import ancestry_file
 from syncer.commands.config_cmd import config_app
 from syncer.commands.policy_cmd import policy_app
 from syncer.config import RepoConfig
 from syncer.config import SyncerConfig
 from syncer.config import load_tool_config
+from syncer.config import parse_age
 from syncer.config import resolve_clone_url
 from syncer.config import resolve_config
 from syncer.config import resolve_registry
@@ -28,7 +31,9 @@ from syncer.output import ICON_WARN
 from syncer.output import _status_line
 from syncer.output import console
 from syncer.output import error
+from syncer.output import hint
 from syncer.report import DEFAULT_JOBS
+from syncer.report import Engine
 from syncer.report import exit_code_for
 from syncer.report import report_branches
 from syncer.repos import Repo
@@ -39,6 +44,8 @@ from syncer.stats import show_stats
 from syncer.sync import run_sync
 from syncer.tracking import events_file_for
 from syncer.tracking import migrate_legacy_events
+from syncer.trips import clear_trips
+from syncer.trips import trips_file
 
 app = typer.Typer(no_args_is_help=True, rich_markup_mode='rich')
 app.add_typer(config_app, name='config', rich_help_panel='Manage')
@@ -97,10 +104,50 @@ def main(
 
 PerBranch = Annotated[bool, typer.Option('--per-branch', help='Per-branch view: no lifecycle, cloning, or run history')]
 Policy = Annotated[str | None, typer.Option('--policy', '-p', help='Override the resolved policy for every repo')]
-Jobs = Annotated[int, typer.Option('--jobs', '-j', help='Max repos to process concurrently')]
+
+
+def _parse_jobs(value: str) -> int | None:
+    """`-j N`, or `-j auto` for a width that follows the network; None stands for auto."""
+    if value == 'auto':
+        return None
+    try:
+        jobs = int(value)
+    except ValueError:
+        raise typer.BadParameter(f"expected a number or 'auto', got {value!r}") from None
+    if jobs < 1:
+        raise typer.BadParameter(f'must be at least 1, got {jobs}')
+    return jobs
+
+
+Jobs = Annotated[
+    int | None,
+    typer.Option('--jobs', '-j', parser=_parse_jobs, metavar='N|auto', help="Max repos to process concurrently, or 'auto' to adapt"),
+]
+# Not the default yet: the asyncio engine has to prove itself against the thread pool on real
+# registries before either one is retired.
+EngineOption = Annotated[Engine, typer.Option('--engine', help='What runs the fetches: a thread pool, or asyncio subprocesses')]
 ReposFile = Annotated[
     Path | None, typer.Option('--repos-file', '-c', help='Use a different repo registry; replaces the default set entirely')
 ]
+
+
+def _parse_max_fetch_age(value: str) -> timedelta:
+    try:
+        return parse_age(value)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc)) from None
+
+
+MaxFetchAge = Annotated[
+    timedelta | None,
+    typer.Option(
+        '--max-fetch-age',
+        parser=_parse_max_fetch_age,
+        metavar='AGE',
+        help='Reuse a fetch syncer made less than AGE ago (10m, 2h) instead of fetching again; 0 always fetches',
+    ),
+]
+Offline = Annotated[bool, typer.Option('--offline', help="Don't fetch: measure every repo against its last fetch, and say how old that is")]
 JsonOutput = Annotated[bool, typer.Option('--json', help='Emit the run as JSON on stdout instead of a report')]
 # -v, not --all. The flag changes what is *printed*, never what is done: every repo is fetched,
 # classified and decided either way, and the set the run operates on is identical with and without
@@ -113,7 +160,19 @@ Verbose = Annotated[bool, typer.Option('--verbose', '-v', help='Show every repo,
 INTERRUPTED_EXIT_CODE = 130
 
 
-def _run(*, apply: bool, per_branch: bool, policy: str | None, jobs: int, repos_file: Path | None, as_json: bool, verbose: bool) -> None:
+def _run(
+    *,
+    apply: bool,
+    per_branch: bool,
+    policy: str | None,
+    jobs: int | None,
+    repos_file: Path | None,
+    as_json: bool,
+    verbose: bool,
+    engine: Engine = Engine.THREADS,
+    offline: bool = False,
+    max_fetch_age: timedelta | None = None,
+) -> None:
     """Both verbs are the same run; only whether it writes and how it is grouped differ."""
     try:
         if per_branch:
@@ -125,6 +184,11 @@ def _run(*, apply: bool, per_branch: bool, policy: str | None, jobs: int, repos_
                 jobs=jobs,
                 as_json=as_json,
                 verbose=verbose,
+                engine=engine,
+                offline=offline,
+                max_fetch_age=max_fetch_age,
+                trips_file=trips_file(),
+                ancestry_file=ancestry_file(),
             )
         else:
             syncer_config, repos_path = resolve_registry(repos_file)
@@ -137,6 +201,11 @@ def _run(*, apply: bool, per_branch: bool, policy: str | None, jobs: int, repos_
                 jobs=jobs,
                 as_json=as_json,
                 verbose=verbose,
+                engine=engine,
+                offline=offline,
+                max_fetch_age=max_fetch_age,
+                trips_file=trips_file(),
+                ancestry_file=ancestry_file(),
             )
     except KeyboardInterrupt:
         # Nothing is rendered and no event is written. A run that covered some unknown fraction of
@@ -154,6 +223,9 @@ def check(
     repos_file: ReposFile = None,
     json_output: JsonOutput = False,
     verbose: Verbose = False,
+    engine: EngineOption = Engine.THREADS,
+    offline: Offline = False,
+    max_fetch_age: MaxFetchAge = None,
 ) -> None:
     """Report what each policy would do to every repo. Never writes.
 
@@ -162,9 +234,24 @@ def check(
     anything needing attention sits nearest the prompt. --per-branch swaps the repo-level view
     (which also clones missing repos under `apply`, and records run history) for a per-branch one.
 
+    [bold]--offline[/bold] fetches nothing, for a machine with no network: each repo is measured
+    against the refs its last fetch left, and says how old they are. Not offered on apply — a
+    decision made from refs of unknown age is not one to execute.
+
     Exits 1 if any repo reached an error state, so it can gate a script.
     """
-    _run(apply=False, per_branch=per_branch, policy=policy, jobs=jobs, repos_file=repos_file, as_json=json_output, verbose=verbose)
+    _run(
+        apply=False,
+        per_branch=per_branch,
+        policy=policy,
+        jobs=jobs,
+        repos_file=repos_file,
+        as_json=json_output,
+        verbose=verbose,
+        engine=engine,
+        offline=offline,
+        max_fetch_age=max_fetch_age,
+    )
 
 
 @app.command(rich_help_panel='Sync')
@@ -175,6 +262,8 @@ def apply(
     repos_file: ReposFile = None,
     json_output: JsonOutput = False,
     verbose: Verbose = False,
+    engine: EngineOption = Engine.THREADS,
+    max_fetch_age: MaxFetchAge = None,
 ) -> None:
     """Execute each policy's safe actions: pull, push, fast-forward, clone, prune.
 
@@ -184,9 +273,23 @@ def apply(
 
     Only the repos with something to report are shown; [bold]-v[/bold] lists every one.
 
+    [bold]--max-fetch-age 10m[/bold] reuses the fetch a `check` just made rather than fetching every
+    repo a second time; each repo that did says how old its refs are. max_fetch_age in config.toml
+    sets it for every run.
+
     Exits 1 if any repo reached an error state, so it can gate a script.
     """
-    _run(apply=True, per_branch=per_branch, policy=policy, jobs=jobs, repos_file=repos_file, as_json=json_output, verbose=verbose)
+    _run(
+        apply=True,
+        per_branch=per_branch,
+        policy=policy,
+        jobs=jobs,
+        repos_file=repos_file,
+        as_json=json_output,
+        verbose=verbose,
+        engine=engine,
+        max_fetch_age=max_fetch_age,
+    )
 
 
 @app.command(rich_help_panel='Inspect')
@@ -319,6 +422,7 @@ def doctor(
         Path | None,
         typer.Option('--repos-file', '-c', help='Check a different repo registry'),
     ] = None,
+    clear: Annotated[bool, typer.Option('--clear-trips', help='Forget the hosts earlier runs found unreachable, then check')] = False,
 ) -> None:
     """Check whether this machine can run syncer at all, and say which part is wrong.
 
@@ -327,9 +431,17 @@ def doctor(
     config and registry paths with the reason each was chosen, whether the remotes can actually
     be reached, and how many repos are cloned. Read-only, and never writes a config.
 
+    A host a recent run found unreachable is listed with when syncer will stop treating it as
+    suspect. [bold]--clear-trips[/bold] forgets those verdicts now, for when whatever closed the
+    host — an expired token, a dropped VPN — has been fixed; it is the one thing this writes.
+
     Exits 1 if any check fails, so [bold]syncer doctor && syncer apply[/bold] stops on a box
     that was never going to work.
     """
+    if clear:
+        count = clear_trips(trips_file())
+        # stderr, with the report it precedes: a diagnostic is not data anyone pipes into jq.
+        hint(f'forgot {count} closed host{"" if count == 1 else "s"}')
     checks = run_doctor(repos_file)
     render_doctor(checks)
     raise typer.Exit(doctor_exit_code(checks))
@@ -0,0 +1,136 @@
+"""One SSH connection per host for a whole run, instead of one per fetch.
+
+Every fetch over SSH opens its own connection: a key exchange and an authentication, 300-800ms to
+a Git server behind a VPN, paid again by each of the repos that server holds. OpenSSH can carry
+many sessions over one connection (ControlMaster), and git, which spawns ssh per call, never asks
+for it.
+
+So with `ssh_multiplex = true` in config.toml, a run starts one master per SSH destination in its
+registry before the first fetch, each listening on a socket in a private directory, and every ssh
+git spawns is told to look there first. A fetch then opens a session on a connection that is
+already authenticated. The masters are stopped and the directory removed when the run ends;
+ControlPersist is only the backstop for a run that is killed before it can do that.
+
+It fails closed. A master that will not start — a host that refuses, a key that needs a passphrase
+BatchMode will not ask for — leaves no socket, and an ssh that finds no socket at its ControlPath
+connects on its own, exactly as it would have without any of this. A GIT_SSH_COMMAND that already
+names a ControlPath or ControlMaster is the user's own multiplexing, and is left alone entirely.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+from syncer.repos import SSH_KEEPALIVE_OPTIONS
+from syncer.repos import set_ssh_options
+
+# How long a master outlives its last session, for a run that ends without stopping it.
+MUX_PERSIST_SECONDS = 60
+# Ceiling on starting one master, which is one connection and one authentication.
+MUX_START_TIMEOUT_SECONDS = 15
+
+_SSH_URL = re.compile(r'^(?:ssh|git\+ssh|ssh\+git)://(?:(?P<user>[^@/]+)@)?(?P<host>\[[^\]]+\]|[^:/]+)(?::(?P<port>\d+))?/')
+# scp-style, `[user@]host:path` — a colon before any slash, and no scheme.
+_SCP_LIKE = re.compile(r'^(?:(?P<user>[^@/:]+)@)?(?P<host>[^@/:]+):(?!//)')
+
+
+class Destination(NamedTuple):
+    """What ssh is told to connect to for a URL: `[user@]host`, and the port when one is named."""
+
+    target: str
+    port: str | None
+
+
+def ssh_destination(url: str) -> Destination | None:
+    """The SSH destination a clone URL connects to, or None for https, git:// and local paths."""
+    if url.startswith(('.', '/', '~')):
+        return None
+    match = _SSH_URL.match(url) or _SCP_LIKE.match(url)
+    if match is None:
+        return None
+    user, host = match['user'], match['host'].strip('[]')
+    port = match.groupdict().get('port')
+    return Destination(f'{user}@{host}' if user else host, port)
+
+
+def _user_ssh_command() -> str:
+    return os.environ.get('GIT_SSH_COMMAND', 'ssh')
+
+
+def _ssh(control_path: str, *options: str, destination: Destination) -> list[str]:
+    """argv for the user's own ssh command with these options, run the way git runs it: through
+    the shell, so a GIT_SSH_COMMAND carrying its own flags and quoting means what it meant there."""
+    port = ['-p', destination.port] if destination.port else []
+    # The keepalives matter on the master most of all: it carries every session's traffic, and the
+    # sessions' own keepalives never reach the network.
+    args = ['-o', 'BatchMode=yes', *SSH_KEEPALIVE_OPTIONS, '-o', f'ControlPath={control_path}', *options, *port, destination.target]
+    return ['sh', '-c', f'{_user_ssh_command()} "$@"', 'ssh', *args]
+
+
+def _start_master(control_path: str, destination: Destination, log: Path) -> bool:
+    """Open one master, backgrounded once it has authenticated. False when it would not start."""
+    argv = _ssh(control_path, '-o', 'ControlMaster=yes', '-o', f'ControlPersist={MUX_PERSIST_SECONDS}', '-N', '-f', destination=destination)
+    # Not run_command: `-f` leaves the master holding whatever stdout and stderr it was given, and
+    # reading pipes until they close would wait for the end of the run. Its complaints go to a file.
+    with log.open('a') as stderr:
+        try:
+            result = subprocess.run(  # nosec B603
+                argv, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=stderr, timeout=MUX_START_TIMEOUT_SECONDS
+            )
+        except subprocess.TimeoutExpired:
+            return False
+    return result.returncode == 0
+
+
+def _stop_master(control_path: str, destination: Destination) -> None:
+    argv = _ssh(control_path, '-O', 'exit', destination=destination)
+    with contextlib.suppress(subprocess.TimeoutExpired):
+        subprocess.run(  # nosec B603
+            argv, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=MUX_START_TIMEOUT_SECONDS
+        )
+
+
+@contextlib.contextmanager
+def ssh_multiplexing(urls: Iterable[str], *, enabled: bool) -> Iterator[list[Destination]]:
+    """Run the block with one SSH master per destination in `urls`; yields the ones that started.
+
+    A no-op when not enabled, when no URL is SSH, or when GIT_SSH_COMMAND already multiplexes.
+    """
+    found = {dest for url in urls if (dest := ssh_destination(url)) is not None}
+    destinations = sorted(found, key=lambda dest: (dest.target, dest.port or ''))
+    command = _user_ssh_command().lower()
+    if not enabled or not destinations or 'controlpath' in command or 'controlmaster' in command:
+        yield []
+        return
+
+    # Short and private: a socket path past ~100 bytes cannot be bound, and the directory is
+    # 0700 so no other user can open a session on a connection that authenticated as this one.
+    control_dir = Path(tempfile.mkdtemp(prefix='syncer-ssh-'))
+    # %C is ssh's hash of the local host, the remote host, the port and the user: one socket per
+    # connection, named the same by the master and by every ssh git spawns for that destination.
+    control_path = str(control_dir / '%C')
+    log = control_dir / 'masters.log'
+    started: list[Destination] = []
+    try:
+        with ThreadPoolExecutor(max_workers=min(8, len(destinations))) as pool:
+            results = pool.map(lambda dest: _start_master(control_path, dest, log), destinations)
+            started = [dest for dest, ok in zip(destinations, results, strict=True) if ok]
+        # Every ssh, master running or not: the client form falls back to its own connection when
+        # there is no socket to find, which is the fail-closed half.
+        set_ssh_options(['-o', 'ControlMaster=no', '-o', f'ControlPath={control_path}'])
+        yield started
+    finally:
+        set_ssh_options([])
+        for dest in started:
+            _stop_master(control_path, dest)
+        shutil.rmtree(control_dir, ignore_errors=True)
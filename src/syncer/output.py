@@ -16,6 +16,8 @@ rich to run a subprocess.
 from __future__ import annotations
 
 import json
+from datetime import UTC
+from datetime import datetime
 from enum import StrEnum
 from typing import Any
 
@@ -91,6 +93,28 @@ def _status_line(icon: str, name: str, msg: str, color: str, branch: str | None
     return f'[{color}]{prefix}{padding} {msg}[/{color}]'
 
 
+def time_ago(dt: datetime) -> str:
+    """How long ago `dt` was, in the largest unit that fits: '3h ago', '2mo ago'."""
+    now = datetime.now(UTC)
+    delta = now - dt
+    minutes = int(delta.total_seconds() / 60)
+    if minutes < 1:
+        return 'just now'
+    if minutes < 60:
+        return f'{minutes}m ago'
+    hours = minutes // 60
+    if hours < 24:
+        return f'{hours}h ago'
+    days = hours // 24
+    if days < 30:
+        return f'{days}d ago'
+    months = days // 30
+    if months < 12:
+        return f'{months}mo ago'
+    years = days // 365
+    return f'{years}y ago'
+
+
 def emit_json(data: Any) -> None:
     """Print JSON to stdout with no markup or ANSI escapes, so it survives a pipe into jq."""
     print(json.dumps(data, indent=2, default=str))
@@ -0,0 +1,101 @@
+"""Ask each host one quick question before its repos queue up behind it.
+
+The breaker closes a host on the first proof that it is unreachable, and its docstring admits the
+window it cannot close: with `jobs` fetches already in flight when that proof lands, every one of
+them pays in full. Sixteen fetches to a host whose token expired is sixteen credential prompts
+refused, and sixteen to a name that no longer resolves behind a VPN is sixteen DNS timeouts.
+
+So with `preflight = true` in config.toml, a run probes each (host, transport) lane with a `git
+ls-remote` — the same question doctor asks — under a short timeout of its own, and until the probe
+answers the lane starts one repo at a time. A host-wide failure trips the breaker before the rest
+of the lane is started, so they are reported as not checked instead of attempted; anything else
+opens the lane to its cap. Lanes the probes are not waiting on start exactly as they did, and so
+does the first repo of every lane: a healthy host loses nothing but the few hundred milliseconds
+its second repo waits for an answer.
+
+A lane with a single repo is never probed. Its one repo is the probe, and it is already allowed to
+start.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Iterable
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from types import TracebackType
+
+from syncer.breaker import HOST_WIDE_CAUSES
+from syncer.breaker import HostBreaker
+from syncer.breaker import host_key
+from syncer.diagnose import classify_failure
+from syncer.repos import GitFailure
+from syncer.repos import run_command
+from syncer.schedule import Lane
+
+# Deliberately not git_timeout, and shorter than doctor's: a probe that waits as long as a fetch
+# would protects nothing, and a host too slow to list its branches in this long is a host for the
+# breaker's flaky tier, which a probe never feeds.
+PREFLIGHT_TIMEOUT_SECONDS = 10
+
+
+def probe_targets(urls: Iterable[str]) -> dict[Lane, str]:
+    """The URL to probe for each lane with more than one repo on it: its first, in `urls` order."""
+    first: dict[Lane, str] = {}
+    counts: Counter[Lane] = Counter()
+    for url in urls:
+        lane = host_key(url)
+        if lane is not None:
+            first.setdefault(lane, url)
+            counts[lane] += 1
+    return {lane: url for lane, url in first.items() if counts[lane] > 1}
+
+
+def probe(url: str) -> GitFailure | None:
+    """List the remote's branches; the failure if that could not be done.
+
+    No `--exit-code`, unlike doctor's: a remote with no branches yet has still answered.
+    """
+    argv = ['ls-remote', '--heads', url]
+    result = run_command(['git', *argv], timeout=PREFLIGHT_TIMEOUT_SECONDS)
+    if result.returncode == 0:
+        return None
+    return GitFailure(argv=tuple(argv), returncode=result.returncode, stderr=result.stderr.strip())
+
+
+class Preflight:
+    """The run's probes, started in the background on construction, and their verdicts as they land.
+
+    Both engines wait on `pending` beside their fetches and hand each probe that finishes to
+    settle(), which tells the breaker and names the lane it was for.
+    """
+
+    def __init__(self, targets: dict[Lane, str], breaker: HostBreaker) -> None:
+        self._breaker = breaker
+        self._pool = ThreadPoolExecutor(max_workers=max(1, min(8, len(targets))))
+        self.pending: dict[Future[GitFailure | None], tuple[Lane, str]] = {
+            self._pool.submit(probe, url): (lane, url) for lane, url in targets.items()
+        }
+
+    def settle(self, future: Future[GitFailure | None]) -> tuple[Lane, bool]:
+        """Record a finished probe's answer; returns its lane, and whether the host answered.
+
+        Only a host-wide cause is passed on. A probe timing out is a slow host, not a dead one,
+        and counting it toward the flaky tier would let a short timeout close a host that every
+        fetch, given git_timeout, would have reached.
+        """
+        lane, url = self.pending.pop(future)
+        failure = future.result()
+        if failure is None:
+            self._breaker.record_success(url)
+        elif classify_failure(failure) in HOST_WIDE_CAUSES:
+            self._breaker.record_failure(url, failure)
+        return lane, failure is None
+
+    def __enter__(self) -> Preflight:
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc: BaseException | None, tb: TracebackType | None) -> None:
+        # A probe still running here belongs to a lane whose repos have all finished; waiting on it
+        # costs at most PREFLIGHT_TIMEOUT_SECONDS, and a Ctrl-C has already killed it.
+        self._pool.shutdown(wait=True, cancel_futures=True)
@@ -78,6 +78,8 @@ class RunProgress:
         self._started = time.monotonic()
         self._spinner = Spinner('dots')
         self._live: Live | None = None
+        # The width an adaptive run is currently at; None for a fixed -j, which has nothing to show.
+        self._concurrency: int | None = None
 
     def __enter__(self) -> RunProgress:
         self._started = time.monotonic()
@@ -110,6 +112,11 @@ class RunProgress:
             if tally is not None:
                 self._tally[tally] = self._tally.get(tally, 0) + 1
 
+    def set_concurrency(self, width: int) -> None:
+        """Show the width `--jobs auto` has settled on, so a run that narrowed itself says so."""
+        with self._lock:
+            self._concurrency = width
+
     def _tally_text(self, counts: dict[Tally, int]) -> Text:
         text = Text()
         # Iterated over the enum, not the counts, so the counters hold their order as they appear.
@@ -136,6 +143,7 @@ class RunProgress:
             # Oldest first: the repo that has been running longest is the one holding up the run,
             # and it is the one that stays on screen while the quick ones churn past it.
             running = sorted(self._running.values(), key=lambda item: item.started)
+            concurrency = self._concurrency
         header = Table.grid(padding=(0, 1))
         header.add_row(
             self._spinner,
@@ -143,5 +151,6 @@ class RunProgress:
             ProgressBar(total=max(self.total, 1), completed=done, width=BAR_WIDTH),
             self._tally_text(counts),
             Text(_clock(now - self._started), style='blue'),
+            Text(f'-j {concurrency}' if concurrency is not None else '', style='blue'),
         )
         return Group(header, self._running_text(running, now))
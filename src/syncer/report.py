@@ -6,10 +6,21 @@ calls block on network/disk I/O with the GIL released, so wall-clock is roughly
 single repo rather than the sum. All git work happens in worker threads; results are collected,
 then sorted and rendered on the main thread so output never interleaves.
 
-The pool caps concurrency at `jobs` and acts as a rolling queue: repos beyond that wait and
-start as slots free up. Each worker also sleeps a small random jitter before its first git
-call, so the initial burst of `jobs` fetches doesn't hit the remote at the same instant. The
-jitter is bounded per task (no cumulative N×delay floor), so it never slows large repo sets.
+Each repo passes through two stages on two pools: the fetch, which waits on the network, and
+the classification and execution after it, which wait on the disk. `jobs` caps the first and
+the machine sizes the second, so neither kind of work holds the other's slots; a bounded
+handoff between them keeps the fetching from running far ahead of what has been read.
+
+The network stage is a rolling queue: repos beyond `jobs` wait and start as slots free up.
+Which repo takes a freed slot is schedule.py's call — round-robin across hosts, within any
+per-host cap config.toml sets — so one throttled host never holds every slot.
+Each worker also sleeps a small random jitter before its first git call, so the initial burst of
+`jobs` fetches doesn't hit the remote at the same instant. The jitter is bounded per task (no
+cumulative N×delay floor), so it never slows large repo sets.
+
+`--engine async` swaps the network pool for an event loop that awaits each fetch as a subprocess, so a
+repo waiting on the network costs a coroutine instead of a thread. The stages either side of the
+fetch are shared code, which is what keeps the two engines' reports identical.
 
 Collecting before rendering is what a live progress display pays for: the workers report
 themselves as they start and finish, so the wait is legible — how far in, which repos are in
@@ -26,32 +37,53 @@ is one where the four rows that mattered were indistinguishable from the seventy
 
 from __future__ import annotations
 
+import asyncio
+import os
 import random
 import time
 from collections import Counter
+from collections.abc import Callable
+from collections.abc import Mapping
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Executor
+from concurrent.futures import Future
 from concurrent.futures import ThreadPoolExecutor
-from concurrent.futures import as_completed
+from concurrent.futures import wait
 from dataclasses import dataclass
 from dataclasses import field
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
 from enum import IntEnum
+from enum import StrEnum
 from functools import partial
 from pathlib import Path
 
 from rich.markup import escape
 
+from syncer.ancestry import load_memo
+from syncer.ancestry import save_memo
 from syncer.breaker import HostBreaker
 from syncer.breaker import Trip
+from syncer.breaker import host_key
 from syncer.classify import ClassifyError
 from syncer.classify import classify_repo
 from syncer.classify import refresh_remote
+from syncer.classify import refresh_remote_async
+from syncer.concurrency import AUTO_MAX_JOBS
+from syncer.concurrency import CONGESTION_CAUSES
+from syncer.concurrency import AimdController
+from syncer.concurrency import fd_ceiling
 from syncer.config import RepoConfig
 from syncer.config import SyncerConfig
 from syncer.config import ToolConfig
 from syncer.config import resolve_clone_url
 from syncer.config import resolve_policies
 from syncer.config import resolve_policy_name
+from syncer.credentials import credential_cache
 from syncer.diagnose import Cause
 from syncer.diagnose import FailureGroup
+from syncer.diagnose import classify_failure
 from syncer.diagnose import group_failures
 from syncer.diagnose import hint_lines
 from syncer.execute import MUTATING_ACTIONS
@@ -60,6 +92,7 @@ from syncer.execute import Refusal
 from syncer.execute import blocking_refusal
 from syncer.execute import describe_block
 from syncer.execute import execute
+from syncer.multiplex import ssh_multiplexing
 from syncer.output import ICON_DOT
 from syncer.output import ICON_DOWNLOAD
 from syncer.output import ICON_ERR
@@ -74,27 +107,48 @@ from syncer.output import emit_json
 from syncer.output import err_console
 from syncer.output import error
 from syncer.output import hint
+from syncer.output import time_ago
 from syncer.policy import Action
 from syncer.policy import BranchState
 from syncer.policy import Policy
 from syncer.policy import PrimaryState
 from syncer.policy import decide
 from syncer.policy import is_watched_remote
+from syncer.preflight import Preflight
+from syncer.preflight import probe_targets
 from syncer.progress import RunProgress
 from syncer.remedy import Remedy
 from syncer.remedy import remedy_for
+from syncer.repos import AncestryMemo
 from syncer.repos import GitFailure
 from syncer.repos import Repo
 from syncer.repos import abort_running_commands
 from syncer.repos import find_repo_in_search_paths
+from syncer.repos import frozen_execution
 from syncer.repos import origin_mismatch
 from syncer.repos import reset_abort
+from syncer.schedule import HostScheduler
+from syncer.schedule import Lane
+from syncer.schedule import expectations
+from syncer.schedule import longest_first
+from syncer.trips import load_trips
+from syncer.trips import save_trips
 
 DEFAULT_JOBS = 16
 # Upper bound on the random pre-fetch delay each worker sleeps, to desynchronize the initial
 # burst of concurrent fetches. Bounded per task, so it adds at most one window of latency.
 DEFAULT_JITTER_SECONDS = 0.3
 
+# Fetched repos allowed to queue for the local stage, per local worker, before fetching pauses.
+HANDOFF_PER_WORKER = 2
+
+
+class Engine(StrEnum):
+    """What runs the per-repo work. Threads is the default until asyncio has proven itself."""
+
+    THREADS = 'threads'
+    ASYNC = 'async'
+
 
 class Severity(IntEnum):
     """Who has to do something about a result, least to most. Rendered in this order so the
@@ -215,6 +269,20 @@ class RepoBranchReport:
     # already stated once in the failure summary, and repeating it sixty times is the wall of
     # noise the skip exists to prevent.
     skipped: Trip | None = None
+    # Wall time this repo held a slot, set by the engine that ran it; recorded into history so the
+    # next run can start the slowest repos first. Not part of equality: it is a measurement of the
+    # run, not of the repo, and two runs reporting the same state are the same report.
+    duration_ms: int | None = field(default=None, compare=False)
+    # How long the fetch alone took, None when there was none. What `--jobs auto` steers on: the
+    # local work either side of it is the disk's time, not the network's.
+    fetch_ms: int | None = field(default=None, compare=False)
+    # Whether that time includes a fetch, or is an ls-remote that found nothing to fetch. Only a
+    # fetch is a sample of what the next one will take.
+    fetch_ran: bool = field(default=False, compare=False)
+    # When origin's refs were last fetched, for a repo this run measured without fetching — an
+    # `--offline` run, or a fetch recent enough for `--max-fetch-age` to reuse; None on a run that
+    # fetched them itself. The report's age, not the repo's.
+    refs_as_of: datetime | None = field(default=None, compare=False)
 
 
 def is_unverified(report: RepoBranchReport) -> bool:
@@ -397,9 +465,10 @@ def _watched_remote_branches(repo: Repo, policy: Policy) -> list[tuple[str, str]
 
 def build_branch_rows(repo: Repo, policy: Policy, apply: bool, *, fetched: bool = False) -> list[BranchRow]:
     """Classify → decide → (execute if apply) for every in-scope branch. Shared by both surfaces."""
-    # Read once, not per row: is_dirty shells out to `git status` every call, and it is the same
-    # tree for every branch. Repo-wide, matching what the execute-time guards actually consult —
-    # state.dirty is scoped to the current branch, so it would under-report the refusal.
+    # Read once, not per row: it is the same tree for every branch, and classify_repo's own read of
+    # it is then answered from the Repo's memo. Repo-wide, matching what the execute-time guards
+    # actually consult — state.dirty is scoped to the current branch, so it would under-report the
+    # refusal.
     dirty = repo.is_dirty
     rows = []
     for state in classify_repo(repo, policy, fetched=fetched):
@@ -419,14 +488,20 @@ def build_branch_rows(repo: Repo, policy: Policy, apply: bool, *, fetched: bool
     return rows
 
 
-def _failed_report(repo: Repo, label: str, repo_config: RepoConfig, error: str, policy_name: str | None = None) -> RepoBranchReport:
+def _failed_report(
+    repo: Repo, label: str, repo_config: RepoConfig, error: str, policy_name: str | None = None, *, failure: GitFailure | None = None
+) -> RepoBranchReport:
     """A repo whose state could not be established. Never carries branch rows.
 
     Rows are the thing being refused: a row is a claim about a branch, and the whole point is
     that no such claim can be made. Local counts are still read so the stale-repo warnings keep
     working when only the network half failed.
+
+    `failure` names the call to show when it is not simply the last one recorded — a fetch whose
+    local reads ran beside it can have recorded theirs after it.
     """
-    detail = repo.failures[-1].stderr if repo.failures else None
+    failure = failure or (repo.failures[-1] if repo.failures else None)
+    detail = failure.stderr if failure is not None else None
     return RepoBranchReport(
         label=label,
         path=repo_config.path,
@@ -489,32 +564,41 @@ def _occupied_note(path: Path) -> str:
     return f'a directory holding {entries} {noun} is already here — apply clones into it and keeps them'
 
 
-def _build_repo_report(
+@dataclass
+class _Prepared:
+    """A repo that got past everything able to end it before the fetch, and what the rest needs.
+
+    The seam between the stages: both engines run _prepare_repo and _finish_repo unchanged and
+    differ only in how they wait on the fetch between them, which is the one call whose length is
+    set by the network rather than the disk.
+    """
+
+    repo_config: RepoConfig
+    repo: Repo
+    label: str
+    policy: Policy
+    policy_name: str
+
+
+def _prepare_repo(
     repo_config: RepoConfig,
     config: SyncerConfig,
     tool_config: ToolConfig,
     policies: dict[str, Policy],
     cli_policy: str | None,
     apply: bool,
-    jitter: float,
     include_lifecycle: bool,
     search_paths: list[Path],
     claimed_paths: set[Path],
     breaker: HostBreaker,
-) -> RepoBranchReport | None:
-    """Do all git work for one repo (runs in a worker thread). Never touches the console.
+    fetch_timeouts: Mapping[str, int],
+    memo: AncestryMemo | None = None,
+) -> RepoBranchReport | _Prepared | None:
+    """Everything before the fetch: lifecycle, remotes, policy, and the breaker's verdict.
 
-    include_lifecycle=False (branches view) returns None for anything that isn't a cloned git
-    repo with a remote. include_lifecycle=True (full sync) surfaces those as lifecycle reports
-    and, in apply mode, clones a missing repo.
-
-    `breaker` is required rather than defaulted. A per-repo fallback instance would be the
-    credential storm restored — every repo asking a host that had already refused, with nothing on
-    screen distinguishing that run from a working one.
+    Returns the report when one of those ends the repo here, None when the branches view has
+    nothing to say about it, and a _Prepared when the fetch is next.
     """
-    if jitter > 0:
-        time.sleep(random.uniform(0, jitter))  # desync the initial burst of concurrent fetches
-
     path = Path(repo_config.path).expanduser()
     label = _label(repo_config)
     owner = repo_config.owner or config.owner
@@ -525,6 +609,8 @@ def _build_repo_report(
         host=config.host,
         timeout=tool_config.git_timeout,
         url=resolve_clone_url(repo_config, config),
+        fetch_timeout=fetch_timeouts.get(repo_config.path),
+        memo=memo,
     )
 
     def lifecycle(status: str, detail: str | None = None) -> RepoBranchReport:
@@ -593,31 +679,187 @@ def _build_repo_report(
     trip = breaker.trip_for(repo.contacted_url)
     if trip is not None:
         return _skipped_report(repo_config, trip, repo.contacted_url)
+    return _Prepared(repo_config=repo_config, repo=repo, label=label, policy=policy, policy_name=policy_name)
+
+
+@dataclass
+class _Fetched:
+    """A repo whose fetch has run, on its way to the local stage. The breaker already knows.
+
+    Or one whose fetch was skipped, offline or inside `--max-fetch-age`: no failure, no fetch time,
+    and the age of the refs it will be measured against in `refs_as_of`.
+    """
+
+    prepared: _Prepared
+    failure: GitFailure | None
+    fetch_ms: int | None
+    refs_as_of: datetime | None = None
+    fetch_ran: bool = False
+
+    @property
+    def failures(self) -> list[GitFailure]:
+        return [self.failure] if self.failure is not None else []
+
+
+def _fetched(prepared: _Prepared, failure: GitFailure | None, started: float, breaker: HostBreaker) -> _Fetched:
+    """Close the network stage: tell the breaker how the fetch went, and time it.
+
+    Here rather than in _finish_repo, because the local stage can be a queue away. A host that
+    has just refused should stop the next fetch to it now, not once this repo's tree is read.
+    """
+    if failure is not None:
+        breaker.record_failure(prepared.repo.contacted_url, failure)
+    else:
+        breaker.record_success(prepared.repo.contacted_url)
+        prepared.repo.mark_fetched()
+    fetch_ms = int((time.monotonic() - started) * 1000)
+    return _Fetched(prepared=prepared, failure=failure, fetch_ms=fetch_ms, fetch_ran=prepared.repo.fetch_ran)
+
+
+def _unfetched(prepared: _Prepared, offline: bool, max_fetch_age: timedelta | None) -> _Fetched | None:
+    """The network stage when it need not run: always offline, and for a repo fetched within
+    `max_fetch_age`. None when the fetch has to happen.
+
+    The breaker hears nothing either way. A host nobody contacted has neither failed nor answered,
+    and counting a reused fetch as a success would clear a host that is refusing right now.
+    """
+    if offline:
+        return _Fetched(prepared=prepared, failure=None, fetch_ms=None, refs_as_of=prepared.repo.last_fetched)
+    if max_fetch_age is None:
+        return None
+    fetched_at = prepared.repo.last_fetched
+    if fetched_at is None or datetime.now(UTC) - fetched_at >= max_fetch_age:
+        return None
+    return _Fetched(prepared=prepared, failure=None, fetch_ms=None, refs_as_of=fetched_at)
+
+
+def _finish_repo(fetched: _Fetched, apply: bool) -> RepoBranchReport:
+    """Everything after the fetch: classify, decide and execute. Local work only."""
+    prepared = fetched.prepared
+    repo, policy, policy_name = prepared.repo, prepared.policy, prepared.policy_name
+    repo_config, label = prepared.repo_config, prepared.label
+    # Returning here is what refuses execution for a repo whose fetch failed — no execute() call
+    # is constructed against refs nobody refreshed.
+    if fetched.failure is not None:
+        error = 'fetch failed — sync state not verified against origin'
+        report = _failed_report(repo, label, repo_config, error, policy_name, failure=fetched.failure)
+    else:
+        try:
+            rows = build_branch_rows(repo, policy, apply, fetched=True)
+        except ClassifyError as exc:
+            report = _failed_report(repo, label, repo_config, f'could not classify {exc.branch}', policy_name)
+        else:
+            report = RepoBranchReport(
+                label=label,
+                path=repo_config.path,
+                name=repo_config.name,
+                policy_name=policy_name,
+                rows=rows,
+                uncommitted=len(repo.uncommitted_changes),
+                stashes=repo.stash_count,
+                origin_mismatch=origin_mismatch(repo),
+                expected_url=repo.url,
+                remote_only=_watched_remote_branches(repo, policy),
+            )
+    report.fetch_ms = fetched.fetch_ms
+    report.fetch_ran = fetched.fetch_ran
+    report.refs_as_of = fetched.refs_as_of
+    return report
+
+
+def _fetch_repo(
+    repo_config: RepoConfig,
+    config: SyncerConfig,
+    tool_config: ToolConfig,
+    policies: dict[str, Policy],
+    cli_policy: str | None,
+    apply: bool,
+    jitter: float,
+    include_lifecycle: bool,
+    search_paths: list[Path],
+    claimed_paths: set[Path],
+    breaker: HostBreaker,
+    reads: Executor | None = None,
+    offline: bool = False,
+    max_fetch_age: timedelta | None = None,
+    fetch_timeouts: Mapping[str, int] | None = None,
+    memo: AncestryMemo | None = None,
+) -> RepoBranchReport | _Fetched | None:
+    """The network stage for the thread engine: prepare, then fetch. Never touches the console.
+
+    Returns the report when preparing ended the repo, and a _Fetched for _finish_repo otherwise.
+    Given the `reads` pool, the repo's fetch-independent reads run on it while this thread waits
+    on the network, and _finish_repo finds them already answered.
+    """
+    if jitter > 0:
+        time.sleep(random.uniform(0, jitter))  # desync the initial burst of concurrent fetches
 
+    prepared = _prepare_repo(
+        repo_config,
+        config=config,
+        tool_config=tool_config,
+        policies=policies,
+        cli_policy=cli_policy,
+        apply=apply,
+        include_lifecycle=include_lifecycle,
+        search_paths=search_paths,
+        claimed_paths=claimed_paths,
+        breaker=breaker,
+        fetch_timeouts=fetch_timeouts or {},
+        memo=memo,
+    )
+    if not isinstance(prepared, _Prepared):
+        return prepared
+    unfetched = _unfetched(prepared, offline, max_fetch_age)
+    if unfetched is not None:
+        return unfetched
+    local = reads.submit(prepared.repo.read_local) if reads is not None else None
     # Before classifying, not after: every branch state is measured against remote-tracking
-    # refs, so a dead fetch invalidates the whole report rather than degrading it. Returning
-    # here is also what refuses execution for this repo — no execute() call is constructed.
-    fetch_failure = refresh_remote(repo, policy)
-    if fetch_failure is not None:
-        breaker.record_failure(repo.contacted_url, fetch_failure)
-        return _failed_report(repo, label, repo_config, 'fetch failed — sync state not verified against origin', policy_name)
-    breaker.record_success(repo.contacted_url)
-    try:
-        rows = build_branch_rows(repo, policy, apply, fetched=True)
-    except ClassifyError as exc:
-        return _failed_report(repo, label, repo_config, f'could not classify {exc.branch}', policy_name)
-    return RepoBranchReport(
-        label=label,
-        path=repo_config.path,
-        name=repo_config.name,
-        policy_name=policy_name,
-        rows=rows,
-        uncommitted=len(repo.uncommitted_changes),
-        stashes=repo.stash_count,
-        origin_mismatch=origin_mismatch(repo),
-        expected_url=repo.url,
-        remote_only=_watched_remote_branches(repo, policy),
+    # refs, so a dead fetch invalidates the whole report rather than degrading it.
+    started = time.monotonic()
+    fetched = _fetched(prepared, refresh_remote(prepared.repo, prepared.policy), started, breaker)
+    if local is not None:
+        prepared.repo.adopt_local(local.result())
+    return fetched
+
+
+def _build_repo_report(
+    repo_config: RepoConfig,
+    config: SyncerConfig,
+    tool_config: ToolConfig,
+    policies: dict[str, Policy],
+    cli_policy: str | None,
+    apply: bool,
+    jitter: float,
+    include_lifecycle: bool,
+    search_paths: list[Path],
+    claimed_paths: set[Path],
+    breaker: HostBreaker,
+) -> RepoBranchReport | None:
+    """Do all git work for one repo, both stages back to back. Never touches the console.
+
+    include_lifecycle=False (branches view) returns None for anything that isn't a cloned git
+    repo with a remote. include_lifecycle=True (full sync) surfaces those as lifecycle reports
+    and, in apply mode, clones a missing repo.
+
+    `breaker` is required rather than defaulted. A per-repo fallback instance would be the
+    credential storm restored — every repo asking a host that had already refused, with nothing on
+    screen distinguishing that run from a working one.
+    """
+    outcome = _fetch_repo(
+        repo_config,
+        config=config,
+        tool_config=tool_config,
+        policies=policies,
+        cli_policy=cli_policy,
+        apply=apply,
+        jitter=jitter,
+        include_lifecycle=include_lifecycle,
+        search_paths=search_paths,
+        claimed_paths=claimed_paths,
+        breaker=breaker,
     )
+    return _finish_repo(outcome, apply) if isinstance(outcome, _Fetched) else outcome
 
 
 def gather_reports(
@@ -625,10 +867,17 @@ def gather_reports(
     tool_config: ToolConfig,
     cli_policy: str | None = None,
     apply: bool = False,
-    jobs: int = DEFAULT_JOBS,
+    jobs: int | None = DEFAULT_JOBS,
     jitter: float = DEFAULT_JITTER_SECONDS,
     include_lifecycle: bool = False,
     show_progress: bool = False,
+    engine: Engine = Engine.THREADS,
+    history_ms: Mapping[str, int] | None = None,
+    fetch_timeouts: Mapping[str, int] | None = None,
+    offline: bool = False,
+    max_fetch_age: timedelta | None = None,
+    trips_file: Path | None = None,
+    ancestry_file: Path | None = None,
 ) -> list[RepoBranchReport]:
     """Process every active repo concurrently and return the reports sorted by
     (severity ascending, path) — synced first, errors last, path-sorted within each group.
@@ -640,6 +889,40 @@ def gather_reports(
     A KeyboardInterrupt ends the run rather than the current call. Nothing is rendered and no run
     event is written: a partial sweep recorded as a run is a fact about a machine that was never
     measured, and `stats` would read it back as one.
+
+    `engine` picks what waits on the fetches; see _gather_async. Both produce the same reports
+    from the same stages, and share one breaker and one progress display.
+
+    `history_ms` is each repo's recorded duration by path, from expected_durations. Given one, the
+    repos start longest-first instead of in path order, so the monorepo that takes ninety seconds
+    is not the last thing started and the floor under everything else.
+
+    `fetch_timeouts` is each repo's fetch ceiling by path, from learned_timeouts; a repo it does
+    not name fetches under git_timeout, as every repo did before there was a history to learn from.
+
+    `jobs=None` is `--jobs auto`: the width starts low and follows the network, see concurrency.py.
+
+    `offline=True` fetches nothing and classifies against the remote-tracking refs already on
+    disk, each report carrying how old they are in `refs_as_of`. For `check` only: nothing decided
+    from refs of unknown age is fit to execute, and a clone is a network call.
+
+    `max_fetch_age` reuses any fetch syncer made less than that long ago instead of fetching again,
+    with the same `refs_as_of` on each report that did. None falls back to the config's, and a
+    zero window fetches everything.
+
+    With `ssh_multiplex` set in the tool config, every fetch to one SSH host rides a single
+    connection opened before the first of them; see multiplex.py. With `credential_cache`, every
+    HTTPS host's credential is looked up once, before the first fetch; see credentials.py. With
+    `preflight`, each host is probed while its first repo fetches, and its others wait for the
+    answer; see preflight.py.
+
+    `trips_file` carries the breaker's verdicts between runs: a host an earlier run closed starts
+    this one half-open, and what this run learned is written back when it completes; see trips.py.
+    None, as in tests, keeps each run to itself.
+
+    `ancestry_file` does the same for AncestryMemo's answers about pairs of commits, read before
+    the first repo starts and written back when the run completes; see ancestry.py. None asks git
+    everything, every run.
     """
     policies = resolve_policies(tool_config)
     active_repos = [repo for repo in config.repos if repo.status != 'retired']
@@ -649,60 +932,351 @@ def gather_reports(
     claimed_paths = {Path(rc.path).expanduser() for rc in active_repos}
 
     breaker = HostBreaker()
-    worker = partial(
-        _build_repo_report,
-        config=config,
-        tool_config=tool_config,
-        policies=policies,
-        cli_policy=cli_policy,
-        apply=apply,
-        jitter=jitter,
-        include_lifecycle=include_lifecycle,
-        search_paths=search_paths,
-        claimed_paths=claimed_paths,
-        breaker=breaker,
-    )
+    memo = load_memo(ancestry_file) if ancestry_file is not None else None
+    stage_args = {
+        'config': config,
+        'tool_config': tool_config,
+        'policies': policies,
+        'cli_policy': cli_policy,
+        'apply': apply,
+        'include_lifecycle': include_lifecycle,
+        'search_paths': search_paths,
+        'claimed_paths': claimed_paths,
+        'breaker': breaker,
+        'fetch_timeouts': fetch_timeouts or {},
+        'memo': memo,
+    }
+    if history_ms:
+        expected = expectations((repo_config.path for repo_config in active_repos), history_ms)
+        active_repos = longest_first(active_repos, expected, key=lambda repo_config: repo_config.path)
+    controller = AimdController(ceiling=min(AUTO_MAX_JOBS, fd_ceiling())) if jobs is None else None
+    width = controller.limit if controller is not None else jobs or DEFAULT_JOBS
+    urls = [resolve_clone_url(repo_config, config) for repo_config in active_repos]
+    scheduler = HostScheduler(zip(urls, active_repos, strict=True), limit=width, caps=tool_config.host_caps())
+
+    if offline:
+        jitter = 0.0  # no burst of fetches to desynchronise
+    if max_fetch_age is None:
+        max_fetch_age = tool_config.max_fetch_age
+    targets = probe_targets(urls) if tool_config.preflight and not offline else {}
+    previous = load_trips(trips_file) if trips_file is not None and not offline else []
+    # A verdict about a host this registry does not use is kept in the file and ignored here.
+    on_probation = {trip.key for trip in previous} & {lane for lane in map(host_key, urls) if lane is not None}
+    for key in on_probation:
+        breaker.half_open(key)
+    scheduler.hold(targets.keys() | on_probation)
 
     reset_abort()
+    # Torn down however the run ends, Ctrl-C included: a master left behind is a live,
+    # authenticated connection nobody is using, and a cache left behind is a secret in memory
+    # nobody asked to keep. An offline run opens neither.
+    with (
+        ssh_multiplexing(urls, enabled=tool_config.ssh_multiplex and not offline),
+        credential_cache(urls, enabled=tool_config.credential_cache and not offline),
+        frozen_execution(),
+        Preflight(targets, breaker) as preflight,
+        RunProgress(len(active_repos), enabled=show_progress) as progress,
+    ):
+        pacer = _Pacer(scheduler, progress, controller, preflight, on_probation)
+        finish = partial(_finish_repo, apply=apply)
+        if engine == Engine.ASYNC:
+            reports = _gather_async(pacer, partial(_prepare_repo, **stage_args), finish, progress, jitter, breaker, offline, max_fetch_age)
+        else:
+            reports = _gather_threads(
+                pacer, partial(_fetch_repo, jitter=jitter, offline=offline, max_fetch_age=max_fetch_age, **stage_args), finish, progress
+            )
+
+    if trips_file is not None and not offline:
+        save_trips(trips_file, breaker, previous)
+    if ancestry_file is not None and memo is not None:
+        save_memo(ancestry_file, memo)
+    reports.sort(key=lambda report: (report_severity(report), report.path))
+    return reports
+
+
+@dataclass
+class _Pacer:
+    """The scheduler and, under `--jobs auto`, the controller steering its width.
+
+    Both engines hand every repo to done() as it leaves the network stage, which is the whole of
+    what adapting costs them: the scheduler's limit moves, and the next ready() starts more or fewer.
+    They wait on the preflight's probes beside their fetches the same way, and hand each that
+    lands to probed(), which opens its lane.
+
+    A lane in `half_open` — a host an earlier run closed — opens only on an answer: a probe that
+    succeeded or a fetch that did. Anything less leaves it starting one repo at a time, and the
+    breaker, told the host is on probation, closes it at the first failure.
+    """
+
+    scheduler: HostScheduler[RepoConfig]
+    progress: RunProgress
+    controller: AimdController | None = None
+    preflight: Preflight | None = None
+    half_open: set[Lane] = field(default_factory=set)
+
+    def __post_init__(self) -> None:
+        if self.controller is not None:
+            self.progress.set_concurrency(self.controller.limit)
+
+    @property
+    def max_width(self) -> int:
+        """The most repos that can ever be in flight at once, for sizing a pool up front."""
+        ceiling = self.controller.ceiling if self.controller is not None else self.scheduler.limit
+        return max(1, min(ceiling, self.scheduler.pending))
+
+    @property
+    def local_width(self) -> int:
+        """Workers for the local stage: the machine's, not -j's. See _gather_threads."""
+        return max(1, min(self.scheduler.pending, (os.cpu_count() or 1) * 2))
+
+    @property
+    def handoff_depth(self) -> int:
+        """Fetched repos allowed to wait for the local stage before no new fetch starts."""
+        return self.local_width * HANDOFF_PER_WORKER
+
+    @property
+    def probes(self) -> list[Future[GitFailure | None]]:
+        """The preflight probes still running."""
+        return list(self.preflight.pending) if self.preflight is not None else []
+
+    def probed(self, probe: Future[GitFailure | None]) -> None:
+        if self.preflight is None:
+            return
+        lane, answered = self.preflight.settle(probe)
+        if answered:
+            self.half_open.discard(lane)
+        if lane not in self.half_open:
+            self.scheduler.open(lane)
+
+    def done(self, lane: Lane, fetch_ms: int | None, failures: list[GitFailure], fetch_ran: bool = False) -> None:
+        self.scheduler.release(lane)
+        # fetch_ms is None for a repo that never reached the network, which proves nothing.
+        if lane in self.half_open and fetch_ms is not None and not failures:
+            self.half_open.discard(lane)
+            self.scheduler.open(lane)
+        if self.controller is None:
+            return
+        causes = {classify_failure(failure) for failure in failures}
+        congestion = next((cause for cause in causes if cause in CONGESTION_CAUSES), None)
+        self.scheduler.limit = self.controller.observe(fetch_ms, congestion, fetched=fetch_ran)
+        self.progress.set_concurrency(self.scheduler.limit)
+
+
+def _gather_threads(
+    pacer: _Pacer,
+    fetch: Callable[..., RepoBranchReport | _Fetched | None],
+    finish: Callable[[_Fetched], RepoBranchReport],
+    progress: RunProgress,
+) -> list[RepoBranchReport]:
+    """Two pools in a pipeline: the network stage runs _fetch_repo, the local one _finish_repo.
+
+    A repo's network slot is released the moment its fetch returns, so the next fetch starts while
+    this repo's branches are still being classified — rather than a -j slot sitting on disk work
+    while the network idles. The local pool is sized to the machine, since what bounds it is the
+    disk and how many git processes the cores can turn over, not the remote.
+
+    The handoff between them is bounded: with handoff_depth repos fetched and not yet finished, no
+    new fetch starts until one drains. Without that, a fast network on a slow disk fetches the
+    whole registry ahead of the classification, and every fetched ref sits stale for longer.
+
+    Inside a repo the stages overlap too: the reads no fetch can change — the tree, the stash, the
+    worktree list — start on a pool of their own the moment the fetch does, so a fetch that is
+    seconds of waiting on a VPN hides them, and only the classification waits for the refs. Their
+    pool is as wide as the network one and apart from the local one: behind a queue of
+    classifications, each fetch slot would wait on the local stage again before it could free up.
+
+    Repos are submitted only as the scheduler releases them rather than queued up front, so a
+    capped host's backlog waits here, not in the pool — where it would sit ahead of every other
+    host's repos in one FIFO.
+    """
     reports: list[RepoBranchReport] = []
-    with RunProgress(len(active_repos), enabled=show_progress) as progress:
-
-        def run_one(repo_config: RepoConfig) -> RepoBranchReport | None:
-            # The bare name, not the report's label: a label is a path so the report says where
-            # the repo is, and four of those overflow one line into a single ellipsised entry —
-            # which loses the only thing the line is for, naming what is slow.
-            token = progress.start(repo_config.name)
-            report: RepoBranchReport | None = None
-            try:
-                report = worker(repo_config)
-            except Exception as exc:
-                report = _crashed_report(repo_config, exc)
-            finally:
-                progress.finish(token, attention_tally(report) if report is not None else None)
-            return report
-
-        pool = ThreadPoolExecutor(max_workers=max(1, min(jobs, len(active_repos))))
-        futures = [pool.submit(run_one, repo_config) for repo_config in active_repos]
+
+    def fetch_one(repo_config: RepoConfig) -> tuple[int, float, RepoBranchReport | _Fetched | None]:
+        # The bare name, not the report's label: a label is a path so the report says where
+        # the repo is, and four of those overflow one line into a single ellipsised entry —
+        # which loses the only thing the line is for, naming what is slow.
+        token = progress.start(repo_config.name)
+        started = time.monotonic()
         try:
-            for future in as_completed(futures):
-                report = future.result()
-                if report is not None:
-                    reports.append(report)
-        except KeyboardInterrupt:
-            # Both halves matter: cancel() empties the queue, and the abort ends the git calls
-            # already running. Without the second, shutdown waits out every in-flight fetch and a
-            # Ctrl-C looks ignored for the length of git_timeout.
-            abort_running_commands()
-            for future in futures:
-                future.cancel()
-            raise
-        finally:
-            pool.shutdown(wait=True)
+            outcome = fetch(repo_config, reads=reads_pool)
+        except Exception as exc:
+            outcome = _crashed_report(repo_config, exc)
+        return token, time.monotonic() - started, outcome
 
-    reports.sort(key=lambda report: (report_severity(report), report.path))
+    def finish_one(fetched: _Fetched) -> tuple[float, RepoBranchReport]:
+        started = time.monotonic()
+        try:
+            report = finish(fetched)
+        except Exception as exc:
+            report = _crashed_report(fetched.prepared.repo_config, exc)
+        return time.monotonic() - started, report
+
+    def land(token: int, spent: float, report: RepoBranchReport | None) -> None:
+        progress.finish(token, attention_tally(report) if report is not None else None)
+        if report is not None:
+            # Time spent working, not waiting in the handoff: it is what the next run orders by.
+            report.duration_ms = int(spent * 1000)
+            reports.append(report)
+
+    # Threads start lazily, so sizing to the widest the run can get costs nothing at -j auto.
+    network_pool = ThreadPoolExecutor(max_workers=pacer.max_width)
+    reads_pool = ThreadPoolExecutor(max_workers=pacer.max_width)
+    local_pool = ThreadPoolExecutor(max_workers=pacer.local_width)
+    network: dict[Future[tuple[int, float, RepoBranchReport | _Fetched | None]], Lane] = {}
+    local: dict[Future[tuple[float, RepoBranchReport]], tuple[int, float]] = {}
+    try:
+        while True:
+            if len(local) < pacer.handoff_depth:
+                for lane, repo_config in pacer.scheduler.ready():
+                    network[network_pool.submit(fetch_one, repo_config)] = lane
+            if not network and not local:
+                break
+            done, _ = wait([*network, *local, *pacer.probes], return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in network:
+                    lane = network.pop(future)
+                    token, spent, outcome = future.result()
+                    if isinstance(outcome, _Fetched):
+                        pacer.done(lane, outcome.fetch_ms, outcome.failures, outcome.fetch_ran)
+                        local[local_pool.submit(finish_one, outcome)] = (token, spent)
+                    else:
+                        pacer.done(lane, None, outcome.failures if outcome is not None else [])
+                        land(token, spent, outcome)
+                elif future in local:
+                    token, spent = local.pop(future)
+                    finished, report = future.result()
+                    land(token, spent + finished, report)
+                else:
+                    pacer.probed(future)
+    except KeyboardInterrupt:
+        # Both halves matter: cancel() drops what has not started, and the abort ends the git
+        # calls already running. Without the second, shutdown waits out every in-flight fetch and
+        # a Ctrl-C looks ignored for the length of git_timeout.
+        abort_running_commands()
+        for future in [*network, *local]:
+            future.cancel()
+        raise
+    finally:
+        network_pool.shutdown(wait=True)
+        reads_pool.shutdown(wait=True)
+        local_pool.shutdown(wait=True)
     return reports
 
 
+def _gather_async(
+    pacer: _Pacer,
+    prepare: Callable[[RepoConfig], RepoBranchReport | _Prepared | None],
+    finish: Callable[[_Fetched], RepoBranchReport],
+    progress: RunProgress,
+    jitter: float,
+    breaker: HostBreaker,
+    offline: bool = False,
+    max_fetch_age: timedelta | None = None,
+) -> list[RepoBranchReport]:
+    """The asyncio engine: fetches are awaited subprocesses, so a repo waiting on the network
+    holds a coroutine rather than a thread and its stack.
+
+    The same pipeline as _gather_threads, with a coroutine per fetch in place of the network pool.
+    The work either side of the fetch still calls git synchronously, so it runs on threads, in two
+    pools the machine's width rather than the fetch fan-out's: a pool as wide as a -j 256 fan-out is
+    the memory this engine exists to not spend. Preparing and the overlapped reads — the network
+    stage's own disk work — have one; classifying and executing have the other, so a fetch never
+    waits to start behind a queue of classifications. Under apply the local pool also carries the
+    pushes, and the front one the clones, which is where the two engines' wall times can part.
+
+    Cancellation is the task's: a Ctrl-C cancels every coroutine, and a cancelled fetch kills its
+    own child. The thread-side stages still need abort_running_commands, for the same reason the
+    thread engine does.
+    """
+    front_pool = ThreadPoolExecutor(max_workers=pacer.local_width)
+    local_pool = ThreadPoolExecutor(max_workers=pacer.local_width)
+
+    async def fetch_one(repo_config: RepoConfig) -> tuple[int, float, RepoBranchReport | _Fetched | None]:
+        loop = asyncio.get_running_loop()
+        token = progress.start(repo_config.name)
+        started = time.monotonic()
+        outcome: RepoBranchReport | _Fetched | None
+        try:
+            if jitter > 0:
+                await asyncio.sleep(random.uniform(0, jitter))  # desync the initial burst of fetches
+            prepared = await loop.run_in_executor(front_pool, prepare, repo_config)
+            unfetched = _unfetched(prepared, offline, max_fetch_age) if isinstance(prepared, _Prepared) else None
+            if unfetched is not None:
+                outcome = unfetched
+            elif isinstance(prepared, _Prepared):
+                # The fetch-independent reads, on a thread while this coroutine awaits the fetch.
+                reads = loop.run_in_executor(front_pool, prepared.repo.read_local)
+                fetch_started = time.monotonic()
+                failure = await refresh_remote_async(prepared.repo, prepared.policy)
+                outcome = _fetched(prepared, failure, fetch_started, breaker)
+                prepared.repo.adopt_local(await reads)
+            else:
+                outcome = prepared
+        except Exception as exc:
+            outcome = _crashed_report(repo_config, exc)
+        return token, time.monotonic() - started, outcome
+
+    def finish_one(fetched: _Fetched) -> tuple[float, RepoBranchReport]:
+        started = time.monotonic()
+        try:
+            report = finish(fetched)
+        except Exception as exc:
+            report = _crashed_report(fetched.prepared.repo_config, exc)
+        return time.monotonic() - started, report
+
+    async def run_all() -> list[RepoBranchReport]:
+        loop = asyncio.get_running_loop()
+        results: list[RepoBranchReport] = []
+
+        def land(token: int, spent: float, report: RepoBranchReport | None) -> None:
+            progress.finish(token, attention_tally(report) if report is not None else None)
+            if report is not None:
+                report.duration_ms = int(spent * 1000)
+                results.append(report)
+
+        network: dict[asyncio.Future[tuple[int, float, RepoBranchReport | _Fetched | None]], Lane] = {}
+        local: dict[asyncio.Future[tuple[float, RepoBranchReport]], tuple[int, float]] = {}
+        # The probes run on threads of their own; wrapped once, so each lands here exactly once.
+        probes = {asyncio.wrap_future(probe): probe for probe in pacer.probes}
+        try:
+            while True:
+                if len(local) < pacer.handoff_depth:
+                    for lane, repo_config in pacer.scheduler.ready():
+                        network[asyncio.ensure_future(fetch_one(repo_config))] = lane
+                if not network and not local:
+                    return results
+                done, _ = await asyncio.wait([*network, *local, *probes], return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    if future in network:
+                        lane = network.pop(future)
+                        token, spent, outcome = future.result()
+                        if isinstance(outcome, _Fetched):
+                            pacer.done(lane, outcome.fetch_ms, outcome.failures, outcome.fetch_ran)
+                            local[loop.run_in_executor(local_pool, finish_one, outcome)] = (token, spent)
+                        else:
+                            pacer.done(lane, None, outcome.failures if outcome is not None else [])
+                            land(token, spent, outcome)
+                    elif future in local:
+                        token, spent = local.pop(future)
+                        finished, report = future.result()
+                        land(token, spent + finished, report)
+                    else:
+                        pacer.probed(probes.pop(future))
+        finally:
+            # Reached with work still running only on the way out of a cancelled run.
+            for future in [*network, *local, *probes]:
+                future.cancel()
+
+    try:
+        return asyncio.run(run_all())
+    except KeyboardInterrupt:
+        abort_running_commands()
+        raise
+    finally:
+        front_pool.shutdown(wait=True, cancel_futures=True)
+        local_pool.shutdown(wait=True, cancel_futures=True)
+
+
 def needs_attention(report: RepoBranchReport) -> bool:
     """Whether this repo has anything to say. The default view renders only these.
 
@@ -750,6 +1324,7 @@ def _branch_json(report: RepoBranchReport) -> dict:
         'error_detail': report.error_detail,
         'origin_mismatch': report.origin_mismatch,
         'skipped': {'host': report.skipped.host, 'cause': report.skipped.cause.value} if report.skipped else None,
+        'refs_as_of': report.refs_as_of.isoformat() if report.refs_as_of else None,
         'branches': [
             {
                 'branch': row.state.branch,
@@ -863,6 +1438,12 @@ def render_remedy(remedy: Remedy) -> None:
         console.print(f'      [blue]{escape(shorten_home(note))}[/blue]', soft_wrap=True)
 
 
+def render_offline_note() -> None:
+    """Said once, above the rows: every row below is measured against refs this run never fetched."""
+    console.print(f'[yellow]{ICON_WARN}  offline — nothing was fetched; each repo is measured against its last fetch[/yellow]')
+    console.print()
+
+
 def render_report(report: RepoBranchReport, apply: bool) -> None:
     if report.lifecycle:
         icon, color, message, _ = LIFECYCLE_STYLE[report.lifecycle]
@@ -887,6 +1468,8 @@ def render_report(report: RepoBranchReport, apply: bool) -> None:
         console.print()
         return
     mode = 'apply' if apply else 'report-only'
+    if report.refs_as_of is not None:
+        mode = f'{mode}, fetched {time_ago(report.refs_as_of)}'
     console.print(f'[bold]{report.label}[/bold] [blue](policy: {report.policy_name}, {mode})[/blue]')
     if report.origin_mismatch:
         # soft_wrap: both lines are URLs, and the point of the check is to hand you two you can
@@ -911,18 +1494,38 @@ def report_branches(
     tool_config: ToolConfig,
     cli_policy: str | None = None,
     apply: bool = False,
-    jobs: int = DEFAULT_JOBS,
+    jobs: int | None = DEFAULT_JOBS,
     jitter: float = DEFAULT_JITTER_SECONDS,
     as_json: bool = False,
     verbose: bool = False,
+    engine: Engine = Engine.THREADS,
+    offline: bool = False,
+    max_fetch_age: timedelta | None = None,
+    trips_file: Path | None = None,
+    ancestry_file: Path | None = None,
 ) -> list[RepoBranchReport]:
     """Per-branch view. Returns the reports so the caller can set an exit code."""
     # include_lifecycle defaults False; progress is a terminal affordance and would corrupt --json.
-    reports = gather_reports(config, tool_config, cli_policy, apply, jobs, jitter, show_progress=not as_json)
+    reports = gather_reports(
+        config,
+        tool_config,
+        cli_policy,
+        apply,
+        jobs,
+        jitter,
+        show_progress=not as_json,
+        engine=engine,
+        offline=offline,
+        max_fetch_age=max_fetch_age,
+        trips_file=trips_file,
+        ancestry_file=ancestry_file,
+    )
     if as_json:
-        emit_json({'repos': [_branch_json(report) for report in reports]})
+        emit_json({'offline': offline, 'repos': [_branch_json(report) for report in reports]})
         return reports
     console.print()
+    if offline:
+        render_offline_note()
     visible = visible_reports(reports, verbose)
     for report in visible:
         render_report(report, apply)
@@ -1,14 +1,38 @@
 from __future__ import annotations
 
+import asyncio
 import contextlib
+import heapq
+import itertools
 import os
 import re
+import shlex
 import shutil
+import signal
 import subprocess
+import tempfile
 import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
 from dataclasses import dataclass
+from dataclasses import replace
+from datetime import UTC
+from datetime import datetime
 from functools import cached_property
 from pathlib import Path
+from typing import Protocol
+
+from syncer.commitgraph import CommitGraph
+from syncer.commitgraph import GraphMiss
+from syncer.commitgraph import rewrites_parents
+
+try:
+    import pygit2
+except ImportError:  # optional: every read it answers, the git CLI answers too
+    pygit2 = None
 
 # Ceiling on a single git invocation. Generous enough for a fetch over a VPN; the point is that
 # a wedged call eventually reports instead of holding a worker thread forever.
@@ -17,6 +41,18 @@ GIT_TIMEOUT_SECONDS = 120
 # the configured timeout rather than a constant, so raising git_timeout for a slow network
 # raises the clone ceiling too — which is what config.toml and the README always claimed.
 CLONE_TIMEOUT_MULTIPLIER = 5
+# How long a transfer may go without moving a byte before the transport gives up on it, whatever
+# the call's timeout. A timeout has to allow for the slowest fetch a repo legitimately makes; a
+# host that has stopped answering is telling the same thing in its first half-minute of silence.
+STALL_SECONDS = 30
+# The ssh half of that: a keepalive every STALL_SECONDS/2, and the connection dropped after two go
+# unanswered. Appended after the user's own ssh command, whose options win, since ssh keeps the
+# first value it is given for each.
+SSH_KEEPALIVE_OPTIONS = ('-o', f'ServerAliveInterval={STALL_SECONDS // 2}', '-o', 'ServerAliveCountMax=2')
+# How long an ended git call has between SIGTERM and SIGKILL. Long enough for git to remove the
+# lock files it holds, which is what TERM buys over KILL: a fetch killed outright can leave a
+# `shallow.lock` or a ref lock behind, and every later fetch of that repo fails on it.
+KILL_GRACE_SECONDS = 2
 # Exit code for a timeout, matching the shell's convention for a command killed by `timeout`.
 TIMEOUT_RETURNCODE = 124
 # Exit code for a call syncer itself killed, matching the shell's convention for SIGINT. Recorded
@@ -48,6 +84,243 @@ class GitFailure:
         return ' '.join(('git', *self.argv))
 
 
+# The reads that look at nothing a fetch writes. A fetch moves remote-tracking refs and FETCH_HEAD;
+# the tree, the index and the stash are untouched, so these are still true after one. See
+# Repo.forget_remote.
+_STATUS_READ = ('status', '--porcelain=v2', '--branch', '--show-stash')
+_LOCAL_READS = frozenset({_STATUS_READ, ('stash', 'list')})
+
+# Touched in the common dir by every fetch syncer saw succeed; see Repo.last_fetched.
+FETCH_STAMP = 'syncer-fetched'
+
+# What classify.refresh_remote asks origin before deciding to fetch: its branches, and the one its
+# HEAD names. Tags are left out, as syncer measures nothing against them.
+_LS_REMOTE = ('ls-remote', '--symref', 'origin', 'HEAD', 'refs/heads/*')
+_TRACKING_READ = ('for-each-ref', '--format=%(refname)%09%(objectname)%09%(symref)', 'refs/remotes/origin/')
+_FETCH_REFSPECS = ('config', '--get-all', 'remote.origin.fetch')
+# What `git clone` writes to remote.origin.fetch, and so what a listing is read against until the
+# repo's own refspecs are asked for.
+CLONE_REFSPECS = ('+refs/heads/*:refs/remotes/origin/*',)
+
+# `%(upstream:track)` spells the counts out — `[ahead 2, behind 1]`, `[ahead 2]`, `[behind 1]` —
+# and says nothing at all for a branch level with its upstream, which `%(upstream:trackshort)`
+# answers as `=` instead.
+_TRACK_COUNTS = re.compile(r'^\[(?:ahead (\d+))?(?:, )?(?:behind (\d+))?\]$')
+
+
+@dataclass(frozen=True, slots=True)
+class BranchRef:
+    """One local branch as a single for-each-ref line describes it.
+
+    `counts` is (ahead, behind) against the upstream when git printed them in a form this could
+    read, else None — never a guessed (0, 0), which _primary_from_counts would read as SYNCED.
+    git translates the words inside `%(upstream:track)`, so under a non-English locale the
+    counts are unreadable here and the caller measures the branch on its own instead.
+    """
+
+    name: str
+    oid: str
+    upstream: str
+    gone: bool
+    counts: tuple[int, int] | None
+
+
+@dataclass(frozen=True, slots=True)
+class StatusSnapshot:
+    """The checked-out branch and its tree, as one `git status --porcelain=v2 --branch --show-stash`
+    reports them.
+
+    One spawn for what took five: rev-parse for the branch, `status --porcelain` for the tree,
+    `stash list` for the stash, for-each-ref and rev-list for the upstream and its counts.
+    Every field is from the same instant, too, which the separate reads never were.
+
+    `oid` is None on an unborn branch and `branch` None when HEAD is detached; `upstream` and the
+    counts are None for a branch with no upstream, or one whose upstream is gone. `stashes` is
+    None when git printed no `# stash` line, which means either no stash or a git older than 2.35
+    that never prints one — Repo.stash_count tells the two apart. `entries` are the raw v2 lines,
+    one per changed or untracked path: for counting, and for is_dirty's truthiness.
+    """
+
+    oid: str | None
+    branch: str | None
+    upstream: str | None
+    ahead: int | None
+    behind: int | None
+    stashes: int | None
+    entries: tuple[str, ...]
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self.entries)
+
+    @property
+    def current(self) -> str:
+        """The branch as rev-parse --abbrev-ref names it: 'HEAD' when detached."""
+        return self.branch or 'HEAD'
+
+
+@dataclass(frozen=True, slots=True)
+class LocalReads:
+    """What Repo.read_local read while the fetch ran, handed back for adopt_local to keep.
+
+    Values rather than warmed caches: the reads run on another thread, and a Repo's memo and
+    caches belong to the thread that owns it. `reads` are the memoised git answers among
+    _LOCAL_READS, `status` the in-process reader's snapshot when it gave one, and `worktrees`
+    linked_worktree_branches' answer.
+    """
+
+    reads: dict[tuple[str, ...], subprocess.CompletedProcess[str]]
+    status: StatusSnapshot | None
+    worktrees: dict[str, str] | None
+    failures: list[GitFailure]
+
+
+@dataclass(frozen=True, slots=True)
+class RemoteRefs:
+    """origin's branches, name -> oid, and the branch its HEAD names — either as origin advertises
+    them right now (`git ls-remote`) or as the last fetch left them under refs/remotes/origin.
+
+    Two of these compared are what a fetch would do, without the pack negotiation: a branch that
+    is new or at another oid is something to fetch, and one the advertisement lacks is something
+    `--prune` would delete. `default` is None when nothing names one — a remote with a detached or
+    unborn HEAD, a server too old to advertise symrefs, a clone that never ran set-head.
+    """
+
+    heads: dict[str, str]
+    default: str | None
+
+    def moved_since(self, recorded: RemoteRefs, refspecs: tuple[str, ...] = CLONE_REFSPECS) -> bool:
+        """True when fetching would bring something: a branch the refspecs fetch that is new, or that
+        moved. A branch they leave out is missing locally by design — the rest of a `--single-branch`
+        clone — and a fetch would not bring it either. A refspec this cannot read counts as moved,
+        so that the fetch decides."""
+        try:
+            tracked = {branch: _tracked_as(refspecs, branch) for branch in self.heads}
+        except _Unanswered:
+            return True
+        return any(name is not None and recorded.heads.get(name) != self.heads[branch] for branch, name in tracked.items())
+
+    def deleted_since(self, recorded: RemoteRefs, refspecs: tuple[str, ...] = CLONE_REFSPECS) -> list[str]:
+        """Recorded branches this side no longer has: what `fetch --prune` would remove, which is
+        only ever a ref the refspecs store into. Nothing when a refspec cannot be read; the next
+        fetch prunes them instead."""
+        try:
+            sources = {name: _tracked_from(refspecs, name) for name in recorded.heads}
+        except _Unanswered:
+            return []
+        return sorted(name for name, branch in sources.items() if branch is not None and branch not in self.heads)
+
+
+def _without_counts(args: tuple[str, ...], result: subprocess.CompletedProcess[str]) -> subprocess.CompletedProcess[str]:
+    """A memoised status without its `# branch.ab` line, which a fetch can make stale; any other
+    read as it is."""
+    if args != _STATUS_READ:
+        return result
+    stdout = ''.join(line for line in result.stdout.splitlines(keepends=True) if not line.startswith('# branch.ab '))
+    return subprocess.CompletedProcess(result.args, result.returncode, stdout=stdout, stderr=result.stderr)
+
+
+def _parsed_refspecs(result: subprocess.CompletedProcess[str]) -> tuple[str, ...]:
+    if result.returncode == 1:
+        return ()
+    return tuple(result.stdout.split()) if result.returncode == 0 else CLONE_REFSPECS
+
+
+def parse_ls_remote(text: str) -> RemoteRefs:
+    """Parse `git ls-remote --symref origin HEAD refs/heads/*`.
+
+    A symref line reads `ref: refs/heads/main<TAB>HEAD`, and every other line `<oid><TAB><ref>`.
+    """
+    heads: dict[str, str] = {}
+    default = None
+    for line in text.splitlines():
+        left, _, name = line.partition('\t')
+        if left.startswith('ref:'):
+            target = left.removeprefix('ref:').strip()
+            if name == 'HEAD' and target.startswith('refs/heads/'):
+                default = target.removeprefix('refs/heads/')
+        elif name.startswith('refs/heads/'):
+            heads[name.removeprefix('refs/heads/')] = left
+    return RemoteRefs(heads=heads, default=default)
+
+
+def parse_tracking_refs(text: str) -> RemoteRefs:
+    """Parse the for-each-ref listing of refs/remotes/origin: `<ref><TAB><oid><TAB><symref>`."""
+    heads: dict[str, str] = {}
+    default = None
+    for line in text.splitlines():
+        name, _, rest = line.partition('\t')
+        oid, _, symref = rest.partition('\t')
+        branch = name.removeprefix('refs/remotes/origin/')
+        if branch == 'HEAD':
+            if symref.startswith('refs/remotes/origin/'):
+                default = symref.removeprefix('refs/remotes/origin/')
+        elif branch != name and not symref:
+            heads[branch] = oid
+    return RemoteRefs(heads=heads, default=default)
+
+
+def parse_status_v2(text: str) -> StatusSnapshot:
+    """Parse porcelain v2 output. Headers start with `# `; every other non-empty line is an entry."""
+    headers: dict[str, str] = {}
+    entries = []
+    for line in text.splitlines():
+        if line.startswith('# '):
+            key, _, value = line[2:].partition(' ')
+            headers[key] = value
+        elif line:
+            entries.append(line)
+    ahead = behind = None
+    counts = headers.get('branch.ab', '').split()
+    if len(counts) == 2 and counts[0].startswith('+') and counts[1].startswith('-'):
+        ahead, behind = int(counts[0][1:]), int(counts[1][1:])
+    oid = headers.get('branch.oid')
+    branch = headers.get('branch.head')
+    stashes = headers.get('stash')
+    return StatusSnapshot(
+        oid=None if oid in (None, '(initial)') else oid,
+        branch=None if branch in (None, '(detached)') else branch,
+        upstream=headers.get('branch.upstream'),
+        ahead=ahead,
+        behind=behind,
+        stashes=int(stashes) if stashes and stashes.isdigit() else None,
+        entries=tuple(entries),
+    )
+
+
+@dataclass(slots=True)
+class SpawnStats:
+    """The git calls made since the last take_spawn_stats(), and where their time went: starting
+    each process, and then waiting on it to answer. Summed over every worker, so on a wide run the
+    seconds add up to more than the wall clock."""
+
+    spawns: int = 0
+    spawn_seconds: float = 0.0
+    wait_seconds: float = 0.0
+
+    def add(self, spawn_seconds: float, wait_seconds: float) -> None:
+        self.spawns += 1
+        self.spawn_seconds += spawn_seconds
+        self.wait_seconds += wait_seconds
+
+
+@dataclass(slots=True)
+class ReadStats:
+    """How often a Repo's read memo answered without spawning git, so the saving can be measured."""
+
+    hits: int = 0
+    misses: int = 0
+
+
+def _track_counts(track: str, trackshort: str) -> tuple[int, int] | None:
+    if trackshort == '=':
+        return 0, 0
+    match = _TRACK_COUNTS.match(track)
+    if match is None or not any(match.groups()):
+        return None
+    return int(match[1] or 0), int(match[2] or 0)
+
+
 def normalize_remote_url(url: str) -> str:
     """Reduce a clone URL to `host/path` so equivalent forms compare equal.
 
@@ -92,6 +365,467 @@ def _same_dir(left: str | Path, right: str | Path) -> bool:
         return Path(left) == Path(right)
 
 
+# git's own ceiling on following one symbolic ref to the next (SYMREF_MAXDEPTH in refs.c). Deeper
+# than this is a loop, or something git itself would refuse to resolve.
+_SYMREF_MAX_DEPTH = 5
+_OID = re.compile(r'^(?:[0-9a-f]{40}|[0-9a-f]{64})$')
+
+
+class _RefsUnreadable(Exception):
+    """The ref store met something it does not model. The caller asks the git CLI instead."""
+
+
+def _dwim_refs(name: str) -> tuple[str, ...]:
+    """The full refs a short name can mean, in the order rev-parse tries them (ref_rev_parse_rules)."""
+    return (f'refs/{name}', f'refs/tags/{name}', f'refs/heads/{name}', f'refs/remotes/{name}', f'refs/remotes/{name}/HEAD')
+
+
+class RefStore:
+    """The refs of one repo, read from `.git` directly instead of by spawning git to read them.
+
+    Answers the handful of questions syncer asks of every repo on every run — which branch is
+    checked out, which branches exist, where origin/HEAD points, whether a ref exists — each of
+    which cost a process spawn: over a thousand per `syncer check` on a 300-repo registry, for
+    data that is a few small text files.
+
+    It understands the files backend and nothing else, and says so rather than guessing:
+    `read()` returns None for a repo it cannot model (reftable, a `.git` that is neither a
+    directory nor a gitdir link), and every query raises _RefsUnreadable on a file it cannot read
+    or a symref chain it cannot finish. The Repo accessors catch that and ask git, so the worst
+    a strange repo costs is the spawns this exists to save.
+
+    Per-worktree state (HEAD) lives in the gitdir, shared refs and packed-refs in the common dir
+    — the same directory for an ordinary clone, `commondir` away for a linked worktree.
+    """
+
+    def __init__(self, git_dir: Path, common_dir: Path) -> None:
+        self.git_dir = git_dir
+        self.common_dir = common_dir
+        self._packed: dict[str, str] | None = None
+
+    @classmethod
+    def read(cls, worktree: Path) -> RefStore | None:
+        dot_git = worktree / '.git'
+        try:
+            if dot_git.is_dir():
+                git_dir = dot_git
+            elif dot_git.is_file():
+                pointer = dot_git.read_text(encoding='utf-8').strip()
+                if not pointer.startswith('gitdir:'):
+                    return None
+                git_dir = worktree / pointer.removeprefix('gitdir:').strip()
+            else:
+                return None
+            commondir = git_dir / 'commondir'
+            common_dir = git_dir / commondir.read_text(encoding='utf-8').strip() if commondir.is_file() else git_dir
+            # reftable keeps refs in binary tables this does not parse; its presence means the
+            # loose files and packed-refs that might still lie around are not the truth.
+            if (common_dir / 'reftable').exists() or not (git_dir / 'HEAD').is_file():
+                return None
+        except (OSError, UnicodeDecodeError):
+            return None
+        return cls(git_dir, common_dir)
+
+    def _read_text(self, path: Path) -> str | None:
+        try:
+            return path.read_text(encoding='utf-8').strip()
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+            # Absent, or a path that is the *directory* of longer names: asking for `feature`
+            # when only `feature/x` exists. Both mean no ref by that name.
+            return None
+        except (OSError, UnicodeDecodeError) as exc:
+            raise _RefsUnreadable(str(path)) from exc
+
+    def _packed_refs(self) -> dict[str, str]:
+        if self._packed is None:
+            text = self._read_text(self.common_dir / 'packed-refs') or ''
+            packed: dict[str, str] = {}
+            for line in text.splitlines():
+                # `#` is the header, `^` the peeled object of the annotated tag on the line above.
+                if not line or line.startswith(('#', '^')):
+                    continue
+                oid, _, name = line.partition(' ')
+                if not _OID.match(oid) or not name:
+                    raise _RefsUnreadable(f'packed-refs line {line!r}')
+                packed[name] = oid
+            self._packed = packed
+        return self._packed
+
+    def _raw(self, name: str) -> str | None:
+        """What `name` holds — an oid or `ref: <target>` — or None when it does not exist.
+
+        A loose file shadows a packed entry of the same name, which is how git reads them too:
+        an update writes the loose file and leaves packed-refs alone until the next pack.
+        """
+        base = self.git_dir if name == 'HEAD' else self.common_dir
+        loose = self._read_text(base / name)
+        if loose is not None:
+            return loose
+        return self._packed_refs().get(name)
+
+    def symref(self, name: str) -> str | None:
+        """The ref `name` points at, when it is a symbolic ref; None when it is absent or direct."""
+        raw = self._raw(name)
+        if raw is None or not raw.startswith('ref:'):
+            return None
+        return raw.removeprefix('ref:').strip()
+
+    def resolve(self, name: str) -> str | None:
+        """The oid `name` ends at, following symbolic refs, or None when the chain ends nowhere."""
+        for _ in range(_SYMREF_MAX_DEPTH):
+            raw = self._raw(name)
+            if raw is None:
+                return None
+            if not raw.startswith('ref:'):
+                if not _OID.match(raw):
+                    raise _RefsUnreadable(f'{name} holds {raw!r}')
+                return raw
+            name = raw.removeprefix('ref:').strip()
+        raise _RefsUnreadable(f'symbolic ref chain too deep at {name}')
+
+    def exists(self, name: str) -> bool:
+        return self.resolve(name) is not None
+
+    def current_branch(self) -> str:
+        """The checked-out branch, or 'HEAD' when detached — the two answers rev-parse gives.
+
+        An unborn branch, or a HEAD pointing outside refs/heads, is left to git: neither is a
+        state syncer reasons about, and rev-parse's answer for them is whatever it is.
+        """
+        target = self.symref('HEAD')
+        if target is None:
+            if self.resolve('HEAD') is None:
+                raise _RefsUnreadable('HEAD is empty')
+            return 'HEAD'
+        if not target.startswith('refs/heads/') or not self.exists(target):
+            raise _RefsUnreadable(f'HEAD points at {target}')
+        return target.removeprefix('refs/heads/')
+
+    def branches(self) -> list[str]:
+        """Every local branch name, sorted as for-each-ref sorts them: by byte, which for UTF-8
+        is code-point order, which is what sorting the decoded names gives."""
+        heads = self.common_dir / 'refs' / 'heads'
+        names = {name.removeprefix('refs/heads/') for name in self._packed_refs() if name.startswith('refs/heads/')}
+        try:
+            for path in heads.rglob('*'):
+                # A .lock is a write in progress, never a ref; git skips it the same way.
+                if path.is_file() and not path.name.endswith('.lock'):
+                    names.add(path.relative_to(heads).as_posix())
+        except OSError as exc:
+            raise _RefsUnreadable(str(heads)) from exc
+        return sorted(names)
+
+
+class _Unanswered(Exception):
+    """The in-process reader cannot answer this one as git would. The caller asks the git CLI."""
+
+
+class ReadBackend(Protocol):
+    """The reads classify_repo makes of every branch, answered without the git CLI.
+
+    Each one answers exactly as the git call it stands in for — the same refs, the same counts, the
+    same verdict — or raises _Unanswered, and the Repo accessor asks git instead. A reader never
+    reports a failure of its own: whatever it cannot answer is the CLI's to answer, and the CLI's
+    failure is the one recorded.
+    """
+
+    def branch_refs(self, patterns: tuple[str, ...]) -> dict[str, BranchRef]: ...
+
+    def status_snapshot(self) -> StatusSnapshot: ...
+
+    def ahead_behind(self, branch: str, upstream: str) -> tuple[int, int]: ...
+
+    def is_ancestor(self, branch: str, target: str) -> bool: ...
+
+
+def _pygit2_usable() -> bool:
+    """pygit2 is importable and new enough: `status(untracked_files=...)` and pygit2.enums are 1.14."""
+    if pygit2 is None:
+        return False
+    match = re.match(r'(\d+)\.(\d+)', pygit2.__version__)
+    return match is not None and (int(match[1]), int(match[2])) >= (1, 14)
+
+
+def _ref_matches(name: str, patterns: tuple[str, ...]) -> bool:
+    """for-each-ref's pattern rule: a pattern matches itself, and whatever lies below it at a `/`."""
+    for pattern in patterns:
+        if name.startswith(pattern) and (len(name) == len(pattern) or pattern.endswith('/') or name[len(pattern)] == '/'):
+            return True
+    return False
+
+
+@contextlib.contextmanager
+def _libgit2_errors() -> Iterator[None]:
+    """Turn whatever libgit2 refuses with into _Unanswered. pygit2 raises GitError for its own
+    failures and KeyError or ValueError for a name it cannot find or parse — a broken ref, an
+    extension it does not support, a repo owned by someone else — and each is git's to answer."""
+    try:
+        yield
+    except (pygit2.GitError, KeyError, ValueError, OSError) as exc:
+        raise _Unanswered(str(exc)) from exc
+
+
+def _fetched_into(refspec: str, ref: str) -> str | None:
+    """The remote-tracking ref fetch refspec `refspec` stores `ref` in; None when it does not fetch it.
+
+    Only the forms a clone writes and people add by hand: `[+]src:dst`, each side with at most one
+    `*`. A negative refspec, or one that fetches `ref` without storing it anywhere, is for git.
+    """
+    if refspec.startswith('^'):
+        raise _Unanswered(f'negative refspec {refspec}')
+    src, _, dst = refspec.removeprefix('+').partition(':')
+    prefix, star, suffix = src.partition('*')
+    if star:
+        if not (ref.startswith(prefix) and ref.endswith(suffix) and len(ref) >= len(prefix) + len(suffix)):
+            return None
+        stored = dst.replace('*', ref[len(prefix) : len(ref) - len(suffix)], 1)
+    else:
+        if ref != src:
+            return None
+        stored = dst
+    if not stored:
+        raise _Unanswered(f'{refspec} fetches {ref} without storing it')
+    return stored
+
+
+def _no_negatives(refspecs: tuple[str, ...]) -> None:
+    """A negative refspec excludes what the others match, wherever it sits in the list."""
+    for refspec in refspecs:
+        if refspec.startswith('^'):
+            raise _Unanswered(f'negative refspec {refspec}')
+
+
+def _tracked_as(refspecs: tuple[str, ...], branch: str) -> str | None:
+    """The name under refs/remotes/origin that a fetch stores origin's `branch` in, or None when
+    none of the refspecs fetches it."""
+    _no_negatives(refspecs)
+    for refspec in refspecs:
+        stored = _fetched_into(refspec, f'refs/heads/{branch}')
+        if stored is not None:
+            if not stored.startswith('refs/remotes/origin/'):
+                raise _Unanswered(f'{refspec} stores {branch} outside refs/remotes/origin')
+            return stored.removeprefix('refs/remotes/origin/')
+    return None
+
+
+def _tracked_from(refspecs: tuple[str, ...], name: str) -> str | None:
+    """The origin branch refs/remotes/origin/`name` is fetched from, or None when no refspec
+    stores into it: the refspecs read right to left."""
+    _no_negatives(refspecs)
+    for refspec in refspecs:
+        src, _, dst = refspec.removeprefix('+').partition(':')
+        source = _fetched_into(f'{dst}:{src}', f'refs/remotes/origin/{name}') if dst else None
+        if source is not None:
+            if not source.startswith('refs/heads/'):
+                raise _Unanswered(f'{refspec} fills origin/{name} from {source}')
+            return source.removeprefix('refs/heads/')
+    return None
+
+
+class Libgit2Reader:
+    """ReadBackend over libgit2, through pygit2, for a machine that has it installed.
+
+    What classify_repo asks of every repo — its branches and their upstreams, the counts against
+    each, whether a branch is in its target, the tree's state — is a walk of a few refs and a few
+    commits, which libgit2 answers in process where the CLI pays a spawn per question.
+
+    It answers only what it can answer identically, and defers everything else:
+
+    - an upstream is worked out from `branch.<name>.merge` and the remote's fetch refspecs, as git
+      does, and only for the plain cases — one merge, one remote, one refspec that stores it. A
+      local upstream (`remote = .`) is one of them. Anything else sends the whole listing to git,
+      and so does an upstream whose short name a tag or branch of the same name would shadow;
+    - the tree is left to git in a sparse checkout, which libgit2 does not honour, and wherever a
+      clean or process filter is configured, since libgit2 cannot run one and would read a git-lfs
+      file as modified;
+    - an unborn HEAD, a name that does not resolve, and any error at all are git's to report.
+
+    Not libgit2's own upstream lookup: it re-reads the remote's whole configuration for every
+    branch, which measured slower than the for-each-ref it was replacing. The configuration is
+    read once instead, on first use, and a Repo opens a new reader after every write, so a push
+    that sets an upstream is seen by the next read.
+
+    The status is as `git status` would print it for what syncer reads: the branch, the upstream
+    and its counts, the stash, and one entry per changed path. The entries carry the path and
+    whether it is tracked, not v2's other fields, and a staged rename is two of them rather than
+    one, since libgit2's status does not pair renames; nothing syncer decides reads more than
+    whether there are any.
+
+    Only reads. Every fetch, push and mutation stays on the CLI, and so does every read inside
+    Repo.live(): execute.py's guards promise git's own answer at the moment of the write.
+    """
+
+    def __init__(self, repository: pygit2.Repository) -> None:
+        self._repo = repository
+        self._settings: dict[str, list[str]] | None = None
+
+    @classmethod
+    def open(cls, worktree: Path) -> Libgit2Reader | None:
+        try:
+            return cls(pygit2.Repository(str(worktree)))
+        except (pygit2.GitError, KeyError, ValueError, OSError):
+            return None
+
+    def _all_config(self) -> dict[str, list[str]]:
+        """Every key set in any file git reads, with each of its values. Section and variable names
+        come back lowercased from libgit2, so a lookup spells them that way; a subsection keeps its case."""
+        if self._settings is None:
+            settings: dict[str, list[str]] = {}
+            with _libgit2_errors():
+                for entry in self._repo.config:
+                    # A bare `key` with no `=` is a boolean true, which libgit2 hands back as None.
+                    settings.setdefault(entry.name, []).append('true' if entry.value is None else entry.value)
+            self._settings = settings
+        return self._settings
+
+    def _config(self, key: str) -> list[str]:
+        return self._all_config().get(key, [])
+
+    def _single(self, key: str) -> str | None:
+        """The one value of `key`, or None when unset. Set in more than one place, which one wins
+        depends on the order git reads the files in, and that is for git to decide."""
+        values = self._config(key)
+        if len(values) > 1:
+            raise _Unanswered(f'{key} is set {len(values)} times')
+        return values[0] if values else None
+
+    def _exists(self, name: str) -> bool:
+        with _libgit2_errors():
+            return self._repo.references.get(name) is not None
+
+    def _target(self, name: str) -> pygit2.Oid:
+        with _libgit2_errors():
+            return self._repo.lookup_reference(name).resolve().target
+
+    def _upstream(self, branch: str) -> str | None:
+        """The full ref `branch` tracks, or None when it tracks nothing: `branch.<name>.merge` unset."""
+        merge = self._single(f'branch.{branch}.merge')
+        if merge is None:
+            return None
+        remote = self._single(f'branch.{branch}.remote')
+        if remote is None:
+            raise _Unanswered(f'branch.{branch}.merge without a remote')
+        if remote == '.':
+            return merge
+        stored = {ref for refspec in self._config(f'remote.{remote}.fetch') if (ref := _fetched_into(refspec, merge)) is not None}
+        if len(stored) != 1:
+            raise _Unanswered(f'{merge} is stored in {len(stored)} refs')
+        return stored.pop()
+
+    def _short(self, refname: str) -> str:
+        """`refname` as `%(upstream:short)` prints it, when no other ref makes that ambiguous."""
+        for prefix in ('refs/heads/', 'refs/remotes/'):
+            if refname.startswith(prefix):
+                short = refname.removeprefix(prefix)
+                break
+        else:
+            raise _Unanswered(f'upstream {refname}')
+        # git prints the shortest name that does not resolve to something else first; a name one
+        # of these would shadow is printed longer, and the CLI knows how much.
+        candidates = _dwim_refs(short)
+        if any(self._exists(name) for name in candidates[: candidates.index(refname)]):
+            raise _Unanswered(f'{short} is ambiguous')
+        return short
+
+    def _commit(self, name: str) -> pygit2.Oid:
+        with _libgit2_errors():
+            return self._repo.revparse_single(name).peel(pygit2.Commit).id
+
+    def _counts(self, local: pygit2.Oid, upstream: pygit2.Oid) -> tuple[int, int]:
+        with _libgit2_errors():
+            repo = self._repo
+            ahead, behind = repo.ahead_behind(repo[local].peel(pygit2.Commit).id, repo[upstream].peel(pygit2.Commit).id)
+        return ahead, behind
+
+    def _tracking(self, branch: str, oid: pygit2.Oid) -> tuple[str, bool, tuple[int, int] | None]:
+        """(upstream short name, gone, counts) for a branch that has an upstream; ('', False, None) without."""
+        upstream = self._upstream(branch)
+        if upstream is None:
+            return '', False, None
+        short = self._short(upstream)
+        if not self._exists(upstream):
+            return short, True, None
+        return short, False, self._counts(oid, self._target(upstream))
+
+    def branch_refs(self, patterns: tuple[str, ...]) -> dict[str, BranchRef]:
+        with _libgit2_errors():
+            names = list(self._repo.branches.local)
+        refs: dict[str, BranchRef] = {}
+        for name in sorted(names, key=str.encode):
+            if not _ref_matches(f'refs/heads/{name}', patterns):
+                continue
+            oid = self._target(f'refs/heads/{name}')
+            upstream, gone, counts = self._tracking(name, oid)
+            refs[name] = BranchRef(name=name, oid=str(oid), upstream=upstream, gone=gone, counts=counts)
+        return refs
+
+    def _untracked_mode(self) -> str:
+        """`status.showUntrackedFiles`, in the spelling pygit2 takes; git's default is `normal`."""
+        value = (self._single('status.showuntrackedfiles') or 'normal').lower()
+        if value in ('no', 'false', 'off', '0'):
+            return 'no'
+        return 'all' if value == 'all' else 'normal'
+
+    def _filters_the_tree(self) -> bool:
+        sparse = (self._single('core.sparsecheckout') or 'false').lower() in ('true', 'yes', 'on', '1')
+        filters = any(name.startswith('filter.') and name.endswith(('.clean', '.process')) for name in self._all_config())
+        return sparse or filters
+
+    def status_snapshot(self) -> StatusSnapshot:
+        repo = self._repo
+        if self._filters_the_tree():
+            raise _Unanswered('the tree is filtered')
+        with _libgit2_errors():
+            if repo.head_is_unborn:
+                raise _Unanswered('unborn HEAD')
+            head = repo.head
+            detached = repo.head_is_detached
+        branch: str | None = None
+        upstream: str | None = None
+        ahead: int | None = None
+        behind: int | None = None
+        if not detached:
+            if not head.name.startswith('refs/heads/'):
+                raise _Unanswered(f'HEAD points at {head.name}')
+            branch = head.name.removeprefix('refs/heads/')
+            short, _, counts = self._tracking(branch, head.target)
+            upstream = short or None
+            if counts is not None:
+                ahead, behind = counts
+        with _libgit2_errors():
+            flags = repo.status(untracked_files=self._untracked_mode())
+            stashes = len(repo.listall_stashes())
+        untracked = pygit2.enums.FileStatus.WT_NEW
+        entries = tuple(f'? {path}' if status == untracked else f'1 {path}' for path, status in flags.items())
+        return StatusSnapshot(
+            oid=str(head.target), branch=branch, upstream=upstream, ahead=ahead, behind=behind, stashes=stashes, entries=entries
+        )
+
+    def ahead_behind(self, branch: str, upstream: str) -> tuple[int, int]:
+        return self._counts(self._commit(branch), self._commit(upstream))
+
+    def is_ancestor(self, branch: str, target: str) -> bool:
+        ancestor, descendant = self._commit(branch), self._commit(target)
+        with _libgit2_errors():
+            return ancestor == descendant or self._repo.descendant_of(descendant, ancestor)
+
+
+# The in-process readers a Repo may use, by name. READ_BACKEND picks one; 'cli', or a name with no
+# opener, is the git CLI alone. libgit2 when pygit2 is installed, since then it is free.
+_READERS: dict[str, Callable[[Path], ReadBackend | None]] = {'libgit2': Libgit2Reader.open}
+READ_BACKEND = 'libgit2' if _pygit2_usable() else 'cli'
+# Whether ahead/behind and ancestry may be answered from the commit-graph files before asking git;
+# see commitgraph.py. Pure Python, so on wherever pygit2 is not, and behind it where it is.
+READ_COMMIT_GRAPH = True
+
+
+def read_backend_description() -> str:
+    """What answers classify's reads on this machine, for doctor."""
+    if READ_BACKEND == 'libgit2':
+        return f'reads: libgit2 {pygit2.LIBGIT2_VERSION} via pygit2 {pygit2.__version__}'
+    return 'reads: git CLI (install pygit2 to answer them in-process)'
+
+
 def _add_git_config(env: dict[str, str], key: str, value: str) -> None:
     """Append the environment form of `git -c key=value`, keeping any the caller already set.
 
@@ -134,6 +868,11 @@ def _noninteractive_env() -> dict[str, str]:
       spellings of the same switch, config and environment. A stored credential still answers;
       only the window is refused. This is why the helper is left configured rather than reset
       with `credential.helper=` — that would break every https remote whose credential is fine.
+
+    The same reasoning covers a host that accepts the connection and then goes silent, which
+    otherwise holds a worker for the whole timeout: ssh's keepalives and curl's low-speed limit
+    end it after STALL_SECONDS without progress. One byte a second is the limit, low enough that
+    the keepalives upload-pack sends while it builds a large pack still count as progress.
     """
     env = os.environ.copy()
     env['GIT_TERMINAL_PROMPT'] = '0'
@@ -141,9 +880,14 @@ def _noninteractive_env() -> dict[str, str]:
     env['SSH_ASKPASS'] = ''
     env['SSH_ASKPASS_REQUIRE'] = 'never'
     ssh_command = env.get('GIT_SSH_COMMAND', 'ssh')
-    env['GIT_SSH_COMMAND'] = f'{ssh_command} -o BatchMode=yes'
+    options = [*SSH_KEEPALIVE_OPTIONS, *_ssh_options]
+    env['GIT_SSH_COMMAND'] = ' '.join([ssh_command, '-o BatchMode=yes', *(shlex.quote(option) for option in options)])
     env['GCM_INTERACTIVE'] = 'never'
     _add_git_config(env, 'credential.interactive', 'false')
+    _add_git_config(env, 'http.lowSpeedLimit', '1')
+    _add_git_config(env, 'http.lowSpeedTime', str(STALL_SECONDS))
+    for key, value in _run_config:
+        _add_git_config(env, key, value)
     return env
 
 
@@ -151,8 +895,184 @@ def _noninteractive_env() -> dict[str, str]:
 # each one's timeout. Module-level because run_command is reached from every layer and threading a
 # handle down to it would put cancellation plumbing in signatures that are about repos.
 _active_lock = threading.Lock()
-_active_processes: set[subprocess.Popen[str]] = set()
+_active_processes: set[subprocess.Popen[str] | subprocess.Popen[bytes]] = set()
 _aborted = threading.Event()
+# Counted under _active_lock, which every call takes on its way out anyway.
+_spawn_stats = SpawnStats()
+# Extra ssh arguments for every git call, for the run they were set in: multiplex.py's ControlPath.
+# Module-level for the reason the process registry is.
+_ssh_options: list[str] = []
+
+
+def set_ssh_options(options: list[str]) -> None:
+    """Append these to the ssh every later git call runs, until set to something else."""
+    _ssh_options[:] = options
+    _refreeze()
+
+
+# Extra `git -c` settings for every git call, for the run they were set in: credentials.py's
+# helper overrides. Module-level for the same reason.
+_run_config: list[tuple[str, str]] = []
+
+
+def set_run_config(pairs: list[tuple[str, str]]) -> None:
+    """Add these settings to every later git call, after the ones above, until set to something else."""
+    _run_config[:] = pairs
+    _refreeze()
+
+
+def noninteractive_env() -> dict[str, str]:
+    """The environment a git call started now would get, for a module that spawns git itself
+    because run_command cannot: credentials.py's helper calls, which need stdin."""
+    return _noninteractive_env()
+
+
+@dataclass(frozen=True, slots=True)
+class _Execution:
+    env: dict[str, str]
+    git: str
+
+
+# The environment and the git binary every call in the current run starts with, when one is frozen;
+# see frozen_execution. Module-level for the reason the process registry is.
+_frozen: list[_Execution] = []
+
+
+@contextlib.contextmanager
+def frozen_execution() -> Iterator[None]:
+    """Build the environment and find git once for every call in the block, not once per call.
+
+    Outside a run each call builds its own, which is what lets the environment be changed between
+    calls — a test's monkeypatch, doctor's one-off probes — and costs a copy of os.environ and a
+    PATH search per spawn. Inside one, at thousands of calls a run, both are done here. Nothing in
+    a run changes the process environment, and the two settings that do change mid-run, the ssh
+    options and the run config, rebuild the frozen one when they are set.
+    """
+    _frozen[:] = [_Execution(env=_noninteractive_env(), git=shutil.which('git') or 'git')]
+    try:
+        yield
+    finally:
+        _frozen.clear()
+
+
+def _refreeze() -> None:
+    if _frozen:
+        _frozen[0] = _Execution(env=_noninteractive_env(), git=_frozen[0].git)
+
+
+def _execution(args: list[str]) -> tuple[list[str], dict[str, str]]:
+    """The argv and environment to start `args` with: the frozen ones inside a run, fresh outside."""
+    if not _frozen:
+        return args, _noninteractive_env()
+    execution = _frozen[0]
+    return ([execution.git, *args[1:]] if args[:1] == ['git'] else args), execution.env
+
+
+def take_spawn_stats() -> SpawnStats:
+    """The spawn counts since the last call, which starts counting afresh."""
+    with _active_lock:
+        taken = SpawnStats(_spawn_stats.spawns, _spawn_stats.spawn_seconds, _spawn_stats.wait_seconds)
+        _spawn_stats.spawns, _spawn_stats.spawn_seconds, _spawn_stats.wait_seconds = 0, 0.0, 0.0
+    return taken
+
+
+@dataclass(slots=True)
+class _Alarm:
+    pid: int
+    armed: bool = True
+    fired: bool = False
+
+
+class _Watchdog:
+    """Ends the calls that outlive their timeouts, from one thread, so that no call waits on git
+    with a timeout of its own.
+
+    communicate(timeout=...) reads the pipes by select(), but then waits for the exit by polling:
+    waitpid, then a sleep of half a millisecond, doubling. A `rev-parse` that answers in one
+    millisecond spent as long again in those sleeps. Without a timeout, communicate() blocks in
+    waitpid and returns the moment git exits, and this is what makes that safe: at a call's
+    deadline it sends the group TERM, KILL_GRACE_SECONDS later KILL, and the blocked communicate()
+    returns as the pipes close. Arming and disarming is a heap push and a flag under one lock.
+    """
+
+    def __init__(self) -> None:
+        self._wake = threading.Condition()
+        # A disarmed alarm stays here until its deadline comes round and it is dropped: cheaper
+        # than finding it, and a run's worth of them is a few thousand small tuples.
+        self._deadlines: list[tuple[float, int, _Alarm]] = []
+        self._order = itertools.count()
+        self._thread: threading.Thread | None = None
+
+    def arm(self, pid: int, timeout: float) -> _Alarm:
+        alarm = _Alarm(pid)
+        with self._wake:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='syncer-watchdog', daemon=True)
+                self._thread.start()
+            self._push(time.monotonic() + timeout, alarm)
+        return alarm
+
+    def disarm(self, alarm: _Alarm) -> bool:
+        """Stop watching a call that has ended; True when it was ended by its deadline."""
+        with self._wake:
+            alarm.armed = False
+            return alarm.fired
+
+    def _push(self, deadline: float, alarm: _Alarm) -> None:
+        heapq.heappush(self._deadlines, (deadline, next(self._order), alarm))
+        # Only an alarm that is now the earliest changes how long the thread has to sleep.
+        if self._deadlines[0][2] is alarm:
+            self._wake.notify()
+
+    def _run(self) -> None:
+        with self._wake:
+            while True:
+                if not self._deadlines:
+                    self._wake.wait()
+                    continue
+                deadline, _, alarm = self._deadlines[0]
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    self._wake.wait(remaining)
+                    continue
+                heapq.heappop(self._deadlines)
+                if not alarm.armed:
+                    continue
+                if alarm.fired:
+                    _signal_group(alarm.pid, signal.SIGKILL)
+                else:
+                    alarm.fired = True
+                    _signal_group(alarm.pid, signal.SIGTERM)
+                    self._push(time.monotonic() + KILL_GRACE_SECONDS, alarm)
+
+
+_watchdog = _Watchdog()
+
+
+def _signal_group(pid: int, signum: signal.Signals) -> None:
+    """Signal every process in the group a git call leads: git, and whatever it started.
+
+    The group can be gone before the signal lands, and a race there is not worth reporting: it is
+    already gone, which is what was being asked for.
+    """
+    with contextlib.suppress(OSError):
+        os.killpg(pid, signum)
+
+
+def _end_group(process: subprocess.Popen[str]) -> tuple[str, str]:
+    """End a git call and everything it spawned, and collect what it had written.
+
+    TERM first, KILL after KILL_GRACE_SECONDS. Then KILL once more whatever way it went: a
+    descendant still in the group once git is gone is an orphan, and nothing will wait for it.
+    """
+    _signal_group(process.pid, signal.SIGTERM)
+    try:
+        stdout, stderr = process.communicate(timeout=KILL_GRACE_SECONDS)
+    except subprocess.TimeoutExpired:
+        _signal_group(process.pid, signal.SIGKILL)
+        stdout, stderr = process.communicate()
+    _signal_group(process.pid, signal.SIGKILL)
+    return stdout, stderr
 
 
 def abort_running_commands() -> None:
@@ -161,15 +1081,21 @@ def abort_running_commands() -> None:
     Without it a Ctrl-C does nothing visible: ThreadPoolExecutor's shutdown waits for running
     tasks, so an interrupt during a fetch storm sits there for the remainder of git_timeout — two
     minutes of a terminal that has already been told to stop.
+
+    Each call is its own session (see run_command), so the terminal's SIGINT never reaches git and
+    this is the only thing that ends it. Its whole group is signalled, with the escalation
+    _end_group uses; the wait for the grace period happens here, once, rather than per call.
     """
     _aborted.set()
     with _active_lock:
         processes = list(_active_processes)
     for process in processes:
-        # The process can exit between the snapshot and the signal, and a race there is not worth
-        # reporting: it is already gone, which is what was being asked for.
-        with contextlib.suppress(OSError):
-            process.terminate()
+        _signal_group(process.pid, signal.SIGTERM)
+    deadline = time.monotonic() + KILL_GRACE_SECONDS
+    while time.monotonic() < deadline and any(process.poll() is None for process in processes):
+        time.sleep(0.05)
+    for process in processes:
+        _signal_group(process.pid, signal.SIGKILL)
 
 
 def reset_abort() -> None:
@@ -185,28 +1111,50 @@ def run_command(args: list[str], *, cwd: Path | None = None, timeout: int) -> su
 
     Popen rather than subprocess.run so the handle is visible to abort_running_commands; run()
     owns its child privately, which is precisely what left a Ctrl-C with nothing to signal.
+
+    Started as a session of its own, so a timeout or an abort can end the whole process group —
+    the ssh, credential helper or git-remote-https that git spawned as well as git. Signalling git
+    alone left those running with the sockets and descriptors they held, and a dying VPN under a
+    wide `--jobs` turned that into hundreds of orphaned ssh processes. A session rather than only a
+    group, because a git with no controlling terminal cannot open /dev/tty at all: a prompt that
+    slipped past _noninteractive_env fails at once, where one in a background group would stop the
+    call until its timeout.
+
+    The timeout is kept by _watchdog rather than by communicate(); see there for why.
     """
     if _aborted.is_set():
         return subprocess.CompletedProcess(args, returncode=ABORTED_RETURNCODE, stdout='', stderr='aborted')
+    argv, env = _execution(args)
+    started = time.perf_counter()
     process = subprocess.Popen(  # nosec B603 B607
-        args,
+        argv,
         cwd=cwd,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
         text=True,
-        env=_noninteractive_env(),
+        env=env,
+        start_new_session=True,
     )
+    spawned = time.perf_counter()
     with _active_lock:
         _active_processes.add(process)
+    alarm = _watchdog.arm(process.pid, timeout)
     try:
-        stdout, stderr = process.communicate(timeout=timeout)
-    except subprocess.TimeoutExpired:
-        process.kill()
-        process.communicate()
-        return subprocess.CompletedProcess(args, returncode=TIMEOUT_RETURNCODE, stdout='', stderr=f'timed out after {timeout}s')
+        stdout, stderr = process.communicate()
+    except BaseException:
+        # A Ctrl-C reaching the thread that waits, as in doctor: the call is a session of its own,
+        # so the terminal's SIGINT never reached git, and it is ended here instead.
+        _end_group(process)
+        raise
     finally:
+        timed_out = _watchdog.disarm(alarm)
         with _active_lock:
             _active_processes.discard(process)
+            _spawn_stats.add(spawned - started, time.perf_counter() - spawned)
+    if timed_out:
+        # Anything still in the group now has outlived git, and nothing else will end it.
+        _signal_group(process.pid, signal.SIGKILL)
+        return subprocess.CompletedProcess(args, returncode=TIMEOUT_RETURNCODE, stdout='', stderr=f'timed out after {timeout}s')
     if _aborted.is_set() and process.returncode != 0:
         # A killed git exits non-zero with whatever it had managed to say. Reporting that as a
         # repo problem would fill the run's failure summary with the consequences of the Ctrl-C.
@@ -214,15 +1162,240 @@ def run_command(args: list[str], *, cwd: Path | None = None, timeout: int) -> su
     return subprocess.CompletedProcess(args, returncode=process.returncode, stdout=stdout, stderr=stderr)
 
 
+class CommandStream:
+    """A running command's stdout, a line at a time, as bytes with the newline cut; and, once the
+    stream_command block has closed, how the command ended.
+
+    `returncode` stays None for a command the caller stopped before it had finished: it was ended
+    on purpose, and its exit status is the signal, which says nothing about what was asked.
+    """
+
+    def __init__(self, lines: Iterable[bytes]) -> None:
+        self._lines = lines
+        self.returncode: int | None = None
+        self.stderr = ''
+        self.exhausted = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        for line in self._lines:
+            yield line.rstrip(b'\n')
+        self.exhausted = True
+
+
+@contextlib.contextmanager
+def stream_command(args: list[str], *, cwd: Path | None = None, timeout: int) -> Iterator[CommandStream]:
+    """run_command for a caller that wants stdout as it arrives, and may not want all of it.
+
+    run_command buffers and decodes everything before the caller sees a byte, so a reader after
+    one line of `git log` held the whole history in memory first. Here each line is handed over
+    as git writes it, undecoded, and leaving the block early ends the command — its whole group,
+    as a timeout does — so nothing after the last line read is ever produced, piped or decoded.
+
+    Otherwise it is run_command: registered for abort_running_commands, the same environment,
+    a timeout or an abort read back as TIMEOUT_RETURNCODE or ABORTED_RETURNCODE, and never an
+    exception. stderr goes to a file, so a command that says a lot there cannot fill a pipe
+    nobody reads until the end and wedge.
+    """
+    if _aborted.is_set():
+        aborted = CommandStream(())
+        aborted.returncode, aborted.stderr = ABORTED_RETURNCODE, 'aborted'
+        yield aborted
+        return
+    argv, env = _execution(args)
+    with tempfile.TemporaryFile() as errors:
+        started = time.perf_counter()
+        process = subprocess.Popen(argv, cwd=cwd, stdout=subprocess.PIPE, stderr=errors, env=env, start_new_session=True)  # nosec B603 B607
+        spawned = time.perf_counter()
+        with _active_lock:
+            _active_processes.add(process)
+        alarm = _watchdog.arm(process.pid, timeout)
+        stdout = process.stdout
+        stream = CommandStream(stdout if stdout is not None else ())
+        try:
+            yield stream
+        finally:
+            # Read to the end, or exited on its own before the caller stopped reading: finished,
+            # and waited for under the watchdog still. Anything else was stopped, and is ended.
+            finished = stream.exhausted or process.poll() is not None
+            if stdout is not None:
+                stdout.close()
+            if finished:
+                process.wait()
+            else:
+                _end_group(process)
+            expired = _watchdog.disarm(alarm)
+            with _active_lock:
+                _active_processes.discard(process)
+                _spawn_stats.add(spawned - started, time.perf_counter() - spawned)
+        if expired:
+            stream.returncode, stream.stderr = TIMEOUT_RETURNCODE, f'timed out after {timeout}s'
+        elif _aborted.is_set() and process.returncode != 0:
+            stream.returncode, stream.stderr = ABORTED_RETURNCODE, 'aborted'
+        elif finished:
+            errors.seek(0)
+            stream.returncode, stream.stderr = process.returncode, errors.read().decode(errors='replace')
+
+
+async def _end_group_async(process: asyncio.subprocess.Process) -> None:
+    """_end_group for the asyncio engine. What the call had written is dropped, as it always was
+    here; the pipes are still drained, or their transports outlive the loop that owned them."""
+    _signal_group(process.pid, signal.SIGTERM)
+    try:
+        async with asyncio.timeout(KILL_GRACE_SECONDS):
+            await process.communicate()
+    except TimeoutError:
+        _signal_group(process.pid, signal.SIGKILL)
+        await process.communicate()
+    _signal_group(process.pid, signal.SIGKILL)
+
+
+async def run_command_async(args: list[str], *, cwd: Path | None = None, timeout: int) -> subprocess.CompletedProcess[str]:
+    """run_command for the asyncio engine: the same results, with cancellation done by the task.
+
+    A timeout becomes TIMEOUT_RETURNCODE exactly as it does in run_command, so a caller cannot tell
+    which engine ran the call. There is no registry of handles here: a Ctrl-C cancels the task
+    awaiting this, and the cancellation kills the child on its way out — which is everything
+    abort_running_commands has to do by hand for a blocked thread. The abort flag is still
+    honoured, so a call started after an abort does not run.
+    """
+    if _aborted.is_set():
+        return subprocess.CompletedProcess(args, returncode=ABORTED_RETURNCODE, stdout='', stderr='aborted')
+    argv, env = _execution(args)
+    started = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        *argv,
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env=env,
+        start_new_session=True,
+    )
+    spawned = time.perf_counter()
+    try:
+        async with asyncio.timeout(timeout):
+            stdout_bytes, stderr_bytes = await process.communicate()
+    except TimeoutError:
+        await _end_group_async(process)
+        return subprocess.CompletedProcess(args, returncode=TIMEOUT_RETURNCODE, stdout='', stderr=f'timed out after {timeout}s')
+    except asyncio.CancelledError:
+        # The child has to go with the task: a cancelled fetch left running would hold its lock
+        # files past the end of the run, and the event loop closing under it would leak the pipes.
+        await _end_group_async(process)
+        raise
+    finally:
+        with _active_lock:
+            _spawn_stats.add(spawned - started, time.perf_counter() - spawned)
+    # Decoded with replacement: a stray byte in a path costs that character, not the call.
+    stdout = stdout_bytes.decode(errors='replace')
+    stderr = stderr_bytes.decode(errors='replace')
+    if _aborted.is_set() and process.returncode != 0:
+        return subprocess.CompletedProcess(args, returncode=ABORTED_RETURNCODE, stdout=stdout, stderr='aborted')
+    return subprocess.CompletedProcess(args, returncode=process.returncode or 0, stdout=stdout, stderr=stderr)
+
+
+# How many answers AncestryMemo keeps. Each is under two hundred bytes on disk, and a sweep of a few
+# hundred repos asks a few hundred questions of it, so this is many runs of turnover.
+ANCESTRY_MEMO_ENTRIES = 20_000
+
+# (kind, repo path, oid, oid): kind is 'counts' for ahead/behind, 'merged' for ancestry, 'patch'
+# for git cherry's every-patch-applied.
+MemoKey = tuple[str, str, str, str]
+Answer = tuple[int, int] | bool
+
+
+class AncestryMemo:
+    """Answers about pairs of commits, kept from one run to the next: ahead/behind counts, and
+    whether one commit's changes are already in another, by ancestry or by patch.
+
+    Keyed by oid, never by branch name, so an answer cannot go stale: a branch that moves asks a
+    new question, and the old answer sits unused until it is the least recently used and goes.
+    Nearly every branch on a machine is where it was last run, and a gone branch waiting to be
+    deleted was costing a merge-base and a `git cherry` — the dearest read syncer makes, a diff
+    of every commit on both sides — on every run it stayed.
+
+    One per run, shared by every worker's Repo, so every access holds the lock.
+    """
+
+    def __init__(self, entries: Iterable[tuple[MemoKey, Answer]] = (), limit: int = ANCESTRY_MEMO_ENTRIES) -> None:
+        self._answers: OrderedDict[MemoKey, Answer] = OrderedDict(entries)
+        self._limit = limit
+        self._lock = threading.Lock()
+        # Set by a new answer or an eviction, never by a hit. A run that only read would otherwise
+        # rewrite the whole file to record a new order, and that is every run where nothing moved.
+        # The order a hit makes is kept in memory, and written with the next run that learns something.
+        self.changed = self._trim()
+
+    def _trim(self) -> bool:
+        evicted = False
+        while len(self._answers) > self._limit:
+            self._answers.popitem(last=False)
+            evicted = True
+        return evicted
+
+    def get(self, key: MemoKey) -> Answer | None:
+        with self._lock:
+            answer = self._answers.get(key)
+            if answer is not None:
+                self._answers.move_to_end(key)
+            return answer
+
+    def put(self, key: MemoKey, answer: Answer) -> None:
+        with self._lock:
+            self._answers[key] = answer
+            self._answers.move_to_end(key)
+            self._trim()
+            self.changed = True
+
+    def entries(self) -> list[tuple[MemoKey, Answer]]:
+        """Every answer, least recently used first: the order to write them in and read them back."""
+        with self._lock:
+            return list(self._answers.items())
+
+
 class Repo:
-    def __init__(self, name: str, path: Path, owner: str, host: str, timeout: int = GIT_TIMEOUT_SECONDS, url: str | None = None):
+    def __init__(
+        self,
+        name: str,
+        path: Path,
+        owner: str,
+        host: str,
+        timeout: int = GIT_TIMEOUT_SECONDS,
+        url: str | None = None,
+        fetch_timeout: int | None = None,
+        memo: AncestryMemo | None = None,
+    ):
         self.name = name
         self.path = path
         self.owner = owner
         self.url = url or f'{host}/{owner}/{name}'
         self.timeout = timeout
-        # Thread-confined: report.py builds one Repo per worker task, so a plain list is safe.
+        # The ceiling for the calls that refresh origin's refs, when this repo's history gives it a
+        # tighter one than git_timeout; see learned_timeouts. Clones and pushes keep `timeout`.
+        self.fetch_timeout = fetch_timeout
+        # The run's answers about pairs of commits, when it keeps them; see _remembered.
+        self.memo = memo
+        # Whether a fetch has run, as opposed to an ls-remote that found origin where it was. What
+        # learns from fetch times reads it: the two differ by the whole pack negotiation.
+        self.fetch_ran = False
+        # One Repo per worker task, used from that task's thread alone; read_local reads on a Repo
+        # of its own and hands its answers back through adopt_local.
         self.failures: list[GitFailure] = []
+        # The read memo: see _read.
+        self._reads: dict[tuple[str, ...], subprocess.CompletedProcess[str]] = {}
+        self._live_depth = 0
+        self.read_stats = ReadStats()
+        # Parsed on first use and dropped by every write, like the memo; see _ref_store.
+        self._refs: RefStore | None = None
+        self._refs_read = False
+        # The in-process reader, opened on first use and dropped by every write as the ref store is,
+        # and the status it last answered, which stands in for the memo's; see _reader.
+        self._reader: ReadBackend | None = None
+        self._reader_open = False
+        self._status: StatusSnapshot | None = None
+        # The commit-graph, opened on first use. Dropped by writes only so a fetch's new graph is
+        # picked up; unlike the refs it is kept through live(), see _commit_graph.
+        self._graph: CommitGraph | None = None
+        self._graph_open = False
 
     def _git(self, *args: str, probe: bool = False, timeout: int | None = None) -> subprocess.CompletedProcess[str]:
         """Run git in this repo, recording a non-zero exit unless it is a probe.
@@ -232,14 +1405,250 @@ class Repo:
         the handful of calls that ask a yes/no question, where non-zero *is* the answer and
         recording it would bury the real failures in noise.
 
-        `timeout` is for the one call that does a clone's work from inside a repo: the first
-        fetch of a full history. Everything else is sized by git_timeout.
+        `timeout` is for the calls sized by something other than git_timeout: the first fetch of a
+        full history, which does a clone's work from inside a repo, and the fetches that have a
+        learned `fetch_timeout`.
         """
         result = run_command(['git', *args], cwd=self.path, timeout=timeout or self.timeout)
         if result.returncode != 0 and not probe:
             self.failures.append(GitFailure(argv=args, returncode=result.returncode, stderr=result.stderr.strip()))
         return result
 
+    @contextlib.contextmanager
+    def _stream(self, *args: str) -> Iterator[CommandStream]:
+        """_git through stream_command, for a reader that wants lines as they come or only some of
+        them. A failure is recorded as _git records one; a stream the caller stopped is not one."""
+        with stream_command(['git', *args], cwd=self.path, timeout=self.timeout) as stream:
+            yield stream
+        if stream.returncode:
+            self.failures.append(GitFailure(argv=args, returncode=stream.returncode, stderr=stream.stderr.strip()))
+
+    def _read(self, *args: str, probe: bool = False) -> subprocess.CompletedProcess[str]:
+        """A git call that changes nothing, answered from the memo when it has been asked already.
+
+        A single report used to run `git status` three times and the default-branch chain twice
+        over, against a repo nothing had touched in between. Keyed on the exact argv, so two
+        accessors share an answer only when they asked git the identical question.
+
+        Failures are kept too: a status that failed once is reported once, not once per reader,
+        and every reader of a failed status already takes the refusing polarity.
+
+        Correctness rests on the other half, `_write`: every call that can move a ref, the tree or
+        the index empties the memo, so nothing read before a mutation answers after it. Inside
+        `live()` the memo is bypassed outright — see there.
+        """
+        if not self._live_depth:
+            cached = self._reads.get(args)
+            if cached is not None:
+                self.read_stats.hits += 1
+                return cached
+        self.read_stats.misses += 1
+        result = self._git(*args, probe=probe)
+        self._reads[args] = result
+        return result
+
+    def _write(self, *args: str, timeout: int | None = None, remote_only: bool = False) -> subprocess.CompletedProcess[str]:
+        """A git call that may change refs, the index or the tree. Forgets every memoised read.
+
+        Cleared whatever the exit code: a failed rebase or an interrupted fetch can still have
+        moved something, and a read re-run is cheap where a stale answer is not. `remote_only` is
+        for the calls that move remote-tracking refs and nothing else, which forget only what
+        those refs can change — see forget_remote.
+        """
+        try:
+            return self._git(*args, timeout=timeout)
+        finally:
+            self._forget(remote_only)
+
+    def _forget(self, remote_only: bool) -> None:
+        if remote_only:
+            self.forget_remote()
+        else:
+            self._reads.clear()
+            self._refs_read = False
+            self._reader_open = False
+            self._graph_open = False
+            self._status = None
+
+    def forget_remote(self) -> None:
+        """Drop every read a fetch can have changed, and keep the ones it cannot.
+
+        What lets read_local run alongside a fetch: the tree, index and stash it read are as true
+        after the fetch as before. The status's ahead/behind line is the exception inside the
+        exception — it is measured against the upstream the fetch just moved — so it is cut, and
+        the counts read as unknown rather than as the old ones.
+        """
+        self._reads = {args: _without_counts(args, result) for args, result in self._reads.items() if args in _LOCAL_READS}
+        self._refs_read = False
+        self._reader_open = False
+        self._graph_open = False
+        if self._status is not None:
+            self._status = replace(self._status, ahead=None, behind=None)
+
+    def read_local(self) -> LocalReads:
+        """Read what the report needs that no fetch can change, so it can run during one.
+
+        Safe on any thread while the owning one fetches, because it touches nothing of this Repo's:
+        the reads go through a Repo of their own, with its own memo and its own in-process reader,
+        and come back as values. The tree and stash come from one status, and the worktree list is
+        read once for the run. The owning thread joins this with the fetch and hands the result to
+        adopt_local.
+        """
+        reader = Repo(
+            name=self.name, path=self.path, owner=self.owner, host='', url=self.url, timeout=self.timeout, fetch_timeout=self.fetch_timeout
+        )
+        reader.status_snapshot()
+        _ = reader.stash_count
+        worktrees = reader.linked_worktree_branches
+        reads = {args: result for args, result in reader._reads.items() if args in _LOCAL_READS}
+        return LocalReads(reads=reads, status=reader._status, worktrees=worktrees, failures=reader.failures)
+
+    def adopt_local(self, local: LocalReads) -> None:
+        """Keep what read_local read, on the thread that owns this Repo, once the fetch is done.
+
+        Its failures are this repo's, recorded after the fetch's. Whatever this Repo has read for
+        itself since wins, and the status's ahead/behind is cut as forget_remote cuts it: the read
+        raced a fetch that may have moved the upstream they were counted against.
+        """
+        self.failures.extend(local.failures)
+        for args, result in local.reads.items():
+            self._reads.setdefault(args, _without_counts(args, result))
+        if self._status is None and local.status is not None:
+            self._status = replace(local.status, ahead=None, behind=None)
+        self.__dict__.setdefault('linked_worktree_branches', local.worktrees)
+
+    def _recorded(self, args: tuple[str, ...]) -> GitFailure:
+        """The failure _git recorded for this argv. Searched for rather than taken as failures[-1],
+        so that nothing recorded in between can be reported as it."""
+        return next(failure for failure in reversed(self.failures) if failure.argv == args)
+
+    async def _git_async(self, *args: str, probe: bool = False, timeout: int | None = None) -> subprocess.CompletedProcess[str]:
+        """_git for the asyncio engine: the same recording, through run_command_async."""
+        result = await run_command_async(['git', *args], cwd=self.path, timeout=timeout or self.timeout)
+        if result.returncode != 0 and not probe:
+            self.failures.append(GitFailure(argv=args, returncode=result.returncode, stderr=result.stderr.strip()))
+        return result
+
+    async def _write_async(self, *args: str, timeout: int | None = None, remote_only: bool = False) -> subprocess.CompletedProcess[str]:
+        """_write for the asyncio engine. Forgets the memo even when the task is cancelled."""
+        try:
+            return await self._git_async(*args, timeout=timeout)
+        finally:
+            self._forget(remote_only)
+
+    def _ref_store(self) -> RefStore | None:
+        """This repo's refs read from disk, or None when they have to come from the git CLI.
+
+        Kept between reads for the same reason as the memo, and dropped by the same writes.
+        Inside live() it is read afresh: re-reading a few small files is cheap, and a guard has
+        to see a ref moved by anything, not only by syncer.
+        """
+        if self._live_depth or not self._refs_read:
+            self._refs = RefStore.read(self.path)
+            self._refs_read = True
+        return self._refs
+
+    def _read_backend(self) -> ReadBackend | None:
+        """The in-process reader for this repo, or None when its reads go to the git CLI.
+
+        None inside live(), whatever is installed: a guard's promise is about what git itself sees
+        at the moment of the write, and no other reader can make it. Opened afresh after every
+        write, so nothing libgit2 cached from before a fetch answers after it.
+        """
+        if self._live_depth:
+            return None
+        if not self._reader_open:
+            opener = _READERS.get(READ_BACKEND)
+            self._reader = opener(self.path) if opener is not None else None
+            self._reader_open = True
+        return self._reader
+
+    def _commit_graph(self) -> CommitGraph | None:
+        """This repo's commit-graph, or None when it has none git would use.
+
+        Kept inside live(), unlike every other read: a commit's parents are part of the commit, so
+        what the graph says about one stays true however the refs move, and a commit made since
+        it was written is simply not in it. Which commit a name means is the part a guard has to
+        see afresh, and _in_graph reads that from the ref files each time.
+        """
+        if not READ_COMMIT_GRAPH:
+            return None
+        if not self._graph_open:
+            store = self._ref_store()
+            self._graph = CommitGraph.open(store.common_dir) if store is not None else None
+            self._graph_open = True
+        return self._graph
+
+    def _in_graph(self, *names: str) -> tuple[CommitGraph, list[str]]:
+        """The commit-graph and the commits `names` mean to rev-parse; _Unanswered when there is no
+        graph or a name does not resolve through the ref files alone."""
+        graph = self._commit_graph()
+        if graph is None:
+            raise _Unanswered('no commit-graph')
+        return graph, self._oids(*names)
+
+    def _oids(self, *names: str) -> list[str]:
+        """The commits `names` mean to rev-parse, read from the ref files; _Unanswered when one does
+        not resolve through them alone."""
+        store = self._ref_store()
+        if store is None:
+            raise _Unanswered('refs are not readable in-process')
+        oids: list[str] = []
+        for name in names:
+            try:
+                # A full object id is itself before it is any ref, as it is to rev-parse.
+                oid = name if _OID.match(name) else next(filter(None, map(store.resolve, (name, *_dwim_refs(name)))), None)
+            except _RefsUnreadable as exc:
+                raise _Unanswered(str(exc)) from exc
+            if oid is None:
+                raise _Unanswered(f'{name} does not resolve')
+            oids.append(oid)
+        return oids
+
+    def _remembered(self, kind: str, left: str, right: str, answer: Callable[[], Answer | None]) -> Answer | None:
+        """`answer()`, or what the memo kept from asking it of the same two commits before.
+
+        The memo is not asked inside live(). Invariants 3 and 5 are about what git says at the
+        moment of the write, and an answer syncer wrote to a file in an earlier run is not git
+        saying it — however right it was then. Nor is it asked when a name does not resolve
+        through the ref files, or in a repo where git takes some commit's parents from elsewhere
+        than the commit — shallow, grafted, replaced — since there the same two commits can have
+        another answer tomorrow. None from `answer()` is git failing to say, and is not kept.
+        """
+        memo = self.memo
+        if memo is None or self._live_depth:
+            return answer()
+        try:
+            left_oid, right_oid = self._oids(left, right)
+        except _Unanswered:
+            return answer()
+        store = self._ref_store()
+        if store is None or rewrites_parents(store.common_dir):
+            return answer()
+        key = (kind, str(self.path), left_oid, right_oid)
+        found = memo.get(key)
+        if found is None:
+            found = answer()
+            if found is not None:
+                memo.put(key, found)
+        return found
+
+    @contextlib.contextmanager
+    def live(self) -> Iterator[None]:
+        """Make every read inside the block ask git afresh, for execute()'s guards.
+
+        The memo only knows about syncer's own writes. A file saved in an editor between classify
+        and execute is invisible to it, and execute.py's invariants are promises about the tree
+        *at the moment of the write* — so the guards re-measure rather than trust anything read
+        earlier, which is what they did before there was a memo at all. Fresh answers still
+        replace the memoised ones, since they are the newest thing known.
+        """
+        self._live_depth += 1
+        try:
+            yield
+        finally:
+            self._live_depth -= 1
+
     @property
     def exists(self) -> bool:
         return self.path.exists()
@@ -290,21 +1699,49 @@ class Repo:
 
     @property
     def current_branch(self) -> str:
-        result = self._git('rev-parse', '--abbrev-ref', 'HEAD')
+        store = self._ref_store()
+        if store is not None:
+            try:
+                return store.current_branch()
+            except _RefsUnreadable:
+                pass
+        result = self._read('rev-parse', '--abbrev-ref', 'HEAD')
         return result.stdout.strip()
 
     @property
     def default_branch(self) -> str | None:
+        store = self._ref_store()
+        if store is not None:
+            try:
+                return self._default_branch_from(store)
+            except _RefsUnreadable:
+                pass
+        return self._default_branch_from_git()
+
+    @staticmethod
+    def _default_branch_from(store: RefStore) -> str | None:
+        """default_branch's chain, answered from the ref files. Same order, same verdicts."""
+        head = store.symref('refs/remotes/origin/HEAD')
+        if head is not None:
+            branch = head.replace('refs/remotes/origin/', '')
+            if store.exists(f'refs/remotes/origin/{branch}'):
+                return branch
+        for branch in ('main', 'master'):
+            if store.exists(f'refs/heads/{branch}'):
+                return branch
+        return None
+
+    def _default_branch_from_git(self) -> str | None:
         # probe: every call here asks "does this ref exist", and walking the fallback chain is
         # the normal path on a repo whose origin/HEAD was never set.
-        result = self._git('symbolic-ref', 'refs/remotes/origin/HEAD', probe=True)
+        result = self._read('symbolic-ref', 'refs/remotes/origin/HEAD', probe=True)
         if result.returncode == 0:
             branch = result.stdout.strip().replace('refs/remotes/origin/', '')
             # Verify the tracking ref exists (could be stale after a rename)
-            if self._git('rev-parse', '--verify', f'refs/remotes/origin/{branch}', probe=True).returncode == 0:
+            if self._read('rev-parse', '--verify', f'refs/remotes/origin/{branch}', probe=True).returncode == 0:
                 return branch
         for branch in ('main', 'master'):
-            check = self._git('rev-parse', '--verify', f'refs/heads/{branch}', probe=True)
+            check = self._read('rev-parse', '--verify', f'refs/heads/{branch}', probe=True)
             if check.returncode == 0:
                 return branch
         return None
@@ -313,6 +1750,25 @@ class Repo:
     def is_detached(self) -> bool:
         return self.current_branch == 'HEAD'
 
+    def status_snapshot(self) -> StatusSnapshot | None:
+        """The current branch and tree in one read, or None when git could not say.
+
+        None is never a clean tree: is_dirty turns it into True, the refusing answer. An answer from
+        the in-process reader is kept like a memoised one, and forgotten by the same writes.
+        """
+        if self._status is not None and not self._live_depth:
+            return self._status
+        reader = self._read_backend()
+        if reader is not None:
+            with contextlib.suppress(_Unanswered):
+                self._status = reader.status_snapshot()
+            if self._status is not None:
+                return self._status
+        result = self._read(*_STATUS_READ)
+        if result.returncode != 0:
+            return None
+        return parse_status_v2(result.stdout)
+
     @property
     def is_dirty(self) -> bool:
         """True when the tree has changes *or* git could not tell us.
@@ -322,18 +1778,22 @@ class Repo:
         permission to mutate — so the unknown case has to answer True, which a `list | None`
         could never do: None is falsy.
         """
-        result = self._git('status', '--porcelain')
-        return result.returncode != 0 or bool(result.stdout.strip())
+        status = self.status_snapshot()
+        return status is None or status.dirty
 
     @property
     def uncommitted_changes(self) -> list[str]:
         """The changed paths, for counting only. Use is_dirty for any safety decision."""
-        result = self._git('status', '--porcelain')
-        if result.returncode != 0:
-            return []
-        return [line for line in result.stdout.strip().splitlines() if line]
+        status = self.status_snapshot()
+        return [] if status is None else list(status.entries)
 
     def local_branches(self) -> list[str]:
+        store = self._ref_store()
+        if store is not None:
+            try:
+                return store.branches()
+            except _RefsUnreadable:
+                pass
         result = self._git('for-each-ref', '--format=%(refname:short)', 'refs/heads/')
         if result.returncode != 0:
             return []
@@ -346,12 +1806,15 @@ class Repo:
         ever iterates local branches, so a long-lived branch you deliberately never check out
         (develop/uat/prod) is invisible: nothing tells you origin/prod moved.
         """
-        result = self._git('for-each-ref', '--sort=-committerdate', '--format=%(refname:short)', 'refs/remotes/origin/')
-        if result.returncode != 0:
-            return []
         local = set(self.local_branches())
-        remote = (line.removeprefix('origin/') for line in result.stdout.splitlines() if line)
-        return [branch for branch in remote if branch != 'HEAD' and branch not in local]
+        # Streamed, and each name decoded only once it is known to be one worth keeping: a repo
+        # that mirrors thousands of branches it never checks out lists every one of them here.
+        with self._stream('for-each-ref', '--sort=-committerdate', '--format=%(refname:short)', 'refs/remotes/origin/') as refs:
+            remote = [ref.removeprefix(b'origin/') for ref in refs if ref]
+        if refs.returncode != 0:
+            return []
+        branches = (branch.decode(errors='replace') for branch in remote if branch != b'HEAD')
+        return [branch for branch in branches if branch not in local]
 
     @cached_property
     def linked_worktree_branches(self) -> dict[str, str] | None:
@@ -405,6 +1868,39 @@ class Repo:
         result = self._git('log', '-1', '--format=%ar', ref)
         return result.stdout.strip() if result.returncode == 0 else ''
 
+    def branch_refs(self, *branches: str) -> dict[str, BranchRef] | None:
+        """Every local branch (or just `branches`) with its oid, upstream and counts, in one call.
+
+        One for-each-ref in place of a `branch_upstream` and a `rev-list --left-right --count`
+        per branch: on a repo with a hundred tracked branches that was two hundred spawns for
+        what git computes in a single pass over the same refs. Ordered by name, as
+        local_branches is. None when git could not list the refs at all, which the caller has
+        to treat as unmeasured rather than as a repo with no branches.
+
+        `%(upstream:track)` compares against the upstream git has configured, the same ref
+        `rev-list` was given, so the counts are the ones the per-branch call produced.
+        """
+        patterns = tuple(f'refs/heads/{branch}' for branch in branches) or ('refs/heads/',)
+        reader = self._read_backend()
+        if reader is not None:
+            try:
+                return reader.branch_refs(patterns)
+            except _Unanswered:
+                pass
+        fields = '%(refname:lstrip=2)%09%(objectname)%09%(upstream:short)%09%(upstream:track)%09%(upstream:trackshort)'
+        result = self._git('for-each-ref', f'--format={fields}', *patterns)
+        if result.returncode != 0:
+            return None
+        refs: dict[str, BranchRef] = {}
+        for line in result.stdout.splitlines():
+            name, oid, upstream, track, trackshort = (line.split('\t') + [''] * 5)[:5]
+            if not name:
+                continue
+            gone = track.strip() == '[gone]'
+            counts = None if gone or not upstream else _track_counts(track.strip(), trackshort.strip())
+            refs[name] = BranchRef(name=name, oid=oid, upstream=upstream, gone=gone, counts=counts)
+        return refs
+
     def branch_upstream(self, branch: str) -> tuple[str, bool]:
         """Return (upstream_short, is_gone) for a branch.
 
@@ -424,7 +1920,24 @@ class Repo:
         None rather than (0, 0): the counts feed _primary_from_counts, which reads (0, 0) as
         SYNCED — so a missing remote-tracking ref after a failed fetch used to make a repo that
         had never reached its remote report as fully in sync.
+
+        Kept in the run's memo by the two commits' oids, outside live(); see _remembered.
         """
+        counts = self._remembered('counts', branch, upstream, lambda: self._count(branch, upstream))
+        return counts if isinstance(counts, tuple) else None
+
+    def _count(self, branch: str, upstream: str) -> tuple[int, int] | None:
+        reader = self._read_backend()
+        if reader is not None:
+            try:
+                return reader.ahead_behind(branch, upstream)
+            except _Unanswered:
+                pass
+        try:
+            graph, (left, right) = self._in_graph(branch, upstream)
+            return graph.ahead_behind(left, right)
+        except (_Unanswered, GraphMiss):
+            pass
         result = self._git('rev-list', '--left-right', '--count', f'{branch}...{upstream}')
         if result.returncode != 0:
             return None
@@ -435,14 +1948,38 @@ class Repo:
 
     def _target_ref(self, target: str) -> str:
         ref = f'origin/{target}'
-        if self._git('rev-parse', '--verify', ref, probe=True).returncode != 0:
+        store = self._ref_store()
+        if store is not None:
+            try:
+                return ref if any(store.exists(name) for name in _dwim_refs(ref)) else target
+            except _RefsUnreadable:
+                pass
+        if self._read('rev-parse', '--verify', ref, probe=True).returncode != 0:
             ref = target
         return ref
 
     def is_merged_into(self, branch: str, target: str) -> bool:
         """True if `branch` is an ancestor of `target` (prefer origin/<target> if present)."""
-        # probe: --is-ancestor answers with its exit code; non-zero means "no", not "broke".
-        return self._git('merge-base', '--is-ancestor', branch, self._target_ref(target), probe=True).returncode == 0
+        ref = self._target_ref(target)
+        return self._remembered('merged', branch, ref, lambda: self._is_ancestor(branch, ref)) is True
+
+    def _is_ancestor(self, branch: str, ref: str) -> bool | None:
+        """Whether `branch` is an ancestor of `ref`, or None when git could not say."""
+        reader = self._read_backend()
+        if reader is not None:
+            try:
+                return reader.is_ancestor(branch, ref)
+            except _Unanswered:
+                pass
+        try:
+            graph, (ancestor, descendant) = self._in_graph(branch, ref)
+            return graph.is_ancestor(ancestor, descendant)
+        except (_Unanswered, GraphMiss):
+            pass
+        # probe: --is-ancestor answers with its exit code; 1 means "no", not "broke". Anything else
+        # is a merge-base that could not look, which the caller reads as "no" but the memo keeps out.
+        returncode = self._git('merge-base', '--is-ancestor', branch, ref, probe=True).returncode
+        return returncode == 0 if returncode in (0, 1) else None
 
     def is_patch_applied_in(self, branch: str, target: str) -> bool:
         """True if every commit unique to `branch` has a patch-equivalent commit in `target`.
@@ -452,11 +1989,16 @@ class Repo:
         and '+' when it is not. A multi-commit branch collapsed into a single squash commit has
         no matching patch-ids and correctly reports '+' — a false negative costs only a refusal.
         """
+        ref = self._target_ref(target)
+        return self._remembered('patch', branch, ref, lambda: self._patches_applied(branch, ref)) is True
+
+    def _patches_applied(self, branch: str, ref: str) -> bool | None:
         # probe: a missing target ref is an ordinary "cannot prove it", and the caller's only
-        # response is to refuse the delete — which is already the safe outcome.
-        result = self._git('cherry', self._target_ref(target), branch, probe=True)
+        # response is to refuse the delete — which is already the safe outcome. None rather than
+        # False, so the memo does not keep it.
+        result = self._git('cherry', ref, branch, probe=True)
         if result.returncode != 0:
-            return False
+            return None
         return all(line.startswith('-') for line in result.stdout.splitlines() if line.strip())
 
     def contains_branch(self, branch: str, target: str) -> bool:
@@ -503,9 +2045,77 @@ class Repo:
             return []
         return [line for line in result.stdout.strip().splitlines() if line]
 
+    @property
+    def last_fetched(self) -> datetime | None:
+        """When origin's refs were last brought up to date, or None when nothing says.
+
+        Read from what a fetch leaves on disk rather than asked of git, because `check --offline`
+        asks it of every repo and exists to spawn as little as it can. syncer's own stamp comes
+        first, and when there is one it is the answer: it is only touched once a fetch has
+        succeeded, where FETCH_HEAD is also rewritten by a fetch that connected and then failed,
+        and `--max-fetch-age` must not skip a fetch on the strength of one that never landed.
+
+        Without a stamp, FETCH_HEAD, which every fetch rewrites even when it moved no ref; a clone
+        that has never been fetched since has only the reflogs its remote-tracking refs were
+        created with, so the newest of those stands in. All of them are mtimes: the clock of this
+        machine, which is the one the age is shown against.
+        """
+        store = self._ref_store()
+        if store is None:
+            return None
+        with contextlib.suppress(OSError):
+            return datetime.fromtimestamp((store.common_dir / FETCH_STAMP).stat().st_mtime, UTC)
+        candidates = [store.git_dir / 'FETCH_HEAD']
+        logs = store.common_dir / 'logs' / 'refs' / 'remotes' / 'origin'
+        with contextlib.suppress(OSError):
+            candidates.extend(path for path in logs.rglob('*') if path.is_file())
+        stamps = []
+        for path in candidates:
+            with contextlib.suppress(OSError):
+                stamps.append(path.stat().st_mtime)
+        return datetime.fromtimestamp(max(stamps), UTC) if stamps else None
+
+    @property
+    def origin_head_written(self) -> datetime | None:
+        """When refs/remotes/origin/HEAD was last written, or None when there is none.
+
+        Every `remote set-head` rewrites the file whether or not the target changed, so for a
+        remote whose listing never names its default this is how long the guess has gone unchecked.
+        """
+        store = self._ref_store()
+        if store is None:
+            return None
+        try:
+            return datetime.fromtimestamp((store.common_dir / 'refs' / 'remotes' / 'origin' / 'HEAD').stat().st_mtime, UTC)
+        except OSError:
+            return None
+
+    def mark_fetched(self) -> None:
+        """Record that origin's refs are current as of now, for last_fetched.
+
+        Best effort: a repo whose git dir cannot be written loses only the shortcut, and is
+        fetched again next run as it would have been without one.
+        """
+        store = self._ref_store()
+        if store is not None:
+            with contextlib.suppress(OSError):
+                (store.common_dir / FETCH_STAMP).touch()
+
     @property
     def stash_count(self) -> int:
-        result = self._git('stash', 'list')
+        status = self.status_snapshot()
+        if status is not None and status.stashes is not None:
+            return status.stashes
+        # No `# stash` line: either nothing is stashed, or this git predates 2.35 and never says.
+        # refs/stash existing is what separates the two, and reading it costs no spawn.
+        store = self._ref_store()
+        if status is not None and store is not None:
+            try:
+                if not store.exists('refs/stash'):
+                    return 0
+            except _RefsUnreadable:
+                pass
+        result = self._read('stash', 'list')
         if not result.stdout.strip():
             return 0
         return len(result.stdout.strip().splitlines())
@@ -519,10 +2129,15 @@ class Repo:
 
     @property
     def first_commit_date(self) -> str | None:
-        result = self._git('log', '--reverse', '--format=%aI')
-        if result.returncode != 0 or not result.stdout.strip():
-            return None
-        return result.stdout.strip().splitlines()[0]
+        """The author date of the oldest root commit, ISO 8601; None for a repo with no commits.
+
+        Roots only. git still walks the history to find them, but prints one or two lines where it
+        printed one per commit, every one of them piped, buffered and decoded to keep the first.
+        Only the first is read now, and the call is ended there.
+        """
+        with self._stream('log', '--reverse', '--max-parents=0', '--format=%aI') as dates:
+            first = next(iter(dates), b'')
+        return first.decode() if first else None
 
     @property
     def total_commits(self) -> int:
@@ -545,33 +2160,103 @@ class Repo:
         failed` with no detail line and nothing to act on. A recorded failure whose stderr is
         empty is the undiagnosable state `GitFailure` exists to prevent.
         """
-        result = self._git('fetch')
-        return None if result.returncode == 0 else self.failures[-1]
+        self.fetch_ran = True
+        result = self._write('fetch', timeout=self.fetch_timeout, remote_only=True)
+        return None if result.returncode == 0 else self._recorded(('fetch',))
 
     def fetch_prune(self) -> GitFailure | None:
         """fetch --prune, so a deleted upstream branch classifies as gone rather than synced."""
-        result = self._git('fetch', '--prune')
-        return None if result.returncode == 0 else self.failures[-1]
+        self.fetch_ran = True
+        result = self._write('fetch', '--prune', timeout=self.fetch_timeout, remote_only=True)
+        return None if result.returncode == 0 else self._recorded(('fetch', '--prune'))
 
     def set_head_auto(self) -> None:
         """Repoint origin/HEAD to the remote's real default (fixes stale ref after a
         default-branch rename). No-op when there's no remote."""
         if not self.has_remote:
             return
-        self._git('remote', 'set-head', 'origin', '--auto')
+        self._write('remote', 'set-head', 'origin', '--auto', timeout=self.fetch_timeout, remote_only=True)
+
+    def ls_remote(self) -> RemoteRefs | GitFailure:
+        """What origin advertises now, or why it could not be asked. One round trip, no pack.
+
+        Remote-only like a fetch, and its failure is the fetch's: a host that will not list its
+        refs would not have served them either, so the breaker and the failure groups read it the
+        same way.
+        """
+        result = self._git(*_LS_REMOTE, timeout=self.fetch_timeout)
+        return parse_ls_remote(result.stdout) if result.returncode == 0 else self._recorded(_LS_REMOTE)
+
+    async def ls_remote_async(self) -> RemoteRefs | GitFailure:
+        result = await self._git_async(*_LS_REMOTE, timeout=self.fetch_timeout)
+        return parse_ls_remote(result.stdout) if result.returncode == 0 else self._recorded(_LS_REMOTE)
+
+    def tracking_refs(self) -> RemoteRefs | None:
+        """What the last fetch left under refs/remotes/origin, or None when git could not say."""
+        result = self._git(*_TRACKING_READ)
+        return parse_tracking_refs(result.stdout) if result.returncode == 0 else None
+
+    async def tracking_refs_async(self) -> RemoteRefs | None:
+        result = await self._git_async(*_TRACKING_READ)
+        return parse_tracking_refs(result.stdout) if result.returncode == 0 else None
+
+    def fetch_refspecs(self) -> tuple[str, ...]:
+        """remote.origin.fetch: what a fetch takes from origin, and where it stores it. Unset is no
+        refspec at all; a config git cannot read is answered with the clone's, as before it was asked."""
+        # probe: an unset key exits 1, and that is an answer.
+        return _parsed_refspecs(self._read(*_FETCH_REFSPECS, probe=True))
+
+    async def fetch_refspecs_async(self) -> tuple[str, ...]:
+        return _parsed_refspecs(await self._git_async(*_FETCH_REFSPECS, probe=True))
+
+    def prune_tracking(self, branches: list[str]) -> None:
+        """Delete these remote-tracking refs, as `fetch --prune` would have, without the fetch."""
+        for branch in branches:
+            self._write('update-ref', '-d', f'refs/remotes/origin/{branch}', remote_only=True)
+
+    async def prune_tracking_async(self, branches: list[str]) -> None:
+        for branch in branches:
+            await self._write_async('update-ref', '-d', f'refs/remotes/origin/{branch}', remote_only=True)
+
+    def set_head(self, branch: str) -> None:
+        """Point origin/HEAD at a branch already known to be origin's default. set_head_auto
+        without the round trip to ask; git refuses a branch with no remote-tracking ref."""
+        self._write('remote', 'set-head', 'origin', branch, remote_only=True)
+
+    async def set_head_async(self, branch: str) -> None:
+        await self._write_async('remote', 'set-head', 'origin', branch, remote_only=True)
+
+    async def fetch_async(self) -> GitFailure | None:
+        """fetch() on the event loop; see there for why the result matters and why not --quiet."""
+        self.fetch_ran = True
+        result = await self._write_async('fetch', timeout=self.fetch_timeout, remote_only=True)
+        return None if result.returncode == 0 else self._recorded(('fetch',))
+
+    async def fetch_prune_async(self) -> GitFailure | None:
+        self.fetch_ran = True
+        result = await self._write_async('fetch', '--prune', timeout=self.fetch_timeout, remote_only=True)
+        return None if result.returncode == 0 else self._recorded(('fetch', '--prune'))
+
+    async def set_head_auto_async(self) -> None:
+        """set_head_auto() on the event loop. The remote check is awaited too: has_remote would
+        block the loop on a `git remote` for every repo in flight."""
+        remotes = await self._git_async('remote')
+        if remotes.returncode != 0 or not remotes.stdout.strip():
+            return
+        await self._write_async('remote', 'set-head', 'origin', '--auto', timeout=self.fetch_timeout, remote_only=True)
 
     def pull_rebase(self) -> bool:
-        result = self._git('pull', '--rebase')
+        result = self._write('pull', '--rebase')
         return result.returncode == 0
 
     def rebase_abort(self) -> bool:
-        result = self._git('rebase', '--abort')
+        result = self._write('rebase', '--abort')
         return result.returncode == 0
 
     def merge_ff_only(self, upstream: str) -> tuple[bool, str]:
         """Fast-forward the current branch to its upstream. Fails (never merges) if the
         upstream is not strictly ahead."""
-        result = self._git('merge', '--ff-only', upstream)
+        result = self._write('merge', '--ff-only', upstream)
         return result.returncode == 0, result.stderr.strip()
 
     def merge_ff_only_in(self, worktree: str, upstream: str) -> tuple[bool, str]:
@@ -582,7 +2267,7 @@ class Repo:
         several worktrees. Everything else is identical to merge_ff_only, deliberately: git moves
         the index and the tree with the ref here, which is the whole difference from update_ref.
         """
-        result = self._git('-C', worktree, 'merge', '--ff-only', upstream)
+        result = self._write('-C', worktree, 'merge', '--ff-only', upstream)
         return result.returncode == 0, result.stderr.strip()
 
     def worktree_is_dirty(self, worktree: str) -> bool:
@@ -598,7 +2283,7 @@ class Repo:
 
     def update_ref(self, branch: str, target: str) -> tuple[bool, str]:
         """Advance a (non-current) local branch ref to `target` without a checkout."""
-        result = self._git('update-ref', f'refs/heads/{branch}', target)
+        result = self._write('update-ref', f'refs/heads/{branch}', target)
         return result.returncode == 0, result.stderr.strip()
 
     def push_branch(self, branch: str, set_upstream: bool = False) -> tuple[bool, str]:
@@ -608,14 +2293,14 @@ class Repo:
             args += ['-u', 'origin', branch]
         else:
             args += ['origin', f'{branch}:{branch}']
-        result = self._git(*args)
+        result = self._write(*args)
         return result.returncode == 0, result.stderr.strip()
 
     def delete_local_branch(self, branch: str) -> tuple[bool, str]:
         """Delete a local branch. Uses -D because a GONE branch has no upstream for git's
         own merged-check to consult — safety is enforced upstream by the delete_local guard
         (merged-into-default, not current, not default, clean), not by git's -d heuristic."""
-        result = self._git('branch', '-D', branch)
+        result = self._write('branch', '-D', branch)
         return result.returncode == 0, result.stderr.strip()
 
     @property
@@ -686,20 +2371,28 @@ class Repo:
         if init.returncode != 0:
             self.failures.append(GitFailure(argv=argv, returncode=init.returncode, stderr=init.stderr.strip()))
             return False, init.stderr.strip()
-        added = self._git('remote', 'add', 'origin', self.url)
+        added = self._write('remote', 'add', 'origin', self.url)
         if added.returncode != 0:
             return False, added.stderr.strip()
         # A first fetch downloads what a clone downloads, so it gets a clone's ceiling.
-        fetched = self._git('fetch', '--quiet', 'origin', timeout=self.timeout * CLONE_TIMEOUT_MULTIPLIER)
+        # git 2.48 and later set origin/HEAD as part of this fetch, where `set-head --auto` is a
+        # connection of its own; older ones ignore the key. On the command line and not in
+        # _noninteractive_env, because any remote.origin.* key there makes `git remote` list an
+        # origin in a repo that has none.
+        fetched = self._write(
+            '-c', 'remote.origin.followRemoteHEAD=always', 'fetch', '--quiet', 'origin', timeout=self.timeout * CLONE_TIMEOUT_MULTIPLIER
+        )
         if fetched.returncode != 0:
             return False, fetched.stderr.strip()
-        self.set_head_auto()
+        # Only a git that did not follow the remote's HEAD has to ask for it again.
+        if self.origin_head_written is None:
+            self.set_head_auto()
         branch = self.default_branch
         if branch is None:
             return False, f'fetched {self.url} but could not read which branch is its default'
         # HEAD is unborn, so this creates the branch from origin/<branch>, sets it tracking and
         # populates the tree — and refuses the whole checkout if any tracked path is occupied.
-        checkout = self._git('checkout', branch)
+        checkout = self._write('checkout', branch)
         if checkout.returncode != 0:
             return False, checkout.stderr.strip()
         return True, ''
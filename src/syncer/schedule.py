@@ -0,0 +1,145 @@
+"""Decide which repo starts next. Pure logic: no git, no threads, no console.
+
+`--jobs` caps how many repos are in flight, and on its own it says nothing about *where* they
+are going. Fed in path order, sixteen slots went to whichever host happened to sort first — and a
+corporate Bitbucket that throttles a user at four concurrent SSH sessions answered the other
+twelve with refusals that read as a broken network, while github.com further down the list sat
+idle until they cleared.
+
+So the run is a set of lanes, one per (host, transport), each with an optional cap of its own
+under the global one. Repos are started round-robin across the lanes with room, which is what
+keeps one slow host from holding every slot: its lane fills to its cap and the rest go elsewhere.
+
+The lane key is breaker.host_key, so a host's concurrency is limited in exactly the units its
+failures are counted in — the ssh and https routes to one machine use different credentials and
+are throttled separately, so a cap applies to each of them, not to their sum. Keyed on the URL the
+registry declares, because a lane has to be chosen before the repo is opened: a clone whose origin
+points somewhere else is scheduled as the host the registry names.
+
+The order repos are *offered* in is the other half. Path order put whichever slow monorepo sorted
+last at the end of the run, where it started only once everything else had finished and set the
+wall-clock floor on its own. longest_first orders by each repo's recorded duration instead — the
+classic longest-processing-time rule, which keeps the tail short — and makespan is the same rule
+simulated, so a run can say what it expected to take and what path order would have cost.
+"""
+
+from __future__ import annotations
+
+import heapq
+from collections import Counter
+from collections import deque
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Mapping
+from statistics import median
+
+from syncer.breaker import host_key
+
+# Lane key: a host_key, or None for a URL with no host (a local path), which no cap can name.
+Lane = tuple[str, str] | None
+
+
+class HostScheduler[T]:
+    """Hands out items a lane at a time, within a global limit and any per-host caps.
+
+    The caller starts what ready() returns and calls release() with its lane when each finishes.
+    Not locked: both engines call it from the one thread that dispatches, never from a worker.
+    """
+
+    def __init__(self, items: Iterable[tuple[str, T]], *, limit: int, caps: Mapping[str, int] | None = None) -> None:
+        self._queues: dict[Lane, deque[T]] = {}
+        for url, item in items:
+            self._queues.setdefault(host_key(url), deque()).append(item)
+        # Lanes in first-seen order, rotated past each one that starts something, so the next pick
+        # begins with the lane after it rather than favouring whichever sorts first.
+        self._order: deque[Lane] = deque(self._queues)
+        self._running: Counter[Lane] = Counter()
+        self._limit = max(1, limit)
+        self._caps = dict(caps or {})
+        self._held: set[Lane] = set()
+
+    @property
+    def pending(self) -> int:
+        """Items not yet handed out."""
+        return sum(len(queue) for queue in self._queues.values())
+
+    @property
+    def in_flight(self) -> int:
+        return self._running.total()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @limit.setter
+    def limit(self, value: int) -> None:
+        """Move the global limit mid-run, for `--jobs auto`. A lower limit takes effect as the
+        repos already running finish; nothing in flight is stopped to meet it."""
+        self._limit = max(1, value)
+
+    def cap_for(self, lane: Lane) -> int | None:
+        """This lane's own ceiling, or None when only the global limit applies."""
+        return None if lane is None else self._caps.get(lane[0])
+
+    def hold(self, lanes: Iterable[Lane]) -> None:
+        """Start one item at a time from these lanes until each is opened: the preflight's
+        single-file queue for a host whose probe has not answered."""
+        self._held.update(lanes)
+
+    def open(self, lane: Lane) -> None:
+        """Let a held lane fill to its cap again."""
+        self._held.discard(lane)
+
+    def _has_room(self, lane: Lane) -> bool:
+        if not self._queues[lane]:
+            return False
+        cap = 1 if lane in self._held else self.cap_for(lane)
+        return cap is None or self._running[lane] < cap
+
+    def ready(self) -> list[tuple[Lane, T]]:
+        """Everything that may start now, one lane at a time in rotation."""
+        started: list[tuple[Lane, T]] = []
+        while self.in_flight < self._limit:
+            for _ in range(len(self._order)):
+                lane = self._order[0]
+                self._order.rotate(-1)
+                if self._has_room(lane):
+                    started.append((lane, self._queues[lane].popleft()))
+                    self._running[lane] += 1
+                    break
+            else:
+                break
+        return started
+
+    def release(self, lane: Lane) -> None:
+        """One item from this lane finished, successfully or otherwise."""
+        self._running[lane] -= 1
+
+
+def expectations(paths: Iterable[str], history_ms: Mapping[str, int]) -> dict[str, int]:
+    """Each path's expected duration, with a stand-in for the paths history has never seen.
+
+    The stand-in is the median of the ones it has: a new repo is assumed ordinary, so it neither
+    jumps the queue nor trails it. With no history at all every repo expects 0, and the stable
+    sort in longest_first leaves path order exactly as it was.
+    """
+    default = int(median(history_ms.values())) if history_ms else 0
+    return {path: history_ms.get(path, default) for path in paths}
+
+
+def longest_first[T](items: Iterable[T], expected_ms: Mapping[str, int], *, key: Callable[[T], str]) -> list[T]:
+    """Items ordered by expected duration, longest first, ties left in their original order."""
+    return sorted(items, key=lambda item: expected_ms[key(item)], reverse=True)
+
+
+def makespan(durations_ms: Iterable[int], workers: int) -> int:
+    """How long `workers` slots take to run these durations when each is started, in this order,
+    on whichever slot frees first — what both engines do, before host caps.
+
+    A model, not a replay: per-host caps and the time spent outside the slots are not in it. It
+    is for comparing two orders over the same durations, which those omissions affect alike.
+    """
+    slots = [0] * max(1, workers)
+    for duration in durations_ms:
+        heapq.heapreplace(slots, slots[0] + duration)
+    return max(slots)
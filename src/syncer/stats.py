@@ -9,7 +9,9 @@ from rich.table import Table
 
 from syncer.config import SyncerConfig
 from syncer.output import console
+from syncer.output import time_ago
 from syncer.repos import Repo
+from syncer.tracking import RunSummary
 from syncer.tracking import SyncRunEvent
 from syncer.tracking import find_stale_repos
 from syncer.tracking import read_events
@@ -17,27 +19,6 @@ from syncer.tracking import read_events
 BLOCK_FULL = '\u2588'
 
 
-def _time_ago(dt: datetime) -> str:
-    now = datetime.now(UTC)
-    delta = now - dt
-    minutes = int(delta.total_seconds() / 60)
-    if minutes < 1:
-        return 'just now'
-    if minutes < 60:
-        return f'{minutes}m ago'
-    hours = minutes // 60
-    if hours < 24:
-        return f'{hours}h ago'
-    days = hours // 24
-    if days < 30:
-        return f'{days}d ago'
-    months = days // 30
-    if months < 12:
-        return f'{months}mo ago'
-    years = days // 365
-    return f'{years}y ago'
-
-
 def _format_duration(days: int) -> str:
     if days >= 365:
         years = days // 365
@@ -65,7 +46,7 @@ def _show_summary(events: list[SyncRunEvent]) -> None:
     avg_issues = sum(e.summary.issues for e in recent) / total_runs
 
     console.print(f'  Total runs:     {total_runs}')
-    console.print(f'  Last run:       {_time_ago(last_run.timestamp)}')
+    console.print(f'  Last run:       {time_ago(last_run.timestamp)}')
     console.print(f'  Avg issues:     {avg_issues:.1f} per run')
 
 
@@ -195,8 +176,10 @@ def _show_stale(events: list[SyncRunEvent]) -> None:
 def _show_all_repos(config: SyncerConfig, events: list[SyncRunEvent]) -> None:
     # Build latest status from most recent event
     latest_status: dict[str, str] = {}
-    if events:
-        last_event = max(events, key=lambda e: e.timestamp)
+    # From the last run that fetched: an offline run's `synced` is only synced with a stale copy.
+    verified = [e for e in events if not e.offline]
+    if verified:
+        last_event = max(verified, key=lambda e: e.timestamp)
         for snap in last_event.repos:
             if snap.status == 'synced':
                 latest_status[snap.name] = 'synced'
@@ -233,7 +216,7 @@ def _show_all_repos(config: SyncerConfig, events: list[SyncRunEvent]) -> None:
             if last_date:
                 try:
                     last_dt = datetime.fromisoformat(last_date)
-                    last_active = _time_ago(last_dt)
+                    last_active = time_ago(last_dt)
                 except ValueError:
                     last_active = last_date
             else:
@@ -277,7 +260,46 @@ def _show_recent_runs(events: list[SyncRunEvent]) -> None:
         if event.summary.issues:
             parts.append(f'{event.summary.issues} issues')
         summary = ', '.join(parts)
-        console.print(f'  {date_str}   {summary}')
+        offline = '  [dim](offline)[/dim]' if event.offline else ''
+        console.print(f'  {date_str}   {summary}{offline}')
+
+
+def _seconds(ms: int) -> str:
+    return f'{ms / 1000:.1f}s'
+
+
+def _spawn_share(summary: RunSummary) -> str:
+    spent = (summary.spawn_ms or 0) + (summary.wait_ms or 0)
+    return f'{(summary.spawn_ms or 0) / spent:.0%}' if spent else '0%'
+
+
+def _show_scheduling(events: list[SyncRunEvent]) -> None:
+    """What each recent run took against what its ordering predicted, and what the ordering saved.
+
+    Saved is path order against longest-first over the same run's own durations, both replayed
+    through one model, so the difference is the ordering's and not the model's error.
+    """
+    # Offline runs are timed too, but with no fetches in them there was nothing to schedule.
+    timed = [e for e in events if e.summary.makespan_ms is not None and not e.offline]
+    if not timed:
+        return
+
+    console.print()
+    console.print('  [bold]Scheduling[/bold]')
+    console.print('  ' + '\u2500' * 62)
+
+    for event in sorted(timed, key=lambda e: e.timestamp, reverse=True)[:10]:
+        summary = event.summary
+        parts = [f'took {_seconds(summary.makespan_ms or 0)}']
+        if summary.predicted_ms is not None:
+            parts.append(f'predicted {_seconds(summary.predicted_ms)}')
+        if summary.path_order_ms is not None and summary.longest_first_ms is not None:
+            saved = summary.path_order_ms - summary.longest_first_ms
+            parts.append(f'path order ~{_seconds(summary.path_order_ms)} (saved ~{_seconds(saved)})')
+        if summary.git_calls and summary.makespan_ms:
+            rate = summary.git_calls / (summary.makespan_ms / 1000)
+            parts.append(f'{summary.git_calls} git calls ({rate:.0f}/s, {_spawn_share(summary)} spawning)')
+        console.print(f'  {event.timestamp.strftime("%b %d  %H:%M")}   {" · ".join(parts)}')
 
 
 def show_stats(config: SyncerConfig, events_file: Path) -> None:
@@ -295,4 +317,5 @@ def show_stats(config: SyncerConfig, events_file: Path) -> None:
     _show_stale(events)
     _show_all_repos(config, events)
     _show_recent_runs(events)
+    _show_scheduling(events)
     console.print()
@@ -12,6 +12,7 @@ import time
 from collections import Counter
 from datetime import UTC
 from datetime import datetime
+from datetime import timedelta
 from pathlib import Path
 
 from syncer.config import SyncerConfig
@@ -31,6 +32,7 @@ from syncer.output import emit_json
 from syncer.policy import Action
 from syncer.report import DEFAULT_JITTER_SECONDS
 from syncer.report import DEFAULT_JOBS
+from syncer.report import Engine
 from syncer.report import RepoBranchReport
 from syncer.report import Severity
 from syncer.report import collect_failures
@@ -39,16 +41,23 @@ from syncer.report import hidden_count
 from syncer.report import is_unverified
 from syncer.report import render_failure_summary
 from syncer.report import render_hidden_note
+from syncer.report import render_offline_note
 from syncer.report import render_report
 from syncer.report import report_severity
 from syncer.report import visible_reports
+from syncer.repos import take_spawn_stats
+from syncer.schedule import expectations
+from syncer.schedule import longest_first
+from syncer.schedule import makespan
 from syncer.tracking import BranchSnapshot
 from syncer.tracking import RepoSnapshot
 from syncer.tracking import RepoStatus
 from syncer.tracking import RunSummary
 from syncer.tracking import SyncRunEvent
 from syncer.tracking import emit_event
+from syncer.tracking import expected_durations
 from syncer.tracking import find_stale_repos
+from syncer.tracking import learned_timeouts
 from syncer.tracking import read_events
 
 _LIFECYCLE_TO_STATUS: dict[str, RepoStatus] = {
@@ -127,6 +136,10 @@ def _snapshot(report: RepoBranchReport) -> RepoSnapshot:
         stashes=report.stashes,
         policy=report.policy_name,
         branches=branches,
+        duration_ms=report.duration_ms,
+        fetch_ms=report.fetch_ms,
+        fetch_ran=report.fetch_ran,
+        refs_as_of=report.refs_as_of,
     )
 
 
@@ -147,6 +160,22 @@ def _summary(snapshots: list[RepoSnapshot]) -> RunSummary:
     )
 
 
+def _record_schedule(summary: RunSummary, reports: list[RepoBranchReport], history_ms: dict[str, int], jobs: int) -> None:
+    """Fill in what the ordering was expected to take and what it saved, for `stats`.
+
+    Every figure is a replay through schedule.makespan over `jobs` slots, so they compare with
+    each other and not with makespan_ms exactly — the model has no host caps and no overhead.
+    """
+    paths = [report.path for report in reports]
+    actual = {report.path: report.duration_ms or 0 for report in reports}
+    expected = expectations(paths, history_ms)
+    ordered = longest_first(paths, expected, key=lambda path: path)
+    if history_ms:
+        summary.predicted_ms = makespan((expected[path] for path in ordered), jobs)
+    summary.path_order_ms = makespan((actual[path] for path in sorted(paths)), jobs)
+    summary.longest_first_ms = makespan((actual[path] for path in ordered), jobs)
+
+
 def _print_summary_line(summary: RunSummary) -> None:
     parts = [f'[green]{ICON_OK}  {summary.synced} synced[/green]']
     if summary.cloned:
@@ -180,19 +209,53 @@ def run_sync(
     events_file: Path,
     cli_policy: str | None = None,
     apply: bool = False,
-    jobs: int = DEFAULT_JOBS,
+    jobs: int | None = DEFAULT_JOBS,
     jitter: float = DEFAULT_JITTER_SECONDS,
     as_json: bool = False,
     verbose: bool = False,
+    engine: Engine = Engine.THREADS,
+    offline: bool = False,
+    max_fetch_age: timedelta | None = None,
+    trips_file: Path | None = None,
+    ancestry_file: Path | None = None,
 ) -> list[RepoBranchReport]:
     """Run the full sync and render it. Returns the reports so the caller can set an exit code."""
     start = time.monotonic()
-    reports = gather_reports(config, tool_config, cli_policy, apply, jobs, jitter, include_lifecycle=True, show_progress=not as_json)
+    events = read_events(events_file)
+    history_ms = expected_durations(events)
+    take_spawn_stats()  # whatever ran before this sweep is not its cost
+    reports = gather_reports(
+        config,
+        tool_config,
+        cli_policy,
+        apply,
+        jobs,
+        jitter,
+        include_lifecycle=True,
+        show_progress=not as_json,
+        engine=engine,
+        history_ms=history_ms,
+        fetch_timeouts=learned_timeouts(events, tool_config.git_timeout),
+        offline=offline,
+        max_fetch_age=max_fetch_age,
+        trips_file=trips_file,
+        ancestry_file=ancestry_file,
+    )
+    makespan_ms = int((time.monotonic() - start) * 1000)
+    spawns = take_spawn_stats()
     snapshots = [_snapshot(report) for report in reports]
     summary = _summary(snapshots)
+    summary.makespan_ms = makespan_ms
+    summary.git_calls = spawns.spawns
+    summary.spawn_ms = int(spawns.spawn_seconds * 1000)
+    summary.wait_ms = int(spawns.wait_seconds * 1000)
+    # An adaptive run has no one width to replay at; the default stands in, as the fixed run it replaced.
+    _record_schedule(summary, reports, history_ms, jobs or DEFAULT_JOBS)
 
     if not as_json:
         console.print()
+        if offline:
+            render_offline_note()
         _print_summary_line(summary)
         # The summary line is the count of everything; the rows below it are only the repos with
         # something to say. Which repos are synced is not information — how many are, is.
@@ -209,6 +272,7 @@ def run_sync(
         timestamp=datetime.now(UTC),
         config_name=config.owner,
         dry_run=not apply,
+        offline=offline,
         repos=snapshots,
         summary=summary,
     )
@@ -220,6 +284,7 @@ def run_sync(
         # cannot disagree about what happened.
         emit_json(
             {
+                'offline': offline,
                 'summary': summary.model_dump(),
                 'repos': [snapshot.model_dump() for snapshot in snapshots],
                 'failures': [
@@ -3,8 +3,10 @@ from __future__ import annotations
 from contextlib import suppress
 from datetime import UTC
 from datetime import datetime
+from math import ceil
 from operator import itemgetter
 from pathlib import Path
+from statistics import median
 from typing import Literal
 
 from pydantic import BaseModel
@@ -120,6 +122,18 @@ class RepoSnapshot(BaseModel):
     # Additive per-branch fields (default empty → old events still validate, stats.py unaffected).
     policy: str | None = None
     branches: list[BranchSnapshot] = []
+    # Wall time this repo held a worker slot. None on events written before it was recorded, and
+    # on any repo the run did not time; expected_durations reads it back to order the next run.
+    duration_ms: int | None = None
+    # How long the network stage took, on a repo that reached it; learned_timeouts sizes the next
+    # run's fetch ceiling from it. None on older events, and on a fetch that was reused or skipped.
+    fetch_ms: int | None = None
+    # Whether fetch_ms timed a fetch, or an ls-remote that found origin unchanged and fetched
+    # nothing. False on older events, whose fetch_ms cannot be told apart.
+    fetch_ran: bool = False
+    # When origin's refs were last fetched, for a repo this run did not fetch (offline, or inside
+    # --max-fetch-age); this snapshot's state is as of then.
+    refs_as_of: datetime | None = None
 
 
 class RunSummary(BaseModel):
@@ -137,12 +151,29 @@ class RunSummary(BaseModel):
     # where nothing could be verified is not the same as a run where everything needs a push.
     failed: int = 0
     duration_ms: int
+    # The scheduling record, all defaulted so older events parse. makespan_ms is how long the
+    # repos actually took, end to end, without the rendering duration_ms also covers.
+    # predicted_ms is what history said the order would take; path_order_ms and longest_first_ms
+    # replay this run's own durations through both orders, so their difference is what the
+    # ordering saved, measured in one model rather than a model against a stopwatch.
+    makespan_ms: int | None = None
+    predicted_ms: int | None = None
+    path_order_ms: int | None = None
+    longest_first_ms: int | None = None
+    # What the run's git calls cost, from repos.SpawnStats: how many, and the time summed over
+    # every worker spent starting them and then waiting on them.
+    git_calls: int | None = None
+    spawn_ms: int | None = None
+    wait_ms: int | None = None
 
 
 class SyncRunEvent(BaseModel):
     timestamp: datetime
     config_name: str
     dry_run: bool = False
+    # A `check --offline`: classified against whatever refs were on disk, verified against nothing.
+    # Readers that want the state of origin, or a fetch's duration, skip these.
+    offline: bool = False
     repos: list[RepoSnapshot]
     summary: RunSummary
 
@@ -174,6 +205,73 @@ def read_events(events_file: Path) -> list[SyncRunEvent]:
     return events
 
 
+# How many recent runs a repo's expected duration is drawn from. Enough that one cold-cache fetch
+# does not reorder the next run, few enough that a repo which grew last week is believed this week.
+DURATION_WINDOW = 5
+
+
+def expected_durations(events: list[SyncRunEvent], window: int = DURATION_WINDOW) -> dict[str, int]:
+    """Each repo's typical duration by path: the median of its last `window` recorded runs.
+
+    The median rather than the mean, so one fetch that hit a timeout does not put a repo at the
+    front of the queue for the next five runs.
+    """
+    recent: dict[str, list[int]] = {}
+    # An offline run's durations have no fetch in them, and would put every repo at the back.
+    online = (event for event in events if not event.offline)
+    for event in sorted(online, key=lambda e: e.timestamp, reverse=True):
+        for snap in event.repos:
+            samples = recent.setdefault(snap.path, [])
+            # Likewise a repo whose fetch was reused rather than run: its time is the disk's alone.
+            if snap.duration_ms is not None and snap.refs_as_of is None and len(samples) < window:
+                samples.append(snap.duration_ms)
+    return {path: int(median(samples)) for path, samples in recent.items() if samples}
+
+
+# The learned fetch ceiling: the 95th percentile of a repo's last TIMEOUT_WINDOW fetches, times
+# TIMEOUT_FACTOR, never under TIMEOUT_FLOOR_SECONDS and never over git_timeout. The factor is wide
+# because a fetch after a week away brings a week of objects; the floor because a repo that always
+# fetches in 200ms still shares a network with everything else on the machine.
+TIMEOUT_WINDOW = 20
+TIMEOUT_MIN_SAMPLES = 3
+TIMEOUT_FACTOR = 5
+TIMEOUT_FLOOR_SECONDS = 30
+
+
+def learned_timeouts(events: list[SyncRunEvent], ceiling: int, window: int = TIMEOUT_WINDOW) -> dict[str, int]:
+    """Each repo's fetch timeout by path, in seconds, from its own recorded fetches.
+
+    A repo with fewer than TIMEOUT_MIN_SAMPLES is left out, and so falls back to `ceiling`. So is
+    one whose latest run could not be verified: had a learned timeout cut short a fetch that was
+    legitimately slow, it would fail again every run after, each failure keeping its own time out
+    of the samples — so one failure buys the next run the full ceiling, and a fetch that then
+    succeeds is a sample like any other. Failed fetches are never samples either way: a refused
+    connection is fast, and would talk the timeout down. Nor is a run that stopped at the ls-remote,
+    for the same reason: most runs find nothing new, and their round trips would set the ceiling
+    for the fetch of a large repo that one day does.
+    """
+    recent: dict[str, list[int]] = {}
+    excluded: set[str] = set()
+    online = (event for event in events if not event.offline)
+    for event in sorted(online, key=lambda e: e.timestamp, reverse=True):
+        for snap in event.repos:
+            if snap.path not in recent:
+                recent[snap.path] = []
+                if snap.status == 'unverified':
+                    excluded.add(snap.path)
+            samples = recent[snap.path]
+            if snap.fetch_ms is not None and snap.fetch_ran and snap.status != 'unverified' and len(samples) < window:
+                samples.append(snap.fetch_ms)
+    timeouts = {}
+    for path, samples in recent.items():
+        if path in excluded or len(samples) < TIMEOUT_MIN_SAMPLES:
+            continue
+        # Nearest rank, so the answer is a fetch that really happened.
+        p95 = sorted(samples)[ceil(0.95 * len(samples)) - 1]
+        timeouts[path] = min(ceiling, max(TIMEOUT_FLOOR_SECONDS, ceil(p95 * TIMEOUT_FACTOR / 1000)))
+    return timeouts
+
+
 def find_stale_repos(events: list[SyncRunEvent], threshold_days: int = 3) -> list[tuple[str, int]]:
     """Find repos with uncommitted changes persisting across recent runs.
 
@@ -0,0 +1,98 @@
+"""Breaker verdicts that outlive the run, for long enough to stop the next one repeating them.
+
+The breaker forgets everything when the process exits, so an expired token was rediscovered by
+every run that followed it: five `syncer check`s in a row, each spending `jobs` credential
+attempts to learn what the last one had just printed. A closed host is a fact with a short shelf
+life — a VPN reconnects, a token is renewed — so each trip is written down with an expiry, ten
+minutes for the host-wide causes and two for the flaky ones, and a run that starts inside it treats
+the host as half-open:
+
+- its lane starts one repo at a time, and only a successful fetch opens it;
+- its first recognised failure, at either tier, closes it for the rest of the run.
+
+A host that answers is struck off the file, whatever it said last time. Nothing here ever skips a
+repo on its own account: the repos after a failed probe are skipped because the probe failed
+*this* run, which is what their reports say.
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
+from pathlib import Path
+
+from pydantic import BaseModel
+from pydantic import TypeAdapter
+from pydantic import ValidationError
+
+from syncer.breaker import HOST_WIDE_CAUSES
+from syncer.breaker import HostBreaker
+from syncer.config import STATE_DIR
+from syncer.diagnose import Cause
+
+# How long a closed host stays suspect. The host-wide causes are slow to change by themselves;
+# a refused connection or a timeout is as likely to be gone in a minute as not.
+HOST_WIDE_TRIP_TTL = timedelta(minutes=10)
+FLAKY_TRIP_TTL = timedelta(minutes=2)
+
+
+def trips_file() -> Path:
+    """Where the verdicts live. One file for every registry: a host is a host whichever list named it."""
+    return STATE_DIR / 'trips.json'
+
+
+class StoredTrip(BaseModel):
+    host: str
+    transport: str
+    cause: Cause
+    until: datetime
+
+    @property
+    def key(self) -> tuple[str, str]:
+        """The breaker's key for this host: (host, ssh-or-https)."""
+        return self.host, self.transport
+
+
+_TRIPS = TypeAdapter(list[StoredTrip])
+
+
+def load_trips(path: Path, now: datetime | None = None) -> list[StoredTrip]:
+    """The verdicts that have not expired yet. An unreadable file is no verdicts at all, for the
+    reason read_events skips a bad line: this is a side channel, and the run is what was asked for."""
+    now = now or datetime.now(UTC)
+    try:
+        stored = _TRIPS.validate_json(path.read_bytes())
+    except (OSError, ValidationError):
+        return []
+    return [trip for trip in stored if trip.until > now]
+
+
+def save_trips(path: Path, breaker: HostBreaker, previous: list[StoredTrip], now: datetime | None = None) -> None:
+    """Write what this run learned over what the last one left.
+
+    A host this run closed gets a fresh expiry; one that answered is dropped; one nobody asked
+    keeps the verdict it had. Written whole and renamed into place, so a run reading it mid-write
+    finds the old file or the new one and never half of either.
+    """
+    now = now or datetime.now(UTC)
+    reached = breaker.reached()
+    kept = {trip.key: trip for trip in previous if trip.key not in reached and trip.until > now}
+    for (host, transport), trip in breaker.tripped().items():
+        ttl = HOST_WIDE_TRIP_TTL if trip.cause in HOST_WIDE_CAUSES else FLAKY_TRIP_TTL
+        kept[host, transport] = StoredTrip(host=host, transport=transport, cause=trip.cause, until=now + ttl)
+    if not kept:
+        path.unlink(missing_ok=True)
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f'.{path.name}.{os.getpid()}')
+    partial.write_bytes(_TRIPS.dump_json(list(kept.values()), indent=2))
+    partial.replace(path)
+
+
+def clear_trips(path: Path) -> int:
+    """Forget every verdict, expired or not; returns how many were still in force."""
+    count = len(load_trips(path))
+    path.unlink(missing_ok=True)
+    return count
@@ -27,3 +27,29 @@ def isolate_shared_environment(monkeypatch):
     """
     for name in SHARED_PATH_VARS:
         monkeypatch.delenv(name, raising=False)
+
+
+@pytest.fixture(autouse=True)
+def isolate_state(tmp_path, monkeypatch):
+    """Keep the breaker's persisted verdicts and the ancestry memo in the test's own directory.
+
+    Autouse for the same reason as above, and more so: a test that reaches a dead host on purpose
+    would otherwise leave the real machine's next run treating that host as suspect, and a CLI
+    test with a diverged or gone branch would write its answers into the real ancestry.json.
+    """
+    monkeypatch.setattr('syncer.trips.STATE_DIR', tmp_path / 'state')
+    monkeypatch.setattr('syncer.ancestry.STATE_DIR', tmp_path / 'state')
+
+
+@pytest.fixture(autouse=True)
+def git_cli_reads(monkeypatch):
+    """Answer every read through the git CLI, whether or not pygit2 is installed here.
+
+    The suite spies on, fakes and counts git calls, and a reader that answered some of them in
+    process would make those tests pass or fail by what the machine running them has installed.
+    The commit-graph is set aside for the same reason: whether a test repo has one depends on the
+    machine's gc and fetch settings. The tests of each reader opt back in by setting READ_BACKEND
+    or READ_COMMIT_GRAPH themselves.
+    """
+    monkeypatch.setattr('syncer.repos.READ_BACKEND', 'cli')
+    monkeypatch.setattr('syncer.repos.READ_COMMIT_GRAPH', False)
@@ -0,0 +1,151 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from syncer.ancestry import load_memo
+from syncer.ancestry import save_memo
+from syncer.config import RepoConfig
+from syncer.config import SyncerConfig
+from syncer.config import ToolConfig
+from syncer.report import gather_reports
+from syncer.repos import AncestryMemo
+from syncer.repos import Repo
+
+A = 'a' * 40
+B = 'b' * 40
+
+
+def _git(path: Path, *args: str) -> None:
+    subprocess.run(['git', '-c', 'user.name=t', '-c', 'user.email=t@t', *args], cwd=path, capture_output=True, check=True)
+
+
+class TestTheMemo:
+    def test_the_least_recently_used_answer_goes_first(self):
+        memo = AncestryMemo(limit=2)
+        memo.put(('counts', '/r', A, B), (1, 0))
+        memo.put(('merged', '/r', A, B), True)
+        assert memo.get(('counts', '/r', A, B)) == (1, 0)
+
+        memo.put(('patch', '/r', A, B), False)
+
+        assert [key[0] for key, _ in memo.entries()] == ['counts', 'patch']
+
+    def test_answers_and_their_order_survive_the_file(self, tmp_path):
+        path = tmp_path / 'state' / 'ancestry.json'
+        memo = AncestryMemo()
+        memo.put(('merged', '/r', A, B), False)
+        memo.put(('counts', '/r', B, A), (3, 2))
+
+        save_memo(path, memo)
+
+        assert load_memo(path).entries() == [(('merged', '/r', A, B), False), (('counts', '/r', B, A), (3, 2))]
+
+    def test_an_unreadable_file_is_an_empty_memo(self, tmp_path):
+        path = tmp_path / 'ancestry.json'
+        path.write_text('{not json')
+        assert load_memo(path).entries() == []
+
+    def test_a_run_that_used_nothing_writes_nothing(self, tmp_path):
+        path = tmp_path / 'ancestry.json'
+        save_memo(path, AncestryMemo())
+        assert not path.exists()
+
+    def test_a_run_that_only_read_writes_nothing(self, tmp_path):
+        path = tmp_path / 'ancestry.json'
+        memo = AncestryMemo()
+        memo.put(('merged', '/r', A, B), False)
+        memo.put(('counts', '/r', B, A), (3, 2))
+        save_memo(path, memo)
+        written = path.read_bytes()
+
+        memo = load_memo(path)
+        assert memo.get(('merged', '/r', A, B)) is False
+        save_memo(path, memo)
+
+        assert path.read_bytes() == written
+        memo.put(('patch', '/r', A, B), True)
+        save_memo(path, memo)
+        assert [key[0] for key, _ in load_memo(path).entries()] == ['counts', 'merged', 'patch']
+
+
+@pytest.fixture
+def gone_branch(tmp_path):
+    """A clone whose `topic` has a commit of its own and an upstream deleted from origin."""
+    seed = tmp_path / 'seed'
+    _git(tmp_path, 'init', '-q', '-b', 'main', str(seed))
+    _git(seed, 'commit', '-q', '--allow-empty', '-m', 'init')
+    _git(seed, 'branch', 'topic')
+    bare = tmp_path / 'origin.git'
+    _git(tmp_path, 'clone', '-q', '--bare', str(seed), str(bare))
+    clone = tmp_path / 'clone'
+    _git(tmp_path, 'clone', '-q', str(bare), str(clone))
+    _git(clone, 'switch', '-q', 'topic')
+    _git(clone, 'commit', '-q', '--allow-empty', '-m', 'never pushed')
+    _git(clone, 'switch', '-q', 'main')
+    _git(bare, 'branch', '-D', 'topic')
+    _git(clone, 'fetch', '-q', '--prune')
+    return clone
+
+
+def _spied(monkeypatch) -> list[str]:
+    calls: list[str] = []
+    original = Repo._git
+    monkeypatch.setattr(Repo, '_git', lambda self, *args, **kwargs: calls.append(args[0]) or original(self, *args, **kwargs))
+    return calls
+
+
+class TestRemembered:
+    def test_the_next_run_does_not_ask_again(self, gone_branch, tmp_path, monkeypatch):
+        config = SyncerConfig(owner='o', host='https://github.com', repos=[RepoConfig(name='clone', path=str(gone_branch))])
+        memo_file = tmp_path / 'ancestry.json'
+        calls = _spied(monkeypatch)
+
+        gather_reports(config, ToolConfig(default_policy='observe'), jobs=1, jitter=0.0, ancestry_file=memo_file)
+        assert {'merge-base', 'cherry'} <= set(calls)
+        calls.clear()
+        [report] = gather_reports(config, ToolConfig(default_policy='observe'), jobs=1, jitter=0.0, ancestry_file=memo_file)
+
+        assert {'merge-base', 'cherry'}.isdisjoint(calls)
+        [topic] = [row.state for row in report.rows if row.state.branch == 'topic']
+        assert topic.merged_into_target is False
+
+    def test_a_guard_asks_git_whatever_the_memo_holds(self, gone_branch, monkeypatch):
+        memo = AncestryMemo()
+        repo = Repo(name='clone', path=gone_branch, owner='o', host='https://github.com', memo=memo)
+        assert repo.contains_branch('topic', 'main') is False
+        # An answer no git would give, to show live() never reads it.
+        for key, _ in memo.entries():
+            memo.put(key, True)
+        calls = _spied(monkeypatch)
+
+        with repo.live():
+            assert repo.contains_branch('topic', 'main') is False
+        assert calls == ['merge-base', 'cherry']
+
+    def test_a_branch_that_moved_is_a_new_question(self, gone_branch):
+        memo = AncestryMemo()
+        repo = Repo(name='clone', path=gone_branch, owner='o', host='https://github.com', memo=memo)
+        assert repo.is_merged_into('topic', 'main') is False
+
+        _git(gone_branch, 'merge', '-q', '--no-ff', '-m', 'merge topic', 'topic')
+        _git(gone_branch, 'push', '-q', 'origin', 'main')
+        _git(gone_branch, 'fetch', '-q')
+        repo = Repo(name='clone', path=gone_branch, owner='o', host='https://github.com', memo=memo)
+
+        assert repo.is_merged_into('topic', 'main') is True
+        assert len(memo.entries()) == 2
+
+    def test_git_failing_to_answer_is_not_kept(self, gone_branch):
+        memo = AncestryMemo()
+        repo = Repo(name='clone', path=gone_branch, owner='o', host='https://github.com', memo=memo)
+        assert repo.is_patch_applied_in('topic', 'no-such-branch') is False
+        assert memo.entries() == []
+
+    def test_a_shallow_clone_is_not_remembered(self, gone_branch):
+        """Deepening a shallow clone changes what the same two commits count as."""
+        (gone_branch / '.git' / 'shallow').write_text('')
+        memo = AncestryMemo()
+        repo = Repo(name='clone', path=gone_branch, owner='o', host='https://github.com', memo=memo)
+        assert repo.ahead_behind('topic', 'main') == (1, 0)
+        assert memo.entries() == []
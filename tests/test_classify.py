@@ -1,15 +1,27 @@
+import asyncio
+import os
+import shutil
 import subprocess
+import time
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
+from syncer.classify import HEAD_RECHECK_DAYS
 from syncer.classify import classify_branch
 from syncer.classify import classify_repo
+from syncer.classify import refresh_remote
+from syncer.classify import refresh_remote_async
 from syncer.policy import BUILTIN_POLICIES
+from syncer.policy import BranchState
 from syncer.policy import Policy
 from syncer.policy import PrimaryState
 from syncer.policy import Scope
+from syncer.repos import BranchRef
+from syncer.repos import RemoteRefs
 from syncer.repos import Repo
+from syncer.repos import _pygit2_usable
 
 
 def _git(path: Path, *args: str) -> subprocess.CompletedProcess[str]:
@@ -220,6 +232,82 @@ class TestClassifyRepoScope:
         assert any(s.primary == PrimaryState.DETACHED for s in states)
 
 
+def _spy_git(repo: Repo) -> list[tuple[str, ...]]:
+    calls: list[tuple[str, ...]] = []
+    original = repo._git
+
+    def recording(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    repo._git = recording
+    return calls
+
+
+def _spy_git_async(repo: Repo, calls: list[tuple[str, ...]]) -> None:
+    """_spy_git for the asyncio engine's calls, into the same list."""
+    original = repo._git_async
+
+    async def recording(*args, **kwargs):
+        calls.append(args)
+        return await original(*args, **kwargs)
+
+    repo._git_async = recording
+
+
+class TestBranchSnapshot:
+    def test_one_for_each_ref_reads_every_kind_of_branch(self, cloned_repo, tmp_path):
+        _git(cloned_repo, 'checkout', '-b', 'feature/ahead')
+        _commit(cloned_repo, 'ahead.py', 'ahead')
+        _git(cloned_repo, 'push', '-u', 'origin', 'feature/ahead')
+        _commit(cloned_repo, 'ahead2.py', 'ahead again')
+        _git(cloned_repo, 'checkout', '-b', 'feature/gone')
+        _git(cloned_repo, 'push', '-u', 'origin', 'feature/gone')
+        _git(cloned_repo, 'push', 'origin', '--delete', 'feature/gone')
+        _git(cloned_repo, 'checkout', '-b', 'feature/local-only')
+        _git(cloned_repo, 'checkout', 'main')
+        _second_clone_pushes(tmp_path)
+        repo = _make_repo(cloned_repo)
+        repo.fetch_prune()
+
+        refs = repo.branch_refs()
+
+        assert list(refs) == ['feature/ahead', 'feature/gone', 'feature/local-only', 'main']
+        assert refs['feature/ahead'].counts == (1, 0)
+        assert refs['feature/gone'].gone is True
+        assert refs['feature/local-only'].upstream == ''
+        assert refs['main'].counts == (0, 1)
+        assert refs['main'].oid == _git(cloned_repo, 'rev-parse', 'main').stdout.strip()
+
+    def test_classify_repo_spawns_no_per_branch_reads(self, cloned_repo):
+        """The point of the snapshot: a hundred tracked branches used to be two hundred spawns."""
+        for index in range(5):
+            _git(cloned_repo, 'checkout', '-b', f'feature/{index}')
+            _git(cloned_repo, 'push', '-u', 'origin', f'feature/{index}')
+        _git(cloned_repo, 'checkout', 'main')
+        repo = _make_repo(cloned_repo)
+        calls = _spy_git(repo)
+
+        states = classify_repo(repo, Policy(name='p', scope=Scope.TRACKED), fetched=True)
+
+        assert len(states) == 6
+        assert [args[0] for args in calls].count('for-each-ref') == 1
+        assert not any(args[0] == 'rev-list' for args in calls)
+
+    def test_counts_git_printed_illegibly_are_measured_on_their_own(self, cloned_repo):
+        """git translates the words in %(upstream:track). An unreadable count is re-measured,
+        never read as the (0, 0) that would classify the branch SYNCED."""
+        _commit(cloned_repo, 'feature.py', 'feat')
+        repo = _make_repo(cloned_repo)
+        oid = _git(cloned_repo, 'rev-parse', 'main').stdout.strip()
+        refs = {'main': BranchRef(name='main', oid=oid, upstream='origin/main', gone=False, counts=None)}
+
+        state = classify_branch(repo, 'main', default='main', current='main', dirty_current=False, stashed=False, refs=refs)
+
+        assert state.primary == PrimaryState.AHEAD
+        assert state.ahead == 1
+
+
 class TestClassifyRepoRemediation:
     def test_stale_origin_head_repointed_after_rename(self, cloned_repo, tmp_path):
         """The original incident: origin/HEAD points at a renamed-away default. classify_repo
@@ -276,3 +364,248 @@ class TestClassifyRepoRemediation:
         assert by_branch['master'].primary == PrimaryState.GONE
         assert by_branch['main'].primary == PrimaryState.BEHIND
         assert by_branch['main'].is_default is True
+
+
+class TestRefreshRemoteAsksFirst:
+    """Most days nothing on origin has moved, and a fetch that finds as much still negotiates."""
+
+    @staticmethod
+    def _refresh(repo: Repo, policy: Policy, engine: str) -> object:
+        if engine == 'async':
+            return asyncio.run(refresh_remote_async(repo, policy))
+        return refresh_remote(repo, policy)
+
+    @pytest.mark.parametrize('engine', ['threads', 'async'])
+    def test_an_unchanged_origin_is_not_fetched(self, cloned_repo, engine):
+        repo = _make_repo(cloned_repo)
+        refresh_remote(repo, BUILTIN_POLICIES['standard'])  # the fixture's empty clone has no origin/HEAD yet
+        calls = _spy_git(repo)
+        _spy_git_async(repo, calls)
+
+        assert self._refresh(repo, BUILTIN_POLICIES['standard'], engine) is None
+
+        assert [args[0] for args in calls] == ['ls-remote', 'for-each-ref']
+
+    @pytest.mark.parametrize('engine', ['threads', 'async'])
+    def test_a_moved_branch_is_fetched(self, cloned_repo, tmp_path, engine):
+        _second_clone_pushes(tmp_path)
+        repo = _make_repo(cloned_repo)
+
+        assert self._refresh(repo, BUILTIN_POLICIES['standard'], engine) is None
+
+        assert _classify_main(repo).primary == PrimaryState.BEHIND
+
+    @pytest.mark.parametrize('engine', ['threads', 'async'])
+    def test_a_deleted_branch_is_pruned_without_a_fetch(self, cloned_repo, tmp_path, engine):
+        _git(cloned_repo, 'push', 'origin', 'main:feature')
+        _git(cloned_repo, 'fetch')
+        _git(tmp_path / 'remote.git', 'branch', '-D', 'feature')
+        repo = _make_repo(cloned_repo)
+        calls = _spy_git(repo)
+        _spy_git_async(repo, calls)
+
+        self._refresh(repo, BUILTIN_POLICIES['standard'], engine)
+
+        assert 'fetch' not in [args[0] for args in calls]
+        assert _git(cloned_repo, 'rev-parse', '--verify', 'refs/remotes/origin/feature').returncode != 0
+
+    def test_a_policy_that_does_not_prune_keeps_the_ref(self, cloned_repo, tmp_path):
+        _git(cloned_repo, 'push', 'origin', 'main:feature')
+        _git(cloned_repo, 'fetch')
+        _git(tmp_path / 'remote.git', 'branch', '-D', 'feature')
+        repo = _make_repo(cloned_repo)
+
+        refresh_remote(repo, Policy(name='p', prune=False))
+
+        assert _git(cloned_repo, 'rev-parse', '--verify', 'refs/remotes/origin/feature').returncode == 0
+
+    def test_a_renamed_default_is_repointed_from_the_listing(self, cloned_repo, tmp_path):
+        _git(cloned_repo, 'push', 'origin', 'main:trunk')
+        _git(cloned_repo, 'fetch')
+        _git(tmp_path / 'remote.git', 'symbolic-ref', 'HEAD', 'refs/heads/trunk')
+        repo = _make_repo(cloned_repo)
+        calls = _spy_git(repo)
+
+        refresh_remote(repo, BUILTIN_POLICIES['standard'])
+
+        assert repo.default_branch == 'trunk'
+        assert ('remote', 'set-head', 'origin', 'trunk') in calls
+
+    @staticmethod
+    def _single_branch_clone(cloned_repo: Path, tmp_path: Path, branch: str) -> Path:
+        """A `--single-branch` clone of `branch`, from an origin that also has `other`."""
+        _git(cloned_repo, 'push', 'origin', 'main:other')
+        clone = tmp_path / 'single'
+        subprocess.run(['git', 'clone', '--single-branch', '-b', branch, str(tmp_path / 'remote.git'), str(clone)], capture_output=True)
+        return clone
+
+    @pytest.mark.parametrize('engine', ['threads', 'async'])
+    def test_a_single_branch_clone_is_not_fetched_for_what_it_leaves_out(self, cloned_repo, tmp_path, engine):
+        repo = _make_repo(self._single_branch_clone(cloned_repo, tmp_path, 'main'))
+        calls = _spy_git(repo)
+        _spy_git_async(repo, calls)
+
+        assert self._refresh(repo, BUILTIN_POLICIES['standard'], engine) is None
+
+        assert [args[0] for args in calls] == ['ls-remote', 'for-each-ref', 'config']
+        assert repo.failures == []
+
+    @pytest.mark.parametrize('engine', ['threads', 'async'])
+    def test_a_default_the_clone_does_not_track_is_left_alone(self, cloned_repo, tmp_path, engine):
+        """set-head refuses a branch with no tracking ref, and would on every run."""
+        repo = _make_repo(self._single_branch_clone(cloned_repo, tmp_path, 'other'))
+        calls = _spy_git(repo)
+        _spy_git_async(repo, calls)
+
+        assert self._refresh(repo, BUILTIN_POLICIES['standard'], engine) is None
+
+        assert 'remote' not in [args[0] for args in calls]
+        assert repo.failures == []
+
+    def test_an_unreachable_origin_is_the_failure(self, cloned_repo, tmp_path):
+        shutil.rmtree(tmp_path / 'remote.git')
+        failure = refresh_remote(_make_repo(cloned_repo), BUILTIN_POLICIES['standard'])
+        assert failure is not None
+        assert failure.argv[0] == 'ls-remote'
+
+
+class TestOriginHeadWithoutASymref:
+    """A server that lists no default leaves set-head --auto to guess, at a connection a time."""
+
+    @staticmethod
+    def _refresh_unnamed(cloned_repo: Path) -> list[tuple[str, ...]]:
+        repo = _make_repo(cloned_repo)
+        listing = repo.ls_remote()
+        calls = _spy_git(repo)
+        with patch.object(repo, 'ls_remote', return_value=RemoteRefs(heads=listing.heads, default=None)):
+            refresh_remote(repo, BUILTIN_POLICIES['standard'])
+        return calls
+
+    def test_a_recent_guess_is_not_remade(self, cloned_repo):
+        _git(cloned_repo, 'remote', 'set-head', 'origin', 'main')
+        assert ('remote', 'set-head', 'origin', '--auto') not in self._refresh_unnamed(cloned_repo)
+
+    def test_a_guess_naming_a_deleted_branch_is_remade(self, cloned_repo):
+        """The renamed default: origin/HEAD still names the branch the rename removed."""
+        _git(cloned_repo, 'symbolic-ref', 'refs/remotes/origin/HEAD', 'refs/remotes/origin/master')
+        assert ('remote', 'set-head', 'origin', '--auto') in self._refresh_unnamed(cloned_repo)
+
+    def test_an_old_guess_is_remade(self, cloned_repo):
+        _git(cloned_repo, 'remote', 'set-head', 'origin', 'main')
+        stale = time.time() - (HEAD_RECHECK_DAYS + 1) * 86400
+        os.utime(cloned_repo / '.git' / 'refs' / 'remotes' / 'origin' / 'HEAD', (stale, stale))
+        assert ('remote', 'set-head', 'origin', '--auto') in self._refresh_unnamed(cloned_repo)
+
+
+needs_pygit2 = pytest.mark.skipif(not _pygit2_usable(), reason='pygit2 1.14 or later is not installed')
+
+
+def _by_each_reader(path: Path, policy: Policy, monkeypatch) -> dict[str, tuple[list[BranchState], Repo]]:
+    """classify_repo over one clone twice, through the git CLI and through libgit2."""
+    classified = {}
+    for backend in ('cli', 'libgit2'):
+        monkeypatch.setattr('syncer.repos.READ_BACKEND', backend)
+        repo = _make_repo(path)
+        classified[backend] = classify_repo(repo, policy, fetched=True), repo
+    return classified
+
+
+@pytest.fixture
+def every_kind_of_branch(cloned_repo, tmp_path):
+    """A clone holding one branch of every state classify tells apart, some refs packed and some
+    loose, a linked worktree with an edit in it, a stash, and a tree with changes of each kind."""
+    _git(cloned_repo, 'checkout', '-b', 'feature/ahead')
+    _commit(cloned_repo, 'ahead.py', 'ahead')
+    _git(cloned_repo, 'push', '-u', 'origin', 'feature/ahead')
+    _commit(cloned_repo, 'ahead2.py', 'ahead again')
+    _git(cloned_repo, 'checkout', '-b', 'feature/gone', 'main')
+    _commit(cloned_repo, 'gone.py', 'gone')
+    _git(cloned_repo, 'push', '-u', 'origin', 'feature/gone')
+    _git(cloned_repo, 'checkout', '-b', 'feature/merged', 'main')
+    _git(cloned_repo, 'push', '-u', 'origin', 'feature/merged')
+    _git(cloned_repo, 'checkout', '-b', 'diverged', 'main')
+    _git(cloned_repo, 'push', '-u', 'origin', 'diverged')
+    _git(cloned_repo, 'checkout', '-b', 'synced', 'main')
+    _git(cloned_repo, 'push', '-u', 'origin', 'synced')
+    _git(cloned_repo, 'checkout', '-b', 'local-only', 'main')
+    _git(cloned_repo, 'branch', '--track', 'tracks-local', 'main')
+    _git(cloned_repo, 'branch', 'worktree-held', 'main')
+    _git(cloned_repo, 'push', 'origin', '--delete', 'feature/gone', 'feature/merged')
+    _git(cloned_repo, 'pack-refs', '--all')
+
+    second = tmp_path / 'second'
+    subprocess.run(['git', 'clone', str(tmp_path / 'remote.git'), str(second)], capture_output=True)
+    _git(second, 'config', 'user.email', 'test@test.com')
+    _git(second, 'config', 'user.name', 'Test')
+    for branch in ('main', 'diverged'):
+        _git(second, 'checkout', branch)
+        _commit(second, f'{branch}-remote.txt', 'remote change')
+        _git(second, 'push', 'origin', branch)
+    _git(cloned_repo, 'checkout', 'diverged')
+    _commit(cloned_repo, 'diverged.py', 'local change')
+    _git(cloned_repo, 'checkout', 'main')
+    _git(cloned_repo, 'fetch', '--prune')
+
+    linked = tmp_path / 'linked'
+    _git(cloned_repo, 'worktree', 'add', str(linked), 'worktree-held')
+    (linked / 'README.md').write_text('# edited in the worktree\n')
+    (cloned_repo / 'stashed.txt').write_text('stashed\n')
+    _git(cloned_repo, 'stash', '--include-untracked')
+    return cloned_repo
+
+
+def _dirty(path: Path) -> None:
+    (path / 'README.md').write_text('# modified\n')
+    (path / 'staged.py').write_text('staged\n')
+    _git(path, 'add', 'staged.py')
+    (path / 'untracked' / 'deep').mkdir(parents=True)
+    (path / 'untracked' / 'deep' / 'file.txt').write_text('untracked\n')
+    (path / '.gitignore').write_text('*.log\n')
+    (path / 'ignored.log').write_text('ignored\n')
+
+
+@needs_pygit2
+class TestReadBackendsAgree:
+    """libgit2 stands in for the git CLI only where it gives the same answer, so the two are run
+    over the same clones and every BranchState they produce has to match, field for field."""
+
+    @pytest.mark.parametrize('scope', list(Scope))
+    def test_every_branch_state_matches(self, every_kind_of_branch, monkeypatch, scope):
+        classified = _by_each_reader(every_kind_of_branch, Policy(name='p', scope=scope), monkeypatch)
+        assert classified['libgit2'][0] == classified['cli'][0]
+
+    def test_the_states_compared_are_every_kind(self, every_kind_of_branch, monkeypatch):
+        states = _by_each_reader(every_kind_of_branch, BUILTIN_POLICIES['observe'], monkeypatch)['libgit2'][0]
+        primaries = {state.branch: state.primary for state in states}
+        assert primaries['feature/ahead'] is PrimaryState.AHEAD
+        assert primaries['main'] is PrimaryState.BEHIND
+        assert primaries['diverged'] is PrimaryState.DIVERGED
+        assert primaries['synced'] is PrimaryState.SYNCED
+        assert primaries['local-only'] is PrimaryState.NO_UPSTREAM
+        assert primaries['feature/gone'] is PrimaryState.GONE
+        merged = {state.branch: state.merged_into_target for state in states if state.primary is PrimaryState.GONE}
+        assert merged == {'feature/gone': False, 'feature/merged': True}
+        assert any(state.worktree_dirty for state in states)
+        assert all(state.stashed for state in states)
+
+    def test_a_dirty_tree_matches(self, every_kind_of_branch, monkeypatch):
+        _dirty(every_kind_of_branch)
+        classified = _by_each_reader(every_kind_of_branch, BUILTIN_POLICIES['observe'], monkeypatch)
+        assert classified['libgit2'][0] == classified['cli'][0]
+        assert any(state.dirty for state in classified['libgit2'][0])
+        counts = {backend: (len(repo.uncommitted_changes), repo.stash_count) for backend, (_, repo) in classified.items()}
+        assert counts['libgit2'] == counts['cli']
+
+    def test_a_detached_head_matches(self, every_kind_of_branch, monkeypatch):
+        _git(every_kind_of_branch, 'checkout', '--detach', 'feature/ahead')
+        classified = _by_each_reader(every_kind_of_branch, BUILTIN_POLICIES['observe'], monkeypatch)
+        assert classified['libgit2'][0] == classified['cli'][0]
+        assert classified['libgit2'][0][-1].primary is PrimaryState.DETACHED
+
+    def test_libgit2_answered_rather_than_deferring(self, every_kind_of_branch, monkeypatch):
+        """Otherwise the comparisons above would be the CLI against itself."""
+        monkeypatch.setattr('syncer.repos.READ_BACKEND', 'libgit2')
+        repo = _make_repo(every_kind_of_branch)
+        calls = _spy_git(repo)
+        classify_repo(repo, BUILTIN_POLICIES['observe'], fetched=True)
+        assert not {args[0] for args in calls} & {'for-each-ref', 'status', 'rev-list', 'merge-base'}
@@ -0,0 +1,156 @@
+import itertools
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from syncer import commitgraph
+from syncer.commitgraph import CommitGraph
+from syncer.commitgraph import GraphMiss
+
+
+def _git(path: Path, *args: str) -> str:
+    result = subprocess.run(['git', *args], cwd=path, capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+def _commit(path: Path, message: str) -> None:
+    _git(path, 'commit', '--allow-empty', '-q', '-m', message)
+
+
+def _init(path: Path, *flags: str) -> Path:
+    path.mkdir()
+    _git(path, 'init', '-q', '-b', 'main', *flags)
+    _git(path, 'config', 'user.email', 'test@test.com')
+    _git(path, 'config', 'user.name', 'Test')
+    _git(path, 'config', 'gc.auto', '0')
+    return path
+
+
+def _tangle(path: Path, prefix: str = '') -> None:
+    """Branches that fork, merge back, cross-merge and meet in an octopus, on top of main."""
+    _commit(path, f'{prefix}base')
+    for name in ('a', 'b', 'c'):
+        _git(path, 'switch', '-q', '-c', f'{prefix}{name}', 'main')
+        for index in range(3):
+            _commit(path, f'{prefix}{name}{index}')
+    _git(path, 'switch', '-q', 'main')
+    _commit(path, f'{prefix}main-only')
+    _git(path, 'merge', '-q', '--no-ff', '-m', f'{prefix}merge a', f'{prefix}a')
+    # Criss-cross: b takes c, c takes b's tip from before that, so the two have two merge bases.
+    _git(path, 'switch', '-q', f'{prefix}c')
+    _git(path, 'merge', '-q', '--no-ff', '-m', f'{prefix}c takes b', f'{prefix}b')
+    _git(path, 'switch', '-q', f'{prefix}b')
+    _git(path, 'merge', '-q', '--no-ff', '-m', f'{prefix}b takes c', f'{prefix}c~1')
+    _commit(path, f'{prefix}b after')
+    _git(path, 'switch', '-q', 'main')
+    _git(path, 'switch', '-q', '-c', f'{prefix}d')
+    _commit(path, f'{prefix}d0')
+    _git(path, 'switch', '-q', 'main')
+    _git(path, 'merge', '-q', '--no-ff', '-m', f'{prefix}octopus', f'{prefix}b', f'{prefix}c', f'{prefix}d')
+    _commit(path, f'{prefix}after octopus')
+
+
+def _rev_list_counts(path: Path, left: str, right: str) -> tuple[int, int]:
+    ahead, behind = _git(path, 'rev-list', '--left-right', '--count', f'{left}...{right}').split()
+    return int(ahead), int(behind)
+
+
+def _is_ancestor(path: Path, ancestor: str, descendant: str) -> bool:
+    return subprocess.run(['git', 'merge-base', '--is-ancestor', ancestor, descendant], cwd=path).returncode == 0
+
+
+def _assert_agrees_with_git(path: Path, graph: CommitGraph) -> None:
+    """Every pair of branch tips, and a spread of commits inside the tangle, both ways round."""
+    tips = _git(path, 'for-each-ref', '--format=%(objectname)', 'refs/heads').split()
+    every = _git(path, 'rev-list', '--all').split()
+    commits = sorted(set(tips) | set(every[::3]))
+    for left, right in itertools.product(commits, repeat=2):
+        assert graph.ahead_behind(left, right) == _rev_list_counts(path, left, right), (left, right)
+        assert graph.is_ancestor(left, right) is _is_ancestor(path, left, right), (left, right)
+
+
+@pytest.fixture
+def tangled(tmp_path):
+    path = _init(tmp_path / 'tangled')
+    _tangle(path)
+    return path
+
+
+class TestAgreesWithGit:
+    def test_a_single_graph_file(self, tangled):
+        _git(tangled, 'commit-graph', 'write', '--reachable')
+
+        graph = CommitGraph.open(tangled / '.git')
+
+        assert graph is not None
+        _assert_agrees_with_git(tangled, graph)
+
+    def test_a_split_chain(self, tangled):
+        """The second layer's parent fields point into the first, by position in the whole chain."""
+        _git(tangled, 'commit-graph', 'write', '--reachable', '--split')
+        _tangle(tangled, prefix='more-')
+        _git(tangled, 'commit-graph', 'write', '--reachable', '--split=no-merge')
+        chain = tangled / '.git' / 'objects' / 'info' / 'commit-graphs' / 'commit-graph-chain'
+        assert len(chain.read_text().split()) == 2
+
+        graph = CommitGraph.open(tangled / '.git')
+
+        assert graph is not None
+        _assert_agrees_with_git(tangled, graph)
+
+    def test_sha256_object_ids(self, tmp_path):
+        path = _init(tmp_path / 'sha256', '--object-format=sha256')
+        _tangle(path)
+        _git(path, 'commit-graph', 'write', '--reachable')
+
+        graph = CommitGraph.open(path / '.git')
+
+        assert graph is not None
+        _assert_agrees_with_git(path, graph)
+
+
+class TestStepsAside:
+    def test_a_commit_made_since_the_graph_was_written(self, tangled):
+        _git(tangled, 'commit-graph', 'write', '--reachable')
+        _commit(tangled, 'newer than the graph')
+        graph = CommitGraph.open(tangled / '.git')
+
+        with pytest.raises(GraphMiss):
+            graph.ahead_behind(_git(tangled, 'rev-parse', 'main'), _git(tangled, 'rev-parse', 'a'))
+
+    def test_no_graph_at_all(self, tangled):
+        assert CommitGraph.open(tangled / '.git') is None
+
+    @pytest.mark.parametrize('rewrite', ['replace', 'graft', 'shallow'])
+    def test_a_repo_whose_parents_git_reads_elsewhere(self, tangled, rewrite):
+        """git sets the graph aside when a commit's parents are not the ones it records."""
+        _git(tangled, 'commit-graph', 'write', '--reachable')
+        head = _git(tangled, 'rev-parse', 'main')
+        if rewrite == 'replace':
+            _git(tangled, 'replace', '--graft', head)
+        elif rewrite == 'graft':
+            (tangled / '.git' / 'info').mkdir(exist_ok=True)
+            (tangled / '.git' / 'info' / 'grafts').write_text(f'{head}\n')
+        else:
+            (tangled / '.git' / 'shallow').write_text(f'{head}\n')
+
+        assert CommitGraph.open(tangled / '.git') is None
+
+    def test_a_walk_too_long_to_be_worth_it(self, tangled, monkeypatch):
+        _git(tangled, 'commit-graph', 'write', '--reachable')
+        graph = CommitGraph.open(tangled / '.git')
+        monkeypatch.setattr(commitgraph, 'WALK_LIMIT', 2)
+
+        with pytest.raises(GraphMiss):
+            graph.ahead_behind(_git(tangled, 'rev-parse', 'main'), _git(tangled, 'rev-parse', 'a~2'))
+
+    def test_a_chain_that_disagrees_with_itself(self, tangled):
+        """A layer naming bases other than the ones below it is where git stops reading the chain."""
+        _git(tangled, 'commit-graph', 'write', '--reachable', '--split')
+        _tangle(tangled, prefix='more-')
+        _git(tangled, 'commit-graph', 'write', '--reachable', '--split=no-merge')
+        chain = tangled / '.git' / 'objects' / 'info' / 'commit-graphs' / 'commit-graph-chain'
+        chain.write_text(chain.read_text().split()[1] + '\n')
+
+        assert CommitGraph.open(tangled / '.git') is None
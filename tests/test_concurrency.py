@@ -0,0 +1,104 @@
+import resource
+
+import pytest
+
+from syncer.concurrency import AUTO_MAX_JOBS
+from syncer.concurrency import FDS_PER_CHILD
+from syncer.concurrency import RESERVED_FDS
+from syncer.concurrency import AimdController
+from syncer.concurrency import fd_ceiling
+from syncer.diagnose import Cause
+
+
+def _settle(controller: AimdController, latency_ms: int, rounds: int) -> int:
+    for _ in range(rounds):
+        controller.observe(latency_ms)
+    return controller.limit
+
+
+class TestTheWidthGrowsWhileLatencyHolds:
+    def test_it_starts_where_it_is_told(self):
+        assert AimdController(start=4).limit == 4
+
+    def test_one_slot_per_round_of_flat_fetches(self):
+        """A round is one observation per slot: growing on every fetch would double the width
+        per round, which is the multiplicative half of the rule on the wrong side."""
+        controller = AimdController(start=4)
+        assert _settle(controller, 100, 3) == 4
+        assert _settle(controller, 100, 1) == 5
+        assert _settle(controller, 100, 5) == 6
+
+    def test_it_stops_at_the_ceiling(self):
+        controller = AimdController(start=2, ceiling=3)
+        assert _settle(controller, 100, 50) == 3
+
+    def test_a_start_above_the_ceiling_is_clamped(self):
+        assert AimdController(start=8, ceiling=2).limit == 2
+
+    def test_a_repo_that_never_fetched_is_not_a_measurement(self):
+        controller = AimdController(start=2)
+        assert _settle(controller, None, 20) == 2
+
+    def test_an_answer_without_a_fetch_grows_it_but_sets_no_baseline(self):
+        """Most runs only ask origin, and a fetch after a round of those is not inflation."""
+        controller = AimdController(start=2)
+        for _ in range(2):
+            controller.observe(40, fetched=False)
+        assert controller.limit == 3
+        assert _settle(controller, 2000, 3) == 4
+
+
+class TestTheWidthHalvesUnderCongestion:
+    @pytest.mark.parametrize('cause', [Cause.NETWORK, Cause.TIMEOUT])
+    def test_a_congestion_failure_halves_it(self, cause):
+        controller = AimdController(start=8)
+        assert controller.observe(None, cause) == 4
+
+    @pytest.mark.parametrize('cause', [Cause.AUTH, Cause.HOST_KEY, None])
+    def test_a_failure_that_names_no_load_is_ignored(self, cause):
+        """A rejected key is wrong at any width; narrowing for it only slows the rest of the run."""
+        controller = AimdController(start=8)
+        assert controller.observe(None, cause) == 8
+
+    def test_inflated_latency_halves_it(self):
+        controller = AimdController(start=8)
+        _settle(controller, 100, 4)
+        assert _settle(controller, 2000, 3) == 4
+
+    def test_one_large_repo_is_not_inflation(self):
+        """Smoothed, so a single slow fetch moves the average without crossing the line."""
+        controller = AimdController(start=8)
+        _settle(controller, 100, 4)
+        assert controller.observe(250) == 8
+
+    def test_the_fetches_in_flight_at_a_cut_do_not_cut_again(self):
+        """They were started at the old width and all report the same congestion; answering each
+        would take the width to one on the strength of a single event."""
+        controller = AimdController(start=16)
+        for _ in range(8):
+            controller.observe(None, Cause.TIMEOUT)
+        assert controller.limit == 8
+
+    def test_a_cut_after_the_cooldown_lands(self):
+        controller = AimdController(start=16)
+        controller.observe(None, Cause.TIMEOUT)
+        _settle(controller, None, 16)
+        assert controller.observe(None, Cause.TIMEOUT) == 4
+
+    def test_it_never_goes_below_one(self):
+        controller = AimdController(start=1)
+        assert controller.observe(None, Cause.NETWORK) == 1
+
+
+class TestTheCeilingLeavesDescriptorsToSpare:
+    def test_three_pipe_ends_per_child_after_the_reserve(self, monkeypatch):
+        monkeypatch.setattr(resource, 'getrlimit', lambda _: (256, 1024))
+        assert fd_ceiling() == (256 - RESERVED_FDS) // FDS_PER_CHILD
+
+    def test_a_tiny_limit_still_allows_one(self, monkeypatch):
+        monkeypatch.setattr(resource, 'getrlimit', lambda _: (16, 16))
+        assert fd_ceiling() == 1
+
+    def test_no_limit_leaves_the_configured_maximum(self, monkeypatch):
+        monkeypatch.setattr(resource, 'getrlimit', lambda _: (resource.RLIM_INFINITY, resource.RLIM_INFINITY))
+        assert fd_ceiling() == AUTO_MAX_JOBS
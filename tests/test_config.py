@@ -1,5 +1,6 @@
 import json
 import tomllib
+from datetime import timedelta
 from pathlib import Path
 
 import pytest
@@ -135,6 +136,38 @@ class TestLoadToolConfig:
         loaded = load_tool_config()
         assert loaded.repo_overrides == {'shared-repo': 'observe'}
 
+    def test_parses_host_limits(self, tool_config):
+        tool_config.write_text('[hosts."bitbucket.example.com"]\nmax_concurrent = 4\n[hosts."github.com"]\n')
+        loaded = load_tool_config()
+        assert loaded.hosts['bitbucket.example.com'].max_concurrent == 4
+        assert loaded.host_caps() == {'bitbucket.example.com': 4}
+
+    def test_an_unknown_host_key_is_refused(self):
+        """A wrong name dropped in silence would be a throttle that reads as applied and never is."""
+        with pytest.raises(ConfigError) as exc:
+            parse_tool_config(tomllib.loads('[hosts."bitbucket.example.com"]\nmax_connections = 4\n'))
+        assert exc.value.problems == ["hosts.bitbucket.example.com: unknown key 'max_connections'"]
+
+    def test_a_host_cap_below_one_is_refused(self):
+        with pytest.raises(ConfigError) as exc:
+            parse_tool_config(tomllib.loads('[hosts."bitbucket.example.com"]\nmax_concurrent = 0\n'))
+        assert any('max_concurrent' in line for line in exc.value.problems)
+
+    @pytest.mark.parametrize(
+        ('raw', 'expected'),
+        [('10m', timedelta(minutes=10)), ('90s', timedelta(seconds=90)), ('2h', timedelta(hours=2)), (600, timedelta(minutes=10))],
+    )
+    def test_parses_a_fetch_age(self, raw, expected):
+        assert parse_tool_config({'max_fetch_age': raw}).max_fetch_age == expected
+
+    def test_no_fetch_age_fetches_every_time(self):
+        assert parse_tool_config({}).max_fetch_age is None
+
+    def test_a_fetch_age_without_a_number_is_refused(self):
+        with pytest.raises(ConfigError) as exc:
+            parse_tool_config({'max_fetch_age': 'ten minutes'})
+        assert exc.value.problems[0].startswith('max_fetch_age: expected a number and a unit')
+
 
 class TestResolveCloneUrl:
     """The default '{host}/{owner}/{name}' cannot express every host: scp-style SSH has no
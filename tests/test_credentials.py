@@ -0,0 +1,170 @@
+import base64
+import subprocess
+import tempfile
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from syncer.breaker import HostBreaker
+from syncer.config import RepoConfig
+from syncer.config import SyncerConfig
+from syncer.config import ToolConfig
+from syncer.credentials import Context
+from syncer.credentials import credential_cache
+from syncer.credentials import credential_context
+from syncer.diagnose import Cause
+from syncer.diagnose import classify_failure
+from syncer.report import gather_reports
+from syncer.repos import GitFailure
+from syncer.repos import Repo
+from syncer.repos import _noninteractive_env
+
+# Stands in for libsecret: logs every action git asks of it, and answers `get` with whatever
+# password $FAKE_PASSWORD names, or with nothing when it is unset.
+FAKE_HELPER = """\
+#!/bin/sh
+echo "$1" >> "$FAKE_HELPER_LOG"
+cat > /dev/null
+if [ "$1" = get ] && [ -n "$FAKE_PASSWORD" ]; then
+    echo username=syncer
+    echo password="$FAKE_PASSWORD"
+fi
+"""
+
+
+class _BasicAuth(SimpleHTTPRequestHandler):
+    """Serves a directory of bare repos over git's dumb HTTP protocol, to syncer:secret only."""
+
+    def do_GET(self):
+        expected = 'Basic ' + base64.b64encode(b'syncer:secret').decode()
+        if self.headers.get('Authorization') != expected:
+            self.send_response(401)
+            self.send_header('WWW-Authenticate', 'Basic realm="git"')
+            self.end_headers()
+            return
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+def _git(path: Path, *args: str) -> None:
+    subprocess.run(['git', *args], cwd=path, capture_output=True, check=True)
+
+
+@pytest.fixture
+def fake_helper(tmp_path, monkeypatch):
+    """The only credential helper git knows of; returns the actions it logs, read afresh each call."""
+    script = tmp_path / 'fake-helper'
+    script.write_text(FAKE_HELPER)
+    script.chmod(0o755)
+    log = tmp_path / 'helper.log'
+    log.touch()
+    gitconfig = tmp_path / 'gitconfig'
+    gitconfig.write_text(f'[credential]\n\thelper = {script}\n')
+    monkeypatch.setenv('GIT_CONFIG_GLOBAL', str(gitconfig))
+    monkeypatch.setenv('GIT_CONFIG_NOSYSTEM', '1')
+    monkeypatch.setenv('FAKE_HELPER_LOG', str(log))
+    monkeypatch.setenv('FAKE_PASSWORD', 'secret')
+    return lambda: log.read_text().split()
+
+
+@pytest.fixture
+def https_clones(tmp_path):
+    """Three clones whose origin is one password-protected HTTP server."""
+    served = tmp_path / 'served'
+    seed = tmp_path / 'seed'
+    _git(tmp_path, 'init', '-q', '-b', 'main', str(seed))
+    _git(seed, '-c', 'user.name=t', '-c', 'user.email=t@t', 'commit', '-q', '--allow-empty', '-m', 'init')
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(_BasicAuth, directory=str(served)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    clones = []
+    for index in range(3):
+        bare = served / f'repo{index}.git'
+        _git(tmp_path, 'clone', '-q', '--bare', str(seed), str(bare))
+        _git(bare, 'update-server-info')
+        clone = tmp_path / f'repo{index}'
+        _git(tmp_path, 'clone', '-q', str(bare), str(clone))
+        _git(clone, 'remote', 'set-url', 'origin', f'http://127.0.0.1:{server.server_port}/{bare.name}')
+        clones.append(clone)
+    yield clones
+    server.shutdown()
+    server.server_close()
+
+
+def _urls(clones: list[Path]) -> list[str]:
+    return [subprocess.run(['git', 'remote', 'get-url', 'origin'], cwd=c, capture_output=True, text=True).stdout.strip() for c in clones]
+
+
+def _fetch_all(clones: list[Path]) -> list[GitFailure | None]:
+    return [Repo(name=clone.name, path=clone, owner='o', host='h').fetch() for clone in clones]
+
+
+class TestCredentialContext:
+    @pytest.mark.parametrize(
+        ('url', 'expected'),
+        [
+            ('https://github.com/owner/repo', Context('https', 'github.com', None)),
+            ('https://me@git.example.com:8443/proj/repo.git', Context('https', 'git.example.com:8443', 'me')),
+            ('http://127.0.0.1:8000/repo.git', Context('http', '127.0.0.1:8000', None)),
+            ('git@github.com:owner/repo.git', None),
+            ('ssh://git@github.com/owner/repo', None),
+            ('/srv/git/repo.git', None),
+        ],
+    )
+    def test_finds_the_context_git_asks_about(self, url, expected):
+        assert credential_context(url) == expected
+
+
+class TestOneLookupPerHost:
+    def test_every_fetch_to_a_host_shares_one_lookup(self, fake_helper, https_clones):
+        with credential_cache(_urls(https_clones), enabled=True) as served:
+            assert len(served) == 1
+            assert _fetch_all(https_clones) == [None] * 3
+        assert fake_helper() == ['get']
+
+    def test_off_unless_asked_for(self, fake_helper, https_clones):
+        with credential_cache(_urls(https_clones), enabled=False):
+            assert _fetch_all(https_clones) == [None] * 3
+        assert fake_helper() == ['get', 'store'] * 3
+
+    def test_a_host_the_helper_has_nothing_for_keeps_its_chain(self, fake_helper, https_clones, monkeypatch):
+        """Fail closed: each fetch asks the helper itself and fails exactly as it did before."""
+        monkeypatch.delenv('FAKE_PASSWORD')
+        with credential_cache(_urls(https_clones), enabled=True) as served:
+            assert served == []
+            failures = _fetch_all(https_clones)
+        assert fake_helper() == ['get'] * 4
+        assert all(failure is not None and classify_failure(failure) is Cause.AUTH for failure in failures)
+
+    def test_a_rejected_credential_still_trips_the_breaker(self, fake_helper, https_clones, monkeypatch):
+        monkeypatch.setenv('FAKE_PASSWORD', 'expired')
+        url = _urls(https_clones)[0]
+        breaker = HostBreaker()
+        with credential_cache([url], enabled=True) as served:
+            assert len(served) == 1
+            failure = _fetch_all(https_clones[:1])[0]
+        assert failure is not None
+        breaker.record_failure(url, failure)
+        assert breaker.trip_for(url).cause is Cause.AUTH
+
+    def test_the_run_leaves_nothing_behind(self, fake_helper, https_clones, tmp_path, monkeypatch):
+        monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path / 'tmp'))
+        (tmp_path / 'tmp').mkdir()
+        with credential_cache(_urls(https_clones), enabled=True):
+            assert any(value.endswith('.helper') for value in _noninteractive_env().values())
+            assert list((tmp_path / 'tmp').iterdir())
+        assert not list((tmp_path / 'tmp').iterdir())
+        assert not any(value.endswith('.helper') for value in _noninteractive_env().values())
+
+    def test_a_run_with_it_configured_looks_up_once(self, fake_helper, https_clones):
+        urls = _urls(https_clones)
+        repos = [RepoConfig(name=clone.name, path=str(clone), clone_url=url) for clone, url in zip(https_clones, urls, strict=True)]
+        config = SyncerConfig(owner='o', host='https://github.com', repos=repos)
+        reports = gather_reports(config, ToolConfig(default_policy='observe', credential_cache=True), jitter=0.0)
+        assert all(report.error is None for report in reports)
+        assert fake_helper().count('get') == 1
@@ -3,11 +3,17 @@ import subprocess
 from pathlib import Path
 
 import pytest
+from typer.testing import CliRunner
 
+from syncer.breaker import HostBreaker
 from syncer.doctor import Status
 from syncer.doctor import doctor_exit_code
 from syncer.doctor import render_doctor
 from syncer.doctor import run_doctor
+from syncer.main import app
+from syncer.repos import GitFailure
+from syncer.trips import save_trips
+from syncer.trips import trips_file
 
 
 @pytest.fixture
@@ -193,6 +199,32 @@ class TestClonesAndPolicy:
         assert policy.status is Status.FAIL
 
 
+class TestClosedHosts:
+    def test_a_host_an_earlier_run_closed_is_listed(self, isolated, tmp_path):
+        breaker = HostBreaker()
+        breaker.record_failure('https://github.com/me/api', GitFailure(('fetch',), 128, 'fatal: Authentication failed'))
+        save_trips(trips_file(), breaker, [])
+        bare = _bare_repo(tmp_path, 'api')
+        _write_registry(isolated, repos=[{'name': 'api', 'path': str(tmp_path / 'api'), 'clone_url': str(bare)}])
+        [trips] = _named(run_doctor(), 'trips')
+        assert trips.status is Status.WARN
+        assert trips.detail[0].startswith('github.com (https): auth')
+        assert '--clear-trips' in trips.hints[0]
+
+    def test_nothing_is_said_when_none_are(self, isolated, tmp_path):
+        bare = _bare_repo(tmp_path, 'api')
+        _write_registry(isolated, repos=[{'name': 'api', 'path': str(tmp_path / 'api'), 'clone_url': str(bare)}])
+        assert _named(run_doctor(), 'trips') == []
+
+    def test_clear_trips_forgets_them(self, isolated):
+        breaker = HostBreaker()
+        breaker.record_failure('https://github.com/me/api', GitFailure(('fetch',), 128, 'fatal: Authentication failed'))
+        save_trips(trips_file(), breaker, [])
+        result = CliRunner().invoke(app, ['doctor', '--clear-trips'])
+        assert 'forgot 1 closed host' in result.output
+        assert not trips_file().exists()
+
+
 class TestExitCode:
     def test_fail_exits_one(self, isolated):
         assert doctor_exit_code(run_doctor()) == 1  # no registry
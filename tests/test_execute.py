@@ -450,6 +450,21 @@ class TestInvariants:
         assert _head(repo) == before_head
         assert repo.uncommitted_changes == before_dirty
 
+    def test_a_tree_dirtied_after_classify_is_refused_at_execute(self, cloned_repo, tmp_path):
+        """The Repo memoises reads, and only syncer's own writes clear it. A file saved between
+        classify and execute is invisible to the memo, so the guards must not consult it."""
+        _second_clone_pushes(tmp_path)
+        repo = _make_repo(cloned_repo)
+        repo.fetch_prune()
+        assert repo.is_dirty is False
+        state = _state_for(repo, 'main')
+        (cloned_repo / 'README.md').write_text('# edited mid-run\n')
+
+        outcome = execute(Action.PULL_FF, state, repo, POLICY)
+
+        assert outcome.status == 'refused'
+        assert outcome.reason is Refusal.DIRTY_TREE
+
 
 # ---------- non-mutating actions ---------- #
 
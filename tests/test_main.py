@@ -148,6 +148,44 @@ class TestExitCodesAndJson:
         registry = self._registry(tmp_path, [{'name': 'api', 'path': str(repo)}])
         assert self._run(registry, monkeypatch, tmp_path, 'check').exit_code == 0
 
+    def test_the_async_engine_is_selectable(self, tmp_path, monkeypatch):
+        repo = self._healthy_repo(tmp_path)
+        registry = self._registry(tmp_path, [{'name': 'api', 'path': str(repo)}])
+        result = self._run(registry, monkeypatch, tmp_path, 'check', '--engine', 'async', '--json')
+        assert result.exit_code == 0
+        assert json.loads(result.stdout)['summary']['failed'] == 0
+
+    def test_jobs_can_be_left_to_adapt(self, tmp_path, monkeypatch):
+        repo = self._healthy_repo(tmp_path)
+        registry = self._registry(tmp_path, [{'name': 'api', 'path': str(repo)}])
+        result = self._run(registry, monkeypatch, tmp_path, 'check', '-j', 'auto', '--json')
+        assert result.exit_code == 0
+        assert json.loads(result.stdout)['summary']['failed'] == 0
+
+    @pytest.mark.parametrize('value', ['0', '-3', 'many'])
+    def test_a_width_that_is_neither_a_count_nor_auto_is_refused(self, tmp_path, monkeypatch, value):
+        registry = self._registry(tmp_path, [])
+        result = self._run(registry, monkeypatch, tmp_path, 'check', f'--jobs={value}')
+        assert result.exit_code == 2
+        assert 'auto' in result.output or 'at least 1' in result.output
+
+    def test_an_offline_check_needs_no_origin(self, tmp_path, monkeypatch):
+        repo = self._healthy_repo(tmp_path)
+        shutil.rmtree(tmp_path / 'api.git')
+        registry = self._registry(tmp_path, [{'name': 'api', 'path': str(repo)}])
+        result = self._run(registry, monkeypatch, tmp_path, 'check', '--offline', '--json')
+        assert result.exit_code == 0
+        assert json.loads(result.stdout)['offline'] is True
+
+    def test_a_fetch_age_must_have_a_unit(self, tmp_path, monkeypatch):
+        registry = self._registry(tmp_path, [])
+        result = self._run(registry, monkeypatch, tmp_path, 'apply', '--max-fetch-age', 'soon')
+        assert result.exit_code == 2
+
+    def test_apply_has_no_offline_mode(self, tmp_path, monkeypatch):
+        registry = self._registry(tmp_path, [])
+        assert self._run(registry, monkeypatch, tmp_path, 'apply', '--offline').exit_code == 2
+
     def test_an_unreadable_repo_exits_one(self, tmp_path, monkeypatch):
         repo = self._healthy_repo(tmp_path)
         shutil.rmtree(tmp_path / 'api.git')  # origin gone, so nothing can be verified
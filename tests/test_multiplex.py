@@ -0,0 +1,161 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from syncer.config import RepoConfig
+from syncer.config import SyncerConfig
+from syncer.config import ToolConfig
+from syncer.multiplex import Destination
+from syncer.multiplex import ssh_destination
+from syncer.multiplex import ssh_multiplexing
+from syncer.report import gather_reports
+from syncer.repos import SSH_KEEPALIVE_OPTIONS
+from syncer.repos import Repo
+from syncer.repos import _noninteractive_env
+
+# Stands in for ssh: a master or a connection made without one is a handshake, a connection that
+# finds its master's socket is a session. Either way the remote command runs locally, so git's
+# fetch over ssh://fakehost/<path> really fetches from the bare repo at <path>.
+FAKE_SSH = """\
+import os, sys
+args = sys.argv[1:]
+options, flags, rest = {}, set(), []
+i = 0
+while i < len(args):
+    arg = args[i]
+    if arg in ('-o', '-p', '-O', '-S', '-i', '-l', '-F', '-E'):
+        if arg == '-o':
+            key, _, value = args[i + 1].partition('=')
+            options.setdefault(key.lower(), value)
+        else:
+            options.setdefault(arg, args[i + 1])
+        i += 2
+    elif arg.startswith('-'):
+        flags.add(arg)
+        i += 1
+    else:
+        rest = args[i:]
+        break
+if '-G' in flags:
+    sys.exit(0)
+host, command = rest[0], rest[1:]
+control = options.get('controlpath', '').replace('%C', host)
+
+def log(event):
+    with open(os.environ['FAKE_SSH_LOG'], 'a') as out:
+        out.write(event + '\\n')
+
+if options.get('-O') == 'exit':
+    log('exit')
+    os.remove(control)
+    sys.exit(0)
+if options.get('controlmaster') == 'yes':
+    if os.environ.get('FAKE_SSH_REFUSE'):
+        log('refused')
+        sys.exit(255)
+    log('handshake')
+    open(control, 'w').close()
+    sys.exit(0)
+log('session' if control and os.path.exists(control) else 'handshake')
+os.execvp('sh', ['sh', '-c', ' '.join(command)])
+"""
+
+KEEPALIVE = ' '.join(SSH_KEEPALIVE_OPTIONS)
+
+
+def _git(path: Path, *args: str) -> None:
+    subprocess.run(['git', *args], cwd=path, capture_output=True, check=True)
+
+
+@pytest.fixture
+def fake_ssh(tmp_path, monkeypatch):
+    """Route git's ssh through FAKE_SSH; returns the events it logs, read afresh on each call."""
+    script = tmp_path / 'fake-ssh'
+    script.write_text(FAKE_SSH)
+    log = tmp_path / 'ssh.log'
+    log.touch()
+    monkeypatch.setenv('GIT_SSH_COMMAND', f'{sys.executable} {script}')
+    monkeypatch.setenv('FAKE_SSH_LOG', str(log))
+    return lambda: log.read_text().split()
+
+
+@pytest.fixture
+def ssh_clones(tmp_path):
+    """Three clones whose origin is ssh://fakehost/<bare repo>."""
+    seed = tmp_path / 'seed'
+    _git(tmp_path, 'init', '-q', '-b', 'main', str(seed))
+    _git(seed, '-c', 'user.name=t', '-c', 'user.email=t@t', 'commit', '-q', '--allow-empty', '-m', 'init')
+    clones = []
+    for index in range(3):
+        bare = tmp_path / f'repo{index}.git'
+        _git(tmp_path, 'clone', '-q', '--bare', str(seed), str(bare))
+        clone = tmp_path / f'repo{index}'
+        _git(tmp_path, 'clone', '-q', str(bare), str(clone))
+        _git(clone, 'remote', 'set-url', 'origin', f'ssh://fakehost{bare}')
+        clones.append(clone)
+    return clones
+
+
+def _fetch_all(clones: list[Path]) -> None:
+    for clone in clones:
+        assert Repo(name=clone.name, path=clone, owner='o', host='h').fetch() is None
+
+
+class TestSshDestination:
+    @pytest.mark.parametrize(
+        ('url', 'expected'),
+        [
+            ('git@github.com:owner/repo.git', Destination('git@github.com', None)),
+            ('ssh://git@bitbucket.example.com:7999/proj/repo.git', Destination('git@bitbucket.example.com', '7999')),
+            ('ssh://work-git/owner/repo', Destination('work-git', None)),
+            ('https://github.com/owner/repo', None),
+            ('git://example.com/repo.git', None),
+            ('/srv/git/repo.git', None),
+        ],
+    )
+    def test_finds_the_ssh_destination(self, url, expected):
+        assert ssh_destination(url) == expected
+
+
+class TestOneConnectionPerHost:
+    def test_every_fetch_to_a_host_shares_one_handshake(self, fake_ssh, ssh_clones):
+        with ssh_multiplexing([f'ssh://fakehost/{clone.name}' for clone in ssh_clones], enabled=True) as started:
+            assert started == [Destination('fakehost', None)]
+            _fetch_all(ssh_clones)
+        assert fake_ssh() == ['handshake', 'session', 'session', 'session', 'exit']
+
+    def test_off_unless_asked_for(self, fake_ssh, ssh_clones):
+        with ssh_multiplexing([f'ssh://fakehost/{clone.name}' for clone in ssh_clones], enabled=False):
+            _fetch_all(ssh_clones)
+        assert fake_ssh() == ['handshake'] * 3
+
+    def test_a_master_that_will_not_start_leaves_plain_ssh(self, fake_ssh, ssh_clones, monkeypatch):
+        """Fail closed: the fetches still run, each on its own connection as before."""
+        monkeypatch.setenv('FAKE_SSH_REFUSE', '1')
+        with ssh_multiplexing([f'ssh://fakehost/{clone.name}' for clone in ssh_clones], enabled=True) as started:
+            assert started == []
+            _fetch_all(ssh_clones)
+        assert fake_ssh() == ['refused', 'handshake', 'handshake', 'handshake']
+
+    def test_a_user_s_own_multiplexing_is_left_alone(self, fake_ssh, monkeypatch, tmp_path):
+        monkeypatch.setenv('GIT_SSH_COMMAND', f'ssh -o ControlPath={tmp_path}/%C')
+        with ssh_multiplexing(['git@github.com:o/r'], enabled=True) as started:
+            assert started == []
+            assert _noninteractive_env()['GIT_SSH_COMMAND'] == f'ssh -o ControlPath={tmp_path}/%C -o BatchMode=yes {KEEPALIVE}'
+
+    def test_the_run_leaves_nothing_behind(self, fake_ssh, ssh_clones):
+        with ssh_multiplexing(['ssh://fakehost/x'], enabled=True):
+            command = _noninteractive_env()['GIT_SSH_COMMAND']
+            control_dir = Path(command.split('ControlPath=')[1]).parent
+            assert control_dir.is_dir()
+        assert not control_dir.exists()
+        assert 'ControlPath' not in _noninteractive_env()['GIT_SSH_COMMAND']
+
+    def test_a_run_with_it_configured_multiplexes(self, fake_ssh, ssh_clones):
+        repos = [RepoConfig(name=clone.name, path=str(clone), clone_url=f'ssh://fakehost/{clone.name}') for clone in ssh_clones]
+        config = SyncerConfig(owner='o', host='https://github.com', repos=repos)
+        reports = gather_reports(config, ToolConfig(default_policy='observe', ssh_multiplex=True), jitter=0.0)
+        assert all(report.error is None for report in reports)
+        assert fake_ssh().count('handshake') == 1
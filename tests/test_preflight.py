@@ -0,0 +1,126 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from syncer.breaker import HostBreaker
+from syncer.config import RepoConfig
+from syncer.config import SyncerConfig
+from syncer.config import ToolConfig
+from syncer.diagnose import Cause
+from syncer.preflight import Preflight
+from syncer.preflight import probe_targets
+from syncer.report import Engine
+from syncer.report import gather_reports
+from syncer.repos import GitFailure
+
+# Stands in for ssh to a host: logs every connection, then refuses it the way a server refuses an
+# unknown key when $FAKE_SSH_DENY is set, and otherwise runs the remote command locally, so
+# ssh://fakehost/<path> reaches the bare repo at <path>.
+FAKE_SSH = """\
+import os, sys
+if '-G' in sys.argv:
+    sys.exit(0)  # git asking which ssh this is, not a connection
+with open(os.environ['FAKE_SSH_LOG'], 'a') as out:
+    out.write('connect\\n')
+if os.environ.get('FAKE_SSH_DENY'):
+    sys.stderr.write('git@fakehost: Permission denied (publickey).\\n')
+    sys.exit(255)
+args = sys.argv[1:]
+while args[0].startswith('-'):
+    args = args[2:] if args[0] in ('-o', '-p') else args[1:]
+os.execvp('sh', ['sh', '-c', ' '.join(args[1:])])
+"""
+
+GITHUB = 'https://github.com/me/{}'
+FAKEHOST = 'ssh://fakehost/{}'
+
+
+def _git(path: Path, *args: str) -> None:
+    subprocess.run(['git', *args], cwd=path, capture_output=True, check=True)
+
+
+@pytest.fixture
+def fake_ssh(tmp_path, monkeypatch):
+    """Route git's ssh through FAKE_SSH; returns how many connections it has seen so far."""
+    script = tmp_path / 'fake-ssh'
+    script.write_text(FAKE_SSH)
+    log = tmp_path / 'ssh.log'
+    log.touch()
+    monkeypatch.setenv('GIT_SSH_COMMAND', f'{sys.executable} {script}')
+    monkeypatch.setenv('FAKE_SSH_LOG', str(log))
+    return lambda: len(log.read_text().split())
+
+
+@pytest.fixture
+def ssh_config(tmp_path):
+    """Six clones on one ssh host, as a registry."""
+    seed = tmp_path / 'seed'
+    _git(tmp_path, 'init', '-q', '-b', 'main', str(seed))
+    _git(seed, '-c', 'user.name=t', '-c', 'user.email=t@t', 'commit', '-q', '--allow-empty', '-m', 'init')
+    repos = []
+    for index in range(6):
+        bare = tmp_path / f'repo{index}.git'
+        _git(tmp_path, 'clone', '-q', '--bare', str(seed), str(bare))
+        clone = tmp_path / f'repo{index}'
+        _git(tmp_path, 'clone', '-q', str(bare), str(clone))
+        _git(clone, 'remote', 'set-url', 'origin', f'ssh://fakehost{bare}')
+        repos.append(RepoConfig(name=clone.name, path=str(clone), clone_url=f'ssh://fakehost{bare}'))
+    return SyncerConfig(owner='o', host='https://github.com', repos=repos)
+
+
+class TestProbeTargets:
+    def test_the_first_url_of_each_lane_with_company(self):
+        urls = [FAKEHOST.format('a'), GITHUB.format('a'), FAKEHOST.format('b'), GITHUB.format('b')]
+        assert probe_targets(urls) == {('fakehost', 'ssh'): FAKEHOST.format('a'), ('github.com', 'https'): GITHUB.format('a')}
+
+    def test_a_lane_of_one_is_its_own_probe(self):
+        urls = [FAKEHOST.format('a'), GITHUB.format('a'), GITHUB.format('b')]
+        assert probe_targets(urls) == {('github.com', 'https'): GITHUB.format('a')}
+
+    def test_a_local_path_has_no_lane_to_probe(self):
+        assert probe_targets(['/srv/git/a.git', '/srv/git/b.git']) == {}
+
+
+class TestTheProbeTellsTheBreaker:
+    def test_a_refused_key_trips_the_host(self, fake_ssh, monkeypatch):
+        monkeypatch.setenv('FAKE_SSH_DENY', '1')
+        breaker = HostBreaker()
+        with Preflight({('fakehost', 'ssh'): FAKEHOST.format('a')}, breaker) as preflight:
+            (probe,) = preflight.pending
+            assert preflight.settle(probe) == (('fakehost', 'ssh'), False)
+        assert breaker.trip_for(FAKEHOST.format('b')).cause is Cause.AUTH
+
+    def test_an_answer_immunises_the_host(self, fake_ssh, ssh_config):
+        breaker = HostBreaker()
+        url = ssh_config.repos[0].clone_url
+        with Preflight({('fakehost', 'ssh'): url}, breaker) as preflight:
+            preflight.settle(next(iter(preflight.pending)))
+        breaker.record_failure(url, GitFailure(argv=('fetch',), returncode=128, stderr='Permission denied (publickey).'))
+        assert breaker.trip_for(url) is None
+
+    def test_a_repo_that_is_not_there_says_nothing_about_the_host(self, fake_ssh, tmp_path):
+        breaker = HostBreaker()
+        url = f'ssh://fakehost{tmp_path}/missing.git'
+        with Preflight({('fakehost', 'ssh'): url}, breaker) as preflight:
+            preflight.settle(next(iter(preflight.pending)))
+        assert breaker.trip_for(url) is None
+
+
+class TestADeadHostCostsOneProbe:
+    """Six repos at -j 6 on a host that refuses the key used to be six refusals."""
+
+    @pytest.mark.parametrize('engine', list(Engine))
+    def test_the_rest_of_the_lane_is_never_contacted(self, fake_ssh, ssh_config, monkeypatch, engine):
+        monkeypatch.setenv('FAKE_SSH_DENY', '1')
+        tool_config = ToolConfig(default_policy='observe', preflight=True)
+        reports = gather_reports(ssh_config, tool_config, jobs=6, jitter=0.0, engine=engine)
+        assert fake_ssh() == 2
+        assert sum(report.skipped is not None for report in reports) == 5
+
+    @pytest.mark.parametrize('engine', list(Engine))
+    def test_a_healthy_host_fetches_everything(self, fake_ssh, ssh_config, engine):
+        reports = gather_reports(ssh_config, ToolConfig(default_policy='observe', preflight=True), jobs=6, jitter=0.0, engine=engine)
+        assert all(report.error is None for report in reports)
+        assert len(reports) == 6
@@ -123,6 +123,19 @@ class TestTheTallyIsSpelledFromTheSharedTable:
             assert text not in output
 
 
+class TestAnAdaptiveRunShowsItsWidth:
+    """`-j auto` moves the width mid-run; a run that narrowed itself to two should say so, or its
+    slowness reads as syncer's rather than the network's."""
+
+    def test_the_current_width_is_on_the_line(self):
+        progress = RunProgress(3, console=_terminal())
+        progress.set_concurrency(6)
+        assert '-j 6' in _render(progress)
+
+    def test_a_fixed_width_shows_nothing(self):
+        assert '-j' not in _render(RunProgress(3, console=_terminal()))
+
+
 class TestClockFormat:
     def test_seconds(self):
         assert _clock(9) == '0:09'
@@ -1,5 +1,14 @@
+import asyncio
+import json
+import os
 import shutil
 import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
 from pathlib import Path
 from unittest.mock import patch
 
@@ -7,6 +16,10 @@ import pytest
 
 from syncer.breaker import HostBreaker
 from syncer.breaker import Trip
+from syncer.classify import refresh_remote
+from syncer.classify import refresh_remote_async
+from syncer.concurrency import AimdController
+from syncer.config import HostConfig
 from syncer.config import RepoConfig
 from syncer.config import SyncerConfig
 from syncer.config import ToolConfig
@@ -21,7 +34,9 @@ from syncer.policy import BranchState
 from syncer.policy import Policy
 from syncer.policy import PrimaryState
 from syncer.remedy import Remedy
+from syncer.report import HANDOFF_PER_WORKER
 from syncer.report import BranchRow
+from syncer.report import Engine
 from syncer.report import RepoBranchReport
 from syncer.report import Severity
 from syncer.report import _apply_line
@@ -35,11 +50,14 @@ from syncer.report import hidden_count
 from syncer.report import render_failure_summary
 from syncer.report import render_hidden_note
 from syncer.report import render_remedy
+from syncer.report import render_report
 from syncer.report import report_branches
 from syncer.report import report_severity
 from syncer.report import visible_reports
 from syncer.repos import ABORTED_RETURNCODE
+from syncer.repos import FETCH_STAMP
 from syncer.repos import GitFailure
+from syncer.repos import Repo
 from syncer.repos import abort_running_commands
 from syncer.repos import reset_abort
 from syncer.repos import run_command
@@ -899,6 +917,316 @@ class TestAnInterruptEndsTheGitCalls:
         assert reports[0].rows
 
 
+class TestTheAsyncEngineReportsWhatTheThreadsDo:
+    """The engines share every stage but the fetch, so any difference between their reports is a
+    bug in the one thing that differs. Compared on a registry that reaches each kind of ending: a
+    synced repo, one behind, one whose origin is gone, and one not yet cloned."""
+
+    def _mixed_registry(self, tmp_path) -> SyncerConfig:
+        synced = _make_cloned_repo(tmp_path, 'synced')
+        behind = _make_cloned_repo(tmp_path, 'behind')
+        second = tmp_path / 'second'
+        subprocess.run(['git', 'clone', str(tmp_path / 'behind.git'), str(second)], capture_output=True)
+        _git(second, 'config', 'user.email', 't@t.com')
+        _git(second, 'config', 'user.name', 'T')
+        _git(second, 'commit', '--allow-empty', '-m', 'ahead')
+        _git(second, 'push')
+        orphan = _make_cloned_repo(tmp_path, 'orphan')
+        shutil.rmtree(tmp_path / 'orphan.git')
+        return _config_for([synced, behind, orphan, tmp_path / 'never-cloned'])
+
+    def test_the_reports_are_identical(self, tmp_path):
+        config = self._mixed_registry(tmp_path)
+        tool_config = ToolConfig(default_policy='observe')
+        threaded = gather_reports(config, tool_config, jitter=0.0, include_lifecycle=True)
+        awaited = gather_reports(config, tool_config, jitter=0.0, include_lifecycle=True, engine=Engine.ASYNC)
+        assert {report.name for report in threaded} == {'synced', 'behind', 'orphan', 'never-cloned'}
+        assert awaited == threaded
+
+    def test_the_breaker_hears_about_every_fetch(self, tmp_path):
+        config = self._mixed_registry(tmp_path)
+        recorder = _RecordingBreaker()
+        with patch('syncer.report.HostBreaker', return_value=recorder):
+            gather_reports(config, ToolConfig(default_policy='observe'), jitter=0.0, engine=Engine.ASYNC)
+        assert sorted(Path(url).name for url in recorder.successes) == ['behind.git', 'synced.git']
+        assert [Path(url).name for url, _ in recorder.failures] == ['orphan.git']
+
+    def test_a_raising_repo_becomes_an_error_report(self, tmp_path):
+        paths = [_make_cloned_repo(tmp_path, 'alpha')]
+        with patch('syncer.report.build_branch_rows', side_effect=RuntimeError('boom')):
+            reports = gather_reports(_config_for(paths), ToolConfig(default_policy='observe'), jitter=0.0, engine=Engine.ASYNC)
+        assert reports[0].error == 'syncer failed on this repo'
+
+    def test_an_interrupt_ends_the_run_and_the_git_calls(self, tmp_path):
+        paths = [_make_cloned_repo(tmp_path, 'alpha')]
+        try:
+            with (
+                patch('syncer.report.build_branch_rows', side_effect=KeyboardInterrupt),
+                pytest.raises(KeyboardInterrupt),
+            ):
+                gather_reports(_config_for(paths), ToolConfig(default_policy='observe'), jitter=0.0, engine=Engine.ASYNC)
+            assert run_command(['echo', 'hi'], timeout=10).returncode == ABORTED_RETURNCODE
+        finally:
+            reset_abort()
+
+
+@contextmanager
+def _counting_fetches():
+    """Patch both engines' fetch to take a moment and count how many run at once; yields the peak."""
+    lock = threading.Lock()
+    in_flight = [0]
+    peak = [0]
+    real, real_async = refresh_remote, refresh_remote_async
+
+    def enter():
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+
+    def leave():
+        with lock:
+            in_flight[0] -= 1
+
+    def counting(*args, **kwargs):
+        enter()
+        try:
+            time.sleep(0.1)
+            return real(*args, **kwargs)
+        finally:
+            leave()
+
+    async def counting_async(*args, **kwargs):
+        enter()
+        try:
+            await asyncio.sleep(0.1)
+            return await real_async(*args, **kwargs)
+        finally:
+            leave()
+
+    with (
+        patch('syncer.report.refresh_remote', side_effect=counting),
+        patch('syncer.report.refresh_remote_async', side_effect=counting_async),
+    ):
+        yield peak
+
+
+class TestAHostCapHoldsInEitherEngine:
+    """The scheduler is pure logic, so this is the wiring: both engines start fetches only as it
+    releases them, whatever --jobs allows."""
+
+    @pytest.mark.parametrize('engine', list(Engine))
+    def test_a_capped_host_never_has_more_repos_in_flight(self, tmp_path, engine):
+        paths = [_make_cloned_repo(tmp_path, f'repo{index}') for index in range(6)]
+        # The lane comes from the registry's URL; the fetch still goes to the local origin.
+        config = SyncerConfig(
+            owner='demo',
+            host='https://github.com',
+            search_paths=[],
+            repos=[RepoConfig(name=p.name, path=str(p), clone_url=f'ssh://git@bitbucket.example.com/proj/{p.name}.git') for p in paths],
+        )
+        tool_config = ToolConfig(default_policy='observe', hosts={'bitbucket.example.com': HostConfig(max_concurrent=2)})
+        with _counting_fetches() as peak:
+            reports = gather_reports(config, tool_config, jobs=6, jitter=0.0, engine=engine)
+        assert len(reports) == 6
+        assert peak[0] == 2
+
+
+class TestFetchingAndClassifyingOverlap:
+    """The network slot is released when the fetch returns, so the next fetch runs while this
+    repo is still classified — and the handoff between them is bounded, so a slow disk holds the
+    fetching back instead of letting it run the whole registry ahead."""
+
+    @pytest.mark.parametrize('engine', list(Engine))
+    def test_fetches_run_ahead_of_the_local_stage_but_only_so_far(self, tmp_path, engine):
+        paths = [_make_cloned_repo(tmp_path, f'repo{index}') for index in range(8)]
+        lock = threading.Lock()
+        waiting = [0]
+        peak = [0]
+        real_rows = build_branch_rows
+
+        def fetched(outcome):
+            with lock:
+                waiting[0] += 1
+                peak[0] = max(peak[0], waiting[0])
+            return outcome
+
+        def slow_rows(*args, **kwargs):
+            try:
+                time.sleep(0.2)
+                return real_rows(*args, **kwargs)
+            finally:
+                with lock:
+                    waiting[0] -= 1
+
+        async def fetch_async(*args, **kwargs):
+            return fetched(await refresh_remote_async(*args, **kwargs))
+
+        with (
+            patch('syncer.report.os.cpu_count', return_value=1),
+            patch('syncer.report.refresh_remote', side_effect=lambda *a, **k: fetched(refresh_remote(*a, **k))),
+            patch('syncer.report.refresh_remote_async', side_effect=fetch_async),
+            patch('syncer.report.build_branch_rows', side_effect=slow_rows),
+        ):
+            reports = gather_reports(_config_for(paths), ToolConfig(default_policy='observe'), jobs=1, jitter=0.0, engine=engine)
+        assert len(reports) == 8
+        # One core is two local workers, whatever -j says. More than one waiting means a fetch ran
+        # during a classification; no more than the depth means the bound held.
+        assert 1 < peak[0] <= 2 * HANDOFF_PER_WORKER
+
+
+class TestTheLocalReadsHideBehindTheFetch:
+    """The tree, stash and worktree reads need nothing from origin, so they run while the fetch
+    waits on the network rather than after it."""
+
+    @pytest.mark.parametrize('engine', list(Engine))
+    def test_they_run_while_the_fetch_is_in_flight(self, tmp_path, engine):
+        paths = [_make_cloned_repo(tmp_path, 'api')]
+        fetching = threading.Event()
+        read = threading.Event()
+        overlapped = []
+        real_read_local = Repo.read_local
+
+        def read_local(repo):
+            fetching.wait(timeout=2)
+            read.set()
+            return real_read_local(repo)
+
+        def fetch(*args, **kwargs):
+            fetching.set()
+            overlapped.append(read.wait(timeout=2))
+            return refresh_remote(*args, **kwargs)
+
+        async def fetch_async(*args, **kwargs):
+            fetching.set()
+            overlapped.append(await asyncio.to_thread(read.wait, 2))
+            return await refresh_remote_async(*args, **kwargs)
+
+        with (
+            patch.object(Repo, 'read_local', read_local),
+            patch('syncer.report.refresh_remote', side_effect=fetch),
+            patch('syncer.report.refresh_remote_async', side_effect=fetch_async),
+        ):
+            (report,) = gather_reports(_config_for(paths), ToolConfig(default_policy='observe'), jitter=0.0, engine=engine)
+        assert overlapped == [True]
+        assert report.error is None
+        assert report.rows
+
+
+class TestARecentFetchIsReused:
+    """`--max-fetch-age`: a `check` then an `apply` a minute later should cost one fetch per repo."""
+
+    @pytest.mark.parametrize('engine', list(Engine))
+    def test_a_repo_fetched_inside_the_window_is_not_fetched_again(self, tmp_path, engine):
+        config = _config_for([_make_cloned_repo(tmp_path, 'api')])
+        tool_config = ToolConfig(default_policy='observe')
+        gather_reports(config, tool_config, jitter=0.0, engine=engine)
+        with (
+            patch('syncer.report.refresh_remote', side_effect=AssertionError('fetched')),
+            patch('syncer.report.refresh_remote_async', side_effect=AssertionError('fetched')),
+        ):
+            (report,) = gather_reports(config, tool_config, jitter=0.0, engine=engine, max_fetch_age=timedelta(minutes=10))
+        assert report.error is None
+        assert report.refs_as_of is not None
+        assert report.fetch_ms is None
+
+    def test_the_window_comes_from_the_config_when_the_run_names_none(self, tmp_path):
+        config = _config_for([_make_cloned_repo(tmp_path, 'api')])
+        tool_config = ToolConfig(default_policy='observe', max_fetch_age=timedelta(minutes=10))
+        gather_reports(config, tool_config, jitter=0.0)
+        (report,) = gather_reports(config, tool_config, jitter=0.0)
+        assert report.refs_as_of is not None
+        (report,) = gather_reports(config, tool_config, jitter=0.0, max_fetch_age=timedelta(0))
+        assert report.refs_as_of is None
+
+    def test_a_fetch_older_than_the_window_runs(self, tmp_path):
+        path = _make_cloned_repo(tmp_path, 'api')
+        config = _config_for([path])
+        gather_reports(config, ToolConfig(default_policy='observe'), jitter=0.0)
+        stamp = path / '.git' / FETCH_STAMP
+        os.utime(stamp, (time.time() - 3600, time.time() - 3600))
+        (report,) = gather_reports(config, ToolConfig(default_policy='observe'), jitter=0.0, max_fetch_age=timedelta(minutes=10))
+        assert report.refs_as_of is None
+        assert report.fetch_ms is not None
+
+    def test_a_failed_fetch_leaves_nothing_to_reuse(self, tmp_path):
+        path = _make_cloned_repo(tmp_path, 'api')
+        shutil.rmtree(tmp_path / 'api.git')
+        config = _config_for([path])
+        gather_reports(config, ToolConfig(default_policy='observe'), jitter=0.0)
+        assert not (path / '.git' / FETCH_STAMP).exists()
+
+    def test_the_breaker_hears_nothing_of_a_reused_fetch(self, tmp_path):
+        """Neither answer is true: a success would clear a host that may be refusing right now."""
+        config = _config_for([_make_cloned_repo(tmp_path, 'api')])
+        gather_reports(config, ToolConfig(default_policy='observe'), jitter=0.0)
+        with (
+            patch('syncer.report.HostBreaker.record_success', side_effect=AssertionError('success')),
+            patch('syncer.report.HostBreaker.record_failure', side_effect=AssertionError('failure')),
+        ):
+            (report,) = gather_reports(config, ToolConfig(default_policy='observe'), jitter=0.0, max_fetch_age=timedelta(minutes=10))
+        assert report.error is None
+
+
+class TestAnOfflineCheckFetchesNothing:
+    """`check --offline` is for a machine with no network, so a fetch attempted at all is the bug:
+    it would fail, and every repo would read as unverified instead of measured against its refs."""
+
+    @pytest.mark.parametrize('engine', list(Engine))
+    def test_no_fetch_runs_and_the_refs_age_is_reported(self, tmp_path, engine):
+        paths = [_make_cloned_repo(tmp_path, 'api')]
+        with (
+            patch('syncer.report.refresh_remote', side_effect=AssertionError('fetched')),
+            patch('syncer.report.refresh_remote_async', side_effect=AssertionError('fetched')),
+        ):
+            (report,) = gather_reports(_config_for(paths), ToolConfig(default_policy='observe'), jitter=0.0, engine=engine, offline=True)
+        assert report.error is None
+        assert report.rows[0].state.primary == PrimaryState.SYNCED
+        assert report.refs_as_of is not None
+        assert report.fetch_ms is None
+
+    def test_an_unreachable_origin_is_not_a_failure(self, tmp_path):
+        path = _make_cloned_repo(tmp_path, 'api')
+        shutil.rmtree(tmp_path / 'api.git')
+        (report,) = gather_reports(_config_for([path]), ToolConfig(default_policy='observe'), jitter=0.0, offline=True)
+        assert report.error is None
+        assert not report.failures
+
+    def test_the_age_is_on_the_repo_line(self, tmp_path, capsys):
+        report = RepoBranchReport(
+            label='api', path='~/api', name='api', policy_name='observe', refs_as_of=datetime.now(UTC) - timedelta(hours=3)
+        )
+        render_report(report, apply=False)
+        assert 'fetched 3h ago' in capsys.readouterr().out
+
+    def test_the_json_says_so(self, tmp_path, capsys):
+        paths = [_make_cloned_repo(tmp_path, 'api')]
+        report_branches(_config_for(paths), ToolConfig(default_policy='observe'), jitter=0.0, as_json=True, offline=True)
+        payload = json.loads(capsys.readouterr().out)
+        assert payload['offline'] is True
+        assert payload['repos'][0]['refs_as_of']
+
+
+class TestAnAdaptiveRunStaysWithinItsWidth:
+    """`jobs=None` hands the width to the controller; the engines must start no more than it allows."""
+
+    @pytest.mark.parametrize('engine', list(Engine))
+    def test_the_run_never_exceeds_the_controllers_width(self, tmp_path, engine):
+        paths = [_make_cloned_repo(tmp_path, f'repo{index}') for index in range(6)]
+        config = SyncerConfig(
+            owner='demo', host='https://github.com', search_paths=[], repos=[RepoConfig(name=p.name, path=str(p)) for p in paths]
+        )
+        with patch('syncer.report.AimdController', return_value=AimdController(start=2, ceiling=2)), _counting_fetches() as peak:
+            reports = gather_reports(config, ToolConfig(default_policy='observe'), jobs=None, jitter=0.0, engine=engine)
+        assert len(reports) == 6
+        assert peak[0] == 2
+
+    def test_every_fetched_repo_reports_its_fetch_time(self, tmp_path):
+        path = _make_cloned_repo(tmp_path, 'api')
+        config = SyncerConfig(owner='demo', host='https://github.com', search_paths=[], repos=[RepoConfig(name='api', path=str(path))])
+        (report,) = gather_reports(config, ToolConfig(default_policy='observe'), jobs=None, jitter=0.0)
+        assert report.fetch_ms is not None
+
+
 class TestSkippedReposAreNeverASilentFact:
     """Every path that trips the breaker also records the failure onto a report, so the fallback
     branch does not fire in practice. It exists because repos nobody contacted must not vanish
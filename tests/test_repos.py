@@ -1,7 +1,12 @@
+import asyncio
+import contextlib
+import dataclasses
 import os
 import subprocess
 import threading
 import time
+from datetime import UTC
+from datetime import datetime
 from http.server import BaseHTTPRequestHandler
 from http.server import HTTPServer
 from pathlib import Path
@@ -17,17 +22,33 @@ from syncer.output import ICON_OK
 from syncer.output import _display_width
 from syncer.output import _status_line
 from syncer.repos import ABORTED_RETURNCODE
+from syncer.repos import FETCH_STAMP
+from syncer.repos import SSH_KEEPALIVE_OPTIONS
+from syncer.repos import STALL_SECONDS
 from syncer.repos import TIMEOUT_RETURNCODE
 from syncer.repos import GitFailure
+from syncer.repos import RefStore
+from syncer.repos import RemoteRefs
 from syncer.repos import Repo
 from syncer.repos import _noninteractive_env
+from syncer.repos import _pygit2_usable
 from syncer.repos import abort_running_commands
 from syncer.repos import find_repo_in_search_paths
 from syncer.repos import find_untracked_repos
+from syncer.repos import frozen_execution
 from syncer.repos import normalize_remote_url
 from syncer.repos import origin_mismatch
+from syncer.repos import parse_ls_remote
+from syncer.repos import parse_status_v2
+from syncer.repos import parse_tracking_refs
 from syncer.repos import reset_abort
 from syncer.repos import run_command
+from syncer.repos import run_command_async
+from syncer.repos import set_run_config
+from syncer.repos import stream_command
+from syncer.repos import take_spawn_stats
+
+KEEPALIVE = ' '.join(SSH_KEEPALIVE_OPTIONS)
 
 
 class _FakeProcess:
@@ -36,32 +57,37 @@ class _FakeProcess:
     run_command drives Popen directly rather than subprocess.run, because a Ctrl-C needs the
     handle in order to end the call — run() owns its child privately. So a patched
     `subprocess.run` intercepts nothing and the tests below stub this instead.
+
+    One that `hangs` answers nothing, as a process the watchdog ended at its deadline would;
+    _patch_git tells the watchdog that deadline has passed.
     """
 
+    # PID_MAX_LIMIT, which no process can have: ending this one's group signals nobody.
+    pid = 4_194_304
+
     def __init__(self, *, returncode: int = 0, stdout: str = '', stderr: str = '', hangs: bool = False) -> None:
         self.returncode = returncode
         self._stdout = stdout
         self._stderr = stderr
         self._hangs = hangs
-        self.killed = False
 
     def communicate(self, timeout: float | None = None) -> tuple[str, str]:
         if self._hangs:
-            # Cleared so the reap after kill() returns, as a real killed process does.
-            self._hangs = False
-            raise subprocess.TimeoutExpired(cmd='git', timeout=timeout or 1)
+            return '', ''
         return self._stdout, self._stderr
 
-    def kill(self) -> None:
-        self.killed = True
-
-    def terminate(self) -> None:
-        self.killed = True
+    def poll(self) -> int | None:
+        return self.returncode
 
 
+@contextlib.contextmanager
 def _patch_git(**kwargs):
     """Answer every git call in the block with a fresh canned process."""
-    return patch('syncer.repos.subprocess.Popen', side_effect=lambda *_args, **_kwargs: _FakeProcess(**kwargs))
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(patch('syncer.repos.subprocess.Popen', side_effect=lambda *_args, **_kwargs: _FakeProcess(**kwargs)))
+        if kwargs.get('hangs'):
+            stack.enter_context(patch('syncer.repos._watchdog.disarm', return_value=True))
+        yield
 
 
 def _git(path: Path, *args: str) -> None:
@@ -379,7 +405,6 @@ class TestNonInteractiveExecution:
         assert env['GCM_INTERACTIVE'] == 'never'
         assert env['GIT_CONFIG_KEY_0'] == 'credential.interactive'
         assert env['GIT_CONFIG_VALUE_0'] == 'false'
-        assert env['GIT_CONFIG_COUNT'] == '1'
 
     def test_the_credential_helper_is_left_configured(self, monkeypatch):
         """Resetting it with `credential.helper=` would break every https remote whose stored
@@ -396,7 +421,7 @@ class TestNonInteractiveExecution:
         env = _noninteractive_env()
         assert env['GIT_CONFIG_KEY_0'] == 'http.sslVerify'
         assert env['GIT_CONFIG_KEY_1'] == 'credential.interactive'
-        assert env['GIT_CONFIG_COUNT'] == '2'
+        assert env['GIT_CONFIG_COUNT'] == '4'
 
     def test_the_injected_config_reaches_git_itself(self):
         """The environment form rather than argv, so it covers the calls assembled elsewhere — a
@@ -406,11 +431,17 @@ class TestNonInteractiveExecution:
 
     def test_adds_ssh_batch_mode(self, monkeypatch):
         monkeypatch.delenv('GIT_SSH_COMMAND', raising=False)
-        assert _noninteractive_env()['GIT_SSH_COMMAND'] == 'ssh -o BatchMode=yes'
+        assert _noninteractive_env()['GIT_SSH_COMMAND'] == f'ssh -o BatchMode=yes {KEEPALIVE}'
 
     def test_preserves_a_configured_ssh_command(self, monkeypatch):
         monkeypatch.setenv('GIT_SSH_COMMAND', 'ssh -i /keys/work')
-        assert _noninteractive_env()['GIT_SSH_COMMAND'] == 'ssh -i /keys/work -o BatchMode=yes'
+        assert _noninteractive_env()['GIT_SSH_COMMAND'] == f'ssh -i /keys/work -o BatchMode=yes {KEEPALIVE}'
+
+    def test_a_silent_http_transfer_is_given_up_on(self):
+        """A host that stops sending is dropped after STALL_SECONDS, not after the call's timeout."""
+        limit = run_command(['git', 'config', '--get', 'http.lowSpeedLimit'], timeout=10)
+        time = run_command(['git', 'config', '--get', 'http.lowSpeedTime'], timeout=10)
+        assert (limit.stdout.strip(), time.stdout.strip()) == ('1', str(STALL_SECONDS))
 
     def test_environment_reaches_the_subprocess(self):
         result = run_command(['sh', '-c', 'echo "$GIT_TERMINAL_PROMPT"'], timeout=10)
@@ -427,8 +458,17 @@ class TestNonInteractiveExecution:
             failure = repo.fetch_prune()
             assert failure is not None
             assert failure.timed_out
-            assert repo.local_branches() == []
-            assert repo.default_branch is None
+            # Reads that still spawn git. Branch names and the default come from the ref files
+            # now, which is the point of RefStore, so they no longer pass through a hung git.
+            assert repo.remotes() is None
+            assert repo.ahead_behind('HEAD', 'HEAD') is None
+
+    def test_a_learned_fetch_timeout_bounds_the_fetch_and_nothing_else(self, git_repo):
+        repo = _make_repo(git_repo, timeout=120, fetch_timeout=7)
+        with _patch_git(hangs=True):
+            repo.fetch()
+            repo.remotes()
+        assert [failure.stderr for failure in repo.failures] == ['timed out after 7s', 'timed out after 120s']
 
 
 class TestAbort:
@@ -480,6 +520,177 @@ class TestAbort:
         assert run_command(['echo', 'hi'], timeout=10).stdout.strip() == 'hi'
 
 
+def _gone(pid: int) -> bool:
+    """Whether a process has exited, allowing a moment for the signal to land. A zombie counts:
+    it has exited, and is waiting only on whatever reaps orphans on this machine."""
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        with contextlib.suppress(OSError):
+            if Path(f'/proc/{pid}/stat').read_text().rpartition(')')[2].split()[0] == 'Z':
+                return True
+        time.sleep(0.05)
+    return False
+
+
+class TestNoDescendantOutlivesItsCall:
+    """git's own children — ssh, a credential helper, git-remote-https — used to outlive a timeout
+    or an abort, because only git was signalled. This one ignores TERM, as a wedged one might."""
+
+    @pytest.fixture(autouse=True)
+    def _rearm(self):
+        yield
+        reset_abort()
+
+    @staticmethod
+    def _spawner(pid_file: Path) -> list[str]:
+        script = f"""sh -c "trap '' TERM; exec sleep 300" & echo $! > {pid_file}; wait"""
+        return ['sh', '-c', script]
+
+    @staticmethod
+    def _await_pid(pid_file: Path) -> int:
+        while not pid_file.exists() or not pid_file.read_text().strip():
+            time.sleep(0.05)
+        return int(pid_file.read_text())
+
+    def test_a_timeout_ends_the_whole_group(self, tmp_path):
+        result = run_command(self._spawner(tmp_path / 'pid'), timeout=1)
+        assert result.returncode == TIMEOUT_RETURNCODE
+        assert _gone(self._await_pid(tmp_path / 'pid'))
+
+    def test_an_abort_ends_the_whole_group(self, tmp_path):
+        thread = threading.Thread(target=run_command, args=(self._spawner(tmp_path / 'pid'),), kwargs={'timeout': 300})
+        thread.start()
+        grandchild = self._await_pid(tmp_path / 'pid')
+        abort_running_commands()
+        thread.join(timeout=10)
+        assert not thread.is_alive()
+        assert _gone(grandchild)
+
+    def test_an_async_timeout_ends_the_whole_group(self, tmp_path):
+        result = asyncio.run(run_command_async(self._spawner(tmp_path / 'pid'), timeout=1))
+        assert result.returncode == TIMEOUT_RETURNCODE
+        assert _gone(self._await_pid(tmp_path / 'pid'))
+
+
+class TestFrozenExecution:
+    def test_a_run_s_calls_share_one_environment(self, monkeypatch):
+        with frozen_execution():
+            monkeypatch.setenv('SYNCER_LATE', 'set after the run began')
+            assert run_command(['sh', '-c', 'echo "$SYNCER_LATE"'], timeout=10).stdout.strip() == ''
+        assert run_command(['sh', '-c', 'echo "$SYNCER_LATE"'], timeout=10).stdout.strip() == 'set after the run began'
+
+    def test_settings_made_during_the_run_still_reach_git(self):
+        with frozen_execution():
+            set_run_config([('syncer.probe', 'yes')])
+            try:
+                assert run_command(['git', 'config', '--get', 'syncer.probe'], timeout=10).stdout.strip() == 'yes'
+            finally:
+                set_run_config([])
+            assert run_command(['git', 'config', '--get', 'syncer.probe'], timeout=10).stdout.strip() == ''
+
+    def test_every_call_is_counted(self):
+        take_spawn_stats()
+        for _ in range(3):
+            run_command(['git', '--version'], timeout=10)
+        stats = take_spawn_stats()
+        assert stats.spawns == 3
+        assert stats.spawn_seconds > 0
+        assert stats.wait_seconds > 0
+        assert take_spawn_stats().spawns == 0
+
+
+class TestStreamCommand:
+    @pytest.fixture(autouse=True)
+    def _rearm(self):
+        yield
+        reset_abort()
+
+    def test_lines_arrive_as_bytes_and_the_exit_status_after(self):
+        with stream_command(['sh', '-c', 'printf "a\\nb\\n"; echo err >&2; exit 3'], timeout=10) as stream:
+            lines = list(stream)
+        assert lines == [b'a', b'b']
+        assert (stream.returncode, stream.stderr.strip()) == (3, 'err')
+
+    def test_stopping_early_ends_the_command(self, tmp_path):
+        pid_file = tmp_path / 'pid'
+        started = time.monotonic()
+        with stream_command(['sh', '-c', f'echo $$ > {pid_file}; exec yes'], timeout=300) as stream:
+            assert next(iter(stream)) == b'y'
+        assert time.monotonic() - started < 5
+        assert stream.returncode is None
+        assert _gone(int(pid_file.read_text()))
+
+    def test_timeout_becomes_a_non_zero_result_not_an_exception(self):
+        with stream_command(['sleep', '30'], timeout=1) as stream:
+            assert list(stream) == []
+        assert stream.returncode == TIMEOUT_RETURNCODE
+        assert 'timed out' in stream.stderr
+
+    def test_an_abort_ends_it_like_any_other_call(self):
+        with stream_command(['sleep', '30'], timeout=300) as stream:
+            threading.Timer(0.3, abort_running_commands).start()
+            assert list(stream) == []
+        assert stream.returncode == ABORTED_RETURNCODE
+
+    def test_a_failed_stream_is_recorded(self, tmp_path):
+        repo = _make_repo(tmp_path)
+        assert repo.first_commit_date is None
+        assert [failure.argv[0] for failure in repo.failures] == ['log']
+
+
+class TestRunCommandAsync:
+    """The asyncio engine's run_command. It has to be indistinguishable from the threaded one to
+    every caller, or the two engines would report the same repo differently."""
+
+    @pytest.fixture(autouse=True)
+    def _rearm(self):
+        yield
+        reset_abort()
+
+    def test_a_result_matches_run_command(self):
+        args = ['sh', '-c', 'echo out; echo err >&2; exit 3']
+        threaded = run_command(args, timeout=10)
+        awaited = asyncio.run(run_command_async(args, timeout=10))
+        assert (awaited.returncode, awaited.stdout, awaited.stderr) == (threaded.returncode, threaded.stdout, threaded.stderr)
+
+    def test_timeout_becomes_a_non_zero_result_not_an_exception(self):
+        result = asyncio.run(run_command_async(['sleep', '5'], timeout=1))
+        assert result.returncode == TIMEOUT_RETURNCODE
+        assert 'timed out' in result.stderr
+
+    def test_a_cancelled_call_takes_its_child_with_it(self, tmp_path):
+        pid_file = tmp_path / 'pid'
+
+        async def cancel_midway() -> None:
+            task = asyncio.create_task(run_command_async(['sh', '-c', f'echo $$ > {pid_file}; exec sleep 30'], timeout=300))
+            while not pid_file.exists() or not pid_file.read_text().strip():
+                await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_midway())
+        with pytest.raises(ProcessLookupError):
+            os.kill(int(pid_file.read_text()), 0)
+
+    def test_later_calls_return_without_running_after_an_abort(self):
+        abort_running_commands()
+        result = asyncio.run(run_command_async(['sleep', '30'], timeout=300))
+        assert result.returncode == ABORTED_RETURNCODE
+
+    def test_an_async_fetch_records_its_failure(self, git_repo_with_remote):
+        _git(git_repo_with_remote, 'remote', 'set-url', 'origin', str(git_repo_with_remote.parent / 'nowhere.git'))
+        repo = _make_repo(git_repo_with_remote)
+        failure = asyncio.run(repo.fetch_prune_async())
+        assert failure is not None
+        assert failure.argv == ('fetch', '--prune')
+        assert repo.failures == [failure]
+
+
 class TestFailureRecording:
     """Every accessor used to turn a non-zero exit into a benign value, so a broken git looked
     like a healthy repo. Recording is the default; probe=True is the argued-for exception."""
@@ -569,6 +780,469 @@ class TestFailureRecording:
         assert 'v1.0.0' in failure.stderr
 
 
+class TestReadMemo:
+    def test_a_repeated_read_spawns_git_once(self, git_repo):
+        repo = _make_repo(git_repo)
+
+        assert repo.is_dirty is False
+        assert repo.uncommitted_changes == []
+        assert repo.is_dirty is False
+
+        assert (repo.read_stats.misses, repo.read_stats.hits) == (1, 2)
+
+    def test_a_write_forgets_what_was_read_before_it(self, git_repo):
+        repo = _make_repo(git_repo)
+        assert repo.current_branch in ('main', 'master')
+
+        repo._write('checkout', '-q', '-b', 'moved')
+
+        assert repo.current_branch == 'moved'
+
+    def test_live_reads_see_changes_syncer_did_not_make(self, git_repo):
+        """The memo only hears about syncer's own writes. execute()'s guards read through live()
+        because an editor saving a file mid-run is exactly what they exist to catch."""
+        repo = _make_repo(git_repo)
+        assert repo.is_dirty is False
+        (git_repo / 'README.md').write_text('# edited\n')
+
+        assert repo.is_dirty is False
+        with repo.live():
+            assert repo.is_dirty is True
+        assert repo.is_dirty is True
+
+
+class TestAFetchKeepsWhatItCannotChange:
+    """A fetch moves remote-tracking refs and nothing else, so the tree and stash read before it
+    still answer after it — which is what lets them be read while it runs."""
+
+    def test_the_tree_and_stash_survive_a_fetch(self, git_repo_with_remote):
+        repo = _make_repo(git_repo_with_remote)
+        repo.adopt_local(repo.read_local())
+        misses = repo.read_stats.misses
+
+        assert repo.fetch() is None
+        assert repo.is_dirty is False
+        assert repo.stash_count == 0
+
+        assert repo.read_stats.misses == misses
+
+    def test_the_counts_against_the_moved_upstream_do_not(self, git_repo_with_remote):
+        repo = _make_repo(git_repo_with_remote)
+        assert repo.status_snapshot().ahead == 0
+
+        repo.fetch()
+
+        snapshot = repo.status_snapshot()
+        assert (snapshot.upstream, snapshot.ahead, snapshot.behind) == ('origin/' + repo.current_branch, None, None)
+
+    def test_any_other_write_still_forgets_everything(self, git_repo_with_remote):
+        repo = _make_repo(git_repo_with_remote)
+        repo.adopt_local(repo.read_local())
+        (git_repo_with_remote / 'README.md').write_text('# edited\n')
+
+        repo._write('add', 'README.md')
+
+        assert repo.is_dirty is True
+
+    def test_a_failed_fetch_reports_its_own_failure_not_the_latest(self, git_repo_with_remote):
+        """read_local runs beside the fetch, so the last failure recorded need not be the fetch's."""
+        repo = _make_repo(git_repo_with_remote)
+        _git(git_repo_with_remote, 'remote', 'set-url', 'origin', str(git_repo_with_remote / 'missing.git'))
+        original = repo._git
+
+        def and_then_a_local_failure(*args, **kwargs):
+            result = original(*args, **kwargs)
+            if args[0] == 'fetch':
+                repo.failures.append(GitFailure(argv=('status',), returncode=128, stderr='fatal: index file corrupt'))
+            return result
+
+        repo._git = and_then_a_local_failure
+        failure = repo.fetch()
+        assert failure is not None
+        assert failure.argv == ('fetch',)
+
+    def test_a_failing_fetch_and_a_failing_read_beside_it_each_report_their_own(self, git_repo_with_remote):
+        """The two run on two threads at once, and neither may see the other's half of the Repo."""
+        repo = _make_repo(git_repo_with_remote)
+        _git(git_repo_with_remote, 'remote', 'set-url', 'origin', str(git_repo_with_remote / 'missing.git'))
+        (git_repo_with_remote / '.git' / 'index').write_bytes(b'not an index')
+        both_running = threading.Barrier(2)
+        original = Repo._git
+
+        def together(self, *args, **kwargs):
+            if args[0] in ('fetch', 'status'):
+                both_running.wait(timeout=5)
+            return original(self, *args, **kwargs)
+
+        with patch.object(Repo, '_git', together):
+            local: list = []
+            reader = threading.Thread(target=lambda: local.append(repo.read_local()))
+            reader.start()
+            failure = repo.fetch()
+            reader.join()
+        repo.adopt_local(local[0])
+
+        assert failure is not None
+        assert failure.argv == ('fetch',)
+        assert [each.argv[0] for each in repo.failures] == ['fetch', 'status']
+        assert repo.is_dirty is True
+
+
+class TestLastFetched:
+    """What `check --offline` shows as a report's age, so it has to be the last time origin was
+    actually asked — not the last commit, and not the last time syncer looked."""
+
+    def test_a_fetch_moves_it(self, git_repo_with_remote):
+        repo = _make_repo(git_repo_with_remote)
+        repo.fetch()
+        fetch_head = git_repo_with_remote / '.git' / 'FETCH_HEAD'
+        os.utime(fetch_head, (time.time() + 3600, time.time() + 3600))
+
+        assert repo.last_fetched == datetime.fromtimestamp(fetch_head.stat().st_mtime, UTC)
+
+    def test_a_clone_never_fetched_since_falls_back_to_its_reflogs(self, git_repo_with_remote):
+        assert not (git_repo_with_remote / '.git' / 'FETCH_HEAD').exists()
+        assert _make_repo(git_repo_with_remote).last_fetched is not None
+
+    def test_a_repo_with_no_remote_has_none(self, git_repo):
+        assert _make_repo(git_repo).last_fetched is None
+
+    def test_syncer_s_stamp_outranks_fetch_head(self, git_repo_with_remote):
+        """FETCH_HEAD is also written by a fetch that connected and then failed; the stamp is not."""
+        repo = _make_repo(git_repo_with_remote)
+        repo.fetch()
+        repo.mark_fetched()
+        stamp = git_repo_with_remote / '.git' / FETCH_STAMP
+        os.utime(stamp, (time.time() - 3600, time.time() - 3600))
+
+        assert repo.last_fetched == datetime.fromtimestamp(stamp.stat().st_mtime, UTC)
+
+
+class TestRemoteRefs:
+    OID_A = 'a' * 40
+    OID_B = 'b' * 40
+
+    def test_parses_an_advertisement(self):
+        text = f'ref: refs/heads/main\tHEAD\n{self.OID_A}\tHEAD\n{self.OID_A}\trefs/heads/main\n{self.OID_B}\trefs/heads/feature/x\n'
+        assert parse_ls_remote(text) == RemoteRefs(heads={'main': self.OID_A, 'feature/x': self.OID_B}, default='main')
+
+    def test_a_server_that_names_no_head_has_no_default(self):
+        assert parse_ls_remote(f'{self.OID_A}\tHEAD\n{self.OID_A}\trefs/heads/main\n').default is None
+
+    def test_parses_the_tracking_refs(self):
+        text = f'refs/remotes/origin/HEAD\t{self.OID_A}\trefs/remotes/origin/main\nrefs/remotes/origin/main\t{self.OID_A}\t\n'
+        assert parse_tracking_refs(text) == RemoteRefs(heads={'main': self.OID_A}, default='main')
+
+    def test_moved_and_deleted_are_what_a_fetch_would_do(self):
+        recorded = RemoteRefs(heads={'main': self.OID_A, 'old': self.OID_A}, default='main')
+        assert not RemoteRefs(heads={'main': self.OID_A}, default='main').moved_since(recorded)
+        assert RemoteRefs(heads={'main': self.OID_B}, default='main').moved_since(recorded)
+        assert RemoteRefs(heads={'main': self.OID_A, 'new': self.OID_A}, default='main').moved_since(recorded)
+        assert RemoteRefs(heads={'main': self.OID_A}, default='main').deleted_since(recorded) == ['old']
+
+    def test_only_what_the_refspecs_fetch_is_compared(self):
+        """A `--single-branch` clone never has the branches its refspec leaves out."""
+        single = ('+refs/heads/main:refs/remotes/origin/main',)
+        recorded = RemoteRefs(heads={'main': self.OID_A, 'leftover': self.OID_A}, default=None)
+        advertised = RemoteRefs(heads={'main': self.OID_A, 'other': self.OID_B}, default='main')
+        assert not advertised.moved_since(recorded, single)
+        assert advertised.deleted_since(recorded, single) == []
+        assert RemoteRefs(heads={'main': self.OID_B}, default='main').moved_since(recorded, single)
+        assert RemoteRefs(heads={}, default=None).deleted_since(recorded, single) == ['main']
+
+    def test_a_refspec_it_cannot_read_is_left_to_the_fetch(self):
+        negative = ('+refs/heads/*:refs/remotes/origin/*', '^refs/heads/wip/*')
+        recorded = RemoteRefs(heads={'main': self.OID_A, 'old': self.OID_A}, default='main')
+        assert RemoteRefs(heads={'main': self.OID_A}, default='main').moved_since(recorded, negative)
+        assert RemoteRefs(heads={'main': self.OID_A}, default='main').deleted_since(recorded, negative) == []
+
+    def test_the_live_repo_agrees_with_itself(self, git_repo_with_remote):
+        """Straight after a fetch, origin and the tracking refs say the same thing."""
+        repo = _make_repo(git_repo_with_remote)
+        repo.fetch()
+        advertised = repo.ls_remote()
+        assert isinstance(advertised, RemoteRefs)
+        assert not advertised.moved_since(repo.tracking_refs())
+
+
+class TestStatusSnapshot:
+    def test_parses_every_header_and_entry(self):
+        text = (
+            '# branch.oid 7166421d97c636cd8365c19cb5d3e9aadb860cb8\n'
+            '# branch.head main\n'
+            '# branch.upstream origin/main\n'
+            '# branch.ab +2 -1\n'
+            '# stash 3\n'
+            '1 .M N... 100644 100644 100644 abc abc README.md\n'
+            '? notes.txt\n'
+        )
+        status = parse_status_v2(text)
+        assert (status.branch, status.upstream, status.ahead, status.behind, status.stashes) == ('main', 'origin/main', 2, 1, 3)
+        assert len(status.entries) == 2
+        assert status.dirty is True
+
+    def test_detached_unborn_and_untracked_branches_read_as_absent(self):
+        status = parse_status_v2('# branch.oid (initial)\n# branch.head (detached)\n')
+        assert (status.oid, status.branch, status.current, status.upstream, status.ahead) == (None, None, 'HEAD', None, None)
+        assert status.dirty is False
+
+    def test_one_status_answers_branch_tree_and_stash(self, git_repo):
+        (git_repo / 'README.md').write_text('# stashed\n')
+        _git(git_repo, 'stash')
+        (git_repo / 'new.txt').write_text('untracked\n')
+        repo = _make_repo(git_repo)
+        calls = []
+        original = repo._git
+        repo._git = lambda *args, **kwargs: calls.append(args) or original(*args, **kwargs)
+
+        assert repo.is_dirty is True
+        assert len(repo.uncommitted_changes) == 1
+        assert repo.stash_count == 1
+        assert repo.status_snapshot().current == repo.current_branch
+
+        assert [args[0] for args in calls] == ['status']
+
+    def test_a_git_that_never_reports_stashes_is_asked_directly(self, git_repo):
+        """git before 2.35 prints no `# stash` line at all, which must not read as zero stashes."""
+        (git_repo / 'README.md').write_text('# stashed\n')
+        _git(git_repo, 'stash')
+        repo = _make_repo(git_repo)
+        snapshot = repo.status_snapshot()
+        repo.status_snapshot = lambda: dataclasses.replace(snapshot, stashes=None)
+
+        assert repo.stash_count == 1
+
+    def test_a_failed_status_reads_as_dirty(self, git_repo):
+        repo = _make_repo(git_repo, timeout=1)
+        with _patch_git(returncode=128, stderr='fatal: index file corrupt'):
+            assert repo.status_snapshot() is None
+            assert repo.is_dirty is True
+
+
+def _for_each_ref(path: Path, pattern: str) -> list[str]:
+    result = subprocess.run(['git', 'for-each-ref', '--format=%(refname:lstrip=2)', pattern], cwd=path, capture_output=True, text=True)
+    return result.stdout.split()
+
+
+class TestRefStore:
+    """Checked against git itself rather than against expected literals, so a divergence is a
+    disagreement with the tool whose answer this replaces, not with a guess about it."""
+
+    def test_agrees_with_git_across_packed_and_loose_refs(self, git_repo_with_remote):
+        for name in ('feature/a', 'feature/b', 'zeta'):
+            _git(git_repo_with_remote, 'branch', name)
+        _git(git_repo_with_remote, 'pack-refs', '--all')
+        # One branch only loose, and one packed branch moved so its loose file shadows the packed line.
+        _git(git_repo_with_remote, 'branch', 'loose-only')
+        (git_repo_with_remote / 'extra.txt').write_text('x\n')
+        _git(git_repo_with_remote, 'add', '.')
+        _git(git_repo_with_remote, 'commit', '-m', 'move zeta later')
+        _git(git_repo_with_remote, 'branch', '-f', 'zeta', 'HEAD')
+
+        store = RefStore.read(git_repo_with_remote)
+
+        assert store.branches() == _for_each_ref(git_repo_with_remote, 'refs/heads/')
+        assert store.resolve('refs/heads/zeta') == _rev(git_repo_with_remote, 'zeta')
+        assert store.resolve('refs/heads/feature/a') == _rev(git_repo_with_remote, 'feature/a')
+        assert (
+            store.current_branch()
+            == subprocess.run(
+                ['git', 'rev-parse', '--abbrev-ref', 'HEAD'], cwd=git_repo_with_remote, capture_output=True, text=True
+            ).stdout.strip()
+        )
+
+    def test_repo_reads_spawn_no_git(self, git_repo_with_remote):
+        repo = _make_repo(git_repo_with_remote)
+        calls = []
+        original = repo._git
+        repo._git = lambda *args, **kwargs: calls.append(args) or original(*args, **kwargs)
+
+        assert repo.current_branch in ('main', 'master')
+        assert repo.default_branch == repo.current_branch
+        assert repo.local_branches() == [repo.current_branch]
+        assert repo._target_ref(repo.current_branch) == f'origin/{repo.current_branch}'
+
+        assert calls == []
+
+    def test_detached_head_reads_as_head(self, git_repo):
+        _git(git_repo, 'checkout', '--detach')
+        assert RefStore.read(git_repo).current_branch() == 'HEAD'
+
+    def test_a_linked_worktree_reads_through_commondir(self, git_repo, tmp_path):
+        _git(git_repo, 'branch', 'side')
+        linked = tmp_path / 'linked'
+        _git(git_repo, 'worktree', 'add', str(linked), 'side')
+
+        store = RefStore.read(linked)
+
+        assert store.current_branch() == 'side'
+        assert store.branches() == _for_each_ref(git_repo, 'refs/heads/')
+
+    def test_reftable_is_left_to_git(self, git_repo):
+        (git_repo / '.git' / 'reftable').mkdir()
+        assert RefStore.read(git_repo) is None
+
+    def test_a_symref_loop_falls_back_to_git(self, git_repo_with_remote):
+        """A loop is something git refuses too; the store must not spin, and must not invent an
+        answer — the CLI's verdict stands, whatever it is."""
+        head = git_repo_with_remote / '.git' / 'refs' / 'remotes' / 'origin' / 'HEAD'
+        head.write_text('ref: refs/remotes/origin/loop\n')
+        (head.parent / 'loop').write_text('ref: refs/remotes/origin/HEAD\n')
+        repo = _make_repo(git_repo_with_remote)
+
+        assert repo.default_branch in ('main', 'master')
+        assert repo.read_stats.misses > 0
+
+    def test_an_unreadable_ref_falls_back_to_git(self, git_repo):
+        (git_repo / '.git' / 'packed-refs').write_text('not a packed-refs line\n')
+        repo = _make_repo(git_repo)
+        calls = []
+        original = repo._git
+        repo._git = lambda *args, **kwargs: calls.append(args) or original(*args, **kwargs)
+
+        repo.local_branches()
+
+        assert calls and calls[0][0] == 'for-each-ref'
+
+
+@pytest.mark.skipif(not _pygit2_usable(), reason='pygit2 1.14 or later is not installed')
+class TestLibgit2Reader:
+    """What libgit2 is not trusted to answer goes to git. The agreement itself is
+    test_classify's TestReadBackendsAgree; these are the places it steps aside."""
+
+    @pytest.fixture(autouse=True)
+    def _libgit2(self, monkeypatch):
+        monkeypatch.setattr('syncer.repos.READ_BACKEND', 'libgit2')
+
+    @staticmethod
+    def _spied(path: Path) -> tuple[Repo, list[tuple[str, ...]]]:
+        repo = _make_repo(path)
+        calls: list[tuple[str, ...]] = []
+        original = repo._git
+        repo._git = lambda *args, **kwargs: calls.append(args) or original(*args, **kwargs)
+        return repo, calls
+
+    def test_answers_without_spawning_git(self, git_repo_with_remote):
+        repo, calls = self._spied(git_repo_with_remote)
+        branch = repo.current_branch
+        assert repo.branch_refs()[branch].counts == (0, 0)
+        assert repo.status_snapshot().upstream == f'origin/{branch}'
+        assert repo.ahead_behind(branch, f'origin/{branch}') == (0, 0)
+        assert repo.is_merged_into(branch, branch) is True
+        assert calls == []
+
+    def test_an_upstream_a_tag_would_shadow_is_named_by_git(self, git_repo_with_remote):
+        """`origin/main` is also a tag here, so git prints the upstream longer; the CLI says how."""
+        repo, calls = self._spied(git_repo_with_remote)
+        _git(git_repo_with_remote, 'tag', f'origin/{repo.current_branch}')
+
+        refs = repo.branch_refs()
+
+        assert [args[0] for args in calls] == ['for-each-ref']
+        assert refs[repo.current_branch].upstream == f'remotes/origin/{repo.current_branch}'
+
+    def test_a_filtered_tree_is_measured_by_git(self, git_repo):
+        """libgit2 cannot run a clean filter, so a git-lfs file would read as modified."""
+        _git(git_repo, 'config', 'filter.lfs.clean', 'git-lfs clean -- %f')
+        repo, calls = self._spied(git_repo)
+
+        assert repo.is_dirty is False
+        assert calls == [('status', '--porcelain=v2', '--branch', '--show-stash')]
+
+    def test_a_guard_reads_through_git(self, git_repo):
+        """execute.py's invariants are promises about what git sees, so live() never asks libgit2."""
+        repo, calls = self._spied(git_repo)
+        assert repo.is_dirty is False
+        (git_repo / 'README.md').write_text('# edited\n')
+
+        with repo.live():
+            assert repo.is_dirty is True
+        assert [args[0] for args in calls] == ['status']
+
+    def test_a_fetch_cuts_the_counts_from_its_answer_as_from_the_memo(self, git_repo_with_remote):
+        repo = _make_repo(git_repo_with_remote)
+        assert repo.status_snapshot().ahead == 0
+
+        repo.forget_remote()
+
+        status = repo.status_snapshot()
+        assert (status.ahead, status.behind) == (None, None)
+        assert status.upstream is not None
+
+    def test_a_write_forgets_its_answer(self, git_repo):
+        repo = _make_repo(git_repo)
+        assert repo.is_dirty is False
+
+        (git_repo / 'new.txt').write_text('new\n')
+        repo._write('add', 'new.txt')
+
+        assert repo.is_dirty is True
+
+    def test_not_a_repo_is_git_s_to_report(self, tmp_path):
+        repo, calls = self._spied(tmp_path)
+        assert repo.branch_refs() is None
+        assert calls and calls[0][0] == 'for-each-ref'
+
+
+class TestCommitGraphReads:
+    """The commit-graph answers the guards' ancestry questions; git answers what it does not hold.
+    Agreement with git itself is test_commitgraph's."""
+
+    @pytest.fixture(autouse=True)
+    def _graph(self, monkeypatch):
+        monkeypatch.setattr('syncer.repos.READ_COMMIT_GRAPH', True)
+
+    @staticmethod
+    def _spied(path: Path) -> tuple[Repo, list[tuple[str, ...]]]:
+        repo = _make_repo(path)
+        calls: list[tuple[str, ...]] = []
+        original = repo._git
+        repo._git = lambda *args, **kwargs: calls.append(args) or original(*args, **kwargs)
+        return repo, calls
+
+    @staticmethod
+    def _diverged(path: Path) -> str:
+        """`feature` two commits ahead of origin's main, which is one ahead of it, and `old` merged
+        into both; graph written."""
+        branch = subprocess.run(['git', 'branch', '--show-current'], cwd=path, capture_output=True, text=True).stdout.strip()
+        _git(path, 'branch', 'old')
+        _git(path, 'switch', '-q', '-c', 'feature')
+        for message in ('one', 'two'):
+            _git(path, 'commit', '--allow-empty', '-q', '-m', message)
+        _git(path, 'switch', '-q', branch)
+        _git(path, 'commit', '--allow-empty', '-q', '-m', 'upstream')
+        _git(path, 'push', '-q')
+        _git(path, 'commit-graph', 'write', '--reachable')
+        return branch
+
+    def test_a_guard_asks_no_git_for_what_the_graph_holds(self, git_repo_with_remote):
+        branch = self._diverged(git_repo_with_remote)
+        repo, calls = self._spied(git_repo_with_remote)
+
+        with repo.live():
+            assert repo.ahead_behind('feature', f'origin/{branch}') == (2, 1)
+            assert repo.is_merged_into('feature', branch) is False
+            assert repo.is_merged_into('old', branch) is True
+        assert calls == []
+
+    def test_a_commit_newer_than_the_graph_is_counted_by_git(self, git_repo_with_remote):
+        branch = self._diverged(git_repo_with_remote)
+        repo, calls = self._spied(git_repo_with_remote)
+        _git(git_repo_with_remote, 'switch', '-q', 'feature')
+        _git(git_repo_with_remote, 'commit', '--allow-empty', '-q', '-m', 'three')
+
+        with repo.live():
+            assert repo.ahead_behind('feature', f'origin/{branch}') == (3, 1)
+        assert [args[0] for args in calls] == ['rev-list']
+
+    def test_a_name_the_ref_files_cannot_resolve_goes_to_git(self, git_repo_with_remote):
+        branch = self._diverged(git_repo_with_remote)
+        repo, calls = self._spied(git_repo_with_remote)
+
+        assert repo.ahead_behind('feature', f'{branch}~1') == (2, 0)
+        assert [args[0] for args in calls] == ['rev-list']
+
+
 class TestLinkedWorktrees:
     """Which tree holds a branch, for the guard that stops update-ref moving a ref out from
     under a live worktree. The repo's own working directory is never one of these — a branch
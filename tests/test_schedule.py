@@ -0,0 +1,123 @@
+from syncer.schedule import HostScheduler
+from syncer.schedule import expectations
+from syncer.schedule import longest_first
+from syncer.schedule import makespan
+
+BITBUCKET = 'ssh://git@bitbucket.example.com:7999/proj/{}.git'
+GITHUB = 'https://github.com/me/{}'
+
+
+def _scheduler(urls: list[str], *, limit: int, caps: dict[str, int] | None = None) -> HostScheduler[str]:
+    return HostScheduler(((url.format(index), f'{url.split("/")[2]}#{index}') for index, url in enumerate(urls)), limit=limit, caps=caps)
+
+
+def _hosts(started) -> list[str]:
+    return [lane[0] for lane, _ in started]
+
+
+class TestTheGlobalLimitStillHolds:
+    def test_never_more_than_the_limit_in_flight(self):
+        scheduler = _scheduler([GITHUB] * 10, limit=4)
+        assert len(scheduler.ready()) == 4
+        assert scheduler.ready() == []
+        assert scheduler.in_flight == 4
+        assert scheduler.pending == 6
+
+    def test_a_release_frees_exactly_one_slot(self):
+        scheduler = _scheduler([GITHUB] * 10, limit=4)
+        started = scheduler.ready()
+        scheduler.release(started[0][0])
+        assert len(scheduler.ready()) == 1
+
+    def test_everything_is_handed_out_exactly_once(self):
+        scheduler = _scheduler([GITHUB, BITBUCKET] * 5, limit=3, caps={'bitbucket.example.com': 1})
+        seen = []
+        while scheduler.pending or scheduler.in_flight:
+            started = scheduler.ready()
+            seen.extend(item for _, item in started)
+            for lane, _ in started:
+                scheduler.release(lane)
+        assert sorted(seen) == sorted(f'{url.split("/")[2]}#{index}' for index, url in enumerate([GITHUB, BITBUCKET] * 5))
+
+
+class TestAThrottledHostNeverHoldsEverySlot:
+    """Fed in path order, sixteen slots went to whichever host sorted first. A Bitbucket that
+    allows four sessions per user answered the other twelve with refusals that read as a broken
+    network, while github.com sat idle behind it."""
+
+    def test_a_capped_host_stops_at_its_cap(self):
+        scheduler = _scheduler([BITBUCKET] * 10, limit=16, caps={'bitbucket.example.com': 4})
+        assert len(scheduler.ready()) == 4
+
+    def test_the_other_slots_go_to_other_hosts(self):
+        scheduler = _scheduler([BITBUCKET] * 10 + [GITHUB] * 10, limit=8, caps={'bitbucket.example.com': 2})
+        assert sorted(_hosts(scheduler.ready())) == ['bitbucket.example.com'] * 2 + ['github.com'] * 6
+
+    def test_hosts_interleave_rather_than_draining_in_order(self):
+        scheduler = _scheduler([BITBUCKET] * 4 + [GITHUB] * 4, limit=4)
+        assert _hosts(scheduler.ready()) == ['bitbucket.example.com', 'github.com'] * 2
+
+    def test_a_freed_slot_goes_to_the_next_host_in_turn(self):
+        """Restarting the rotation at the first lane on every call would hand every freed slot to
+        whichever host sorts first, which is the starvation this exists to prevent."""
+        scheduler = _scheduler([BITBUCKET] * 4 + [GITHUB] * 4, limit=1)
+        first = scheduler.ready()
+        scheduler.release(first[0][0])
+        assert _hosts(first + scheduler.ready()) == ['bitbucket.example.com', 'github.com']
+
+
+class TestTheLaneIsTheBreakersKey:
+    def test_each_transport_is_capped_separately(self):
+        """They are separate sessions to whatever is doing the throttling."""
+        scheduler = _scheduler(
+            [BITBUCKET] * 4 + ['https://bitbucket.example.com/scm/proj/{}.git'] * 4, limit=16, caps={'bitbucket.example.com': 1}
+        )
+        assert sorted(lane for lane, _ in scheduler.ready()) == [('bitbucket.example.com', 'https'), ('bitbucket.example.com', 'ssh')]
+
+    def test_a_url_with_no_host_is_limited_only_globally(self):
+        scheduler = _scheduler(['/srv/git/{}.git'] * 6, limit=4, caps={'': 1})
+        assert len(scheduler.ready()) == 4
+
+
+class TestAHeldLaneStartsOneAtATime:
+    def test_a_held_lane_starts_only_its_first(self):
+        scheduler = _scheduler([BITBUCKET] * 4 + [GITHUB] * 4, limit=8)
+        scheduler.hold([('bitbucket.example.com', 'ssh')])
+        assert sorted(_hosts(scheduler.ready())) == ['bitbucket.example.com'] + ['github.com'] * 4
+
+    def test_opening_it_fills_it_to_its_cap(self):
+        scheduler = _scheduler([BITBUCKET] * 4, limit=8, caps={'bitbucket.example.com': 3})
+        scheduler.hold([('bitbucket.example.com', 'ssh')])
+        assert len(scheduler.ready()) == 1
+        scheduler.open(('bitbucket.example.com', 'ssh'))
+        assert len(scheduler.ready()) == 2
+
+
+class TestLongestFirst:
+    """Path order put whichever monorepo sorted last at the end of the run, where it set the
+    wall-clock floor on its own."""
+
+    def test_the_slowest_repo_starts_first(self):
+        expected = expectations(['a', 'b', 'mono'], {'a': 2_000, 'b': 1_000, 'mono': 90_000})
+        assert longest_first(['a', 'b', 'mono'], expected, key=str) == ['mono', 'a', 'b']
+
+    def test_a_repo_with_no_history_is_assumed_ordinary(self):
+        expected = expectations(['new', 'fast', 'mid', 'slow'], {'fast': 1_000, 'mid': 5_000, 'slow': 9_000})
+        assert expected['new'] == 5_000
+
+    def test_no_history_leaves_path_order_alone(self):
+        paths = ['c', 'a', 'b']
+        assert longest_first(paths, expectations(paths, {}), key=str) == paths
+
+
+class TestMakespan:
+    def test_one_slot_is_the_sum(self):
+        assert makespan([1, 2, 3], 1) == 6
+
+    def test_each_item_takes_the_first_free_slot(self):
+        assert makespan([3, 1, 1, 1], 2) == 3
+
+    def test_the_long_job_last_sets_the_floor(self):
+        """The whole case for longest-first, in two lines."""
+        assert makespan([1, 1, 1, 1, 10], 2) == 12
+        assert makespan([10, 1, 1, 1, 1], 2) == 10
@@ -7,10 +7,10 @@ from rich.console import Console
 
 from syncer.config import RepoConfig
 from syncer.config import SyncerConfig
+from syncer.output import time_ago
 from syncer.stats import _format_duration
 from syncer.stats import _show_commits_graph
 from syncer.stats import _show_repo_age
-from syncer.stats import _time_ago
 from syncer.stats import show_stats
 from syncer.tracking import RepoSnapshot
 from syncer.tracking import RunSummary
@@ -31,22 +31,22 @@ def _make_event(repos=None, timestamp=None, config_name='default', **summary_ove
 
 class TestTimeAgo:
     def test_just_now(self):
-        assert _time_ago(datetime.now(UTC)) == 'just now'
+        assert time_ago(datetime.now(UTC)) == 'just now'
 
     def test_minutes(self):
-        assert _time_ago(datetime.now(UTC) - timedelta(minutes=30)) == '30m ago'
+        assert time_ago(datetime.now(UTC) - timedelta(minutes=30)) == '30m ago'
 
     def test_hours(self):
-        assert _time_ago(datetime.now(UTC) - timedelta(hours=3)) == '3h ago'
+        assert time_ago(datetime.now(UTC) - timedelta(hours=3)) == '3h ago'
 
     def test_days(self):
-        assert _time_ago(datetime.now(UTC) - timedelta(days=5)) == '5d ago'
+        assert time_ago(datetime.now(UTC) - timedelta(days=5)) == '5d ago'
 
     def test_months(self):
-        assert _time_ago(datetime.now(UTC) - timedelta(days=60)) == '2mo ago'
+        assert time_ago(datetime.now(UTC) - timedelta(days=60)) == '2mo ago'
 
     def test_years(self):
-        assert _time_ago(datetime.now(UTC) - timedelta(days=400)) == '1y ago'
+        assert time_ago(datetime.now(UTC) - timedelta(days=400)) == '1y ago'
 
 
 class TestShowStats:
@@ -127,6 +127,59 @@ class TestShowStats:
         pos_10 = output.find('Jan 10')
         assert pos_12 < pos_10
 
+    def test_scheduling_shows_predicted_actual_and_saved(self, tmp_path):
+        events = [_make_event(makespan_ms=42_100, predicted_ms=40_300, path_order_ms=55_000, longest_first_ms=41_900)]
+        config = SyncerConfig(owner='test', host='https://github.com', repos=[])
+        output_file = tmp_path / 'output.txt'
+        console = Console(file=open(output_file, 'w'), width=120)  # noqa: SIM115
+        with (
+            patch('syncer.stats.console', console),
+            patch('syncer.stats.read_events', return_value=events),
+        ):
+            show_stats(config, tmp_path / 'events.jsonl')
+        output = output_file.read_text()
+        assert 'took 42.1s · predicted 40.3s · path order ~55.0s (saved ~13.1s)' in output
+
+    def test_scheduling_is_absent_for_runs_that_never_timed_it(self, tmp_path):
+        config = SyncerConfig(owner='test', host='https://github.com', repos=[])
+        output_file = tmp_path / 'output.txt'
+        console = Console(file=open(output_file, 'w'), width=120)  # noqa: SIM115
+        with (
+            patch('syncer.stats.console', console),
+            patch('syncer.stats.read_events', return_value=[_make_event()]),
+        ):
+            show_stats(config, tmp_path / 'events.jsonl')
+        assert 'Scheduling' not in output_file.read_text()
+
+    def test_scheduling_shows_what_the_git_calls_cost(self, tmp_path):
+        events = [_make_event(makespan_ms=10_000, git_calls=2_000, spawn_ms=3_000, wait_ms=9_000)]
+        config = SyncerConfig(owner='test', host='https://github.com', repos=[])
+        output_file = tmp_path / 'output.txt'
+        console = Console(file=open(output_file, 'w'), width=120)  # noqa: SIM115
+        with (
+            patch('syncer.stats.console', console),
+            patch('syncer.stats.read_events', return_value=events),
+        ):
+            show_stats(config, tmp_path / 'events.jsonl')
+        assert '2000 git calls (200/s, 25% spawning)' in output_file.read_text()
+
+    def test_an_offline_run_is_labelled_and_does_not_set_the_status(self, tmp_path):
+        """The status column is what origin said last; an offline run never asked it."""
+        (tmp_path / 'api' / '.git').mkdir(parents=True)
+        config = SyncerConfig(owner='test', host='https://github.com', repos=[RepoConfig(name='api', path=str(tmp_path / 'api'))])
+        verified = _make_event(repos=[_make_snapshot('api', status='issues', unpushed=2)], timestamp=datetime.now(UTC) - timedelta(days=1))
+        offline = _make_event(repos=[_make_snapshot('api')]).model_copy(update={'offline': True})
+        output_file = tmp_path / 'output.txt'
+        console = Console(file=open(output_file, 'w'), width=120)  # noqa: SIM115
+        with (
+            patch('syncer.stats.console', console),
+            patch('syncer.stats.read_events', return_value=[verified, offline]),
+        ):
+            show_stats(config, tmp_path / 'events.jsonl')
+        output = output_file.read_text()
+        assert '(offline)' in output
+        assert '2 unpushed' in output[output.find('All Repos') :]
+
     def test_all_repos_sorted_by_last_active(self, tmp_path):
         """All Repos table should sort most recently active first."""
         for name in ('old-repo', 'new-repo'):
@@ -1,5 +1,7 @@
+import json
 import subprocess
 from pathlib import Path
+from unittest.mock import patch
 
 from syncer.breaker import Trip
 from syncer.config import RepoConfig
@@ -7,11 +9,13 @@ from syncer.config import SyncerConfig
 from syncer.config import ToolConfig
 from syncer.diagnose import Cause
 from syncer.output import Tally
+from syncer.progress import RunProgress
 from syncer.report import LIFECYCLE_STYLE
 from syncer.report import RepoBranchReport
 from syncer.report import attention_tally
 from syncer.report import gather_reports
 from syncer.repos import GitFailure
+from syncer.repos import Repo
 from syncer.sync import _FAILED_STATUSES
 from syncer.sync import _ISSUE_STATUSES
 from syncer.sync import _LIFECYCLE_TO_STATUS
@@ -173,6 +177,90 @@ class TestRunSync:
         assert out.index('aaa-good') < out.index('zzz-noremote')
 
 
+class TestAnOfflineRunIsRecordedAsOne:
+    """The history is what `stats` trusts, so a run that verified nothing against origin has to
+    say so there — or its `synced` reads as a fact about the remote."""
+
+    def test_the_event_and_each_snapshot_are_marked(self, tmp_path):
+        events_file = tmp_path / 'events.jsonl'
+        config = _config_for([_make_cloned_repo(tmp_path, 'alpha')])
+        run_sync(config, ToolConfig(default_policy='observe'), jitter=0.0, events_file=events_file, offline=True)
+        event = read_events(events_file)[0]
+        assert event.offline is True
+        assert event.repos[0].refs_as_of is not None
+
+    def test_the_json_is_marked(self, tmp_path, capsys):
+        config = _config_for([_make_cloned_repo(tmp_path, 'alpha')])
+        run_sync(config, ToolConfig(default_policy='observe'), jitter=0.0, events_file=tmp_path / 'e.jsonl', as_json=True, offline=True)
+        assert json.loads(capsys.readouterr().out)['offline'] is True
+
+    def test_the_report_says_nothing_was_fetched(self, tmp_path, capsys):
+        config = _config_for([_make_cloned_repo(tmp_path, 'alpha')])
+        run_sync(config, ToolConfig(default_policy='observe'), jitter=0.0, events_file=tmp_path / 'e.jsonl', offline=True)
+        assert 'nothing was fetched' in capsys.readouterr().out
+
+
+class TestTheSlowestReposStartFirst:
+    def test_each_repo_records_its_duration(self, tmp_path):
+        events_file = tmp_path / 'events.jsonl'
+        config = _config_for([_make_cloned_repo(tmp_path, 'alpha')])
+        run_sync(config, ToolConfig(default_policy='observe'), jitter=0.0, events_file=events_file)
+        event = read_events(events_file)[0]
+        assert event.repos[0].duration_ms is not None
+        assert event.repos[0].fetch_ms is not None
+        assert event.summary.makespan_ms is not None
+        assert event.summary.git_calls
+        assert event.summary.predicted_ms is None  # no history to predict from on a first run
+        assert event.summary.path_order_ms is not None
+
+    def test_history_reorders_the_next_run(self, tmp_path):
+        events_file = tmp_path / 'events.jsonl'
+        paths = [_make_cloned_repo(tmp_path, name) for name in ('alpha', 'bravo', 'charlie')]
+        config = _config_for(paths)
+        run_sync(config, ToolConfig(default_policy='observe'), jitter=0.0, events_file=events_file)
+        # Rewrite history so charlie, last by path, is the slow one.
+        event = read_events(events_file)[0]
+        for snap in event.repos:
+            snap.duration_ms = 90_000 if snap.name == 'charlie' else 1_000
+        events_file.write_text(event.model_dump_json() + '\n')
+
+        started: list[str] = []
+        real = RunProgress.start
+
+        def record(progress, label):
+            started.append(label)
+            return real(progress, label)
+
+        with patch.object(RunProgress, 'start', record):
+            run_sync(config, ToolConfig(default_policy='observe'), jobs=1, jitter=0.0, events_file=events_file)
+        assert started == ['charlie', 'alpha', 'bravo']
+        assert read_events(events_file)[-1].summary.predicted_ms == 92_000
+
+
+class TestFetchesLearnTheirTimeout:
+    def test_history_sizes_each_repo_s_fetch_ceiling(self, tmp_path):
+        events_file = tmp_path / 'events.jsonl'
+        config = _config_for([_make_cloned_repo(tmp_path, name) for name in ('alpha', 'bravo')])
+        run_sync(config, ToolConfig(default_policy='observe'), jitter=0.0, events_file=events_file)
+        # Rewrite history so alpha has three fetches of 10s behind it, and bravo none.
+        event = read_events(events_file)[0]
+        event.repos = [snap for snap in event.repos if snap.name == 'alpha']
+        event.repos[0].fetch_ms = 10_000
+        event.repos[0].fetch_ran = True
+        events_file.write_text((event.model_dump_json() + '\n') * 3)
+
+        timeouts: dict[str, int | None] = {}
+        real = Repo.__init__
+
+        def record(repo, *args, **kwargs):
+            real(repo, *args, **kwargs)
+            timeouts[repo.name] = repo.fetch_timeout
+
+        with patch.object(Repo, '__init__', record):
+            run_sync(config, ToolConfig(default_policy='observe', git_timeout=120), jitter=0.0, events_file=events_file)
+        assert timeouts == {'alpha': 50, 'bravo': None}
+
+
 def _config_matching_origin(paths: list[Path]) -> SyncerConfig:
     """A registry whose clone URL is each clone's real origin, so a synced repo is severity SYNCED
     rather than a WARNING for pointing somewhere the registry never named."""
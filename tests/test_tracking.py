@@ -5,6 +5,8 @@ from pathlib import Path
 
 import pytest
 
+from syncer.tracking import TIMEOUT_FLOOR_SECONDS
+from syncer.tracking import TIMEOUT_WINDOW
 from syncer.tracking import BranchSnapshot
 from syncer.tracking import RepoSnapshot
 from syncer.tracking import RepoStatus
@@ -12,7 +14,9 @@ from syncer.tracking import RunSummary
 from syncer.tracking import SyncRunEvent
 from syncer.tracking import emit_event
 from syncer.tracking import events_file_for
+from syncer.tracking import expected_durations
 from syncer.tracking import find_stale_repos
+from syncer.tracking import learned_timeouts
 from syncer.tracking import migrate_legacy_events
 from syncer.tracking import read_events
 
@@ -344,3 +348,81 @@ class TestFindStaleRepos:
         ]
         stale = find_stale_repos(events, threshold_days=3)
         assert stale == []
+
+
+class TestExpectedDurations:
+    def _run(self, days_ago: int, **durations: int | None) -> SyncRunEvent:
+        repos = [_make_snapshot(name, duration_ms=ms) for name, ms in durations.items()]
+        return _make_event(repos=repos, timestamp=datetime.now(UTC) - timedelta(days=days_ago))
+
+    def test_the_median_of_recent_runs(self):
+        events = [self._run(3, mono=80_000), self._run(2, mono=90_000), self._run(1, mono=400_000)]
+        assert expected_durations(events) == {'~/code/mono': 90_000}
+
+    def test_only_the_last_window_counts(self):
+        events = [self._run(days, api=1_000 if days < 3 else 60_000) for days in range(6)]
+        assert expected_durations(events, window=3) == {'~/code/api': 1_000}
+
+    def test_runs_that_recorded_nothing_are_not_zero(self):
+        """Events written before durations were recorded carry None, which is not a fast repo."""
+        events = [self._run(2, api=5_000), self._run(1, api=None)]
+        assert expected_durations(events) == {'~/code/api': 5_000}
+
+    def test_offline_runs_are_not_timings(self):
+        """No fetch in them, so every repo looks fast and the ordering they would give is noise."""
+        offline = self._run(1, api=200).model_copy(update={'offline': True})
+        assert expected_durations([self._run(2, api=5_000), offline]) == {'~/code/api': 5_000}
+
+    def test_a_reused_fetch_is_not_a_timing(self):
+        reused = self._run(1, api=200)
+        reused.repos[0].refs_as_of = datetime.now(UTC) - timedelta(minutes=3)
+        assert expected_durations([self._run(2, api=5_000), reused]) == {'~/code/api': 5_000}
+
+    def test_older_events_still_parse(self):
+        line = (
+            '{"timestamp": "2025-01-01T00:00:00Z", "config_name": "x", "repos": [{"name": "a", "path": "~/a", "status": "synced"}],'
+            ' "summary": {"total": 1, "synced": 1, "pulled": 0, "pushed": 0, "issues": 0, "duration_ms": 5}}'
+        )
+        event = SyncRunEvent.model_validate_json(line)
+        assert event.repos[0].duration_ms is None
+        assert event.summary.makespan_ms is None
+
+
+class TestLearnedTimeouts:
+    def _run(self, days_ago: int, fetch_ms: int | None, status: RepoStatus = 'synced', fetch_ran: bool = True) -> SyncRunEvent:
+        repo = _make_snapshot('api', status=status, fetch_ms=fetch_ms, fetch_ran=fetch_ran)
+        return _make_event(repos=[repo], timestamp=datetime.now(UTC) - timedelta(days=days_ago))
+
+    def test_five_times_the_slowest_recent_fetch(self):
+        events = [self._run(days, ms) for days, ms in enumerate([8_000, 10_000, 11_000, 12_000])]
+        assert learned_timeouts(events, ceiling=120) == {'~/code/api': 60}
+
+    def test_never_under_the_floor_or_over_the_ceiling(self):
+        fast = [self._run(days, 200) for days in range(3)]
+        slow = [self._run(days, 90_000) for days in range(3)]
+        assert learned_timeouts(fast, ceiling=120) == {'~/code/api': TIMEOUT_FLOOR_SECONDS}
+        assert learned_timeouts(slow, ceiling=120) == {'~/code/api': 120}
+
+    def test_too_little_history_is_no_answer(self):
+        events = [self._run(2, 5_000), self._run(1, 5_000), self._run(0, None)]
+        assert learned_timeouts(events, ceiling=120) == {}
+
+    def test_failed_fetches_are_not_samples(self):
+        """A refused connection fails in milliseconds, and would talk the timeout down."""
+        events = [self._run(days, 20_000) for days in range(1, 4)] + [self._run(4, 10, status='unverified')]
+        assert learned_timeouts(events, ceiling=300) == {'~/code/api': 100}
+
+    def test_runs_that_only_asked_origin_are_not_samples(self):
+        """An ls-remote that found nothing new is a round trip, not the fetch it would size."""
+        probes = [self._run(days, 150, fetch_ran=False) for days in range(TIMEOUT_WINDOW)]
+        events = probes + [self._run(days, 20_000) for days in range(TIMEOUT_WINDOW, TIMEOUT_WINDOW + 3)]
+        assert learned_timeouts(events, ceiling=300) == {'~/code/api': 100}
+
+    def test_a_history_of_only_those_is_no_answer(self):
+        events = [self._run(days, 150, fetch_ran=False) for days in range(TIMEOUT_WINDOW)]
+        assert learned_timeouts(events, ceiling=300) == {}
+
+    def test_a_failure_last_run_buys_the_full_ceiling(self):
+        """Otherwise a fetch legitimately slower than its history would time out every run after."""
+        events = [self._run(days, 20_000) for days in range(1, 4)] + [self._run(0, 100_000, status='unverified')]
+        assert learned_timeouts(events, ceiling=300) == {}
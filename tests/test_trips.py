@@ -0,0 +1,158 @@
+import subprocess
+import sys
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+from syncer.breaker import HostBreaker
+from syncer.config import RepoConfig
+from syncer.config import SyncerConfig
+from syncer.config import ToolConfig
+from syncer.diagnose import Cause
+from syncer.report import gather_reports
+from syncer.repos import GitFailure
+from syncer.trips import FLAKY_TRIP_TTL
+from syncer.trips import HOST_WIDE_TRIP_TTL
+from syncer.trips import StoredTrip
+from syncer.trips import clear_trips
+from syncer.trips import load_trips
+from syncer.trips import save_trips
+
+NOW = datetime(2026, 10, 1, 12, 0, tzinfo=UTC)
+URL = 'ssh://git@bitbucket.example.com:7999/proj/api.git'
+KEY = ('bitbucket.example.com', 'ssh')
+
+DENIED = GitFailure(argv=('fetch',), returncode=128, stderr='git@bitbucket.example.com: Permission denied (publickey).')
+TIMED_OUT = GitFailure(argv=('fetch',), returncode=124, stderr='timed out after 120s')
+
+# Stands in for ssh: logs every connection, refuses it while $FAKE_SSH_DENY is set, and otherwise
+# runs the remote command locally, so ssh://fakehost/<path> reaches the bare repo at <path>.
+FAKE_SSH = """\
+import os, sys
+if '-G' in sys.argv:
+    sys.exit(0)
+with open(os.environ['FAKE_SSH_LOG'], 'a') as out:
+    out.write('connect\\n')
+if os.environ.get('FAKE_SSH_DENY'):
+    sys.stderr.write('git@fakehost: Permission denied (publickey).\\n')
+    sys.exit(255)
+args = sys.argv[1:]
+while args[0].startswith('-'):
+    args = args[2:] if args[0] in ('-o', '-p') else args[1:]
+os.execvp('sh', ['sh', '-c', ' '.join(args[1:])])
+"""
+
+
+def _stored(key=KEY, cause=Cause.AUTH, until=NOW + timedelta(minutes=5)) -> StoredTrip:
+    return StoredTrip(host=key[0], transport=key[1], cause=cause, until=until)
+
+
+def _git(path: Path, *args: str) -> None:
+    subprocess.run(['git', *args], cwd=path, capture_output=True, check=True)
+
+
+class TestTheVerdictsOutliveTheRun:
+    def test_a_host_wide_trip_is_kept_for_ten_minutes(self, tmp_path):
+        breaker = HostBreaker()
+        breaker.record_failure(URL, DENIED)
+        save_trips(tmp_path / 'trips.json', breaker, [], now=NOW)
+        assert load_trips(tmp_path / 'trips.json', now=NOW) == [_stored(until=NOW + HOST_WIDE_TRIP_TTL)]
+
+    def test_a_flaky_trip_is_kept_for_two(self, tmp_path):
+        breaker = HostBreaker()
+        for _ in range(3):
+            breaker.record_failure(URL, TIMED_OUT)
+        save_trips(tmp_path / 'trips.json', breaker, [], now=NOW)
+        assert load_trips(tmp_path / 'trips.json', now=NOW) == [_stored(cause=Cause.TIMEOUT, until=NOW + FLAKY_TRIP_TTL)]
+
+    def test_an_expired_verdict_is_gone(self, tmp_path):
+        save_trips(tmp_path / 'trips.json', HostBreaker(), [_stored()], now=NOW)
+        assert load_trips(tmp_path / 'trips.json', now=NOW + timedelta(minutes=6)) == []
+
+    def test_a_host_that_answered_is_struck_off(self, tmp_path):
+        breaker = HostBreaker()
+        breaker.record_success(URL)
+        save_trips(tmp_path / 'trips.json', breaker, [_stored()], now=NOW)
+        assert not (tmp_path / 'trips.json').exists()
+
+    def test_a_host_nobody_asked_keeps_its_verdict(self, tmp_path):
+        other = _stored(key=('github.com', 'https'))
+        save_trips(tmp_path / 'trips.json', HostBreaker(), [other], now=NOW)
+        assert load_trips(tmp_path / 'trips.json', now=NOW) == [other]
+
+    def test_an_unreadable_file_is_no_verdicts(self, tmp_path):
+        (tmp_path / 'trips.json').write_text('{not json')
+        assert load_trips(tmp_path / 'trips.json') == []
+
+    def test_clearing_forgets_everything(self, tmp_path):
+        save_trips(tmp_path / 'trips.json', HostBreaker(), [_stored(until=datetime.now(UTC) + timedelta(minutes=5))])
+        assert clear_trips(tmp_path / 'trips.json') == 1
+        assert not (tmp_path / 'trips.json').exists()
+
+
+class TestAHalfOpenHost:
+    def test_its_first_flaky_failure_trips_it(self):
+        breaker = HostBreaker()
+        breaker.half_open(KEY)
+        breaker.record_failure(URL, TIMED_OUT)
+        assert breaker.trip_for(URL).cause is Cause.TIMEOUT
+
+    def test_an_answer_clears_it(self):
+        breaker = HostBreaker()
+        breaker.half_open(KEY)
+        breaker.record_success(URL)
+        breaker.record_failure(URL, TIMED_OUT)
+        assert breaker.trip_for(URL) is None
+
+
+@pytest.fixture
+def fake_ssh(tmp_path, monkeypatch):
+    """Route git's ssh through FAKE_SSH; returns how many connections it has seen so far."""
+    script = tmp_path / 'fake-ssh'
+    script.write_text(FAKE_SSH)
+    log = tmp_path / 'ssh.log'
+    log.touch()
+    monkeypatch.setenv('GIT_SSH_COMMAND', f'{sys.executable} {script}')
+    monkeypatch.setenv('FAKE_SSH_LOG', str(log))
+    return lambda: len(log.read_text().split())
+
+
+@pytest.fixture
+def ssh_config(tmp_path):
+    """Four clones on one ssh host, as a registry."""
+    seed = tmp_path / 'seed'
+    _git(tmp_path, 'init', '-q', '-b', 'main', str(seed))
+    _git(seed, '-c', 'user.name=t', '-c', 'user.email=t@t', 'commit', '-q', '--allow-empty', '-m', 'init')
+    repos = []
+    for index in range(4):
+        bare = tmp_path / f'repo{index}.git'
+        _git(tmp_path, 'clone', '-q', '--bare', str(seed), str(bare))
+        clone = tmp_path / f'repo{index}'
+        _git(tmp_path, 'clone', '-q', str(bare), str(clone))
+        _git(clone, 'remote', 'set-url', 'origin', f'ssh://fakehost{bare}')
+        repos.append(RepoConfig(name=clone.name, path=str(clone), clone_url=f'ssh://fakehost{bare}'))
+    return SyncerConfig(owner='o', host='https://github.com', repos=repos)
+
+
+class TestTheNextRunStartsHalfOpen:
+    """An expired token meant every `syncer check` after it spent a full --jobs rediscovering it."""
+
+    def test_a_host_still_refusing_costs_one_repo(self, fake_ssh, ssh_config, tmp_path, monkeypatch):
+        monkeypatch.setenv('FAKE_SSH_DENY', '1')
+        trips = tmp_path / 'trips.json'
+        save_trips(trips, HostBreaker(), [_stored(key=('fakehost', 'ssh'), until=datetime.now(UTC) + timedelta(minutes=5))])
+        reports = gather_reports(ssh_config, ToolConfig(default_policy='observe'), jobs=4, jitter=0.0, trips_file=trips)
+        assert fake_ssh() == 1
+        assert sum(report.skipped is not None for report in reports) == 3
+        [trip] = load_trips(trips)
+        assert trip.until > datetime.now(UTC) + timedelta(minutes=9)
+
+    def test_a_host_that_recovered_is_let_in_and_forgotten(self, fake_ssh, ssh_config, tmp_path):
+        trips = tmp_path / 'trips.json'
+        save_trips(trips, HostBreaker(), [_stored(key=('fakehost', 'ssh'), until=datetime.now(UTC) + timedelta(minutes=5))])
+        reports = gather_reports(ssh_config, ToolConfig(default_policy='observe'), jobs=4, jitter=0.0, trips_file=trips)
+        assert all(report.error is None for report in reports)
+        assert not trips.exists()